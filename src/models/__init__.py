@@ -1,11 +1,26 @@
 """Optimization model implementations."""
 
 from .bank_loan import BankLoanOptimizer
-from .production_inventory import ProductionInventoryOptimizer
+from .multi_period_loan import MultiPeriodLoanOptimizer
+from .production_inventory import LotSizingOptimizer, ProductionInventoryOptimizer
+from .production_network import ProductionNetworkOptimizer
 from .oil_refining import OilRefiningOptimizer
+from .refinery_schedule import MultiDayRefiningOptimizer
+from .refinery_network import RefineryNetworkOptimizer
+from .pooling import PoolingOptimizer
+from .price_stream import PriceTickReoptimizer
+from .compiler import LinearProgram
 
 __all__ = [
     "BankLoanOptimizer",
+    "MultiPeriodLoanOptimizer",
     "ProductionInventoryOptimizer",
+    "LotSizingOptimizer",
+    "ProductionNetworkOptimizer",
     "OilRefiningOptimizer",
+    "MultiDayRefiningOptimizer",
+    "RefineryNetworkOptimizer",
+    "PoolingOptimizer",
+    "PriceTickReoptimizer",
+    "LinearProgram",
 ]
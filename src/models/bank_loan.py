@@ -2,14 +2,74 @@
 
 This module implements a linear programming model to optimize
 bank loan portfolio allocation across multiple loan types.
+
+Portfolio rules are declared as data. Loan groups name sets of loan
+types, and each ratio constraint reads
+
+    sum(w[i] * x[i] for i in group) >= min * sum(x[j] for j in of)
+
+(or ``<= max * ...``), where the weights ``w`` default to 1 and may name a
+per-loan-type parameter such as ``bad_debt_ratios``. The rules compile to
+sparse rows, so portfolios of many thousands of loan types stay cheap.
+
+Given a matrix of sampled default-rate scenarios, the deterministic bad
+debt cap is replaced by a limit on the CVaR of the default loss. The
+"lp" method adds the Rockafellar-Uryasev rows (one auxiliary variable per
+scenario) to the sparse program. The "cutting_plane" method keeps the
+master LP at one row per cut and streams the scenarios in chunks, so a
+memory-mapped scenario file never has to fit in memory.
+
+Loans may also be restricted to whole blocks (``block_sizes``) or to a
+minimum ticket (``min_tickets``: either nothing or at least that amount,
+all-or-nothing when ``max_tickets`` is the same). These add integer
+variables, and the model is then solved by an anytime branch and bound that
+honours a time limit and a gap target and reports each improving portfolio
+to an optional callback.
 """
 
-from typing import List, Dict, Optional, Tuple
+import time
+from typing import Any, Callable, List, Dict, Optional, Sequence, Tuple, Union
 import numpy as np
-from pulp import LpMaximize, LpProblem, LpVariable, lpSum, LpStatus, value
+from scipy import sparse
+from pulp import LpVariable
+
+from .base import LPOptimizer
+from .compiler import LinearProgram, coo_rows
+from ..utils.batch_lp import solve_lp, solve_lp_batch, stack_parameters, status_names
+from ..utils.branch_bound import branch_and_bound
+from ..utils.cvar import cvar, cvar_cut, iter_chunks, load_scenarios, scenario_losses
+from ..utils.parametric import parametric_rhs
+from ..utils.solver_utils import get_default_backend
+
+
+DEFAULT_LOAN_TYPES = ["Personal", "Car", "Home", "Farm", "Commercial"]
 
+DEFAULT_LOAN_GROUPS = {
+    "consumer": ["Personal", "Car", "Home"],
+    "home": ["Home"],
+    "farm_commercial": ["Farm", "Commercial"],
+}
 
-class BankLoanOptimizer:
+DEFAULT_RATIO_CONSTRAINTS = [
+    # Farm and commercial loans >= 40% of all loans
+    {"name": "Farm_Commercial_Minimum", "group": "farm_commercial", "of": "all", "min": 0.4},
+    # Home loans >= 50% of consumer loans (personal + car + home)
+    {"name": "Home_Loan_Minimum", "group": "home", "of": "consumer", "min": 0.5},
+    # Bad debt <= 4% of all loans
+    {"name": "Bad_Debt_Limit", "group": "all", "weights": "bad_debt_ratios", "max": 0.04},
+]
+
+# Per-loan-type parameters a ratio constraint may use as weights
+WEIGHT_PARAMETERS = ("bad_debt_ratios", "interest_rates")
+
+CVAR_METHODS = ("auto", "lp", "cutting_plane")
+
+# Above this many scenario coefficients "auto" switches from the full
+# Rockafellar-Uryasev LP to the cutting-plane method
+CVAR_LP_MAX_NNZ = 100_000
+
+
+class BankLoanOptimizer(LPOptimizer):
     """Optimize bank loan portfolio allocation.
 
     This class implements an LP model to maximize net returns (interest - bad debt)
@@ -20,14 +80,66 @@ class BankLoanOptimizer:
         interest_rates (List[float]): Interest rates for each loan type
         bad_debt_ratios (List[float]): Bad debt ratios for each loan type
         loan_types (List[str]): Names of loan types
+        loan_groups (Dict[str, Sequence]): Named groups of loan types, given
+            as loan type names or indices
+        ratio_constraints (List[Dict]): Declared ratio constraints (see the
+            module docstring)
+        default_scenarios (Optional[np.ndarray]): Default-rate scenarios,
+            shape (S, K), possibly a memory map
+        cvar_alpha (float): CVaR confidence level
+        cvar_limit (float): CVaR of the default loss as a share of the funds
+            allocated
+        cvar_method (str): "auto", "lp" or "cutting_plane"
+        block_sizes (Optional[np.ndarray]): Block size per loan type, 0 for
+            continuous amounts
+        min_tickets (Optional[np.ndarray]): Smallest non-zero amount per
+            loan type, 0 for none
+        max_tickets (Optional[np.ndarray]): Largest amount per loan type,
+            inf for none
+        time_limit (Optional[float]): Seconds allowed for integer models
+        mip_gap (float): Relative gap at which integer models stop
+        incumbent_callback (Optional[Callable]): Receives each improving
+            portfolio of an integer model
+        backend (Optional[str]): Solver backend, None for the global default
     """
 
+    PARAMETERS = {
+        "total_funds": "patch",
+        "interest_rates": "patch",
+        "bad_debt_ratios": "patch",
+        "loan_types": "rebuild",
+        "loan_groups": "rebuild",
+        "ratio_constraints": "rebuild",
+        "default_scenarios": "rebuild",
+        "cvar_alpha": "patch",
+        "cvar_limit": "patch",
+        "cvar_method": "rebuild",
+        "block_sizes": "patch",
+        "min_tickets": "patch",
+        "max_tickets": "patch",
+    }
+
     def __init__(
         self,
         total_funds: float = 12_000_000,
         interest_rates: Optional[List[float]] = None,
         bad_debt_ratios: Optional[List[float]] = None,
         loan_types: Optional[List[str]] = None,
+        loan_groups: Optional[Dict[str, Sequence]] = None,
+        ratio_constraints: Optional[List[Dict[str, Any]]] = None,
+        default_scenarios: Optional[Union[str, np.ndarray]] = None,
+        cvar_alpha: float = 0.95,
+        cvar_limit: float = 0.04,
+        cvar_method: str = "auto",
+        scenario_chunk_size: int = 65536,
+        max_cuts: int = 200,
+        block_sizes: Optional[Sequence[float]] = None,
+        min_tickets: Optional[Sequence[float]] = None,
+        max_tickets: Optional[Sequence[float]] = None,
+        time_limit: Optional[float] = None,
+        mip_gap: float = 1e-4,
+        incumbent_callback: Optional[Callable[[Dict], Optional[bool]]] = None,
+        backend: Optional[str] = None,
     ):
         """Initialize the Bank Loan Optimizer.
 
@@ -36,147 +148,845 @@ class BankLoanOptimizer:
             interest_rates: List of interest rates for each loan type
             bad_debt_ratios: List of bad debt ratios for each loan type
             loan_types: Names of loan types
+            loan_groups: Named groups of loan types used by the ratio
+                constraints; defaults to DEFAULT_LOAN_GROUPS
+            ratio_constraints: Ratio constraints, each a dictionary with a
+                ``name``, a ``group`` (group name, "all" or a list of loan
+                types), an optional ``of`` (default "all"), optional
+                ``weights`` (a name in WEIGHT_PARAMETERS or one value per
+                loan type) and exactly one of ``min`` or ``max``. Defaults
+                to DEFAULT_RATIO_CONSTRAINTS; default rules whose group
+                holds none of the loan types are skipped, as is the default
+                bad debt rule when scenarios are given.
+            default_scenarios: Sampled default rates, shape (S, K), as an
+                array or the path of a ``.npy`` file (memory-mapped). When
+                given, the CVaR of the default loss is limited and
+                ``bad_debt_ratios`` defaults to the scenario mean.
+            cvar_alpha: CVaR confidence level, e.g. 0.95 for the worst 5%
+            cvar_limit: Largest allowed CVaR of the default loss, as a share
+                of the funds allocated
+            cvar_method: "lp" (Rockafellar-Uryasev LP), "cutting_plane"
+                (bounded memory) or "auto" (by scenario matrix size)
+            scenario_chunk_size: Scenario rows held in memory at a time
+            max_cuts: Cut limit of the cutting-plane method
+            block_sizes: Block size of each loan type (a scalar applies to
+                all); amounts are whole multiples of it, 0 leaves the
+                amount continuous
+            min_tickets: Smallest non-zero amount of each loan type; the
+                amount is either 0 or at least this, 0 for no minimum
+            max_tickets: Largest amount of each loan type, inf for no
+                limit; equal to ``min_tickets`` for all-or-nothing loans
+            time_limit: Seconds allowed for solving a model with blocks or
+                tickets; the best portfolio found by then is returned
+            mip_gap: Relative gap between the best portfolio and the bound
+                at which the search for integer models stops
+            incumbent_callback: Called with a solution dictionary for each
+                improving portfolio found for an integer model; returning
+                True stops the search. The solve cache is bypassed while set
+            backend: Solver backend name (see solver_utils.SOLVER_BACKENDS);
+                None uses the global default
         """
         self.total_funds = total_funds
 
         # Default values based on the original problem
         self.interest_rates = interest_rates or [0.14, 0.13, 0.12, 0.125, 0.10]
+        self.loan_types = loan_types or list(DEFAULT_LOAN_TYPES)
+        self.loan_groups = loan_groups
+        self.ratio_constraints = ratio_constraints
+
+        if cvar_method not in CVAR_METHODS:
+            raise ValueError(f"cvar_method must be one of {CVAR_METHODS}, got '{cvar_method}'")
+        self.scenario_chunk_size = scenario_chunk_size
+        self.max_cuts = max_cuts
+        self.cvar_alpha = cvar_alpha
+        self.cvar_limit = cvar_limit
+        self.cvar_method = cvar_method
+        self.default_scenarios = None
+        if default_scenarios is not None:
+            self.default_scenarios = load_scenarios(default_scenarios)
+            mean = self._check_scenarios()
+            if bad_debt_ratios is None:
+                bad_debt_ratios = mean.tolist()
         self.bad_debt_ratios = bad_debt_ratios or [0.10, 0.07, 0.03, 0.05, 0.02]
-        self.loan_types = loan_types or ["Personal", "Car", "Home", "Farm", "Commercial"]
+        self.block_sizes = block_sizes
+        self.min_tickets = min_tickets
+        self.max_tickets = max_tickets
+        self._ticket_arrays()
+        self.time_limit = time_limit
+        self.mip_gap = mip_gap
+        self.incumbent_callback = incumbent_callback
+        self._cvar_cuts = []
+        self._cuts_for = None
+
+        self.backend = backend
 
         self.model = None
+        self.program = None
         self.variables = None
         self.solution = None
 
+    def _check_scenarios(self) -> np.ndarray:
+        """Validate the scenario matrix in one chunked pass.
+
+        Returns:
+            Mean default rate per loan type
+        """
+        scenarios = self.default_scenarios
+        if scenarios.shape[1] != len(self.loan_types):
+            raise ValueError(f"Scenarios must have one column per loan type "
+                             f"({len(self.loan_types)}), got {scenarios.shape[1]}")
+        total = np.zeros(scenarios.shape[1])
+        for _, block in iter_chunks(scenarios, self.scenario_chunk_size):
+            if not np.isfinite(block).all() or (block < 0).any():
+                raise ValueError("Scenario default rates must be finite and non-negative")
+            total += block.sum(axis=0)
+        return total / len(scenarios)
+
+    def _cvar_mode(self) -> Optional[str]:
+        """Resolve cvar_method to "lp" or "cutting_plane"; None without scenarios."""
+        if self.default_scenarios is None:
+            return None
+        if self.cvar_method != "auto":
+            return self.cvar_method
+        S, K = self.default_scenarios.shape
+        return "lp" if S * (K + 2) <= CVAR_LP_MAX_NNZ else "cutting_plane"
+
+    def _ticket_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Block sizes, minimum and maximum tickets as arrays over loan types."""
+        K = len(self.loan_types)
+
+        def per_type(values, default, name):
+            array = np.full(K, default) if values is None else np.asarray(values, dtype=float)
+            if array.ndim and array.shape != (K,):
+                raise ValueError(f"{name} needs one value per loan type ({K})")
+            array = np.broadcast_to(array, (K,))
+            if np.isnan(array).any() or (array < 0).any():
+                raise ValueError(f"{name} must be non-negative")
+            return array
+
+        blocks = per_type(self.block_sizes, 0.0, "block_sizes")
+        low = per_type(self.min_tickets, 0.0, "min_tickets")
+        high = per_type(self.max_tickets, np.inf, "max_tickets")
+        if not np.isfinite(blocks).all():
+            raise ValueError("block_sizes must be finite")
+        if (high < low).any():
+            raise ValueError("max_tickets must not be below min_tickets")
+        return blocks, low, high
+
+    def _has_integers(self) -> bool:
+        """Whether block sizes or minimum tickets make the model a MIP."""
+        blocks, low, _ = self._ticket_arrays()
+        return bool((blocks > 0).any() or (low > 0).any())
+
     def _calculate_net_returns(self) -> List[float]:
         """Calculate net return coefficients for objective function.
 
         Returns:
             List of net return coefficients
         """
-        net_returns = []
-        for i in range(len(self.loan_types)):
-            # Net return = Interest rate * (1 - bad debt) - bad debt
-            # Simplifies to: Interest rate - (Interest rate * bad debt) - bad debt
-            # = Interest rate - bad debt * (1 + interest rate)
-            # Actually: Net return = Interest on good loans - bad debt loss
-            good_loan_fraction = 1 - self.bad_debt_ratios[i]
-            interest_earned = self.interest_rates[i] * good_loan_fraction
-            net_return = interest_earned - self.bad_debt_ratios[i]
-            net_returns.append(net_return)
-        return net_returns
-
-    def build_model(self) -> LpProblem:
-        """Build the linear programming model.
+        # Net return = interest earned on good loans - bad debt loss
+        rates = np.asarray(self.interest_rates, dtype=float)
+        bad_debt = np.asarray(self.bad_debt_ratios, dtype=float)
+        return (rates * (1 - bad_debt) - bad_debt).tolist()
+
+    def _resolve_rules(self) -> List[Tuple[str, np.ndarray, np.ndarray, Any, float, float]]:
+        """Resolve the declared ratio constraints to loan type indices.
 
         Returns:
-            LpProblem: The constructed LP model
+            One ``(name, group, of, weights, sign, ratio)`` tuple per row,
+            where the row reads ``sign * (w @ x[group] - ratio * sum(x[of])) <= 0``
+            and ``weights`` is None, a parameter name or an array over ``group``
         """
-        # Create the model
-        self.model = LpProblem("Bank_Loan_Portfolio_Optimization", LpMaximize)
+        K = len(self.loan_types)
+        index = {name: i for i, name in enumerate(self.loan_types)}
+        declared = self.ratio_constraints is not None
+        groups = DEFAULT_LOAN_GROUPS if self.loan_groups is None else self.loan_groups
+        rules = DEFAULT_RATIO_CONSTRAINTS if not declared else self.ratio_constraints
 
-        # Decision variables (non-negative loan amounts)
-        self.variables = [
-            LpVariable(f"x_{loan_type}", lowBound=0)
-            for loan_type in self.loan_types
-        ]
+        def members(ref) -> np.ndarray:
+            if isinstance(ref, str):
+                if ref == "all":
+                    return np.arange(K)
+                if ref not in groups:
+                    raise ValueError(f"Unknown loan group '{ref}'")
+                ref = groups[ref]
+            ref = np.asarray(ref)
+            if ref.dtype.kind in "iu":
+                if ref.size and (ref.min() < 0 or ref.max() >= K):
+                    raise ValueError(f"Loan type indices must be in [0, {K})")
+                return ref.astype(np.int64)
+            known = [index[t] for t in ref.tolist() if t in index]
+            if (self.loan_groups is not None or declared) and len(known) != ref.size:
+                missing = sorted(set(ref.tolist()) - set(index))
+                raise ValueError(f"Unknown loan types in group: {missing}")
+            return np.array(known, dtype=np.int64)
 
-        # Objective function: maximize net returns
-        net_returns = self._calculate_net_returns()
-        self.model += lpSum([
-            net_returns[i] * self.variables[i]
-            for i in range(len(self.loan_types))
-        ]), "Total_Net_Return"
+        resolved = []
+        for rule in rules:
+            if ("min" in rule) == ("max" in rule):
+                raise ValueError(f"Ratio constraint '{rule.get('name')}' needs exactly one "
+                                 "of 'min' or 'max'")
+            group, of = members(rule["group"]), members(rule.get("of", "all"))
+            if not declared and len(group) == 0:
+                continue
+            if (not declared and self.default_scenarios is not None
+                    and rule.get("weights") == "bad_debt_ratios"):
+                continue  # replaced by the CVaR limit
+            weights = rule.get("weights")
+            if weights is not None and not isinstance(weights, str):
+                weights = np.asarray(weights, dtype=float)
+                if weights.shape != (K,):
+                    raise ValueError(f"Weights of '{rule['name']}' need one value per loan type")
+                weights = weights[group]
+            elif weights is not None and weights not in WEIGHT_PARAMETERS:
+                raise ValueError(f"Weights must be one of {WEIGHT_PARAMETERS}, got '{weights}'")
+            if "min" in rule:
+                resolved.append((rule["name"], group, of, weights, -1.0, float(rule["min"])))
+            else:
+                resolved.append((rule["name"], group, of, weights, 1.0, float(rule["max"])))
+        return resolved
 
-        # Constraint 1: Total funds should not exceed available amount
-        self.model += (
-            lpSum(self.variables) <= self.total_funds,
-            "Total_Funds_Constraint"
-        )
+    @staticmethod
+    def _rule_coefficients(group, of, weights, sign, ratio,
+                           params) -> Tuple[np.ndarray, np.ndarray]:
+        """Column indices and coefficients of one ratio constraint row.
 
-        # Constraint 2: Minimum funds allocated (optional, ensures all funds used)
-        self.model += (
-            lpSum(self.variables) >= 0,
-            "Minimum_Allocation"
-        )
+        ``params`` maps weight parameter names to arrays whose last axis
+        indexes loan types; leading axes (instances of a batch) carry over
+        to the coefficients.
+        """
+        if weights is None:
+            w = np.ones(len(group))
+        elif isinstance(weights, str):
+            w = params[weights][..., group]
+        else:
+            w = weights
+        w = sign * np.asarray(w, dtype=float)
+        share = np.full(w.shape[:-1] + (len(of),), -sign * ratio)
+        return np.concatenate([group, of]), np.concatenate([w, share], axis=-1)
 
-        # Constraint 3: Farm and commercial loans >= 40% of all loans
-        # x[3] + x[4] >= 0.4 * (x[0] + x[1] + x[2] + x[3] + x[4])
-        # Rearranged: 0.4*x[0] + 0.4*x[1] + 0.4*x[2] - 0.6*x[3] - 0.6*x[4] <= 0
-        self.model += (
-            0.4 * self.variables[0] +
-            0.4 * self.variables[1] +
-            0.4 * self.variables[2] -
-            0.6 * self.variables[3] -
-            0.6 * self.variables[4] <= 0,
-            "Farm_Commercial_Minimum"
+    def compile_model(self) -> LinearProgram:
+        """Compile the model into sparse matrix form.
+
+        Returns:
+            LinearProgram: The compiled LP model
+        """
+        num_loans = len(self.loan_types)
+        net_returns = np.array(self._calculate_net_returns())
+        params = {name: np.asarray(getattr(self, name), dtype=float)
+                  for name in WEIGHT_PARAMETERS}
+        rules = self._resolve_rules()
+
+        # Row 0: total funds should not exceed the available amount
+        # Row 1: minimum funds allocated, -sum(x) <= 0
+        rows = [np.zeros(num_loans, dtype=np.int64), np.ones(num_loans, dtype=np.int64)]
+        cols = [np.arange(num_loans), np.arange(num_loans)]
+        vals = [np.ones(num_loans), -np.ones(num_loans)]
+
+        # Ratio constraints, e.g. farm + commercial >= 40% of all loans:
+        # 0.4 * sum(x) - (x_farm + x_commercial) <= 0
+        for r, (_, group, of, weights, sign, ratio) in enumerate(rules, start=2):
+            row_cols, row_vals = self._rule_coefficients(group, of, weights, sign, ratio, params)
+            rows.append(np.full(len(row_cols), r))
+            cols.append(row_cols)
+            vals.append(row_vals)
+
+        num_rows = 2 + len(rules)
+        A_ub = coo_rows(np.concatenate(rows), np.concatenate(cols), np.concatenate(vals),
+                        (num_rows, num_loans))
+        b_ub = np.zeros(num_rows)
+        b_ub[0] = self.total_funds
+
+        ub_names = ["Total_Funds_Constraint", "Minimum_Allocation"] + [rule[0] for rule in rules]
+        if self.default_scenarios is not None:
+            program = self._compile_cvar(net_returns, A_ub, b_ub, ub_names)
+        else:
+            program = LinearProgram(
+                net_returns,
+                A_ub=A_ub,
+                b_ub=b_ub,
+                maximize=True,
+                name="Bank_Loan_Portfolio_Optimization",
+                var_names=[f"x_{loan_type}" for loan_type in self.loan_types],
+                ub_names=ub_names,
+            )
+        return self._compile_tickets(program)
+
+    def _compile_tickets(self, program: LinearProgram) -> LinearProgram:
+        """Add block and ticket variables to the compiled program.
+
+        A loan type with block size ``b`` gets an integer block count ``n``
+        with ``x == b * n``. One with a minimum ticket ``m`` gets a binary
+        ``y`` with ``m * y <= x <= M * y``, where ``M`` is its maximum
+        ticket or else the total funds. Maximum tickets also bound ``x``.
+        """
+        blocks, low, high = self._ticket_arrays()
+        program.upper[:len(high)] = np.minimum(program.upper[:len(high)], high)
+        blocked, ticketed = np.flatnonzero(blocks > 0), np.flatnonzero(low > 0)
+        if not len(blocked) and not len(ticketed):
+            return program
+
+        n, nb, nt = program.num_vars, len(blocked), len(ticketed)
+        width = n + nb + nt
+        funded = n + nb + np.arange(nt)
+        cap = np.where(np.isfinite(high), high, self.total_funds)[ticketed]
+
+        # m * y - x <= 0 and x - M * y <= 0, one pair per ticketed type
+        ticket_rows = coo_rows(
+            np.repeat(np.arange(2 * nt), 2),
+            np.column_stack([np.r_[ticketed, ticketed], np.r_[funded, funded]]),
+            np.column_stack([np.r_[-np.ones(nt), np.ones(nt)], np.r_[low[ticketed], -cap]]).ravel(),
+            (2 * nt, width),
+        )
+        # x - b * n == 0, one row per blocked type
+        block_rows = coo_rows(
+            np.repeat(np.arange(nb), 2),
+            np.column_stack([blocked, n + np.arange(nb)]),
+            np.column_stack([np.ones(nb), -blocks[blocked]]).ravel(),
+            (nb, width),
         )
 
-        # Constraint 4: Home loans >= 50% of (personal + car + home)
-        # x[2] >= 0.5 * (x[0] + x[1] + x[2])
-        # Rearranged: 0.5*x[0] + 0.5*x[1] - 0.5*x[2] <= 0
-        self.model += (
-            0.5 * self.variables[0] +
-            0.5 * self.variables[1] -
-            0.5 * self.variables[2] <= 0,
-            "Home_Loan_Minimum"
+        def widen(matrix):
+            return sparse.hstack([matrix, sparse.csr_matrix((matrix.shape[0], nb + nt))])
+
+        types = self.loan_types
+        return LinearProgram(
+            np.concatenate([program.c, np.zeros(nb + nt)]),
+            A_ub=sparse.vstack([widen(program.A_ub), ticket_rows]).tocsr(),
+            b_ub=np.concatenate([program.b_ub, np.zeros(2 * nt)]),
+            A_eq=sparse.vstack([widen(program.A_eq), block_rows]).tocsr(),
+            b_eq=np.concatenate([program.b_eq, np.zeros(nb)]),
+            lower=np.concatenate([program.lower, np.zeros(nb + nt)]),
+            upper=np.concatenate([program.upper, np.full(nb, np.inf), np.ones(nt)]),
+            maximize=True,
+            name=program.name,
+            var_names=lambda: (program.var_names + [f"Blocks_{types[k]}" for k in blocked]
+                               + [f"Funded_{types[k]}" for k in ticketed]),
+            ub_names=lambda: (program.ub_names + [f"Min_Ticket_{types[k]}" for k in ticketed]
+                              + [f"Max_Ticket_{types[k]}" for k in ticketed]),
+            eq_names=lambda: program.eq_names + [f"Block_Size_{types[k]}" for k in blocked],
+            integrality=np.r_[np.zeros(n, dtype=int), np.ones(nb + nt, dtype=int)],
         )
 
-        # Constraint 5: Bad debt ratio <= 4% of all loans
-        # Sum(bad_debt[i] * x[i]) <= 0.04 * Sum(x[i])
-        # Rearranged: Sum((bad_debt[i] - 0.04) * x[i]) <= 0
-        self.model += (
-            lpSum([
-                (self.bad_debt_ratios[i] - 0.04) * self.variables[i]
-                for i in range(len(self.loan_types))
-            ]) <= 0,
-            "Bad_Debt_Limit"
+    def _compile_cvar(self, net_returns: np.ndarray, A_ub: sparse.csr_matrix,
+                      b_ub: np.ndarray, ub_names: List[str]) -> LinearProgram:
+        """Add the CVaR limit to the compiled rows.
+
+        The "lp" form adds the Rockafellar-Uryasev variables: a VaR level
+        ``z`` and one shortfall ``u[s] >= R[s] @ x - z`` per scenario, with
+        ``z + sum(u) / ((1 - alpha) * S) <= limit * sum(x)``. The
+        "cutting_plane" form adds the cuts collected so far instead, each
+        ``g @ x <= limit * sum(x)`` with ``g @ x`` a lower bound on CVaR.
+        """
+        K = len(self.loan_types)
+        var_names = [f"x_{loan_type}" for loan_type in self.loan_types]
+        share = np.full(K, -float(self.cvar_limit))
+
+        if self._cvar_mode() == "cutting_plane":
+            cuts = np.array(self._cvar_cuts).reshape(-1, K) + share
+            return LinearProgram(
+                net_returns,
+                A_ub=sparse.vstack([A_ub, sparse.csr_matrix(cuts)]).tocsr(),
+                b_ub=np.concatenate([b_ub, np.zeros(len(cuts))]),
+                maximize=True,
+                name="Bank_Loan_Portfolio_Optimization",
+                var_names=var_names,
+                ub_names=ub_names + [f"CVaR_Cut_{i}" for i in range(len(cuts))],
+            )
+
+        scenarios = self.default_scenarios
+        S = len(scenarios)
+        R = sparse.vstack([sparse.csr_matrix(block)
+                           for _, block in iter_chunks(scenarios, self.scenario_chunk_size)])
+        m = A_ub.shape[0]
+        A = sparse.vstack([
+            sparse.hstack([A_ub, sparse.csr_matrix((m, 1 + S))]),
+            sparse.hstack([R, -np.ones((S, 1)), -sparse.identity(S)]),
+            np.concatenate([share, [1.0], np.full(S, 1.0 / ((1 - self.cvar_alpha) * S))]),
+        ]).tocsr()
+
+        return LinearProgram(
+            np.concatenate([net_returns, np.zeros(1 + S)]),
+            A_ub=A,
+            b_ub=np.concatenate([b_ub, np.zeros(S + 1)]),
+            maximize=True,
+            name="Bank_Loan_Portfolio_Optimization",
+            var_names=lambda: var_names + ["VaR"] + [f"Shortfall_{s}" for s in range(S)],
+            ub_names=lambda: (ub_names + [f"Scenario_Loss_{s}" for s in range(S)]
+                              + ["CVaR_Limit"]),
         )
 
-        return self.model
+    def _bind_variables(self, variables: List[LpVariable]) -> None:
+        """Expose exported PuLP variables as ``self.variables``."""
+        self.variables = variables
+
+    def _extract_solution(self, x: np.ndarray, objective: float) -> Dict:
+        """Build the solution dictionary from loan amounts."""
+        allocations = {
+            self.loan_types[i]: float(x[i])
+            for i in range(len(self.loan_types))
+        }
+
+        total_allocated = sum(allocations.values())
+        roi = (objective / total_allocated) if total_allocated > 0 else 0
 
-    def solve(self) -> Dict:
-        """Solve the optimization problem.
+        solution = {
+            "allocations": allocations,
+            "total_allocated": total_allocated,
+            "net_return": objective,
+            "roi_percentage": roi * 100,
+        }
+        if self.default_scenarios is not None:
+            losses = scenario_losses(self.default_scenarios, x[:len(self.loan_types)],
+                                     self.scenario_chunk_size)
+            var, value = cvar(losses, self.cvar_alpha)
+            solution.update({
+                "var": var,
+                "cvar": value,
+                "cvar_limit": self.cvar_limit * total_allocated,
+                "expected_loss": float(losses.mean()),
+            })
+        return solution
+
+    def _failure_solution(self, status: str) -> Dict:
+        """Build the solution dictionary for a non-optimal status."""
+        return {
+            "status": status,
+            "allocations": None,
+            "error": "Optimization failed to find optimal solution"
+        }
+
+    def _solve(self) -> Dict:
+        """Solve the model; cutting planes and integer variables use their own loop.
+
+        Each round of the cutting-plane CVaR method solves the master
+        problem with the cuts found so far, then evaluates the CVaR of the
+        allocation over all scenarios. A violated limit adds the supporting
+        cut at that allocation. Cuts remain valid when the limit or fund
+        parameters change, so they are kept for later solves with the same
+        scenarios and confidence level.
+
+        Models with blocks or minimum tickets are solved by branch and
+        bound within ``time_limit``. If the limit is reached first, the
+        best portfolio found is returned with status "Not Solved" and its
+        ``mip_gap``.
 
         Returns:
             Dictionary containing solution details
         """
-        if self.model is None:
-            self.build_model()
-
-        # Solve the model
-        self.model.solve()
-
-        # Extract solution
-        status = LpStatus[self.model.status]
-
-        if status == "Optimal":
-            allocations = {
-                self.loan_types[i]: value(self.variables[i])
-                for i in range(len(self.loan_types))
-            }
-
-            total_allocated = sum(allocations.values())
-            objective_value = value(self.model.objective)
-            roi = (objective_value / total_allocated) if total_allocated > 0 else 0
-
-            self.solution = {
-                "status": status,
-                "allocations": allocations,
-                "total_allocated": total_allocated,
-                "net_return": objective_value,
-                "roi_percentage": roi * 100,
-                "model": self.model,
-            }
-        else:
-            self.solution = {
-                "status": status,
-                "allocations": None,
-                "error": "Optimization failed to find optimal solution"
-            }
+        cutting = self._cvar_mode() == "cutting_plane"
+        if (not cutting and not self._has_integers()) or self._has_user_model():
+            return super()._solve()
+
+        backend = self.backend or get_default_backend()
+        K = len(self.loan_types)
+        if cutting and self._cuts_for != (id(self.default_scenarios), self.cvar_alpha):
+            self._cvar_cuts = []
+            self._cuts_for = (id(self.default_scenarios), self.cvar_alpha)
+        self._mark_compiled()
+        self._basis = None
+        deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+
+        status, accepted = "Not Solved", None
+        for _ in range(self.max_cuts + 1):
+            self.program = self.compile_model()
+            result = self._solve_compiled(backend, deadline)
+            status = result["status"]
+            if "x" not in result:
+                break
+            if cutting:
+                x = result["x"][:K]
+                _, value, gradient = cvar_cut(self.default_scenarios, x, self.cvar_alpha,
+                                              self.scenario_chunk_size)
+                limit = self.cvar_limit * x.sum()
+                if value > limit + 1e-7 * max(1.0, abs(limit)):
+                    self._cvar_cuts.append(gradient)
+                    status = "Not Solved"
+                    continue
+            accepted = result
+            break
 
+        if accepted is not None:
+            self.solution = {"status": status}
+            self.solution.update(self._extract_solution(accepted["x"], accepted["objective"]))
+            if cutting:
+                self.solution["cvar_cuts"] = len(self._cvar_cuts)
+            if "mip_gap" in accepted:
+                self.solution.update({key: accepted[key] for key in ("mip_gap", "bound", "nodes")})
+            self.solution["model"] = self.model
+            self.solution["program"] = self.program
+        else:
+            self.solution = self._failure_solution(status)
         return self.solution
 
+    def _solve_compiled(self, backend: str, deadline: Optional[float]) -> Dict:
+        """Solve the compiled program, by branch and bound when it has integers.
+
+        Relaxations are solved by the dense kernel on the "dense" backend
+        and by HiGHS otherwise.
+        """
+        program = self.program
+        if not program.is_mip:
+            return program.solve(backend)
+
+        def report_incumbent(info):
+            incumbent = {"status": "Not Solved"}
+            incumbent.update(self._extract_solution(info["x"], info["objective"]))
+            incumbent.update({key: info[key]
+                              for key in ("mip_gap", "bound", "nodes", "elapsed")})
+            return self.incumbent_callback(incumbent)
+
+        callback = report_incumbent if self.incumbent_callback is not None else None
+
+        return branch_and_bound(
+            program.c, program.A_ub, program.b_ub, program.A_eq, program.b_eq,
+            program.bounds, program.integrality, maximize=True,
+            time_limit=None if deadline is None else max(deadline - time.perf_counter(), 0.0),
+            gap=self.mip_gap, callback=callback,
+            backend="dense" if backend == "dense" else "highs",
+        )
+
+    def _cache_options(self) -> Dict:
+        """Solver options for the cache key, with the MIP and CVaR limits."""
+        options = super()._cache_options()
+        if self._has_integers():
+            options.update(time_limit=self.time_limit, mip_gap=self.mip_gap)
+        if self.default_scenarios is not None:
+            options.update(max_cuts=self.max_cuts,
+                           scenario_chunk_size=self.scenario_chunk_size)
+        return options
+
+    def _solve_cached(self) -> Tuple[Dict, bool]:
+        """Bypass the solve cache when an incumbent callback must be called."""
+        if self.incumbent_callback is not None:
+            self._result = None
+            return self._solve(), False
+        return super()._solve_cached()
+
+    def _check_continuous(self, method: str) -> None:
+        """Reject blocks and tickets in methods that solve the plain LP."""
+        if any(getattr(self, name) is not None
+               for name in ("block_sizes", "min_tickets", "max_tickets")):
+            raise NotImplementedError(f"{method} does not support block sizes or tickets")
+
+    def solve_batch(self, param_arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Solve many variants of the model in one vectorized call.
+
+        The LP is assembled as stacked dense arrays and solved in-process by
+        the batched simplex kernel, without building PuLP objects or calling
+        an external solver.
+
+        Args:
+            param_arrays: Mapping of parameter name to an array whose leading
+                axis indexes the instances. Supported keys are
+                ``total_funds`` (N,), ``interest_rates`` (N, K) and
+                ``bad_debt_ratios`` (N, K). Missing keys use the values
+                this optimizer was created with.
+
+        Returns:
+            Dictionary of arrays with one entry per instance:
+                - ``status``: solution status names, shape (N,)
+                - ``allocations``: loan amounts, shape (N, K)
+                - ``total_allocated``: total funds allocated, shape (N,)
+                - ``net_return``: objective values, shape (N,)
+                - ``roi_percentage``: return on investment, shape (N,)
+        """
+        if self.default_scenarios is not None:
+            raise NotImplementedError("solve_batch does not support default scenarios")
+        self._check_continuous("solve_batch")
+        N, params = stack_parameters(param_arrays, {
+            "total_funds": self.total_funds,
+            "interest_rates": self.interest_rates,
+            "bad_debt_ratios": self.bad_debt_ratios,
+        })
+        rates = params["interest_rates"]
+        bad_debt = params["bad_debt_ratios"]
+        # Same rows as compile_model(); only rows weighted by a batched
+        # parameter and the fund limit differ between instances
+        net_returns = rates * (1 - bad_debt) - bad_debt
+        program = self.compile_model()
+        A_ub = np.repeat(program.A_ub.toarray()[np.newaxis], N, axis=0)
+        for r, (_, group, of, weights, sign, ratio) in enumerate(self._resolve_rules(), start=2):
+            if isinstance(weights, str):
+                row_cols, row_vals = self._rule_coefficients(group, of, weights, sign, ratio,
+                                                             params)
+                A_ub[:, r, :] = 0.0
+                np.add.at(A_ub[:, r, :], (slice(None), row_cols), row_vals)
+        b_ub = np.repeat(program.b_ub[np.newaxis], N, axis=0)
+        b_ub[:, 0] = params["total_funds"]
+
+        result = solve_lp_batch(net_returns, A_ub, b_ub, maximize=True)
+
+        allocations = result["x"]
+        total_allocated = allocations.sum(axis=1)
+        net_return = result["objective"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            roi = np.where(total_allocated > 0, net_return / total_allocated, 0.0)
+
+        return {
+            "status": status_names(result["status"]),
+            "allocations": allocations,
+            "total_allocated": total_allocated,
+            "net_return": net_return,
+            "roi_percentage": roi * 100,
+        }
+
+    def parametric_total_funds(self, lo: float, hi: float) -> Dict:
+        """Trace the optimal portfolio as total funds range over [lo, hi].
+
+        The net return is piecewise linear in the fund limit. Instead of one
+        solve per sample point, the optimal basis at ``lo`` is carried up the
+        range with dual simplex pivots (see parametric.parametric_rhs), one
+        per breakpoint. ``total_funds`` and ``net_return`` can be passed
+        straight to plot_sensitivity_analysis.
+
+        Args:
+            lo: Smallest fund limit
+            hi: Largest fund limit
+
+        Returns:
+            Dictionary with:
+                - ``status``: "Optimal" when the whole range was traced
+                - ``total_funds``: fund limits at the breakpoints, shape (k+1,)
+                - ``net_return``: optimal net return at each breakpoint
+                - ``marginal_return``: net return per extra dollar on each
+                  segment, shape (k,)
+                - ``segments``: one dictionary per segment with its fund
+                  range, net return range, marginal return and the
+                  optimal allocations at both ends
+                - ``pivots``: dual simplex pivots used
+        """
+        if lo < 0:
+            raise ValueError("Total funds must be non-negative")
+        if self.default_scenarios is not None:
+            raise NotImplementedError("Parametric analysis does not support default scenarios")
+        self._check_continuous("Parametric analysis")
+        program = self.compile_model()
+        b_ub = program.b_ub.copy()
+        b_ub[0] = 0.0
+        direction = np.zeros(len(b_ub))
+        direction[0] = 1.0
+
+        result = parametric_rhs(
+            program.c, program.A_ub, b_ub, program.A_eq, program.b_eq,
+            bounds=np.column_stack([program.lower, program.upper]),
+            maximize=True, d_ub=direction, lo=lo, hi=hi,
+        )
+
+        funds, returns, x = result["breakpoints"], result["objective"], result["x"]
+        segments = []
+        for k, slope in enumerate(result["slopes"]):
+            segments.append({
+                "total_funds": (float(funds[k]), float(funds[k + 1])),
+                "net_return": (float(returns[k]), float(returns[k + 1])),
+                "marginal_return": float(slope),
+                "allocations": {
+                    loan_type: (float(x[k, i]), float(x[k + 1, i]))
+                    for i, loan_type in enumerate(self.loan_types)
+                },
+            })
+
+        return {
+            "status": result["status"],
+            "total_funds": funds,
+            "net_return": returns,
+            "marginal_return": result["slopes"],
+            "segments": segments,
+            "pivots": result["pivots"],
+        }
+
+    def _frontier_program(self, rule: str) -> Dict:
+        """Normalized LP whose right-hand side carries the ratio of ``rule``.
+
+        Every row except the fund limit is homogeneous, so optimal
+        portfolios scale with the funds. Fixing ``sum(w) = 1`` turns the
+        rule ``g @ w <= q * sum(w)`` (or ``>=``) into a right-hand side
+        ``q``, and the portfolio for fund limit F is ``F * w`` whenever the
+        normalized return is positive.
+        """
+        if self.default_scenarios is not None:
+            raise NotImplementedError("The frontier does not support default scenarios")
+        self._check_continuous("The frontier")
+        rules = self._resolve_rules()
+        names = [r[0] for r in rules]
+        if rule not in names:
+            raise ValueError(f"Unknown ratio constraint '{rule}'")
+        k = names.index(rule)
+        _, group, of, weights, sign, _ = rules[k]
+        K = len(self.loan_types)
+        if len(of) != K or len(np.unique(of)) != K:
+            raise ValueError(f"Ratio constraint '{rule}' must be relative to all loans")
+
+        program = self.compile_model()
+        params = {name: np.asarray(getattr(self, name), dtype=float)
+                  for name in WEIGHT_PARAMETERS}
+        cols, vals = self._rule_coefficients(group, of[:0], weights, sign, 0.0, params)
+        row = np.zeros(K)
+        np.add.at(row, cols, vals)
+
+        # Drop the fund limit (row 0) and the rule itself (row k + 2)
+        keep = np.setdiff1d(np.arange(program.A_ub.shape[0]), [0, k + 2])
+        A_ub = sparse.vstack([program.A_ub[keep], sparse.csr_matrix(row)]).tocsr()
+        return {
+            "c": program.c,
+            "A_ub": A_ub,
+            "b_ub": np.zeros(A_ub.shape[0]),
+            "A_eq": np.ones((1, K)),
+            "b_eq": np.ones(1),
+            "d_ub": np.r_[np.zeros(len(keep)), 1.0],
+            "row": row,
+            "sign": sign,
+        }
+
+    def _frontier_result(self, result: Dict, ratios: np.ndarray,
+                         invest: Optional[np.ndarray] = None) -> Dict:
+        """Scale a normalized parametric result to the fund limit.
+
+        ``invest`` marks ratios whose portfolio is kept although its return
+        is not positive, for the invested side of a zero crossing.
+        """
+        weights = np.array([np.interp(ratios, result["breakpoints"], result["x"][:, j])
+                            for j in range(result["x"].shape[1])]).T.reshape(len(ratios), -1)
+        value = np.interp(ratios, result["breakpoints"], result["objective"])
+        value = np.maximum(value, 0.0)
+        invest = value > 0 if invest is None else invest | (value > 0)
+        return {
+            "bad_debt_cap": ratios,
+            "net_return": value * self.total_funds,
+            "allocations": (np.where(invest[:, np.newaxis], np.maximum(weights, 0.0), 0.0)
+                            * self.total_funds),
+        }
+
+    def bad_debt_frontier(self, lo: Optional[float] = None, hi: Optional[float] = None,
+                          rule: str = "Bad_Debt_Limit") -> Dict:
+        """Trace net return against the cap of a ratio constraint.
+
+        The frontier is computed by parametric LP on the normalized
+        portfolio (see parametric.parametric_rhs): one dual simplex pivot
+        per vertex instead of one solve per cap value. Where the normalized
+        return crosses zero the portfolio jumps between nothing and the
+        normalized optimum, so that cap appears twice: once with no loans
+        and once invested. Between vertices the return and the portfolio
+        are linear in the cap.
+
+        Args:
+            lo: Smallest cap; defaults to the smallest attainable ratio
+            hi: Largest cap; defaults to the ratio of the portfolio that is
+                optimal without the rule, beyond which the rule is slack
+            rule: Name of the ratio constraint to vary; it must be relative
+                to all loans
+
+        Returns:
+            Dictionary of NumPy arrays:
+                - ``status``: "Optimal" when the whole range was traced
+                - ``bad_debt_cap``: caps at the frontier vertices, shape (k+1,)
+                - ``net_return``: optimal net return at each vertex
+                - ``allocations``: optimal loan amounts at each vertex, shape
+                  (k+1, K), columns in ``loan_types`` order
+                - ``marginal_return``: net return per unit of cap, shape (k,)
+                - ``bases``: optimal bases per segment, for refine_frontier()
+                - ``pivots``: dual simplex pivots used
+        """
+        lp = self._frontier_program(rule)
+        sign, row = lp["sign"], lp["row"]
+        args = (lp["c"], lp["A_ub"], lp["b_ub"], lp["A_eq"], lp["b_eq"])
+
+        if lo is None or hi is None:
+            # Attainable range of the ratio, and its value with the rule slack
+            others = (lp["A_ub"][:-1], lp["b_ub"][:-1], lp["A_eq"], lp["b_eq"])
+            extreme = solve_lp(row, *others)
+            free = solve_lp(lp["c"], *others, maximize=True)
+            if extreme["status"] != "Optimal" or free["status"] != "Optimal":
+                return {"status": "Infeasible" if extreme["status"] != "Optimal"
+                        else free["status"]}
+            ends = sorted([sign * extreme["objective"], sign * float(row @ free["x"])])
+            lo = ends[0] if lo is None else lo
+            hi = ends[1] if hi is None else hi
+
+        # The parameter is the signed cap: g @ w <= sign * theta
+        theta_lo, theta_hi = sorted([sign * lo, sign * hi])
+        result = parametric_rhs(*args, maximize=True, d_ub=lp["d_ub"],
+                                lo=theta_lo, hi=theta_hi)
+        if not len(result["breakpoints"]):
+            return {"status": result["status"]}
+
+        # Split pieces whose normalized return changes sign at the crossing,
+        # with a zero-length piece between the empty and invested vertices;
+        # all three keep the piece's basis
+        breakpoints, objective, bases = result["breakpoints"], result["objective"], result["bases"]
+        crossing = np.flatnonzero(objective[:-1] * objective[1:] < 0)
+        invest = np.zeros(len(breakpoints) + 2 * len(crossing), dtype=bool)
+        if len(crossing):
+            start, end = breakpoints[crossing], breakpoints[crossing + 1]
+            zero = start + (end - start) * objective[crossing] / (
+                objective[crossing] - objective[crossing + 1])
+            breakpoints = np.insert(breakpoints, np.repeat(crossing + 1, 2), np.repeat(zero, 2))
+            bases = np.insert(bases, np.repeat(crossing, 2), np.repeat(bases[crossing], 2, axis=0),
+                              axis=0)
+            rising = objective[crossing] < 0
+            invest[crossing + 1 + 2 * np.arange(len(crossing)) + rising] = True
+
+        frontier = self._frontier_result(result, breakpoints, invest)
+        # Breakpoints ascend in the signed parameter; reversing (rather than
+        # sorting) keeps the two vertices of a zero crossing on their sides
+        order = np.arange(len(breakpoints))[::1 if sign > 0 else -1]
+        frontier = {key: value[order] for key, value in frontier.items()}
+        frontier["bad_debt_cap"] = sign * breakpoints[order]
+        frontier.update({
+            "status": result["status"],
+            "marginal_return": np.diff(frontier["net_return"]) / np.where(
+                np.diff(frontier["bad_debt_cap"]) == 0, 1.0, np.diff(frontier["bad_debt_cap"])),
+            "bases": bases,
+            "pivots": result["pivots"],
+            "rule": rule,
+        })
+        return frontier
+
+    def refine_frontier(self, frontier: Dict, lo: float, hi: float, num: int = 50) -> Dict:
+        """Sample a region of a frontier densely, warm-started from its bases.
+
+        The region is re-traced by parametric LP starting from the optimal
+        basis of the frontier segment that contains ``lo``, so no solve
+        starts from scratch, and the samples are read off the exact
+        piecewise-linear curve.
+
+        Args:
+            frontier: Result of bad_debt_frontier()
+            lo: Start of the region
+            hi: End of the region
+            num: Number of evenly spaced caps to return
+
+        Returns:
+            Dictionary with ``bad_debt_cap``, ``net_return`` and
+            ``allocations`` at the samples, plus ``status`` and ``pivots``
+        """
+        if hi < lo:
+            raise ValueError(f"hi ({hi}) must not be below lo ({lo})")
+        lp = self._frontier_program(frontier["rule"])
+        sign = lp["sign"]
+        caps = frontier["bad_debt_cap"]
+        segment = int(np.clip(np.searchsorted(caps, lo, side="right") - 1,
+                              0, max(len(frontier["bases"]) - 1, 0)))
+        if sign < 0:
+            # Bases are stored in order of the signed parameter
+            segment = len(frontier["bases"]) - 1 - segment
+        basis = frontier["bases"][segment] if len(frontier["bases"]) else None
+
+        theta_lo, theta_hi = sorted([sign * lo, sign * hi])
+        result = parametric_rhs(lp["c"], lp["A_ub"], lp["b_ub"], lp["A_eq"], lp["b_eq"],
+                                maximize=True, d_ub=lp["d_ub"],
+                                lo=theta_lo, hi=theta_hi, basis=basis)
+        if not len(result["breakpoints"]):
+            return {"status": result["status"]}
+
+        samples = np.linspace(lo, hi, num)
+        covered = samples[(sign * samples >= result["breakpoints"][0] - 1e-12)
+                          & (sign * samples <= result["breakpoints"][-1] + 1e-12)]
+        refined = self._frontier_result(result, sign * covered)
+        refined["bad_debt_cap"] = covered
+        refined.update({"status": result["status"], "pivots": result["pivots"]})
+        return refined
+
     def print_summary(self):
         """Print a formatted summary of the solution."""
         if self.solution is None:
@@ -188,11 +998,18 @@ class BankLoanOptimizer:
         print("=" * 60)
         print(f"\nStatus: {self.solution['status']}")
 
-        if self.solution['status'] == "Optimal":
+        if self.solution.get('allocations') is not None:
             print(f"\nTotal Funds Available: ${self.total_funds:,.2f}")
             print(f"Total Allocated: ${self.solution['total_allocated']:,.2f}")
             print(f"Net Return: ${self.solution['net_return']:,.2f}")
             print(f"ROI: {self.solution['roi_percentage']:.2f}%")
+            if "cvar" in self.solution:
+                print(f"Default Loss CVaR ({self.cvar_alpha:.0%}): "
+                      f"${self.solution['cvar']:,.2f} "
+                      f"(limit ${self.solution['cvar_limit']:,.2f})")
+            if "mip_gap" in self.solution:
+                print(f"MIP Gap: {self.solution['mip_gap']:.4%} "
+                      f"({self.solution['nodes']} nodes)")
 
             print("\n" + "-" * 60)
             print("Loan Allocation by Type:")
@@ -201,7 +1018,8 @@ class BankLoanOptimizer:
             print("-" * 60)
 
             for loan_type, amount in self.solution['allocations'].items():
-                percentage = (amount / self.solution['total_allocated'] * 100) if self.solution['total_allocated'] > 0 else 0
+                total = self.solution['total_allocated']
+                percentage = (amount / total * 100) if total > 0 else 0
                 print(f"{loan_type:<15} ${amount:>14,.2f} {percentage:>11.2f}%")
 
             print("=" * 60)
@@ -0,0 +1,410 @@
+"""Shared build and solve pipeline for the LP optimization models."""
+
+import warnings
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from pulp import LpProblem, LpStatus, LpVariable, value
+
+from .compiler import LinearProgram
+from ..utils.cache import SolveCache, canonical_key, get_default_cache
+from ..utils.calibration import select_backend
+from ..utils.metrics import (
+    MetricsSink,
+    PhaseTimer,
+    emit,
+    get_default_metrics_sink,
+    phase,
+    timed,
+)
+from ..utils.solution_export import SolutionArrays
+from ..utils.solver_utils import (
+    AUTO_BACKEND,
+    SolverOptions,
+    get_default_backend,
+    get_default_options,
+    is_pulp_backend,
+    solve_model,
+)
+
+
+class LPOptimizer:
+    """Base class for optimizers that compile to a ``LinearProgram``.
+
+    Subclasses implement ``compile_model()`` to emit the sparse matrix form
+    of their LP, ``_bind_variables()`` to expose exported PuLP variables
+    under their model-specific attribute names, and ``_extract_solution()``
+    to turn a primal vector into the model's solution dictionary.
+
+    Solving goes straight from the compiled matrices to the selected
+    backend. A PuLP model is only created by ``build_model()`` or when the
+    CBC backend is used; once it exists it is the model that gets solved,
+    so edits made to it are honoured.
+
+    Assigning one of the names in ``PARAMETERS`` marks it dirty. The next
+    ``solve()`` recompiles the matrices, compares them with the existing
+    program and patches only the objective coefficients, right-hand sides,
+    bounds and constraint rows that changed, in the program and in the
+    exported PuLP model. Parameters mapped to "rebuild" (those that change
+    names or shapes) discard both instead. The dense backend re-solves from
+    the previous optimal basis.
+
+    Parameters edited in place (``opt.demands[3] = 500``) bypass
+    ``__setattr__``, so each compile also stores a content hash of every
+    parameter and the next ``solve()`` marks the ones whose hash changed
+    dirty. Values are compared rather than copied or frozen on assignment,
+    so callers keep the lists and arrays they passed in.
+
+    When a ``SolveCache`` is set on the optimizer (or as the process-wide
+    default), ``solve()`` first looks up the canonicalized parameters and
+    solver options and returns a stored solution without compiling or
+    solving anything. On a miss the program is brought up to date with the
+    same parameter values before solving, in-place edits included, so the
+    stored solution always belongs to its key. A PuLP model built with
+    ``build_model()`` bypasses the cache, since it may have been edited by
+    hand.
+
+    The "auto" backend compiles the program first and picks the backend
+    predicted fastest for its dimensions (see utils.calibration).
+
+    ``solution_arrays()`` exports the last solve as aligned NumPy arrays
+    (see utils.solution_export) from the backend's result vectors.
+
+    Every ``solve()`` is timed by phase (see utils.metrics). The record is
+    stored on the solution under ``metrics`` and sent to the metrics sink.
+    Subclass implementations of the hooks in ``TIMED_HOOKS`` are timed as
+    their phase automatically.
+
+    Attributes:
+        PARAMETERS (Dict[str, str]): Tracked parameter names, each mapped to
+            "patch" or "rebuild"
+        cache (Optional[SolveCache]): Solution cache; None uses the default
+        solver_options (Optional[SolverOptions]): Time limit, threads, gap
+            and presolve settings; None uses the global default
+        metrics_sink (Optional[MetricsSink]): Receiver of the solve
+            metrics; None uses the default
+    """
+
+    PARAMETERS: Dict[str, str] = {}
+    TIMED_HOOKS: Dict[str, str] = {
+        "compile_model": "compile",
+        "_compile_window": "compile",
+        "build_network": "compile",
+        "_extract_solution": "extract",
+    }
+    cache: Optional[SolveCache] = None
+    solver_options: Optional[SolverOptions] = None
+    metrics_sink: Optional[MetricsSink] = None
+
+    def __init_subclass__(cls, **kwargs):
+        """Time the subclass's own implementations of the TIMED_HOOKS."""
+        super().__init_subclass__(**kwargs)
+        for name, phase_name in cls.TIMED_HOOKS.items():
+            if name in cls.__dict__:
+                setattr(cls, name, timed(phase_name)(cls.__dict__[name]))
+
+    def __setattr__(self, name, value):
+        """Record assignments to tracked parameters."""
+        super().__setattr__(name, value)
+        if name in self.PARAMETERS:
+            self.__dict__.setdefault("_dirty", set()).add(name)
+
+    def set_parameters(self, **changes) -> "LPOptimizer":
+        """Assign several parameters at once.
+
+        Args:
+            **changes: Parameter names and their new values
+
+        Returns:
+            The optimizer, so calls can be chained with solve()
+        """
+        for name, new in changes.items():
+            if name not in self.PARAMETERS:
+                raise ValueError(f"Unknown parameter '{name}' for {type(self).__name__}")
+            setattr(self, name, new)
+        return self
+
+    @property
+    def dirty_parameters(self) -> set:
+        """Parameters changed since the model was last compiled."""
+        return (set(self.__dict__.get("_dirty", ()))
+                | self._edited_parameters(self._parameter_signatures()))
+
+    def _parameter_signatures(self) -> Dict[str, str]:
+        """Content hash of each tracked parameter."""
+        parameters = self._cache_parameters()
+        return {name: canonical_key(name, {name: parameters[name] if name in parameters
+                                           else getattr(self, name)})
+                for name in self.PARAMETERS}
+
+    def _edited_parameters(self, signatures: Dict[str, str]) -> set:
+        """Parameters whose hash differs from the last compile, e.g. edited in place."""
+        compiled = self.__dict__.get("_signatures")
+        if compiled is None:
+            return set()
+        return {name for name, signature in signatures.items()
+                if compiled.get(name) != signature}
+
+    def _mark_compiled(self) -> None:
+        """Record the parameters as compiled: clear the dirty set, store their hashes."""
+        self._dirty = set()
+        self._signatures = self._parameter_signatures()
+
+    def compile_model(self) -> LinearProgram:
+        """Compile the model parameters into a sparse LinearProgram.
+
+        Returns:
+            LinearProgram: The compiled model
+        """
+        raise NotImplementedError
+
+    def _bind_variables(self, variables: List[LpVariable]) -> None:
+        """Store exported PuLP variables under model-specific attributes."""
+        raise NotImplementedError
+
+    def _extract_solution(self, x: np.ndarray, objective: float) -> Dict:
+        """Build the solution dictionary from an optimal primal vector."""
+        raise NotImplementedError
+
+    def _failure_solution(self, status: str) -> Dict:
+        """Build the solution dictionary for a non-optimal status."""
+        return {
+            "status": status,
+            "error": "Optimization failed to find optimal solution"
+        }
+
+    def build_model(self) -> LpProblem:
+        """Build the linear programming model.
+
+        The model is compiled to matrix form and exported to PuLP.
+
+        Returns:
+            LpProblem: The constructed LP model
+        """
+        self.program = self.compile_model()
+        self.model, self._lp_variables = self.program.to_pulp()
+        self._bind_variables(self._lp_variables)
+        self._mark_compiled()
+        self._basis = None
+        self._auto_model = False
+        return self.model
+
+    def _has_user_model(self) -> bool:
+        """Whether a PuLP model from build_model() must be solved as built.
+
+        Models exported on the solver's behalf for a PuLP backend do not
+        count, so method switches and the solve cache still apply to them.
+        """
+        return (getattr(self, "model", None) is not None
+                and not self.__dict__.get("_auto_model", False))
+
+    def _build_internal_model(self) -> None:
+        """Export the PuLP model for a PuLP-driven backend on the solver's behalf."""
+        self.build_model()
+        self._auto_model = True
+
+    def _same_layout(self, old: LinearProgram, new: LinearProgram) -> bool:
+        """Whether two compilations share variables and rows, so patching applies."""
+        return (new.c.shape == old.c.shape
+                and new.A_ub.shape == old.A_ub.shape
+                and new.A_eq.shape == old.A_eq.shape
+                and new.maximize == old.maximize
+                and np.array_equal(new.integrality, old.integrality))
+
+    @timed("compile")
+    def _apply_parameter_changes(self) -> None:
+        """Bring the compiled program and PuLP model up to date with the parameters."""
+        signatures = self._parameter_signatures()
+        dirty = set(self.__dict__.get("_dirty", ())) | self._edited_parameters(signatures)
+        self._dirty, self._signatures = set(), signatures
+        if not dirty or self.program is None:
+            return
+
+        new = self.compile_model()
+        old = self.program
+        if (any(self.PARAMETERS[name] == "rebuild" for name in dirty)
+                or not self._same_layout(old, new)):
+            self.program = new
+            self._basis = None
+            if self.model is not None:
+                auto = self.__dict__.get("_auto_model", False)
+                self.build_model()
+                self._auto_model = auto
+            return
+
+        def changed_rows(A_old, A_new, b_old, b_new):
+            diff = (A_new - A_old).tocoo()
+            rows = diff.row[diff.data != 0]
+            return np.union1d(rows, np.flatnonzero(b_new != b_old))
+
+        cols = np.flatnonzero((new.c != old.c) | (new.lower != old.lower)
+                              | (new.upper != old.upper))
+        ub_rows = changed_rows(old.A_ub, new.A_ub, old.b_ub, new.b_ub)
+        eq_rows = changed_rows(old.A_eq, new.A_eq, old.b_eq, new.b_eq)
+        for attr in ("c", "A_ub", "b_ub", "A_eq", "b_eq", "lower", "upper"):
+            setattr(old, attr, getattr(new, attr))
+
+        if self.model is not None:
+            self._patch_pulp(cols, ub_rows, eq_rows)
+
+    @timed("build")
+    def _patch_pulp(self, cols: np.ndarray, ub_rows: np.ndarray, eq_rows: np.ndarray) -> None:
+        """Copy changed columns and rows of the program into the PuLP model."""
+        program, variables = self.program, self._lp_variables
+        for j in cols:
+            var = variables[j]
+            self.model.objective[var] = program.c[j]
+            var.lowBound = program.lower[j] if np.isfinite(program.lower[j]) else None
+            var.upBound = program.upper[j] if np.isfinite(program.upper[j]) else None
+
+        for rows, A, b, names in ((ub_rows, program.A_ub, program.b_ub, program.ub_names),
+                                  (eq_rows, program.A_eq, program.b_eq, program.eq_names)):
+            for i in rows:
+                constraint = self.model.constraints[names[i]]
+                # PuLP 3 keeps the expression in .expr; PuLP 2 constraints are expressions
+                expr = getattr(constraint, "expr", constraint)
+                expr.clear()
+                row = slice(A.indptr[i], A.indptr[i + 1])
+                for j, a in zip(A.indices[row], A.data[row]):
+                    expr[variables[j]] = a
+                constraint.changeRHS(b[i])
+
+    def _solve_program(self, backend: str) -> Dict:
+        """Solve the compiled program, falling back to CBC if HiGHS fails."""
+        if self.program is None:
+            self.program = self.compile_model()
+            self._basis = None
+        if backend != "cbc":
+            try:
+                result = self.program.solve(backend, basis=getattr(self, "_basis", None),
+                                            options=self.solver_options)
+                if result.get("basis") is not None:
+                    self._basis = result["basis"]
+                return result
+            except (ImportError, RuntimeError) as e:
+                warnings.warn(f"{backend} backend failed ({e}); falling back to CBC",
+                              RuntimeWarning)
+        self._build_internal_model()
+        return self._solve_pulp("cbc")
+
+    def _solve_pulp(self, backend: str) -> Dict:
+        """Solve the exported PuLP model and read its primal vector."""
+        solve_model(self.model, backend, self.solver_options)
+        with phase("extract"):
+            status = LpStatus[self.model.status]
+            result = {"status": status}
+            if status == "Optimal":
+                result["x"] = np.array([v.varValue for v in self._lp_variables], dtype=float)
+                result["objective"] = value(self.model.objective)
+        return result
+
+    def solution_arrays(self) -> SolutionArrays:
+        """Export the last solve as aligned NumPy arrays.
+
+        Values come from the compiled program and the backend's result
+        vectors, in the program's column and row order. A solve that went
+        through a PuLP model is read from that model instead.
+
+        Returns:
+            SolutionArrays with primal values, reduced costs, row activity,
+            slacks and duals
+
+        Raises:
+            ValueError: If the last solve has no primal solution, came from
+                the solve cache, or was answered without an LP
+        """
+        result = getattr(self, "_result", None)
+        if result is None:
+            raise ValueError("No LP result to export; the last solve() did not solve the "
+                             "compiled program (cache hit or specialized method)")
+        if result["status"] != "Optimal":
+            raise ValueError(f"No primal solution to export (status {result['status']})")
+        if self.model is not None:
+            return SolutionArrays.from_pulp(self.model)
+        return SolutionArrays.from_program(self.program, result)
+
+    def _cache_parameters(self) -> Dict:
+        """Parameter values that determine the solution, for the cache key."""
+        return {name: getattr(self, name) for name in self.PARAMETERS}
+
+    def _cache_options(self) -> Dict:
+        """Solver options that determine the solution, for the cache key."""
+        options = self.solver_options or get_default_options()
+        return {"backend": self.backend or get_default_backend(),
+                "method": getattr(self, "method", None),
+                "solver_options": options.to_dict()}
+
+    def solve(self) -> Dict:
+        """Solve the optimization problem, consulting the solve cache.
+
+        Returns:
+            Dictionary containing solution details, with the phase timings
+            of this call under ``metrics``
+        """
+        with PhaseTimer() as timer:
+            solution, cache_hit = self._solve_cached()
+        record = timer.record(
+            model=type(self).__name__,
+            backend=timer.backend or self.backend or get_default_backend(),
+            status=solution.get("status"),
+            cache_hit=cache_hit,
+        )
+        solution["metrics"] = record
+        emit(self.metrics_sink if self.metrics_sink is not None
+             else get_default_metrics_sink(), record)
+        return solution
+
+    def _solve_cached(self) -> Tuple[Dict, bool]:
+        """Answer from the solve cache, or solve and store the solution."""
+        self._result = None
+        cache = self.cache if self.cache is not None else get_default_cache()
+        if cache is None or self._has_user_model():
+            return self._solve(), False
+
+        with phase("cache"):
+            key = canonical_key(type(self).__name__, self._cache_parameters(),
+                                self._cache_options())
+            solution = cache.get(key)
+        if solution is not None:
+            self.solution = solution
+            return self.solution, True
+
+        solution = self._solve()
+        with phase("cache"):
+            cache.put(key, solution)
+        return solution, False
+
+    def _solve(self) -> Dict:
+        """Solve the optimization problem without consulting the cache.
+
+        Returns:
+            Dictionary containing solution details
+        """
+        backend = self.backend or get_default_backend()
+        self._apply_parameter_changes()
+        if backend == AUTO_BACKEND and self.model is None:
+            if self.program is None:
+                self.program = self.compile_model()
+                self._basis = None
+            program = self.program
+            backend = select_backend(program.num_rows, program.num_vars, program.nnz,
+                                     program.is_mip)
+
+        if self.model is not None:
+            result = self._solve_pulp(backend)
+        elif is_pulp_backend(backend):
+            self._build_internal_model()
+            result = self._solve_pulp(backend)
+        else:
+            result = self._solve_program(backend)
+        self._result = result
+
+        status = result["status"]
+        if status == "Optimal":
+            self.solution = {"status": status}
+            self.solution.update(self._extract_solution(result["x"], result["objective"]))
+            self.solution["model"] = self.model
+            self.solution["program"] = self.program
+        else:
+            self.solution = self._failure_solution(status)
+
+        return self.solution
@@ -0,0 +1,272 @@
+"""Matrix-form model compiler shared by the optimization models.
+
+Each optimizer compiles its parameters straight into a sparse
+``LinearProgram`` (objective vector, constraint matrices, right-hand sides
+and bounds) with vectorized NumPy operations. Solvers consume the matrices
+directly; PuLP is only an export target for callers that want an
+``LpProblem`` to inspect, edit or hand to CBC.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from scipy import sparse
+from pulp import (
+    LpAffineExpression,
+    LpConstraint,
+    LpConstraintEQ,
+    LpConstraintLE,
+    LpContinuous,
+    LpInteger,
+    LpMaximize,
+    LpMinimize,
+    LpProblem,
+    LpStatus,
+    LpVariable,
+    value,
+)
+
+from ..utils.calibration import select_backend
+from ..utils.metrics import set_backend, timed
+from ..utils.solver_utils import (
+    AUTO_BACKEND,
+    SolverOptions,
+    get_backend,
+    get_default_options,
+    solve_model,
+)
+
+
+def coo_rows(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    vals: np.ndarray,
+    shape: Tuple[int, int],
+) -> sparse.csr_matrix:
+    """Assemble a CSR matrix from COO triplets, summing duplicates.
+
+    Args:
+        rows: Row index of each coefficient
+        cols: Column index of each coefficient
+        vals: Coefficient values (broadcast against rows)
+        shape: Matrix shape (rows, columns)
+
+    Returns:
+        CSR matrix with explicit zeros removed
+    """
+    rows = np.asarray(rows).ravel()
+    cols = np.asarray(cols).ravel()
+    vals = np.broadcast_to(np.asarray(vals, dtype=float), rows.shape).ravel()
+    matrix = sparse.coo_matrix((vals, (rows, cols)), shape=shape).tocsr()
+    matrix.eliminate_zeros()
+    return matrix
+
+
+class LinearProgram:
+    """Sparse matrix form of a linear program.
+
+    The program is ``min`` (or ``max``) ``c @ x`` subject to
+    ``A_ub @ x <= b_ub``, ``A_eq @ x == b_eq`` and ``lower <= x <= upper``.
+
+    Attributes:
+        name (str): Model name used for exports
+        c (np.ndarray): Objective coefficients
+        A_ub (csr_matrix): Inequality constraint matrix
+        b_ub (np.ndarray): Inequality right-hand sides
+        A_eq (csr_matrix): Equality constraint matrix
+        b_eq (np.ndarray): Equality right-hand sides
+        lower (np.ndarray): Variable lower bounds (may be -inf)
+        upper (np.ndarray): Variable upper bounds (may be +inf)
+        maximize (bool): Whether the objective is maximized
+        var_names (List[str]): Variable names
+        ub_names (List[str]): Inequality row names
+        eq_names (List[str]): Equality row names
+        integrality (np.ndarray): 1 for integer variables, 0 for continuous
+    """
+
+    def __init__(
+        self,
+        c: np.ndarray,
+        A_ub: Optional[sparse.spmatrix] = None,
+        b_ub: Optional[np.ndarray] = None,
+        A_eq: Optional[sparse.spmatrix] = None,
+        b_eq: Optional[np.ndarray] = None,
+        lower: Optional[np.ndarray] = None,
+        upper: Optional[np.ndarray] = None,
+        maximize: bool = False,
+        name: str = "LP",
+        var_names: Optional[Sequence[str]] = None,
+        ub_names: Optional[Sequence[str]] = None,
+        eq_names: Optional[Sequence[str]] = None,
+        integrality: Optional[np.ndarray] = None,
+    ):
+        """Initialize the linear program.
+
+        Args:
+            c: Objective coefficients, shape (n,)
+            A_ub: Inequality matrix, shape (m_ub, n)
+            b_ub: Inequality right-hand sides, shape (m_ub,)
+            A_eq: Equality matrix, shape (m_eq, n)
+            b_eq: Equality right-hand sides, shape (m_eq,)
+            lower: Variable lower bounds (default 0)
+            upper: Variable upper bounds (default +inf)
+            maximize: Maximize instead of minimize
+            name: Model name used for exports
+            var_names: Variable names (default x_0, x_1, ...)
+            ub_names: Inequality row names (default ub_0, ...)
+            eq_names: Equality row names (default eq_0, ...)
+
+            integrality: Optional per-variable flags, 1 marks an integer
+                variable (the convention of scipy.optimize.milp)
+
+        Name arguments may also be zero-argument callables, which are only
+        evaluated when the names are first needed (for example on export).
+        """
+        self.c = np.asarray(c, dtype=float)
+        n = len(self.c)
+        self.A_ub = sparse.csr_matrix(A_ub) if A_ub is not None else sparse.csr_matrix((0, n))
+        self.b_ub = np.asarray(b_ub if b_ub is not None else np.zeros(0), dtype=float)
+        self.A_eq = sparse.csr_matrix(A_eq) if A_eq is not None else sparse.csr_matrix((0, n))
+        self.b_eq = np.asarray(b_eq if b_eq is not None else np.zeros(0), dtype=float)
+        self.lower = np.zeros(n) if lower is None else np.broadcast_to(
+            np.asarray(lower, dtype=float), (n,)).copy()
+        self.upper = np.full(n, np.inf) if upper is None else np.broadcast_to(
+            np.asarray(upper, dtype=float), (n,)).copy()
+        self.maximize = maximize
+        self.name = name
+        self.integrality = (np.zeros(n, dtype=int) if integrality is None
+                            else np.asarray(integrality, dtype=int).copy())
+        self._names = {
+            "var": (var_names, "x", n),
+            "ub": (ub_names, "ub", self.A_ub.shape[0]),
+            "eq": (eq_names, "eq", self.A_eq.shape[0]),
+        }
+
+        if self.A_ub.shape != (len(self.b_ub), n) or self.A_eq.shape != (len(self.b_eq), n):
+            raise ValueError("Constraint matrices do not match the objective and right-hand sides")
+
+    def _resolve_names(self, kind: str) -> List[str]:
+        """Materialize a name list on first use; callables are evaluated lazily."""
+        names, prefix, count = self._names[kind]
+        if callable(names):
+            names = names()
+        if names is None:
+            names = [f"{prefix}_{i}" for i in range(count)]
+        names = list(names)
+        self._names[kind] = (names, prefix, count)
+        return names
+
+    @property
+    def var_names(self) -> List[str]:
+        """Variable names in column order."""
+        return self._resolve_names("var")
+
+    @property
+    def ub_names(self) -> List[str]:
+        """Inequality row names."""
+        return self._resolve_names("ub")
+
+    @property
+    def eq_names(self) -> List[str]:
+        """Equality row names."""
+        return self._resolve_names("eq")
+
+    @property
+    def num_vars(self) -> int:
+        """Number of decision variables."""
+        return len(self.c)
+
+    @property
+    def num_rows(self) -> int:
+        """Number of constraint rows (inequalities and equalities)."""
+        return self.A_ub.shape[0] + self.A_eq.shape[0]
+
+    @property
+    def nnz(self) -> int:
+        """Number of nonzero constraint coefficients."""
+        return self.A_ub.nnz + self.A_eq.nnz
+
+    @property
+    def is_mip(self) -> bool:
+        """Whether any variable is integer."""
+        return bool(self.integrality.any())
+
+    @property
+    def bounds(self) -> np.ndarray:
+        """Variable bounds as an (n, 2) array, the layout linprog accepts."""
+        return np.column_stack([self.lower, self.upper])
+
+    def solve(self, backend: str = "highs", basis: Optional[np.ndarray] = None,
+              options: Optional[SolverOptions] = None) -> Dict:
+        """Solve the program without building PuLP objects.
+
+        Args:
+            backend: "highs" (in-process HiGHS, MIP-capable), "dense" (the
+                NumPy simplex kernel, for small LPs), "cbc" or "glpk" (export
+                to PuLP), any other registered backend, or "auto" to pick
+                the backend predicted fastest for this program's size
+            basis: Optional starting basis for backends that warm start
+            options: Solver options, or None for the global default
+
+        Returns:
+            Dictionary with ``status`` and, when optimal, ``x``,
+            ``objective``, ``duals_ub``, ``duals_eq`` and ``reduced_costs``
+        """
+        options = options if options is not None else get_default_options()
+        if backend == AUTO_BACKEND:
+            backend = select_backend(self.num_rows, self.num_vars, self.nnz, self.is_mip)
+        entry = get_backend(backend)
+        set_backend(backend)
+        if entry.solve is not None:
+            if self.is_mip and not entry.supports_mip:
+                raise RuntimeError(f"The {backend} backend does not support integer variables")
+            if not entry.is_available():
+                raise RuntimeError(f"The {backend} backend is not available")
+            return entry.solve(self.c, self.A_ub, self.b_ub, self.A_eq, self.b_eq,
+                               self.bounds, maximize=self.maximize,
+                               integrality=self.integrality,
+                               basis=basis if entry.warm_start else None, options=options)
+
+        model, variables = self.to_pulp()
+        solve_model(model, backend, options)
+        status = LpStatus[model.status]
+        result = {"status": status}
+        if status == "Optimal":
+            result["x"] = np.array([v.varValue for v in variables], dtype=float)
+            result["objective"] = value(model.objective) or 0.0
+        return result
+
+    @timed("build")
+    def to_pulp(self) -> Tuple[LpProblem, List[LpVariable]]:
+        """Export the program as a PuLP model.
+
+        Returns:
+            Tuple of (LpProblem, list of LpVariable in column order)
+        """
+        model = LpProblem(self.name, LpMaximize if self.maximize else LpMinimize)
+        variables = [
+            LpVariable(name,
+                       lowBound=lo if np.isfinite(lo) else None,
+                       upBound=up if np.isfinite(up) else None,
+                       cat=LpInteger if integer else LpContinuous)
+            for name, lo, up, integer in zip(self.var_names, self.lower, self.upper,
+                                             self.integrality)
+        ]
+
+        objective = LpAffineExpression(
+            [(variables[j], self.c[j]) for j in np.flatnonzero(self.c)]
+        )
+        model.setObjective(objective)
+
+        for matrix, rhs, names, sense in (
+            (self.A_ub, self.b_ub, self.ub_names, LpConstraintLE),
+            (self.A_eq, self.b_eq, self.eq_names, LpConstraintEQ),
+        ):
+            indptr, indices, data = matrix.indptr, matrix.indices, matrix.data
+            for i, name in enumerate(names):
+                row = slice(indptr[i], indptr[i + 1])
+                expr = LpAffineExpression(
+                    [(variables[j], a) for j, a in zip(indices[row], data[row])]
+                )
+                model.addConstraint(LpConstraint(expr, sense, name, rhs[i]))
+
+        return model, variables
@@ -0,0 +1,420 @@
+"""Structure-exploiting solvers for single-item production planning.
+
+Without capacity limits, the production-inventory LP decomposes by demand
+period: each period's demand is produced in the period j <= t that
+minimizes ``production_costs[j] + storage_cost * (t - j)``. Writing that
+cost as ``(production_costs[j] - storage_cost * j) + storage_cost * t``
+turns the search into a running minimum, so the optimal plan is found in a
+single vectorized forward scan instead of an LP solve.
+
+Fixed setup costs make the problem a lot-sizing MIP. Without capacities it
+is solved exactly by the Wagner-Whitin dynamic program; with capacities a
+repair heuristic produces a feasible plan together with a lower bound, so
+the optimality gap of every plan is known.
+"""
+
+import warnings
+from typing import Dict, Optional
+import numpy as np
+
+from ..utils.metrics import timed_solver
+
+
+@timed_solver(backend="forward_scan")
+def solve_uncapacitated(
+    production_costs: np.ndarray,
+    storage_cost,
+    demands: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """Solve uncapacitated production-inventory problems by forward scan.
+
+    Runs in O(S * T) time for S items (SKUs) over T periods. Among
+    equally cheap source periods the latest one is chosen, which keeps
+    inventory as low as possible.
+
+    Args:
+        production_costs: Unit production cost per period, shape (T,) or (S, T)
+        storage_cost: Unit storage cost per period, scalar or shape (S,)
+        demands: Demand per period, shape (T,) or (S, T)
+
+    Returns:
+        Dictionary of arrays (leading axis dropped for 1-D inputs):
+            - ``production_schedule``: units produced per period
+            - ``inventory_schedule``: ending inventory per period
+            - ``source_period``: period each period's demand is produced in
+            - ``total_cost``, ``production_cost``, ``storage_cost``: totals
+    """
+    single = np.ndim(production_costs) == 1 and np.ndim(demands) == 1
+    costs = np.atleast_2d(np.asarray(production_costs, dtype=float))
+    demands = np.atleast_2d(np.asarray(demands, dtype=float))
+    costs, demands = np.broadcast_arrays(costs, demands)
+    S, T = demands.shape
+    holding = np.broadcast_to(np.asarray(storage_cost, dtype=float), (S,))[:, np.newaxis]
+
+    periods = np.arange(T)
+    adjusted = costs - holding * periods
+    running_min = np.minimum.accumulate(adjusted, axis=1)
+
+    # The latest period attaining the running minimum is the source period
+    attains = adjusted == running_min
+    source = np.maximum.accumulate(np.where(attains, periods, 0), axis=1)
+
+    flat = (source + T * np.arange(S)[:, np.newaxis]).ravel()
+    production = np.bincount(flat, weights=demands.ravel(), minlength=S * T).reshape(S, T)
+    inventory = np.cumsum(production, axis=1) - np.cumsum(demands, axis=1)
+    inventory[np.abs(inventory) < 1e-9] = 0.0
+
+    production_cost = np.einsum("st,st->s", costs, production)
+    storage_total = holding[:, 0] * inventory.sum(axis=1)
+
+    result = {
+        "production_schedule": production,
+        "inventory_schedule": inventory,
+        "source_period": source,
+        "total_cost": production_cost + storage_total,
+        "production_cost": production_cost,
+        "storage_cost": storage_total,
+    }
+    if single:
+        result = {key: value[0] for key, value in result.items()}
+    return result
+
+
+class _LiChaoTree:
+    """Minimum over lines y = a + b * x, queried at a fixed set of points.
+
+    Both insertion and query take O(log n) for n query points.
+    """
+
+    def __init__(self, points: np.ndarray):
+        self.points = points
+        size = 1
+        while size < len(points):
+            size *= 2
+        self.lines = [None] * (2 * size)
+        self.size = size
+
+    def _value(self, line, i):
+        return line[0] + line[1] * self.points[min(i, len(self.points) - 1)]
+
+    def insert(self, intercept: float, slope: float, label: int) -> None:
+        line = (intercept, slope, label)
+        node, lo, hi = 1, 0, self.size
+        while True:
+            current = self.lines[node]
+            if current is None:
+                self.lines[node] = line
+                return
+            mid = (lo + hi) // 2
+            left_better = self._value(line, lo) < self._value(current, lo)
+            mid_better = self._value(line, mid) < self._value(current, mid)
+            if mid_better:
+                self.lines[node], line = line, current
+            if hi - lo == 1:
+                return
+            if left_better != mid_better:
+                node, hi = 2 * node, mid
+            else:
+                node, lo = 2 * node + 1, mid
+
+    def query(self, i: int):
+        """Return (value, label) of the lowest line at point index i."""
+        node, lo, hi = 1, 0, self.size
+        best, label = np.inf, -1
+        while True:
+            line = self.lines[node]
+            if line is not None:
+                v = line[0] + line[1] * self.points[i]
+                if v < best:
+                    best, label = v, line[2]
+            if hi - lo == 1:
+                return best, label
+            mid = (lo + hi) // 2
+            if i < mid:
+                node, hi = 2 * node, mid
+            else:
+                node, lo = 2 * node + 1, mid
+
+
+def _plan_costs(production, demands, costs, storage_cost, setup_costs, tol=1e-9):
+    """Cost breakdown of a single-item production plan."""
+    inventory = np.cumsum(production) - np.cumsum(demands)
+    inventory[np.abs(inventory) < tol] = 0.0
+    setups = production > tol
+    production_cost = float(costs @ production)
+    storage_total = float(storage_cost * inventory.sum())
+    setup_total = float(setup_costs[setups].sum())
+    return {
+        "production_schedule": production,
+        "inventory_schedule": inventory,
+        "setup_schedule": setups,
+        "total_cost": production_cost + storage_total + setup_total,
+        "production_cost": production_cost,
+        "storage_cost": storage_total,
+        "setup_cost": setup_total,
+    }
+
+
+@timed_solver(backend="wagner_whitin")
+def wagner_whitin(
+    production_costs: np.ndarray,
+    storage_cost: float,
+    demands: np.ndarray,
+    setup_costs,
+) -> Dict[str, np.ndarray]:
+    """Solve uncapacitated lot sizing with setup costs exactly.
+
+    Every optimal plan produces only when inventory is empty, so period j
+    covers a block of demands j..t. With cumulative demand D and
+    W[t] = sum(k * d_k), the cost of the best plan through t is
+
+        F(t) = h W[t] + min_j (a_j + b_j * D[t])
+
+    with b_j = p_j - h j and a_j depending only on F(j - 1). Each j adds a
+    line and each t queries the lower envelope at D[t], which a Li Chao tree
+    answers in O(log n), for O(n log n) overall.
+
+    Args:
+        production_costs: Unit production cost per period, shape (T,)
+        storage_cost: Unit storage cost per period
+        demands: Demand per period, shape (T,)
+        setup_costs: Fixed cost of producing in a period, scalar or shape (T,)
+
+    Returns:
+        Dictionary with ``production_schedule``, ``inventory_schedule``,
+        ``setup_schedule`` (bool) and ``total_cost``, ``production_cost``,
+        ``storage_cost``, ``setup_cost`` totals
+    """
+    costs = np.asarray(production_costs, dtype=float)
+    demands = np.asarray(demands, dtype=float)
+    T = len(demands)
+    setups = np.broadcast_to(np.asarray(setup_costs, dtype=float), (T,))
+    h = float(storage_cost)
+
+    D = np.cumsum(demands)
+    W = np.cumsum(np.arange(T) * demands)
+    D_prev = np.concatenate([[0.0], D[:-1]])
+    W_prev = np.concatenate([[0.0], W[:-1]])
+    slopes = costs - h * np.arange(T)
+
+    tree = _LiChaoTree(D)
+    F = np.zeros(T + 1)           # F[t + 1] = best cost covering periods 0..t
+    choice = np.zeros(T, dtype=int)
+    for t in range(T):
+        tree.insert(F[t] + setups[t] - h * W_prev[t] - slopes[t] * D_prev[t], slopes[t], t)
+        best, j = tree.query(t)
+        best += h * W[t]
+        # A period without demand can also be left uncovered
+        if demands[t] <= 0 and F[t] <= best:
+            F[t + 1], choice[t] = F[t], -1
+        else:
+            F[t + 1], choice[t] = best, j
+
+    production = np.zeros(T)
+    t = T - 1
+    while t >= 0:
+        j = choice[t]
+        if j < 0:
+            t -= 1
+            continue
+        production[j] = D[t] - D_prev[j]
+        t = j - 1
+
+    return _plan_costs(production, demands, costs, h, setups)
+
+
+def _lp_relaxation_bound(costs, h, demands, setups, capacities) -> float:
+    """Lower bound from the LP relaxation with tightened setup forcing rows."""
+    from scipy import sparse
+    from ..utils.solver_utils import solve_highs
+
+    T = len(demands)
+    periods = np.arange(T)
+    remaining = demands[::-1].cumsum()[::-1]
+    big_m = np.minimum(capacities, remaining)
+
+    # Variables [x, I, y]; balance rows as in the production LP
+    c = np.concatenate([costs, np.full(T, h), setups])
+    rows = np.concatenate([periods, periods, periods[1:]])
+    cols = np.concatenate([periods, T + periods, T + periods[:-1]])
+    vals = np.concatenate([np.ones(T), -np.ones(T), np.ones(T - 1)])
+    A_eq = sparse.csr_matrix((vals, (rows, cols)), shape=(T, 3 * T))
+    A_ub = sparse.hstack([sparse.eye(T), sparse.csr_matrix((T, T)),
+                          sparse.diags(-big_m)]).tocsr()
+    bounds = np.column_stack([np.zeros(3 * T), np.full(3 * T, np.inf)])
+    bounds[2 * T:, 1] = 1.0
+    result = solve_highs(c, A_ub, np.zeros(T), A_eq, demands, bounds)
+    return result["objective"] if result["status"] == "Optimal" else -np.inf
+
+
+def _allocate(is_open, costs, storage_cost, demands, capacities) -> Optional[np.ndarray]:
+    """Cheapest production plan for a fixed set of setup periods.
+
+    Serving demand t from period j costs ``(costs[j] - h j) + h t``; the
+    ``h t`` part does not depend on j, and every period open for demand t is
+    also open for all later demands. Serving each demand in turn from the
+    cheapest open period with spare capacity is therefore optimal.
+
+    Returns:
+        Production per period, or None if the open periods cannot cover demand
+    """
+    import heapq
+
+    adjusted = costs - storage_cost * np.arange(len(demands))
+    spare = np.where(is_open, capacities, 0.0).astype(float)
+    production = np.zeros(len(demands))
+    heap = []
+    for t, demand in enumerate(demands):
+        if spare[t] > 0:
+            heapq.heappush(heap, (adjusted[t], t))
+        while demand > 1e-9:
+            if not heap:
+                return None
+            _, j = heap[0]
+            amount = min(spare[j], demand)
+            production[j] += amount
+            spare[j] -= amount
+            demand -= amount
+            if spare[j] <= 1e-9:
+                heapq.heappop(heap)
+    return production
+
+
+@timed_solver(backend="lot_sizing_heuristic")
+def capacitated_lot_sizing(
+    production_costs: np.ndarray,
+    storage_cost: float,
+    demands: np.ndarray,
+    setup_costs,
+    capacities,
+    lp_bound: bool = True,
+    max_passes: int = 3,
+) -> Dict[str, np.ndarray]:
+    """Find a good capacitated lot-sizing plan with a proven lower bound.
+
+    The plan starts from the uncapacitated Wagner-Whitin optimum. A backward
+    pass then moves production above capacity to the earlier period with
+    the lowest marginal cost per unit (production, storage and any new
+    setup), and a final pass removes setups whose output is cheaper to
+    build earlier. Dropping the capacities gives a relaxation, so the
+    Wagner-Whitin cost is a lower bound; the LP relaxation may raise it.
+
+    Args:
+        production_costs: Unit production cost per period, shape (T,)
+        storage_cost: Unit storage cost per period
+        demands: Demand per period, shape (T,)
+        setup_costs: Fixed cost of producing in a period, scalar or shape (T,)
+        capacities: Production capacity per period, scalar or shape (T,)
+        lp_bound: Also compute the LP relaxation bound (needs SciPy)
+        max_passes: Maximum number of local search passes over the setups
+
+    Returns:
+        Dictionary as returned by wagner_whitin plus ``status``,
+        ``lower_bound`` and ``gap`` (relative distance to the lower bound).
+        ``status`` is "Infeasible" when cumulative capacity cannot cover
+        cumulative demand.
+    """
+    costs = np.asarray(production_costs, dtype=float)
+    demands = np.asarray(demands, dtype=float)
+    T = len(demands)
+    setups = np.broadcast_to(np.asarray(setup_costs, dtype=float), (T,))
+    capacities = np.broadcast_to(np.asarray(capacities, dtype=float), (T,))
+    h = float(storage_cost)
+    tol = 1e-9
+
+    if np.any(np.cumsum(capacities) < np.cumsum(demands) - 1e-6):
+        return {"status": "Infeasible"}
+
+    relaxed = wagner_whitin(costs, h, demands, setups)
+    production = relaxed["production_schedule"].copy()
+    periods = np.arange(T)
+
+    # Backward repair: shift production above capacity to earlier periods
+    for t in range(T - 1, -1, -1):
+        excess = production[t] - capacities[t]
+        if excess <= tol:
+            continue
+        production[t] = capacities[t]
+        while excess > tol:
+            spare = capacities[:t] - production[:t]
+            open_ = spare > tol
+            if not open_.any():
+                break
+            amount = np.minimum(spare, excess)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                unit = costs[:t] + h * (t - periods[:t]) + np.where(
+                    production[:t] > tol, 0.0, setups[:t] / amount)
+            unit = np.where(open_, unit, np.inf)
+            j = int(np.argmin(unit))
+            production[j] += amount[j]
+            excess -= amount[j]
+        production[t] += excess
+
+    # Whatever did not fit earlier serves later demand: every earlier period
+    # is full at that point, so pushing it forward keeps inventory >= 0
+    carry = 0.0
+    for t in range(T):
+        production[t] += carry
+        carry = max(production[t] - capacities[t], 0.0)
+        production[t] -= carry
+
+    # Local search over the set of setup periods: close a setup or move it
+    # one period. A move is evaluated on the stretch between the surrounding
+    # periods that end with empty stock, which fixes the plan outside it.
+    production = _allocate(production > tol, costs, h, demands, capacities)
+    is_open = production > tol
+    for _ in range(max_passes):
+        improved = False
+        for t in np.flatnonzero(production > tol)[::-1]:
+            if not is_open[t]:
+                continue
+            empty = np.flatnonzero(np.cumsum(production) - np.cumsum(demands) <= 1e-6)
+            k = np.searchsorted(empty, t)
+            start = empty[k - 2] + 1 if k >= 2 else 0
+            k = np.searchsorted(empty, t + 1)
+            stop = empty[k + 1] + 1 if k + 1 < len(empty) else T
+            window = slice(start, stop)
+            args = (costs[window], h, demands[window], capacities[window])
+
+            def window_cost(open_, x):
+                inventory = np.cumsum(x) - np.cumsum(demands[window])
+                return costs[window] @ x + h * inventory.sum() + setups[window][open_].sum()
+
+            best = window_cost(is_open[window], production[window])
+            for other in (None, t - 1, t + 1):
+                if other is not None and not (start <= other < stop and not is_open[other]):
+                    continue
+                trial_open = is_open.copy()
+                trial_open[t] = False
+                if other is not None:
+                    trial_open[other] = True
+                trial = _allocate(trial_open[window], *args)
+                if trial is not None and window_cost(trial_open[window], trial) < best - tol:
+                    is_open = trial_open
+                    production[window] = trial
+                    improved = True
+                    break
+        if not improved:
+            break
+
+    plan = _plan_costs(production, demands, costs, h, setups)
+    lower_bound = relaxed["total_cost"]
+    if lp_bound:
+        try:
+            lower_bound = max(lower_bound,
+                              _lp_relaxation_bound(costs, h, demands, setups, capacities))
+        except ImportError:
+            pass
+    scale = max(1.0, abs(plan["total_cost"]))
+    if lower_bound - plan["total_cost"] > 1e-6 * scale:
+        warnings.warn(f"Lower bound {lower_bound:.6g} exceeds the cost {plan['total_cost']:.6g} "
+                      "of a feasible plan", RuntimeWarning)
+    else:
+        # A bound within solver tolerance of the plan's cost proves it optimal
+        lower_bound = min(lower_bound, plan["total_cost"])
+
+    optimal = plan["total_cost"] - lower_bound <= 1e-9 * max(1.0, abs(lower_bound))
+    plan["status"] = "Optimal" if optimal else "Feasible"
+    plan["lower_bound"] = lower_bound
+    plan["gap"] = (plan["total_cost"] - lower_bound) / max(abs(plan["total_cost"]), tol)
+    return plan
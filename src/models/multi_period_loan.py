@@ -0,0 +1,420 @@
+"""Multi-Period Asset-Liability Bank Loan Model.
+
+This module extends the single-shot loan allocation to a monthly planning
+horizon. Each month the bank originates new loans of every type out of its
+cash; loans amortize, prepay and default over their terms and the cash they
+return is reinvested. Liabilities drain cash and deposits add to it.
+
+Every unit originated follows a fixed per-type profile of outstanding
+balance and cash returned by age, so balances and cash flows are
+convolutions of the origination schedule with those profiles. The
+constraint matrix is therefore a block-Toeplitz staircase, which is
+assembled in one vectorized step from the profiles rather than row by row.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from .bank_loan import BankLoanOptimizer, WEIGHT_PARAMETERS
+from .compiler import LinearProgram, coo_rows
+from ..utils.solver_utils import get_default_backend
+
+
+# Loan terms in months for the default loan types
+DEFAULT_LOAN_TERMS = {"Personal": 36, "Car": 60, "Home": 360, "Farm": 120, "Commercial": 84}
+
+METHODS = ("full", "rolling")
+
+
+def loan_profiles(
+    terms: np.ndarray,
+    monthly_rates: np.ndarray,
+    default_rates: np.ndarray,
+    prepayment_rates: np.ndarray,
+    amortizing: np.ndarray,
+    horizon: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Per-unit balance and cash flow of each loan type by age in months.
+
+    Scheduled principal is repaid in equal monthly parts (or at maturity
+    for bullet loans). Each month a share ``default_rates`` of the balance
+    defaults and a share ``prepayment_rates`` of the remainder prepays.
+
+    Args:
+        terms: Loan term in months, shape (K,)
+        monthly_rates: Monthly interest rate, shape (K,)
+        default_rates: Monthly default rate, shape (K,)
+        prepayment_rates: Monthly prepayment rate, shape (K,)
+        amortizing: Whether principal amortizes (True) or is repaid at
+            maturity (False), shape (K,)
+        horizon: Number of ages to tabulate
+
+    Returns:
+        Tuple of arrays of shape (K, horizon), indexed by age: outstanding
+        balance, cash returned (interest plus principal), interest earned
+        and principal lost to defaults. Age 0 is the month of origination.
+    """
+    ages = np.arange(horizon)
+    terms = np.asarray(terms, dtype=float)[:, np.newaxis]
+    amortizing = np.asarray(amortizing, dtype=bool)[:, np.newaxis]
+    scheduled = np.where(amortizing, np.clip(1 - ages / terms, 0.0, 1.0),
+                         (ages < terms).astype(float))
+    d = np.asarray(default_rates, dtype=float)[:, np.newaxis]
+    p = np.asarray(prepayment_rates, dtype=float)[:, np.newaxis]
+    r = np.asarray(monthly_rates, dtype=float)[:, np.newaxis]
+    balance = scheduled * ((1 - d) * (1 - p)) ** ages
+
+    previous = np.zeros_like(balance)
+    previous[:, 1:] = balance[:, :-1]
+    interest = r * (1 - d) * previous
+    # Performing balance plus interest, less what stays outstanding
+    cash = (1 - d) * (1 + r) * previous - np.where(ages > 0, balance, 0.0)
+    losses = d * previous
+    return balance, cash, interest, losses
+
+
+def convolve_profiles(originations: np.ndarray, profile: np.ndarray) -> np.ndarray:
+    """Aggregate cohort profiles: ``out[k, t] = sum(profile[k, t - s] * x[k, s])``.
+
+    Args:
+        originations: Originations per type and period, shape (K, T)
+        profile: Per-unit profile by age, shape (K, >= T)
+
+    Returns:
+        Array of shape (K, T)
+    """
+    T = originations.shape[1]
+    age = np.subtract.outer(np.arange(T), np.arange(T))
+    toeplitz = np.where(age >= 0, profile[:, np.clip(age, 0, None)], 0.0)
+    return np.einsum("kts,ks->kt", toeplitz, originations)
+
+
+class MultiPeriodLoanOptimizer(BankLoanOptimizer):
+    """Plan monthly loan originations over a horizon with reinvested cash.
+
+    Decision variables are the originations ``x[k, t]`` of each loan type in
+    each month and the cash ``c[t]`` held at the end of each month, which
+    earns ``cash_rate``. Cash balances are equality rows; the ratio
+    constraints of BankLoanOptimizer (for example farm and commercial loans
+    at least 40% of the book) apply to the outstanding balances every month.
+    The objective is the terminal value, cash plus outstanding balances at
+    the end of the horizon.
+
+    Attributes:
+        num_periods (int): Number of months planned
+        loan_terms (np.ndarray): Term of each loan type in months
+        prepayment_rates (np.ndarray): Monthly prepayment rates
+        amortizing (np.ndarray): Whether each loan type amortizes
+        cash_rate (float): Annual rate earned on cash
+        deposits (np.ndarray): Cash added each month
+        liabilities (np.ndarray): Cash paid out each month
+        method (str): "full" (one LP) or "rolling" (rolling horizon)
+        window (int): Months per rolling-horizon window
+        step (int): Months committed per rolling-horizon window
+    """
+
+    PARAMETERS = dict(
+        BankLoanOptimizer.PARAMETERS,
+        num_periods="rebuild",
+        loan_terms="patch",
+        prepayment_rates="patch",
+        amortizing="patch",
+        cash_rate="patch",
+        deposits="patch",
+        liabilities="patch",
+        window="patch",
+        step="patch",
+    )
+
+    def __init__(
+        self,
+        total_funds: float = 12_000_000,
+        interest_rates: Optional[List[float]] = None,
+        bad_debt_ratios: Optional[List[float]] = None,
+        loan_types: Optional[List[str]] = None,
+        loan_groups: Optional[Dict[str, Sequence]] = None,
+        ratio_constraints: Optional[List[Dict]] = None,
+        num_periods: int = 120,
+        loan_terms: Optional[Sequence[int]] = None,
+        prepayment_rates=0.005,
+        amortizing=True,
+        cash_rate: float = 0.02,
+        deposits=0.0,
+        liabilities=0.0,
+        method: str = "full",
+        window: int = 24,
+        step: int = 12,
+        backend: Optional[str] = None,
+    ):
+        """Initialize the Multi-Period Loan Optimizer.
+
+        Args:
+            total_funds: Cash available at the start of the first month
+            interest_rates: Annual interest rate of each loan type
+            bad_debt_ratios: Annual default rate of each loan type
+            loan_types: Names of loan types
+            loan_groups: Named groups of loan types (see BankLoanOptimizer)
+            ratio_constraints: Ratio constraints on outstanding balances,
+                enforced every month (see BankLoanOptimizer)
+            num_periods: Number of months to plan
+            loan_terms: Term of each loan type in months; defaults to
+                DEFAULT_LOAN_TERMS for the default types and 60 otherwise
+            prepayment_rates: Monthly prepayment rate, broadcast to (K,)
+            amortizing: Whether principal amortizes, broadcast to (K,)
+            cash_rate: Annual rate earned on cash
+            deposits: Cash added each month, broadcast to (num_periods,)
+            liabilities: Cash paid out each month, broadcast to (num_periods,)
+            method: "full" solves one LP over the horizon; "rolling" solves
+                overlapping windows of ``window`` months and commits the
+                first ``step`` months of each
+            window: Months per rolling-horizon window
+            step: Months committed per rolling-horizon window
+            backend: Solver backend name; None uses the global default
+        """
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {METHODS}, got '{method}'")
+        if not 0 < step <= window:
+            raise ValueError("step must be positive and no larger than window")
+        super().__init__(
+            total_funds=total_funds,
+            interest_rates=interest_rates,
+            bad_debt_ratios=bad_debt_ratios,
+            loan_types=loan_types,
+            loan_groups=loan_groups,
+            ratio_constraints=ratio_constraints,
+            backend=backend,
+        )
+        K = len(self.loan_types)
+        if loan_terms is None:
+            loan_terms = [DEFAULT_LOAN_TERMS.get(t, 60) for t in self.loan_types]
+        self.num_periods = num_periods
+        self.loan_terms = np.broadcast_to(np.asarray(loan_terms, dtype=np.int64), (K,))
+        self.prepayment_rates = np.broadcast_to(np.asarray(prepayment_rates, dtype=float), (K,))
+        self.amortizing = np.broadcast_to(np.asarray(amortizing, dtype=bool), (K,))
+        self.cash_rate = cash_rate
+        self.deposits = np.broadcast_to(np.asarray(deposits, dtype=float), (num_periods,))
+        self.liabilities = np.broadcast_to(np.asarray(liabilities, dtype=float), (num_periods,))
+        self.method = method
+        self.window = window
+        self.step = step
+        if (self.loan_terms < 1).any():
+            raise ValueError("Loan terms must be at least one month")
+
+    def _profiles(self, horizon: int) -> Tuple[np.ndarray, ...]:
+        """Loan profiles with annual rates converted to monthly ones."""
+        annual_default = np.asarray(self.bad_debt_ratios, dtype=float)
+        return loan_profiles(
+            self.loan_terms,
+            np.asarray(self.interest_rates, dtype=float) / 12,
+            1 - (1 - annual_default) ** (1 / 12),
+            self.prepayment_rates,
+            self.amortizing,
+            horizon,
+        )
+
+    def _rule_matrix(self) -> Tuple[List[str], np.ndarray]:
+        """Ratio constraint coefficients per loan type, shape (R, K)."""
+        rules = self._resolve_rules()
+        params = {name: np.asarray(getattr(self, name), dtype=float)
+                  for name in WEIGHT_PARAMETERS}
+        coefficients = np.zeros((len(rules), len(self.loan_types)))
+        for r, (_, group, of, weights, sign, ratio) in enumerate(rules):
+            cols, vals = self._rule_coefficients(group, of, weights, sign, ratio, params)
+            np.add.at(coefficients[r], cols, vals)
+        return [rule[0] for rule in rules], coefficients
+
+    def _compile_window(self, start: int, length: int, opening_cash: float,
+                        legacy_cash: np.ndarray, legacy_balance: np.ndarray) -> LinearProgram:
+        """Compile the LP for months ``start`` to ``start + length - 1``.
+
+        Loans originated before ``start`` enter as known cash flows
+        ``legacy_cash`` (T,) and balances ``legacy_balance`` (K, T).
+
+        Variables are ``x[k, s]`` at column ``k * length + s`` followed by
+        ``c[s]``. Cash row s reads
+
+            c[s] - (1 + rc) c[s-1] + sum_k x[k, s]
+                - sum_{k, s' < s} cash[k, s - s'] x[k, s'] = inflow[s]
+        """
+        K, W = len(self.loan_types), length
+        balance, cash, _, _ = self._profiles(W)
+        names, coefficients = self._rule_matrix()
+        R = len(names)
+        rc = (1 + self.cash_rate) ** (1 / 12) - 1
+        periods = slice(start, start + W)
+
+        # Block-Toeplitz staircase: entry (s, s') of block k depends only on
+        # the age s - s'; all blocks are assembled in one broadcast
+        age = np.subtract.outer(np.arange(W), np.arange(W))
+        s_idx, s0_idx = np.nonzero(age >= 0)
+        ages = age[s_idx, s0_idx]
+        k_idx = np.repeat(np.arange(K), len(ages))
+        rows_t = np.tile(s_idx, K)
+        cols_x = k_idx * W + np.tile(s0_idx, K)
+        ages_k = np.tile(ages, K)
+
+        # Cash rows: originations leave at age 0, returns arrive afterwards
+        cash_vals = np.where(ages_k == 0, 1.0, -cash[k_idx, ages_k])
+        cash_rows = np.concatenate([rows_t, np.arange(W), np.arange(1, W)])
+        cash_cols = np.concatenate([cols_x, K * W + np.arange(W), K * W + np.arange(W - 1)])
+        cash_data = np.concatenate([cash_vals, np.ones(W), np.full(W - 1, -(1 + rc))])
+        A_eq = coo_rows(cash_rows, cash_cols, cash_data, (W, K * W + W))
+        b_eq = self.deposits[periods] - self.liabilities[periods] + legacy_cash[periods]
+        b_eq = b_eq.copy()
+        b_eq[0] += self.total_funds if start == 0 else (1 + rc) * opening_cash
+
+        # Ratio rows on outstanding balances, one per rule and month
+        rule_vals = coefficients[:, k_idx] * balance[k_idx, ages_k]
+        A_ub = coo_rows(np.arange(R)[:, np.newaxis] * W + rows_t,
+                        np.broadcast_to(cols_x, rule_vals.shape),
+                        rule_vals.ravel(), (R * W, K * W + W))
+        b_ub = -(coefficients @ legacy_balance[:, periods]).ravel()
+
+        # Terminal value: cash plus the balances still outstanding
+        c = np.zeros(K * W + W)
+        last = np.flatnonzero(rows_t == W - 1)
+        c[cols_x[last]] = balance[k_idx[last], ages_k[last]]
+        c[-1] = 1.0
+
+        loan_types = self.loan_types
+        return LinearProgram(
+            c,
+            A_ub=A_ub,
+            b_ub=b_ub,
+            A_eq=A_eq,
+            b_eq=b_eq,
+            maximize=True,
+            name="Multi_Period_Loan_Planning",
+            var_names=lambda: ([f"x_{t}_{start + s}" for t in loan_types for s in range(W)]
+                               + [f"cash_{start + s}" for s in range(W)]),
+            ub_names=lambda: [f"{name}_{start + s}" for name in names for s in range(W)],
+            eq_names=lambda: [f"Cash_Balance_{start + s}" for s in range(W)],
+        )
+
+    def compile_model(self) -> LinearProgram:
+        """Compile the full-horizon model into sparse matrix form.
+
+        Returns:
+            LinearProgram: The compiled LP model
+        """
+        T = self.num_periods
+        return self._compile_window(0, T, self.total_funds, np.zeros(T),
+                                    np.zeros((len(self.loan_types), T)))
+
+    def _schedule_solution(self, originations: np.ndarray, cash: np.ndarray) -> Dict:
+        """Build the solution dictionary from the origination schedule."""
+        T = self.num_periods
+        balance, _, interest, losses = self._profiles(T)
+        outstanding = convolve_profiles(originations, balance)
+        terminal_value = float(cash[-1] + outstanding[:, -1].sum())
+        totals = originations.sum(axis=1)
+        return {
+            "originations": originations,
+            "cash": cash,
+            "outstanding": outstanding,
+            "interest_income": convolve_profiles(originations, interest).sum(axis=0),
+            "default_losses": convolve_profiles(originations, losses).sum(axis=0),
+            "allocations": {t: float(v) for t, v in zip(self.loan_types, totals)},
+            "total_allocated": float(totals.sum()),
+            "terminal_value": terminal_value,
+            "net_return": terminal_value - self.total_funds
+            - float(self.deposits.sum() - self.liabilities.sum()),
+        }
+
+    def _extract_solution(self, x: np.ndarray, objective: float) -> Dict:
+        """Build the solution dictionary from the full-horizon LP."""
+        K, T = len(self.loan_types), self.num_periods
+        originations = np.maximum(x[:K * T].reshape(K, T), 0.0)
+        return self._schedule_solution(originations, x[K * T:])
+
+    def _solve(self) -> Dict:
+        """Solve the full LP, or a rolling sequence of window LPs.
+
+        The rolling horizon solves ``window`` months at a time, commits the
+        originations of the first ``step`` months, and carries their future
+        cash flows and balances into the next window as constants.
+
+        Returns:
+            Dictionary containing solution details
+        """
+        if self.method == "full" or self._has_user_model():
+            return super()._solve()
+
+        K, T = len(self.loan_types), self.num_periods
+        backend = self.backend or get_default_backend()
+        balance, cash_profile, _, _ = self._profiles(T)
+        originations = np.zeros((K, T))
+        cash = np.zeros(T)
+        legacy_cash = np.zeros(T)
+        legacy_balance = np.zeros((K, T))
+        self._mark_compiled()
+
+        start = 0
+        while start < T:
+            length = min(self.window, T - start)
+            commit = length if start + length == T else min(self.step, length)
+            self.program = self._compile_window(start, length,
+                                                cash[start - 1] if start else 0.0,
+                                                legacy_cash, legacy_balance)
+            result = self.program.solve(backend)
+            if result["status"] != "Optimal":
+                self.solution = self._failure_solution(result["status"])
+                return self.solution
+
+            x = np.maximum(result["x"][:K * length].reshape(K, length)[:, :commit], 0.0)
+            originations[:, start:start + commit] = x
+            cash[start:start + commit] = result["x"][K * length:K * length + commit]
+            # Committed cohorts become known cash flows and balances
+            for s in range(commit):
+                t = start + s
+                legacy_cash[t:] += cash_profile[:, :T - t].T @ x[:, s]
+                legacy_balance[:, t:] += balance[:, :T - t] * x[:, s:s + 1]
+            start += commit
+
+        self.solution = {"status": "Optimal"}
+        self.solution.update(self._schedule_solution(originations, cash))
+        self.solution["model"] = None
+        self.solution["program"] = self.program
+        return self.solution
+
+    def solve_batch(self, param_arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Not available for the multi-period model."""
+        raise NotImplementedError("solve_batch is not available for the multi-period model")
+
+    def parametric_total_funds(self, lo: float, hi: float) -> Dict:
+        """Not available for the multi-period model."""
+        raise NotImplementedError("Parametric analysis is not available for the "
+                                  "multi-period model")
+
+    def bad_debt_frontier(self, lo: Optional[float] = None, hi: Optional[float] = None,
+                          rule: str = "Bad_Debt_Limit") -> Dict:
+        """Not available for the multi-period model."""
+        raise NotImplementedError("The frontier is not available for the multi-period model")
+
+    def print_summary(self):
+        """Print a formatted summary of the solution."""
+        if self.solution is None:
+            print("No solution available. Run solve() first.")
+            return
+
+        print("=" * 60)
+        print("MULTI-PERIOD LOAN PLANNING RESULTS")
+        print("=" * 60)
+        print(f"\nStatus: {self.solution['status']}")
+
+        if self.solution['status'] == "Optimal":
+            print(f"\nPeriods: {self.num_periods} months ({self.method})")
+            print(f"Initial Funds: ${self.total_funds:,.2f}")
+            print(f"Terminal Value: ${self.solution['terminal_value']:,.2f}")
+            print(f"Interest Income: ${self.solution['interest_income'].sum():,.2f}")
+            print(f"Default Losses: ${self.solution['default_losses'].sum():,.2f}")
+
+            print("\n" + "-" * 60)
+            print(f"{'Loan Type':<15} {'Originated':>18} {'Outstanding (end)':>20}")
+            print("-" * 60)
+            for k, loan_type in enumerate(self.loan_types):
+                print(f"{loan_type:<15} ${self.solution['originations'][k].sum():>17,.2f} "
+                      f"${self.solution['outstanding'][k, -1]:>19,.2f}")
+            print("=" * 60)
+        else:
+            print(f"\nError: {self.solution.get('error', 'Unknown error')}")
@@ -2,18 +2,52 @@
 
 This module implements a linear programming model for optimizing
 crude oil refining operations and gasoline blending.
+
+The blend is described by data: a component-property matrix (one row per
+blending component, one column per quality such as octane, RVP, sulfur or
+benzene) and product spec matrices of minimum and maximum qualities. For
+qualities that blend linearly by volume, each finite spec becomes one row
+
+    sum((spec[p, q] - property[c, q]) * x[c, p] for c) <= 0
+
+(reversed for maxima), and all of them are generated in one vectorized
+step. The quality rows are cached, so changing capacities, demands or
+margins reuses them, and a property or spec change only rebuilds them.
+
+Instead of fixed crude-to-component ratios, the refinery may choose a crude
+slate from an assay library (see utils.assays). Each candidate crude gets a
+volume variable; its yields bound the components available for blending,
+and the crude capacity limits the slate volume. The yield rows are cached
+per slate, so re-planning with a new price deck only patches the objective.
 """
 
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Sequence, Tuple
 import numpy as np
-from pulp import LpMaximize, LpProblem, LpVariable, lpSum, LpStatus, value
+from scipy import sparse
+from pulp import LpVariable
+
+from .base import LPOptimizer
+from .compiler import LinearProgram, coo_rows
+from ..utils.assays import AssayLibrary
+from ..utils.batch_lp import solve_lp_batch, stack_parameters, status_names
+
+
+# Gasoline grades produced by the refinery, in variable order
+PRODUCTS = ["regular", "premium", "super"]
 
+# Blending components of the default refinery: straight-run feedstock and
+# cracker output, which use 5 and 10 barrels of crude per barrel and 0 and
+# 2 units of cracker capacity
+COMPONENTS = ["feedstock", "cracker"]
+DEFAULT_CRUDE_USAGE = [5.0, 10.0]
+DEFAULT_CRACKER_USAGE = [0.0, 2.0]
 
-class OilRefiningOptimizer:
+
+class OilRefiningOptimizer(LPOptimizer):
     """Optimize crude oil refining and gasoline blending operations.
 
     This class implements an LP model to maximize profit from refining
-    crude oil into different gasoline products with octane constraints.
+    crude oil into different gasoline products with quality constraints.
 
     Attributes:
         crude_capacity (float): Crude oil processing capacity (bbl/day)
@@ -21,8 +55,54 @@ class OilRefiningOptimizer:
         octane_numbers (Dict): Octane numbers for feedstock and cracker output
         demand_limits (Dict): Demand limits for each gasoline type
         profit_margins (Dict): Profit per barrel for each gasoline type
+        components (List[str]): Blending components
+        products (List[str]): Blended products
+        qualities (List[str]): Blended qualities
+        properties (Optional[np.ndarray]): Component properties, shape (C, Q);
+            None derives octane from ``octane_numbers``
+        spec_min (Optional[np.ndarray]): Minimum product qualities, shape
+            (P, Q), NaN where there is no minimum
+        spec_max (Optional[np.ndarray]): Maximum product qualities, shape
+            (P, Q), NaN where there is no maximum
+        crude_usage (np.ndarray): Crude used per barrel of each component
+        cracker_usage (np.ndarray): Cracker capacity used per barrel of
+            each component
+        component_supply (np.ndarray): Barrels/day available of each component
+        component_costs (np.ndarray): Cost per barrel of each component
+        assays (Optional[AssayLibrary]): Crude assays; when set, the crude
+            slate is chosen from ``crudes``
+        crudes (List[str]): Candidate crude IDs
+        crude_prices (np.ndarray): Price per barrel of each candidate crude
+        crude_availability (np.ndarray): Barrels/day available of each crude
+        slate_min (Optional[Dict]): Minimum slate-average crude qualities
+        slate_max (Optional[Dict]): Maximum slate-average crude qualities
+        backend (Optional[str]): Solver backend, None for the global default
     """
 
+    PARAMETERS = {
+        "crude_capacity": "patch",
+        "cracker_capacity": "patch",
+        "octane_numbers": "patch",
+        "demand_limits": "patch",
+        "profit_margins": "patch",
+        "components": "rebuild",
+        "products": "rebuild",
+        "qualities": "rebuild",
+        "properties": "patch",
+        "spec_min": "patch",
+        "spec_max": "patch",
+        "crude_usage": "patch",
+        "cracker_usage": "patch",
+        "component_supply": "patch",
+        "component_costs": "patch",
+        "assays": "rebuild",
+        "crudes": "rebuild",
+        "crude_prices": "patch",
+        "crude_availability": "patch",
+        "slate_min": "patch",
+        "slate_max": "patch",
+    }
+
     def __init__(
         self,
         crude_capacity: float = 1_500_000,
@@ -30,15 +110,68 @@ class OilRefiningOptimizer:
         octane_numbers: Optional[Dict] = None,
         demand_limits: Optional[Dict] = None,
         profit_margins: Optional[Dict] = None,
+        components: Optional[List[str]] = None,
+        products: Optional[List[str]] = None,
+        qualities: Optional[List[str]] = None,
+        properties: Optional[np.ndarray] = None,
+        spec_min: Optional[np.ndarray] = None,
+        spec_max: Optional[np.ndarray] = None,
+        crude_usage: Optional[Sequence[float]] = None,
+        cracker_usage: Optional[Sequence[float]] = None,
+        component_supply: Optional[Sequence[float]] = None,
+        component_costs: Optional[Sequence[float]] = None,
+        assays: Optional[AssayLibrary] = None,
+        crudes: Optional[Sequence[str]] = None,
+        crude_prices=None,
+        crude_availability=None,
+        slate_min: Optional[Dict[str, float]] = None,
+        slate_max: Optional[Dict[str, float]] = None,
+        backend: Optional[str] = None,
     ):
         """Initialize the Oil Refining Optimizer.
 
         Args:
             crude_capacity: Crude oil processing capacity (barrels/day)
             cracker_capacity: Cracker unit capacity (barrels/day)
-            octane_numbers: Octane numbers for feedstock and cracker
-            demand_limits: Maximum demand for each gasoline type
-            profit_margins: Profit per barrel for each gasoline type
+            octane_numbers: Octane numbers for feedstock and cracker, and
+                the minimum octane of each product
+            demand_limits: Maximum demand for each gasoline type, as a
+                dictionary or one value per product
+            profit_margins: Profit per barrel for each gasoline type, as a
+                dictionary or one value per product
+            components: Blending component names; defaults to feedstock
+                and cracker output
+            products: Product names; defaults to PRODUCTS
+            qualities: Quality names, one per column of ``properties``;
+                defaults to ["octane"]
+            properties: Component properties, shape (C, Q). Defaults to
+                the feedstock and cracker octane of ``octane_numbers``
+            spec_min: Minimum product qualities, shape (P, Q), NaN for
+                none. Defaults to the product octane of ``octane_numbers``
+            spec_max: Maximum product qualities, shape (P, Q), NaN for none
+            crude_usage: Crude per barrel of each component (default 5 and
+                10 for the default components, 0 otherwise)
+            cracker_usage: Cracker capacity per barrel of each component
+                (default 0 and 2 for the default components, 0 otherwise)
+            component_supply: Barrels/day available of each component
+                (default unlimited)
+            component_costs: Cost per barrel of each component (default 0)
+            assays: Crude assay library. When given, the crude slate is a
+                decision: components are limited by the yields of the
+                crudes run, ``crude_capacity`` limits the slate volume and
+                ``crude_usage`` is not used
+            crudes: Candidate crude IDs (default every crude in ``assays``)
+            crude_prices: Price per barrel of each candidate crude, as a
+                dictionary by crude ID or one value per crude (default 0)
+            crude_availability: Barrels/day available of each candidate
+                crude, as a dictionary, sequence or one value for all
+                (default unlimited)
+            slate_min: Minimum slate-average value of assay qualities, e.g.
+                ``{"api": 30}``
+            slate_max: Maximum slate-average value of assay qualities, e.g.
+                ``{"sulfur": 1.2}``
+            backend: Solver backend name (see solver_utils.SOLVER_BACKENDS);
+                None uses the global default
         """
         self.crude_capacity = crude_capacity
         self.cracker_capacity = cracker_capacity
@@ -53,163 +186,400 @@ class OilRefiningOptimizer:
         }
 
         # Default demand limits (barrels/day)
-        self.demand_limits = demand_limits or {
+        self.demand_limits = demand_limits if demand_limits is not None else {
             "regular": 50_000,
             "premium": 30_000,
             "super": 40_000,
         }
 
         # Default profit margins ($/barrel)
-        self.profit_margins = profit_margins or {
+        self.profit_margins = profit_margins if profit_margins is not None else {
             "regular": 6.70,
             "premium": 7.20,
             "super": 8.10,
         }
 
+        self.components = list(components or COMPONENTS)
+        self.products = list(products or PRODUCTS)
+        if not qualities and properties is not None:
+            qualities = [f"quality_{q}" for q in range(np.shape(properties)[1])]
+        self.qualities = list(qualities or ["octane"])
+        self.properties = properties
+        self.spec_min = spec_min
+        self.spec_max = spec_max
+        default = components is None
+        self.crude_usage = crude_usage if crude_usage is not None else (
+            DEFAULT_CRUDE_USAGE if default else np.zeros(len(self.components)))
+        self.cracker_usage = cracker_usage if cracker_usage is not None else (
+            DEFAULT_CRACKER_USAGE if default else np.zeros(len(self.components)))
+        self.component_supply = component_supply
+        self.component_costs = component_costs
+        self.assays = assays
+        self.crudes = list(crudes) if crudes is not None else (
+            list(assays.crude_ids) if assays is not None else [])
+        self.crude_prices = crude_prices
+        self.crude_availability = crude_availability
+        self.slate_min = slate_min
+        self.slate_max = slate_max
+
+        self.backend = backend
+
         self.model = None
+        self.program = None
         self.variables = None
+        self.crude_vars = None
         self.solution = None
-
-    def build_model(self) -> LpProblem:
-        """Build the linear programming model.
+        self._blocks = {}
+
+    def _per_product(self, values, name: str) -> np.ndarray:
+        """A product-indexed parameter (dictionary or sequence) as an array."""
+        if isinstance(values, dict):
+            missing = [p for p in self.products if p not in values]
+            if missing:
+                raise ValueError(f"{name} has no value for products {missing}")
+            values = [values[p] for p in self.products]
+        array = np.asarray(values, dtype=float)
+        if array.shape != (len(self.products),):
+            raise ValueError(f"{name} needs one value per product ({len(self.products)})")
+        return array
+
+    def _per_component(self, values, default: float, name: str) -> np.ndarray:
+        """A component-indexed parameter as an array, ``default`` when None."""
+        C = len(self.components)
+        array = np.full(C, default) if values is None else np.asarray(values, dtype=float)
+        if array.shape != (C,):
+            raise ValueError(f"{name} needs one value per component ({C})")
+        return array
+
+    def _per_crude(self, values, default: float, name: str) -> np.ndarray:
+        """A crude-indexed parameter (dictionary, sequence or scalar) as an array."""
+        K = len(self.crudes)
+        if values is None:
+            return np.full(K, default)
+        if isinstance(values, dict):
+            missing = [crude for crude in self.crudes if crude not in values]
+            if missing:
+                raise ValueError(f"{name} has no value for crudes {missing}")
+            values = [values[crude] for crude in self.crudes]
+        array = np.asarray(values, dtype=float)
+        if array.shape not in ((), (K,)):
+            raise ValueError(f"{name} needs one value per crude ({K})")
+        return np.broadcast_to(array, (K,))
+
+    def _slate_block(self) -> Tuple[sparse.csr_matrix, sparse.csr_matrix, List[str]]:
+        """Crude columns of the capacity rows and the yield rows of the slate.
+
+        For every component the assays produce, the yield row is
+        ``sum(x[c, :]) - sum(yields[k, c] * z[k] for k) <= 0``. Both blocks
+        depend only on the slate and the components, so they are cached.
+        """
+        C, P, K = len(self.components), len(self.products), len(self.crudes)
+        rows = self.assays.index(self.crudes)
+        produced = np.array([c for c, component in enumerate(self.components)
+                             if component in self.assays.components], dtype=np.int64)
+
+        def build():
+            yields, _ = self.assays.select(self.crudes, [self.components[c] for c in produced])
+            R = len(produced)
+            blend_cols = produced[:, np.newaxis] * P + np.arange(P)
+            matrix = sparse.hstack([
+                coo_rows(np.repeat(np.arange(R), P), blend_cols, 1.0, (R, C * P)),
+                sparse.csr_matrix(-yields.T),
+            ], format="csr")
+            capacity = sparse.csr_matrix(np.vstack([np.ones(K), np.zeros(K)]))
+            return capacity, matrix
+
+        capacity, matrix = self._cached_block(
+            "slate", [rows, self.assays.yields[rows], produced, np.array([C, P])], build)
+        return capacity, matrix, [f"Yield_{self.components[c]}" for c in produced]
+
+    def _slate_quality_rows(self) -> Tuple[sparse.csr_matrix, np.ndarray, List[str]]:
+        """Rows bounding slate-average crude qualities, over the crude columns.
+
+        A maximum ``v`` on quality q is ``sum((property[k, q] - v) * z[k]) <= 0``
+        and a minimum is the same row reversed.
+        """
+        _, properties = self.assays.select(self.crudes)
+        rows, names = [], []
+        for sign, specs, label in ((-1.0, self.slate_min, "Min"), (1.0, self.slate_max, "Max")):
+            for quality, limit in (specs or {}).items():
+                if quality not in self.assays.qualities:
+                    raise ValueError(f"Unknown assay quality '{quality}'")
+                column = properties[:, self.assays.qualities.index(quality)]
+                rows.append(sign * (column - limit))
+                names.append(f"Slate_{quality.capitalize()}_{label}")
+        matrix = (np.vstack(rows) if rows else np.zeros((0, len(self.crudes))))
+        return sparse.csr_matrix(matrix), np.zeros(len(rows)), names
+
+    def _quality_matrices(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Component properties (C, Q) and minimum and maximum specs (P, Q)."""
+        C, P, Q = len(self.components), len(self.products), len(self.qualities)
+        octane = self.qualities.index("octane") if "octane" in self.qualities else None
+
+        if self.properties is not None:
+            properties = np.asarray(self.properties, dtype=float)
+        elif octane is not None and all(c in self.octane_numbers for c in self.components):
+            properties = np.zeros((C, Q))
+            properties[:, octane] = [self.octane_numbers[c] for c in self.components]
+        else:
+            raise ValueError("properties are required for components without octane_numbers")
+
+        def spec(values, default):
+            if values is not None:
+                return np.asarray(values, dtype=float)
+            matrix = np.full((P, Q), np.nan)
+            if default and octane is not None:
+                matrix[:, octane] = [self.octane_numbers.get(p, np.nan) for p in self.products]
+            return matrix
+
+        low, high = spec(self.spec_min, True), spec(self.spec_max, False)
+        if properties.shape != (C, Q) or not np.isfinite(properties).all():
+            raise ValueError(f"properties must be a finite ({C}, {Q}) matrix")
+        if low.shape != (P, Q) or high.shape != (P, Q):
+            raise ValueError(f"Product specs must have shape ({P}, {Q})")
+        return properties, low, high
+
+    def _cached_block(self, name: str, inputs: Sequence[np.ndarray], build: Callable):
+        """Return a compiled block, rebuilding it only when its inputs change."""
+        signature = [(np.shape(a), np.asarray(a, dtype=float).tobytes()) for a in inputs]
+        cached = self._blocks.get(name)
+        if cached is None or cached[0] != signature:
+            cached = (signature, build())
+            self._blocks[name] = cached
+        return cached[1]
+
+    def _quality_block(self, properties: np.ndarray, low: np.ndarray,
+                       high: np.ndarray) -> Tuple[sparse.csr_matrix, List[str]]:
+        """Quality rows for every finite spec, built in one vectorized step.
+
+        Minimum rows come first, then maximum rows, each in product-major
+        order. Variable ``x[c, p]`` is column ``c * P + p``.
+        """
+        C, P = len(self.components), len(self.products)
+        # coefficients[k, p, q, c]: k = 0 for minima, 1 for maxima
+        coefficients = np.stack([
+            low[:, :, np.newaxis] - properties.T[np.newaxis],
+            properties.T[np.newaxis] - high[:, :, np.newaxis],
+        ])
+        kind, product, quality = np.nonzero(np.isfinite(np.stack([low, high])))
+        R = len(kind)
+        rows = coefficients[kind, product, quality]
+        cols = np.arange(C)[np.newaxis] * P + product[:, np.newaxis]
+        matrix = coo_rows(np.repeat(np.arange(R), C), cols, rows.ravel(), (R, C * P))
+
+        qualities = [q.capitalize() for q in self.qualities]
+        names = [f"{qualities[q]}_{'Max_' if k else ''}{self.products[p].capitalize()}"
+                 for k, p, q in zip(kind, product, quality)]
+        return matrix, names
+
+    def compile_model(self) -> LinearProgram:
+        """Compile the model into sparse matrix form.
+
+        Variables ``x[c, p]`` (barrels of component c in product p) are
+        ordered component-major, so the default model has
+        [feedstock x products, cracker x products]. Quality rows are
+        generated from ``properties`` and the spec matrices, so custom
+        octane ratings are honoured. With an assay library, one crude volume
+        variable per candidate crude follows the blend variables, and the
+        yield and slate quality rows follow the blend quality rows.
 
         Returns:
-            LpProblem: The constructed LP model
+            LinearProgram: The compiled LP model
         """
-        # Create the model
-        self.model = LpProblem("Oil_Refining_Optimization", LpMaximize)
-
-        # Decision variables: amount of each source for each product
-        # x[source][product] where source in {feedstock, cracker}
-        # product in {regular, premium, super}
-
-        self.variables = {
-            "feedstock": {
-                "regular": LpVariable("x_feed_regular", lowBound=0),
-                "premium": LpVariable("x_feed_premium", lowBound=0),
-                "super": LpVariable("x_feed_super", lowBound=0),
-            },
-            "cracker": {
-                "regular": LpVariable("x_crack_regular", lowBound=0),
-                "premium": LpVariable("x_crack_premium", lowBound=0),
-                "super": LpVariable("x_crack_super", lowBound=0),
-            }
-        }
+        components, products = self.components, self.products
+        C, P = len(components), len(products)
 
         # Objective function: maximize total profit
-        total_profit = lpSum([
-            self.profit_margins[product] * (
-                self.variables["feedstock"][product] +
-                self.variables["cracker"][product]
-            )
-            for product in ["regular", "premium", "super"]
-        ])
-
-        self.model += total_profit, "Total_Profit"
-
-        # Constraint 1: Crude oil capacity
-        # Feedstock uses crude at 5:1 ratio, cracker at 10:1
-        total_feedstock = lpSum([
-            self.variables["feedstock"][p]
-            for p in ["regular", "premium", "super"]
+        margins = self._per_product(self.profit_margins, "profit_margins")
+        costs = self._per_component(self.component_costs, 0.0, "component_costs")
+        c = (margins[np.newaxis] - costs[:, np.newaxis]).ravel()
+
+        # Constraints 1 and 2: crude oil and cracker unit capacity
+        crude = self._per_component(self.crude_usage, 0.0, "crude_usage")
+        cracker = self._per_component(self.cracker_usage, 0.0, "cracker_usage")
+        capacity_rows = sparse.csr_matrix(np.repeat(np.vstack([crude, cracker]), P, axis=1))
+
+        # Constraint 3: demand limits for each product, sum over components
+        demand_rows = self._cached_block("demand", [np.array([C, P])],
+                                         lambda: sparse.hstack([sparse.identity(P)] * C).tocsr())
+
+        # Constraint 4: component availability, sum over products
+        supply = self._per_component(self.component_supply, np.inf, "component_supply")
+        limited = np.flatnonzero(np.isfinite(supply))
+        supply_rows = coo_rows(np.repeat(np.arange(len(limited)), P),
+                               limited[:, np.newaxis] * P + np.arange(P),
+                               1.0, (len(limited), C * P))
+
+        # Constraint 5: quality specs, e.g. minimum octane
+        # o_feed*x_feed + o_crack*x_crack >= o_product*(x_feed + x_crack)
+        # Rearranged: (o_product - o_feed)*x_feed + (o_product - o_crack)*x_crack <= 0
+        matrices = self._quality_matrices()
+        quality_rows, quality_names = self._cached_block(
+            "quality", matrices, lambda: self._quality_block(*matrices))
+
+        A_ub = sparse.vstack([capacity_rows, demand_rows, supply_rows, quality_rows]).tocsr()
+        b_ub = np.concatenate([
+            [self.crude_capacity, self.cracker_capacity],
+            self._per_product(self.demand_limits, "demand_limits"),
+            supply[limited],
+            np.zeros(quality_rows.shape[0]),
         ])
-
-        total_cracker = lpSum([
-            self.variables["cracker"][p]
-            for p in ["regular", "premium", "super"]
-        ])
-
-        self.model += (
-            5 * total_feedstock + 10 * total_cracker <= self.crude_capacity,
-            "Crude_Capacity"
+        upper = np.full(C * P, np.inf)
+        slate_names = []
+
+        # Constraint 6: the crude slate; crude volumes replace the fixed crude usage
+        if self.assays is not None:
+            K = len(self.crudes)
+            crude_capacity, yield_rows, yield_names = self._slate_block()
+            slate_rows, slate_b, slate_names = self._slate_quality_rows()
+            capacity_rows = sparse.vstack([sparse.csr_matrix((1, C * P)), capacity_rows[1]])
+            A_ub = sparse.vstack([
+                sparse.hstack([capacity_rows, crude_capacity]),
+                sparse.hstack([A_ub[2:], sparse.csr_matrix((A_ub.shape[0] - 2, K))]),
+                yield_rows,
+                sparse.hstack([sparse.csr_matrix((len(slate_names), C * P)), slate_rows]),
+            ], format="csr")
+            b_ub = np.concatenate([b_ub, np.zeros(len(yield_names)), slate_b])
+            c = np.concatenate([c, -self._per_crude(self.crude_prices, 0.0, "crude_prices")])
+            upper = np.concatenate([upper, self._per_crude(self.crude_availability, np.inf,
+                                                           "crude_availability")])
+            slate_names = yield_names + slate_names
+
+        return LinearProgram(
+            c,
+            A_ub=A_ub,
+            b_ub=b_ub,
+            upper=upper,
+            maximize=True,
+            name="Oil_Refining_Optimization",
+            var_names=([f"x_{component}_{product}"
+                        for component in components for product in products]
+                       + [f"crude_{crude}" for crude in self.crudes]),
+            ub_names=(["Crude_Capacity", "Cracker_Capacity"]
+                      + [f"Demand_{p}" for p in products]
+                      + [f"Supply_{components[k]}" for k in limited]
+                      + quality_names + slate_names),
         )
 
-        # Constraint 2: Cracker unit capacity
-        self.model += (
-            2 * total_cracker <= self.cracker_capacity,
-            "Cracker_Capacity"
-        )
+    def _same_layout(self, old: LinearProgram, new: LinearProgram) -> bool:
+        """Specs or supplies that appear or vanish change the rows."""
+        return super()._same_layout(old, new) and old.ub_names == new.ub_names
 
-        # Constraint 3: Demand limits for each product
-        for product in ["regular", "premium", "super"]:
-            self.model += (
-                self.variables["feedstock"][product] +
-                self.variables["cracker"][product] <=
-                self.demand_limits[product],
-                f"Demand_{product}"
+    def _bind_variables(self, variables: List[LpVariable]) -> None:
+        """Expose exported PuLP variables as ``variables[component][product]``."""
+        P = len(self.products)
+        self.variables = {
+            component: dict(zip(self.products, variables[k * P:(k + 1) * P]))
+            for k, component in enumerate(self.components)
+        }
+        self.crude_vars = dict(zip(self.crudes, variables[len(self.components) * P:]))
+
+    def _extract_solution(self, x: np.ndarray, objective: float) -> Dict:
+        """Build the solution dictionary from blend volumes and the crude slate."""
+        C, P = len(self.components), len(self.products)
+        blend = x[:C * P].reshape(C, P)
+        totals = blend.sum(axis=0)
+        production = {
+            product: dict(
+                {component: float(blend[k, i]) for k, component in enumerate(self.components)},
+                total=float(totals[i]),
             )
+            for i, product in enumerate(self.products)
+        }
 
-        # Constraint 4: Octane number requirements
-        # For each product, weighted average octane must meet minimum
-
-        # Regular (87): 82*x_feed + 98*x_crack >= 87*(x_feed + x_crack)
-        # Rearranged: -5*x_feed + 11*x_crack >= 0
-        self.model += (
-            -5 * self.variables["feedstock"]["regular"] +
-            11 * self.variables["cracker"]["regular"] >= 0,
-            "Octane_Regular"
-        )
-
-        # Premium (89): 82*x_feed + 98*x_crack >= 89*(x_feed + x_crack)
-        # Rearranged: -7*x_feed + 9*x_crack >= 0
-        self.model += (
-            -7 * self.variables["feedstock"]["premium"] +
-            9 * self.variables["cracker"]["premium"] >= 0,
-            "Octane_Premium"
-        )
-
-        # Super (92): 82*x_feed + 98*x_crack >= 92*(x_feed + x_crack)
-        # Rearranged: -10*x_feed + 6*x_crack >= 0
-        self.model += (
-            -10 * self.variables["feedstock"]["super"] +
-            6 * self.variables["cracker"]["super"] >= 0,
-            "Octane_Super"
-        )
-
-        return self.model
+        # Volume-weighted qualities of each blend
+        properties, _, _ = self._quality_matrices()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            blended = np.where(totals[:, np.newaxis] > 0,
+                               blend.T @ properties / totals[:, np.newaxis], np.nan)
+
+        solution = {
+            "production": production,
+            "blend": blend,
+            "qualities": {
+                product: dict(zip(self.qualities, blended[i].tolist()))
+                for i, product in enumerate(self.products)
+            },
+            "total_profit": objective,
+            "daily_profit": objective,
+        }
+        if self.assays is not None:
+            volumes = np.maximum(x[C * P:], 0.0)
+            prices = self._per_crude(self.crude_prices, 0.0, "crude_prices")
+            solution["slate"] = {crude: float(v) for crude, v in zip(self.crudes, volumes)
+                                 if v > 1e-9}
+            solution["slate_volumes"] = volumes
+            solution["crude_cost"] = float(prices @ volumes)
+        return solution
+
+    def solve_batch(self, param_arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Solve many variants of the model in one vectorized call.
+
+        The LP is assembled as stacked dense arrays and solved in-process by
+        the batched simplex kernel. Product-indexed parameters are arrays
+        whose columns follow ``products``.
 
-    def solve(self) -> Dict:
-        """Solve the optimization problem.
+        Args:
+            param_arrays: Mapping of parameter name to an array whose leading
+                axis indexes the instances. Supported keys are
+                ``crude_capacity`` (N,), ``cracker_capacity`` (N,),
+                ``demand_limits`` (N, P) and ``profit_margins`` (N, P),
+                plus ``crude_prices`` (N, K) with an assay library.
+                Missing keys use the values this optimizer was created with.
 
         Returns:
-            Dictionary containing solution details
+            Dictionary of arrays with one entry per instance:
+                - ``status``: solution status names, shape (N,)
+                - ``production``: dict with the barrels of each component
+                  and the ``total`` per product, each of shape (N, P)
+                - ``total_profit``: objective values, shape (N,)
+                - ``daily_profit``: same as total_profit
+                - ``slate_volumes``: crude volumes, shape (N, K), with an
+                  assay library
         """
-        if self.model is None:
-            self.build_model()
-
-        # Solve the model
-        self.model.solve()
-
-        # Extract solution
-        status = LpStatus[self.model.status]
-
-        if status == "Optimal":
-            production = {
-                product: {
-                    "feedstock": value(self.variables["feedstock"][product]),
-                    "cracker": value(self.variables["cracker"][product]),
-                    "total": value(self.variables["feedstock"][product]) +
-                            value(self.variables["cracker"][product])
-                }
-                for product in ["regular", "premium", "super"]
-            }
-
-            total_profit = value(self.model.objective)
-
-            self.solution = {
-                "status": status,
-                "production": production,
-                "total_profit": total_profit,
-                "daily_profit": total_profit,
-                "model": self.model,
-            }
-        else:
-            self.solution = {
-                "status": status,
-                "error": "Optimization failed to find optimal solution"
-            }
-
-        return self.solution
+        C, P = len(self.components), len(self.products)
+        defaults = {
+            "crude_capacity": self.crude_capacity,
+            "cracker_capacity": self.cracker_capacity,
+            "demand_limits": self._per_product(self.demand_limits, "demand_limits"),
+            "profit_margins": self._per_product(self.profit_margins, "profit_margins"),
+        }
+        if self.assays is not None:
+            defaults["crude_prices"] = self._per_crude(self.crude_prices, 0.0, "crude_prices")
+        N, params = stack_parameters(param_arrays, defaults)
+
+        # Rows are shared by all instances; objective and capacities vary
+        program = self.compile_model()
+        costs = self._per_component(self.component_costs, 0.0, "component_costs")
+        c = (params["profit_margins"][:, np.newaxis, :]
+             - costs[np.newaxis, :, np.newaxis]).reshape(N, C * P)
+        A_ub = program.A_ub.toarray()
+        b_ub = np.repeat(program.b_ub[np.newaxis], N, axis=0)
+        b_ub[:, 0] = params["crude_capacity"]
+        b_ub[:, 1] = params["cracker_capacity"]
+        b_ub[:, 2:2 + P] = params["demand_limits"]
+        if self.assays is not None:
+            # Crude availability limits become rows for the batched kernel
+            c = np.hstack([c, -params["crude_prices"]])
+            capped = np.flatnonzero(np.isfinite(program.upper))
+            A_ub = np.vstack([A_ub, np.eye(program.num_vars)[capped]])
+            b_ub = np.hstack([b_ub, np.repeat(program.upper[capped][np.newaxis], N, axis=0)])
+
+        result = solve_lp_batch(c, A_ub, b_ub, maximize=True)
+
+        blend = result["x"][:, :C * P].reshape(N, C, P)
+        production = {component: blend[:, k] for k, component in enumerate(self.components)}
+        production["total"] = blend.sum(axis=1)
+
+        solution = {
+            "status": status_names(result["status"]),
+            "production": production,
+            "total_profit": result["objective"],
+            "daily_profit": result["objective"],
+        }
+        if self.assays is not None:
+            solution["slate_volumes"] = result["x"][:, C * P:]
+        return solution
 
     def print_summary(self):
         """Print a formatted summary of the solution."""
@@ -226,36 +596,37 @@ class OilRefiningOptimizer:
             print(f"\nDaily Profit: ${self.solution['daily_profit']:,.2f}")
             print(f"Annual Profit (365 days): ${self.solution['daily_profit'] * 365:,.2f}")
 
+            demand = self._per_product(self.demand_limits, "demand_limits")
             print("\n" + "-" * 80)
             print("Production Schedule (barrels/day):")
             print("-" * 80)
-            print(f"{'Product':<12} {'Feedstock':>12} {'Cracker':>12} {'Total':>12} {'Demand Limit':>15} {'Utilization':>12}")
+            if self.components == COMPONENTS:
+                print(f"{'Product':<12} {'Feedstock':>12} {'Cracker':>12} {'Total':>12} "
+                      f"{'Demand Limit':>15} {'Utilization':>12}")
+            else:
+                print(f"{'Product':<12} {'Total':>12} {'Demand Limit':>15} {'Utilization':>12}")
             print("-" * 80)
 
-            for product in ["regular", "premium", "super"]:
+            for product, limit in zip(self.products, demand):
                 prod_data = self.solution['production'][product]
-                feedstock = prod_data['feedstock']
-                cracker = prod_data['cracker']
                 total = prod_data['total']
-                limit = self.demand_limits[product]
                 utilization = (total / limit * 100) if limit > 0 else 0
 
-                print(f"{product.capitalize():<12} {feedstock:>12.0f} {cracker:>12.0f} "
-                      f"{total:>12.0f} {limit:>15,} {utilization:>11.1f}%")
+                if self.components == COMPONENTS:
+                    print(f"{product.capitalize():<12} {prod_data['feedstock']:>12.0f} "
+                          f"{prod_data['cracker']:>12.0f} "
+                          f"{total:>12.0f} {limit:>15,.0f} {utilization:>11.1f}%")
+                else:
+                    print(f"{product.capitalize():<12} {total:>12.0f} "
+                          f"{limit:>15,.0f} {utilization:>11.1f}%")
 
             # Calculate resource utilization
-            total_feedstock = sum([
-                self.solution['production'][p]['feedstock']
-                for p in ["regular", "premium", "super"]
-            ])
-
-            total_cracker = sum([
-                self.solution['production'][p]['cracker']
-                for p in ["regular", "premium", "super"]
-            ])
-
-            crude_used = 5 * total_feedstock + 10 * total_cracker
-            cracker_used = 2 * total_cracker
+            used = self.solution['blend'].sum(axis=1)
+            if self.assays is not None:
+                crude_used = self.solution['slate_volumes'].sum()
+            else:
+                crude_used = used @ self._per_component(self.crude_usage, 0.0, "crude_usage")
+            cracker_used = used @ self._per_component(self.cracker_usage, 0.0, "cracker_usage")
 
             print("\n" + "-" * 80)
             print("Resource Utilization:")
@@ -265,6 +636,14 @@ class OilRefiningOptimizer:
             print(f"Cracker Unit: {cracker_used:,.0f} / {self.cracker_capacity:,.0f} bbl/day "
                   f"({cracker_used/self.cracker_capacity*100:.1f}%)")
 
+            if self.assays is not None:
+                print("\n" + "-" * 80)
+                print(f"Crude Slate (crude cost ${self.solution['crude_cost']:,.2f}/day):")
+                print("-" * 80)
+                for crude, volume in sorted(self.solution['slate'].items(),
+                                            key=lambda item: -item[1]):
+                    print(f"{crude:<24} {volume:>15,.0f} bbl/day")
+
             print("=" * 80)
         else:
             print(f"\nError: {self.solution.get('error', 'Unknown error')}")
@@ -0,0 +1,482 @@
+"""Refinery Blending with Pooling.
+
+In a real blend shop some components are first run into intermediate tanks
+(pools), and products are blended from pool outflows as well as directly
+from components. The quality of a pool is the volume-weighted quality of
+what went in, and it is a decision too, so the quality balance of a pool
+and the specs of the products it feeds multiply a pool quality by a flow:
+
+    q[l, k] * sum(z[l, :]) = sum(property[c, k] * y[c, l] for c)
+
+The program is bilinear and is solved by successive linear programming
+(see utils.slp): each iteration linearizes the products of pool qualities
+and flows at the current point and solves an LP within a trust region. The
+rows are compiled once; the iterations only rewrite the linearized
+coefficients and warm-start from the previous basis. The result is a local
+optimum.
+"""
+
+from typing import Dict, Optional, Sequence
+import numpy as np
+from scipy import sparse
+
+from .compiler import LinearProgram, coo_rows
+from .oil_refining import OilRefiningOptimizer
+from ..utils.slp import successive_lp
+
+
+class PoolingOptimizer(OilRefiningOptimizer):
+    """Blend products from components and pools of components.
+
+    Variables are the direct blend ``x[c, p]``, pool inflows ``y[c, l]``,
+    pool outflows ``z[l, p]`` and pool qualities ``q[l, k]`` for every
+    quality with a product spec. Components cost the same whether blended
+    directly or through a pool, and every barrel of product earns its
+    margin.
+
+    Attributes:
+        pools (List[str]): Pool (intermediate tank) names
+        pool_capacity (np.ndarray): Barrels/day through each pool
+        pool_inputs (Optional[np.ndarray]): Which components may enter each
+            pool, boolean shape (C, L); None allows all
+        pool_outputs (Optional[np.ndarray]): Which products each pool may
+            feed, boolean shape (L, P); None allows all
+        direct_blending (Optional[np.ndarray]): Which components may be
+            blended into each product without a pool, boolean shape (C, P);
+            None allows all
+        max_iterations (int): Largest number of LPs per start
+        tol (float): Convergence tolerance of the successive LP
+        starts (int): Number of successive-LP starting points
+    """
+
+    PARAMETERS = dict(
+        OilRefiningOptimizer.PARAMETERS,
+        pools="rebuild",
+        pool_capacity="patch",
+        pool_inputs="patch",
+        pool_outputs="patch",
+        direct_blending="patch",
+    )
+
+    def __init__(
+        self,
+        pools: Sequence[str] = ("pool",),
+        pool_capacity=np.inf,
+        pool_inputs: Optional[np.ndarray] = None,
+        pool_outputs: Optional[np.ndarray] = None,
+        direct_blending: Optional[np.ndarray] = None,
+        max_iterations: int = 100,
+        tol: float = 1e-6,
+        starts: int = 2,
+        backend: Optional[str] = None,
+        **blending,
+    ):
+        """Initialize the Pooling Optimizer.
+
+        Args:
+            pools: Pool names
+            pool_capacity: Barrels/day through each pool, scalar or one
+                value per pool (default unlimited)
+            pool_inputs: Boolean (C, L) matrix of the components allowed
+                into each pool (default all)
+            pool_outputs: Boolean (L, P) matrix of the products each pool
+                may feed (default all)
+            direct_blending: Boolean (C, P) matrix of the components that
+                may go straight into each product (default all)
+            max_iterations: Largest number of LPs per start
+            tol: Convergence tolerance on the merit improvement and on the
+                violation of the pool quality balances and specs
+            starts: Number of starting points. Pool qualities start evenly
+                spaced over their range, from the lowest to the highest
+                quality of the components allowed in, and the best local
+                optimum is kept
+            backend: "highs" solves each LP with HiGHS; any other value
+                uses the warm-started dense simplex kernel
+            **blending: Capacities, demands, margins, components, products,
+                qualities, properties, specs, usages, supplies and costs as
+                for OilRefiningOptimizer
+        """
+        if max_iterations < 1 or starts < 1:
+            raise ValueError("max_iterations and starts must be at least 1")
+        self.pools = list(pools)
+        super().__init__(backend=backend, **blending)
+        if self.assays is not None:
+            raise ValueError("Crude slate selection is not available in the pooling model")
+        self.pool_capacity = pool_capacity
+        self.pool_inputs = pool_inputs
+        self.pool_outputs = pool_outputs
+        self.direct_blending = direct_blending
+        self.max_iterations = max_iterations
+        self.tol = tol
+        self.starts = starts
+
+    def _allowed(self, values, shape, name: str) -> np.ndarray:
+        """A boolean connection matrix, all True when None."""
+        if values is None:
+            return np.ones(shape, dtype=bool)
+        array = np.asarray(values, dtype=bool)
+        if array.shape != shape:
+            raise ValueError(f"{name} must have shape {shape}, got {array.shape}")
+        return array
+
+    def _pool_layout(self):
+        """Connection matrices, pool capacities and the spec'd qualities."""
+        C, P, L = len(self.components), len(self.products), len(self.pools)
+        if np.shape(self.pool_capacity) not in ((), (L,)):
+            raise ValueError(f"pool_capacity needs one value per pool ({L})")
+        capacity = np.broadcast_to(np.asarray(self.pool_capacity, dtype=float), (L,))
+        inputs = self._allowed(self.pool_inputs, (C, L), "pool_inputs")
+        outputs = self._allowed(self.pool_outputs, (L, P), "pool_outputs")
+        direct = self._allowed(self.direct_blending, (C, P), "direct_blending")
+        _, low, high = self._quality_matrices()
+        specified = np.flatnonzero((np.isfinite(low) | np.isfinite(high)).any(axis=0))
+        return capacity, inputs, outputs, direct, specified
+
+    def compile_model(self) -> LinearProgram:
+        """Compile the linear part of the pooling program.
+
+        Columns are ``x[c, p]`` (component-major), then ``y[c, l]``,
+        ``z[l, p]`` and ``q[l, k]`` for the spec'd qualities. The pool
+        quality balances and the spec rows carry bilinear terms in ``q``
+        and ``z``, which ``_bilinear_terms()`` lists; this program holds
+        their linear coefficients only.
+
+        Returns:
+            LinearProgram: The linear rows, objective and bounds
+        """
+        components, products, pools = self.components, self.products, self.pools
+        C, P, L = len(components), len(products), len(pools)
+        capacity, inputs, outputs, direct, specified = self._pool_layout()
+        K = len(specified)
+        CP, CL, LP = C * P, C * L, L * P
+        n = CP + CL + LP + L * K
+
+        margins = self._per_product(self.profit_margins, "profit_margins")
+        costs = self._per_component(self.component_costs, 0.0, "component_costs")
+        c = np.concatenate([
+            (margins[np.newaxis] - costs[:, np.newaxis]).ravel(),
+            np.repeat(-costs, L),
+            np.tile(margins, L),
+            np.zeros(L * K),
+        ])
+
+        # A component's usage counts whether it is blended directly or pooled
+        crude = self._per_component(self.crude_usage, 0.0, "crude_usage")
+        cracker = self._per_component(self.cracker_usage, 0.0, "cracker_usage")
+        usage = np.vstack([crude, cracker])
+        capacity_rows = sparse.hstack([
+            sparse.csr_matrix(np.repeat(usage, P, axis=1)),
+            sparse.csr_matrix(np.repeat(usage, L, axis=1)),
+            sparse.csr_matrix((2, LP + L * K)),
+        ])
+
+        demand_rows = sparse.hstack([
+            sparse.hstack([sparse.identity(P)] * C),
+            sparse.csr_matrix((P, CL)),
+            sparse.hstack([sparse.identity(P)] * L),
+            sparse.csr_matrix((P, L * K)),
+        ])
+
+        supply = self._per_component(self.component_supply, np.inf, "component_supply")
+        limited = np.flatnonzero(np.isfinite(supply))
+        supply_rows = sparse.hstack([
+            coo_rows(np.repeat(np.arange(len(limited)), P),
+                     limited[:, np.newaxis] * P + np.arange(P), 1.0, (len(limited), CP)),
+            coo_rows(np.repeat(np.arange(len(limited)), L),
+                     limited[:, np.newaxis] * L + np.arange(L), 1.0, (len(limited), CL)),
+            sparse.csr_matrix((len(limited), LP + L * K)),
+        ])
+
+        bounded = np.flatnonzero(np.isfinite(capacity))
+        pool_rows = coo_rows(np.repeat(np.arange(len(bounded)), C),
+                             CP + np.arange(C)[np.newaxis] * L + bounded[:, np.newaxis],
+                             1.0, (len(bounded), n))
+
+        # Spec rows: the direct blend as in the base model, plus each pool
+        # outflow at (spec - q) for minima and (q - spec) for maxima
+        properties, low, high = self._quality_matrices()
+        quality_rows, quality_names = self._cached_block(
+            "quality", (properties, low, high),
+            lambda: self._quality_block(properties, low, high))
+        kind, product, quality = np.nonzero(np.isfinite(np.stack([low, high])))
+        spec = np.where(kind == 0, low[product, quality], -high[product, quality])
+        R = len(kind)
+        spec_rows = sparse.hstack([
+            quality_rows,
+            sparse.csr_matrix((R, CL)),
+            coo_rows(np.repeat(np.arange(R), L),
+                     np.arange(L)[np.newaxis] * P + product[:, np.newaxis],
+                     np.repeat(spec, L), (R, LP)),
+            sparse.csr_matrix((R, L * K)),
+        ])
+
+        A_ub = sparse.vstack([capacity_rows, demand_rows, supply_rows, pool_rows,
+                              spec_rows]).tocsr()
+        b_ub = np.concatenate([
+            [self.crude_capacity, self.cracker_capacity],
+            self._per_product(self.demand_limits, "demand_limits"),
+            supply[limited],
+            capacity[bounded],
+            np.zeros(R),
+        ])
+
+        # Pool balances, then pool quality balances (pool-major)
+        balance_rows = sparse.hstack([
+            sparse.csr_matrix((L, CP)),
+            sparse.hstack([sparse.identity(L)] * C),
+            -sparse.kron(sparse.identity(L), np.ones((1, P))),
+            sparse.csr_matrix((L, L * K)),
+        ])
+        blend_rows = sparse.hstack([
+            sparse.csr_matrix((L * K, CP)),
+            sparse.kron(properties[:, specified].T, sparse.identity(L)),
+            sparse.csr_matrix((L * K, LP + L * K)),
+        ])
+        # kron above orders rows quality-major; reorder them pool-major
+        order = (np.arange(K)[np.newaxis] * L + np.arange(L)[:, np.newaxis]).ravel()
+        A_eq = sparse.vstack([balance_rows, blend_rows.tocsr()[order]]).tocsr()
+        b_eq = np.zeros(L + L * K)
+
+        # Closed connections are fixed at zero. Pool flows are bounded by
+        # the pool and the product demand, and pool qualities by the
+        # qualities of the components allowed in
+        demand = self._per_product(self.demand_limits, "demand_limits")
+        flow_cap = np.minimum(capacity[:, np.newaxis], demand[np.newaxis])
+        if not np.isfinite(flow_cap[outputs]).all():
+            raise ValueError("Pool outflows need a finite pool_capacity or demand limit")
+        lower = np.zeros(n)
+        upper = np.concatenate([
+            np.where(direct, np.inf, 0.0).ravel(),
+            np.where(inputs, capacity[np.newaxis], 0.0).ravel(),
+            np.where(outputs, flow_cap, 0.0).ravel(),
+            np.zeros(L * K),
+        ])
+        for j in range(L):
+            feeds = properties[inputs[:, j]][:, specified]
+            if len(feeds):
+                lower[CP + CL + LP + j * K:CP + CL + LP + (j + 1) * K] = feeds.min(axis=0)
+                upper[CP + CL + LP + j * K:CP + CL + LP + (j + 1) * K] = feeds.max(axis=0)
+
+        names = [q.capitalize() for q in self.qualities]
+        return LinearProgram(
+            c,
+            A_ub=A_ub,
+            b_ub=b_ub,
+            A_eq=A_eq,
+            b_eq=b_eq,
+            lower=lower,
+            upper=upper,
+            maximize=True,
+            name="Pooling_Optimization",
+            var_names=lambda: (
+                [f"x_{comp}_{prod}" for comp in components for prod in products]
+                + [f"y_{comp}_{pool}" for comp in components for pool in pools]
+                + [f"z_{pool}_{prod}" for pool in pools for prod in products]
+                + [f"q_{pool}_{self.qualities[k]}" for pool in pools for k in specified]),
+            ub_names=lambda: (
+                ["Crude_Capacity", "Cracker_Capacity"]
+                + [f"Demand_{p}" for p in products]
+                + [f"Supply_{components[k]}" for k in limited]
+                + [f"Pool_Capacity_{pools[j]}" for j in bounded]
+                + quality_names),
+            eq_names=lambda: (
+                [f"Pool_Balance_{pool}" for pool in pools]
+                + [f"Pool_{names[k]}_{pool}" for pool in pools for k in specified]),
+        )
+
+    def _bilinear_terms(self):
+        """Bilinear terms ``w * q[l, k] * z[l, p]`` of the spec and pool quality rows.
+
+        Returns:
+            Tuple of the inequality and equality terms, each as arrays
+            ``(rows, q columns, z columns, w)`` for utils.slp
+        """
+        C, P, L = len(self.components), len(self.products), len(self.pools)
+        capacity, _, _, _, specified = self._pool_layout()
+        _, low, high = self._quality_matrices()
+        K = len(specified)
+        z0 = C * P + C * L
+        q0 = z0 + L * P
+        position = np.full(len(self.qualities), -1)
+        position[specified] = np.arange(K)
+
+        # Spec rows follow the capacity, demand, supply and pool rows
+        supply = self._per_component(self.component_supply, np.inf, "component_supply")
+        first = 2 + P + int(np.isfinite(supply).sum()) + int(np.isfinite(capacity).sum())
+        kind, product, quality = np.nonzero(np.isfinite(np.stack([low, high])))
+        R, pool = len(kind), np.arange(L)
+        ub_terms = (
+            np.repeat(first + np.arange(R), L),
+            (q0 + pool[np.newaxis] * K + position[quality][:, np.newaxis]).ravel(),
+            (z0 + pool[np.newaxis] * P + product[:, np.newaxis]).ravel(),
+            np.repeat(np.where(kind == 0, -1.0, 1.0), L),
+        )
+
+        # Pool quality rows: - sum(q[l, k] * z[l, p] for p)
+        l, k, p = np.meshgrid(pool, np.arange(K), np.arange(P), indexing="ij")
+        eq_terms = (
+            (L + l * K + k).ravel(),
+            (q0 + l * K + k).ravel(),
+            (z0 + l * P + p).ravel(),
+            -np.ones(l.size),
+        )
+        return ub_terms, eq_terms
+
+    def _starting_point(self, program: LinearProgram, fraction: float) -> np.ndarray:
+        """Pool outflows shared evenly, pool qualities ``fraction`` of the way up their range.
+
+        Starting from empty pools would give the pool qualities no weight in
+        the first linearization.
+        """
+        C, P, L = len(self.components), len(self.products), len(self.pools)
+        z0, q0 = C * P + C * L, C * P + C * L + L * P
+        x0 = np.zeros(program.num_vars)
+        x0[z0:q0] = program.upper[z0:q0] / L
+        x0[q0:] = program.lower[q0:] + fraction * (program.upper[q0:] - program.lower[q0:])
+        return x0
+
+    def _pool_qualities(self, x: np.ndarray) -> np.ndarray:
+        """Set every pool quality to the blend of its inflows.
+
+        The pool quality balances then hold exactly and only the specs can
+        be violated; the qualities of empty pools are left as they are.
+        """
+        C, P, L = len(self.components), len(self.products), len(self.pools)
+        properties, _, _ = self._quality_matrices()
+        specified = self._pool_layout()[4]
+        q0 = C * P + C * L + L * P
+        inflow = np.maximum(x[C * P:C * P + C * L].reshape(C, L), 0.0)
+        volume = inflow.sum(axis=0)
+        q = x[q0:].reshape(L, len(specified))
+        filled = volume > 1e-9 * max(1.0, volume.max(initial=0.0))
+        q[filled] = (inflow[:, filled].T @ properties[:, specified]) / volume[filled, np.newaxis]
+        x[q0:] = np.clip(q.ravel(), self.program.lower[q0:], self.program.upper[q0:])
+        return x
+
+    def _cache_options(self) -> Dict:
+        """The successive LP settings also determine the solution."""
+        return dict(super()._cache_options(), max_iterations=self.max_iterations,
+                    tol=self.tol, starts=self.starts)
+
+    def build_model(self):
+        """Not available: the pooling program is not linear."""
+        raise NotImplementedError("The pooling model is bilinear and has no PuLP export")
+
+    def _solve(self) -> Dict:
+        """Solve the pooling program by successive linear programming.
+
+        Returns:
+            Dictionary containing solution details
+        """
+        if self.program is None or self.dirty_parameters:
+            self.program = self.compile_model()
+            self._mark_compiled()
+        program = self.program
+        ub_terms, eq_terms = self._bilinear_terms()
+        bounds = np.column_stack([program.lower, program.upper])
+        backend = "highs" if self.backend == "highs" else "dense"
+
+        # Successive LP finds local optima; keep the best over the starts
+        result, runs = None, []
+        for fraction in np.linspace(0.0, 1.0, self.starts):
+            run = successive_lp(
+                program.c, program.A_ub, program.b_ub, program.A_eq, program.b_eq, bounds,
+                bilinear_ub=ub_terms, bilinear_eq=eq_terms,
+                x0=self._starting_point(program, fraction), maximize=True,
+                correct=self._pool_qualities, max_iterations=self.max_iterations,
+                tol=self.tol, backend=backend,
+            )
+            runs.append(run)
+            if result is None or (run["status"] == "Optimal" and (
+                    result["status"] != "Optimal" or run["objective"] > result["objective"])):
+                result = run
+        stats = {
+            "iterations": sum(run["iterations"] for run in runs),
+            "lp_iterations": sum(run["lp_iterations"] for run in runs),
+            "elapsed": sum(run["elapsed"] for run in runs),
+            "residual": result["residual"],
+            "history": result["history"],
+            "starts": [run["objective"] if run["status"] == "Optimal" else None
+                       for run in runs],
+        }
+
+        if result["status"] == "Optimal":
+            self.solution = {"status": "Optimal"}
+            self.solution.update(self._extract_solution(result["x"], result["objective"]))
+            self.solution["model"] = None
+            self.solution["program"] = program
+        else:
+            self.solution = self._failure_solution(result["status"])
+        self.solution["slp"] = stats
+        return self.solution
+
+    def _extract_solution(self, x: np.ndarray, objective: float) -> Dict:
+        """Build the solution dictionary from direct and pooled flows.
+
+        ``blend`` holds the barrels of each component that end up in each
+        product, directly or through a pool; ``direct`` only the former.
+        """
+        C, P, L = len(self.components), len(self.products), len(self.pools)
+        x = np.maximum(x, 0.0)
+        direct = x[:C * P].reshape(C, P)
+        inflow = x[C * P:C * P + C * L].reshape(C, L)
+        outflow = x[C * P + C * L:C * P + C * L + L * P].reshape(L, P)
+
+        properties, _, _ = self._quality_matrices()
+        volume = inflow.sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            composition = np.where(volume > 0, inflow / volume, 0.0)
+            pool_qualities = np.where(volume[:, np.newaxis] > 0,
+                                      composition.T @ properties, np.nan)
+
+        solution = super()._extract_solution((direct + composition @ outflow).ravel(), objective)
+        solution["direct"] = direct
+        solution["pools"] = {
+            pool: {
+                "inflow": {comp: float(inflow[c, j]) for c, comp in enumerate(self.components)},
+                "outflow": {prod: float(outflow[j, p]) for p, prod in enumerate(self.products)},
+                "qualities": dict(zip(self.qualities, pool_qualities[j].tolist())),
+            }
+            for j, pool in enumerate(self.pools)
+        }
+        return solution
+
+    def solve_batch(self, param_arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Not available for the pooling model."""
+        raise NotImplementedError("solve_batch is not available for the pooling model")
+
+    def print_summary(self):
+        """Print a formatted summary of the solution, then the pools."""
+        super().print_summary()
+        if self.solution is None or self.solution['status'] != "Optimal":
+            return
+
+        slp = self.solution['slp']
+        print(f"\nPools (successive LP: {slp['iterations']} iterations, "
+              f"residual {slp['residual']:.2e}, {slp['elapsed']:.3f}s):")
+        print("-" * 80)
+        for pool, flows in self.solution['pools'].items():
+            qualities = ", ".join(f"{q} {v:.2f}" for q, v in flows['qualities'].items()
+                                  if np.isfinite(v))
+            print(f"{pool:<12} {sum(flows['outflow'].values()):>15,.0f} bbl/day  {qualities}")
+        print("=" * 80)
+
+
+if __name__ == "__main__":
+    # Example usage: Haverly's pooling problem
+    optimizer = PoolingOptimizer(
+        pools=["pool"],
+        components=["A", "B", "C"],
+        products=["X", "Y"],
+        qualities=["sulfur"],
+        properties=np.array([[3.0], [1.0], [2.0]]),
+        spec_max=np.array([[2.5], [1.5]]),
+        spec_min=np.full((2, 1), np.nan),
+        demand_limits=[100, 200],
+        profit_margins=[9, 15],
+        component_costs=[6, 16, 10],
+        pool_inputs=np.array([[True], [True], [False]]),
+        direct_blending=np.array([[False, False], [False, False], [True, True]]),
+    )
+    solution = optimizer.solve()
+    optimizer.print_summary()
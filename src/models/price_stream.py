@@ -0,0 +1,275 @@
+"""Streaming Re-optimization of the Refinery Plan on Price Ticks.
+
+Crack spreads move many times a day, and every move changes the profit
+margins of the blending LP. Only the objective changes, so the plan of the
+last optimal basis stays optimal until some reduced cost changes sign.
+Each tick is therefore priced against the factored basis first (see
+utils.batch_lp.BasisPricer), and the LP is re-solved from that basis only
+when the tick moves the margins outside the basis's objective ranging.
+
+Ticks arrive on an asynchronous stream. While a solve runs, newer ticks
+queue up and are merged, so a burst costs one solve for its latest prices
+rather than one solve per tick.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Union
+import numpy as np
+
+from .oil_refining import OilRefiningOptimizer
+from ..utils.batch_lp import BasisPricer
+
+
+class PriceTickReoptimizer:
+    """Keep an OilRefiningOptimizer plan optimal as margin ticks arrive.
+
+    A tick is a dictionary of new profit margins for some products, or one
+    margin per product. The re-optimizer owns the optimizer it is given:
+    margins are assigned on it and it is re-solved in place, bypassing the
+    solve cache.
+
+    Attributes:
+        optimizer (OilRefiningOptimizer): The plan being maintained
+        tol (float): Optimality tolerance of the reduced-cost check
+        ticks (int): Ticks received
+        published (int): Plan updates published (coalesced batches)
+        solves (int): LP re-solves, excluding the initial solve
+        skipped (int): Batches answered by the reduced-cost check alone
+    """
+
+    def __init__(
+        self,
+        optimizer: Optional[OilRefiningOptimizer] = None,
+        backend: str = "dense",
+        tol: float = 1e-9,
+        window: int = 10_000,
+    ):
+        """Initialize the re-optimizer.
+
+        Args:
+            optimizer: Single-day blending model to maintain (default the
+                default refinery)
+            backend: Solver backend for re-solves; "dense" re-solves from the
+                previous basis and enables the reduced-cost check
+            tol: Optimality tolerance of the reduced-cost check, relative to
+                the largest objective coefficient
+            window: Number of most recent latencies kept for the metrics
+        """
+        optimizer = optimizer if optimizer is not None else OilRefiningOptimizer()
+        if type(optimizer) is not OilRefiningOptimizer:
+            raise ValueError("PriceTickReoptimizer maintains a single-day OilRefiningOptimizer")
+        optimizer.backend = backend
+        self.optimizer = optimizer
+        self.tol = tol
+        self.ticks = 0
+        self.published = 0
+        self.solves = 0
+        self.skipped = 0
+        self._latencies = deque(maxlen=window)
+        self._pricer = None
+
+    def _margins(self, ticks: Sequence) -> np.ndarray:
+        """Current margins with a batch of ticks applied in arrival order."""
+        products = self.optimizer.products
+        margins = self.optimizer._per_product(self.optimizer.profit_margins, "profit_margins")
+        for tick in ticks:
+            if isinstance(tick, dict):
+                unknown = [product for product in tick if product not in products]
+                if unknown:
+                    raise ValueError(f"Tick has margins for unknown products {unknown}")
+                margins = margins.copy()
+                for product, margin in tick.items():
+                    margins[products.index(product)] = margin
+            else:
+                margins = self.optimizer._per_product(tick, "tick")
+        return margins
+
+    def _refresh_pricer(self) -> None:
+        """Factor the basis of the last solve, if the backend left one."""
+        optimizer, basis = self.optimizer, getattr(self.optimizer, "_basis", None)
+        self._pricer = None
+        if optimizer.solution.get("status") == "Optimal" and basis is not None:
+            program = optimizer.program
+            self._pricer = BasisPricer(program.A_ub, program.A_eq, program.bounds, basis)
+
+    def start(self) -> Dict:
+        """Solve the initial plan, unless one is already available.
+
+        Returns:
+            The optimizer's solution dictionary
+        """
+        if self.optimizer.solution is None:
+            self.optimizer._solve()
+            self._refresh_pricer()
+        return self.optimizer.solution
+
+    def update(self, ticks: Union[Dict, Sequence[float], List],
+               arrived: Optional[float] = None) -> Dict:
+        """Apply one tick, or a list of ticks as one batch, and publish the plan delta.
+
+        Args:
+            ticks: A tick, or a list of ticks applied in order
+            arrived: ``time.perf_counter()`` when the oldest tick arrived
+                (default now); the published latency is measured from it
+
+        Returns:
+            Dictionary with:
+                - ``margins``: the margins now in force, by product
+                - ``ticks``: number of ticks in the batch
+                - ``resolved``: whether the LP was re-solved
+                - ``status``: solution status
+                - ``changes``: {product: {component: change in barrels/day}}
+                  for the blend volumes that moved
+                - ``total_profit`` and ``profit_change``
+                - ``latency``: seconds from ``arrived`` to publication
+        """
+        arrived = time.perf_counter() if arrived is None else arrived
+        batch = ticks if isinstance(ticks, list) else [ticks]
+        previous = self.start()
+        margins = self._margins(batch)
+
+        optimizer = self.optimizer
+        C, P = len(optimizer.components), len(optimizer.products)
+        optimizer.profit_margins = dict(zip(optimizer.products, margins.tolist()))
+        c = optimizer.program.c.copy()
+        costs = optimizer._per_component(optimizer.component_costs, 0.0, "component_costs")
+        c[:C * P] = (margins[np.newaxis] - costs[:, np.newaxis]).ravel()
+
+        x = np.concatenate([previous["blend"].ravel(), previous.get("slate_volumes", [])]) \
+            if previous["status"] == "Optimal" else None
+        resolved = not (x is not None and self._pricer is not None
+                        and self._pricer.is_optimal(c, maximize=True, tol=self.tol))
+        if resolved:
+            solution = optimizer._solve()
+            self._refresh_pricer()
+            self.solves += 1
+        else:
+            # Same basis, same plan: only the profit moves
+            solution = dict(previous, total_profit=float(c @ x), daily_profit=float(c @ x))
+            optimizer.solution = solution
+            self.skipped += 1
+
+        changes = {}
+        if solution["status"] == "Optimal" and previous["status"] == "Optimal":
+            moved = solution["blend"] - previous["blend"]
+            scale = max(1.0, float(np.abs(previous["blend"]).max(initial=0.0)))
+            for k, i in zip(*np.nonzero(np.abs(moved) > 1e-9 * scale)):
+                product, component = optimizer.products[i], optimizer.components[k]
+                changes.setdefault(product, {})[component] = float(moved[k, i])
+
+        latency = time.perf_counter() - arrived
+        self._latencies.append(latency)
+        self.ticks += len(batch)
+        self.published += 1
+        profit = solution.get("total_profit", float("nan"))
+        return {
+            "margins": dict(zip(optimizer.products, margins.tolist())),
+            "ticks": len(batch),
+            "resolved": resolved,
+            "status": solution["status"],
+            "changes": changes,
+            "total_profit": profit,
+            "profit_change": profit - previous.get("total_profit", float("nan")),
+            "latency": latency,
+        }
+
+    async def run(self, ticks: Union[AsyncIterator, Iterable]) -> AsyncIterator[Dict]:
+        """Re-optimize as ticks arrive and yield one plan delta per batch.
+
+        Ticks that arrive while a batch is being solved are merged into the
+        next batch, so the plan always follows the latest prices. Solves run
+        in a worker thread to keep the event loop receiving ticks.
+
+        Args:
+            ticks: Async iterator (or plain iterable) of ticks
+
+        Yields:
+            The plan delta of every batch, as returned by update()
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.start)
+        pending: List = []
+        first_arrival = None
+        arrived = asyncio.Event()
+
+        async def receive():
+            nonlocal first_arrival
+            try:
+                if hasattr(ticks, "__aiter__"):
+                    async for tick in ticks:
+                        if not pending:
+                            first_arrival = time.perf_counter()
+                        pending.append(tick)
+                        arrived.set()
+                else:
+                    for tick in ticks:
+                        if not pending:
+                            first_arrival = time.perf_counter()
+                        pending.append(tick)
+                        arrived.set()
+                        await asyncio.sleep(0)
+            finally:
+                arrived.set()
+
+        reader = asyncio.create_task(receive())
+        try:
+            while True:
+                await arrived.wait()
+                arrived.clear()
+                if not pending:
+                    if reader.done():
+                        break
+                    continue
+                batch, since = pending[:], first_arrival
+                pending.clear()
+                yield await loop.run_in_executor(None, self.update, batch, since)
+                if reader.done() and not pending:
+                    break
+            reader.result()
+        finally:
+            reader.cancel()
+
+    def metrics(self) -> Dict:
+        """Tick counts and publication latency percentiles.
+
+        Returns:
+            Dictionary with ``ticks``, ``published``, ``coalesced`` (ticks
+            merged into a later one), ``solves``, ``skipped`` and the
+            ``latency_p50``, ``latency_p99`` and ``latency_mean`` seconds of
+            the most recent publications
+        """
+        latencies = np.array(self._latencies)
+        percentile = (lambda q: float(np.percentile(latencies, q))) if len(latencies) \
+            else (lambda q: float("nan"))
+        return {
+            "ticks": self.ticks,
+            "published": self.published,
+            "coalesced": self.ticks - self.published,
+            "solves": self.solves,
+            "skipped": self.skipped,
+            "latency_p50": percentile(50),
+            "latency_p99": percentile(99),
+            "latency_mean": float(latencies.mean()) if len(latencies) else float("nan"),
+        }
+
+
+if __name__ == "__main__":
+    # Example usage: a random walk of crack spreads
+    async def ticks(count=200):
+        rng = np.random.default_rng(0)
+        margins = np.array([6.70, 7.20, 8.10])
+        for _ in range(count):
+            margins = margins + rng.normal(0, 0.05, 3)
+            yield dict(zip(["regular", "premium", "super"], margins.tolist()))
+            await asyncio.sleep(0.001)
+
+    async def main():
+        reoptimizer = PriceTickReoptimizer()
+        async for delta in reoptimizer.run(ticks()):
+            if delta["changes"]:
+                print(f"Plan changed after {delta['ticks']} tick(s): {delta['changes']}")
+        print(reoptimizer.metrics())
+
+    asyncio.run(main())
@@ -4,12 +4,18 @@ This module implements a linear programming model for production
 and inventory planning across multiple time periods.
 """
 
-from typing import List, Dict, Optional
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Union
 import numpy as np
-from pulp import LpMinimize, LpProblem, LpVariable, lpSum, LpStatus, value
+from scipy import sparse
+from pulp import LpVariable
 
+from .base import LPOptimizer
+from .compiler import LinearProgram, coo_rows
+from .lot_sizing import capacitated_lot_sizing, solve_uncapacitated, wagner_whitin
+from ..utils.batch_lp import solve_lp_batch, stack_parameters, status_names
 
-class ProductionInventoryOptimizer:
+
+class ProductionInventoryOptimizer(LPOptimizer):
     """Optimize production and inventory levels across multiple periods.
 
     This class implements an LP model to minimize total costs (production + storage)
@@ -20,13 +26,20 @@ class ProductionInventoryOptimizer:
         storage_cost (float): Storage cost per unit per period
         demands (List[int]): Demand requirements for each period
         num_periods (int): Number of time periods
+        backend (Optional[str]): Solver backend, None for the global default
+        method (str): "auto" to use the forward-scan solver when it applies,
+            "lp" to always solve the linear program
     """
 
+    PARAMETERS = {"production_costs": "patch", "storage_cost": "patch", "demands": "patch"}
+
     def __init__(
         self,
         production_costs: Optional[List[float]] = None,
         storage_cost: float = 8.0,
         demands: Optional[List[int]] = None,
+        backend: Optional[str] = None,
+        method: str = "auto",
     ):
         """Initialize the Production-Inventory Optimizer.
 
@@ -34,137 +47,353 @@ class ProductionInventoryOptimizer:
             production_costs: List of production costs per unit for each period
             storage_cost: Storage cost per unit per period
             demands: List of demand requirements for each period
+            backend: Solver backend name (see solver_utils.SOLVER_BACKENDS);
+                None uses the global default
+            method: "auto" solves with an O(n) forward scan when the model
+                has its standard uncapacitated form; "lp" always solves the LP
         """
+        if method not in ("auto", "lp"):
+            raise ValueError(f"method must be 'auto' or 'lp', got '{method}'")
+
         # Default values from the original problem
         self.production_costs = production_costs or [50, 45, 55, 48, 52, 50]
         self.storage_cost = storage_cost
         self.demands = demands or [100, 250, 190, 140, 220, 110]
-        self.num_periods = len(self.demands)
+
+        self.backend = backend
+        self.method = method
 
         self.model = None
+        self.program = None
         self.production_vars = None
         self.inventory_vars = None
         self.solution = None
 
-    def build_model(self) -> LpProblem:
-        """Build the linear programming model.
+    @property
+    def num_periods(self) -> int:
+        """Number of time periods, following the length of ``demands``."""
+        return len(self.demands)
+
+    def compile_model(self) -> LinearProgram:
+        """Compile the model into sparse matrix form.
+
+        Variables are ordered [x_1..x_n, I_1..I_n] (production, then ending
+        inventory). Every coefficient is generated with array operations, so
+        compiling a long horizon takes milliseconds.
 
         Returns:
-            LpProblem: The constructed LP model
+            LinearProgram: The compiled LP model
         """
-        # Create the model
-        self.model = LpProblem("Production_Inventory_Optimization", LpMinimize)
-
-        # Decision variables
-        # Production quantities (non-negative)
-        self.production_vars = [
-            LpVariable(f"x_{i+1}", lowBound=0)
-            for i in range(self.num_periods)
-        ]
-
-        # Ending inventory levels (non-negative)
-        self.inventory_vars = [
-            LpVariable(f"I_{i+1}", lowBound=0)
-            for i in range(self.num_periods)
-        ]
+        T = self.num_periods
+        periods = np.arange(T)
 
         # Objective function: minimize total cost (production + storage)
-        total_production_cost = lpSum([
-            self.production_costs[i] * self.production_vars[i]
-            for i in range(self.num_periods)
-        ])
-
-        total_storage_cost = lpSum([
-            self.storage_cost * self.inventory_vars[i]
-            for i in range(self.num_periods)
+        c = np.concatenate([
+            np.asarray(self.production_costs[:T], dtype=float),
+            np.full(T, float(self.storage_cost)),
         ])
 
-        self.model += (
-            total_production_cost + total_storage_cost,
-            "Total_Cost"
-        )
-
         # Constraints: Inventory balance equations
-        # Period 1: Beginning inventory (0) + Production - Ending inventory = Demand
-        self.model += (
-            self.production_vars[0] - self.inventory_vars[0] == self.demands[0],
-            "Period_1_Balance"
-        )
-
-        # Periods 2 through n:
-        # Beginning inventory + Production - Ending inventory = Demand
-        for i in range(1, self.num_periods):
-            self.model += (
-                self.inventory_vars[i-1] + self.production_vars[i] -
-                self.inventory_vars[i] == self.demands[i],
-                f"Period_{i+1}_Balance"
-            )
+        # Beginning inventory + Production - Ending inventory = Demand,
+        # with zero beginning inventory in period 1
+        rows = np.concatenate([periods, periods, periods[1:]])
+        cols = np.concatenate([periods, T + periods, T + periods[:-1]])
+        vals = np.concatenate([np.ones(T), -np.ones(T), np.ones(T - 1)])
+        A_eq = coo_rows(rows, cols, vals, (T, 2 * T))
 
         # Optional: Ending inventory in last period should be zero
-        # (uncomment if desired)
-        # self.model += (
-        #     self.inventory_vars[-1] == 0,
-        #     "Zero_Final_Inventory"
-        # )
+        # (set self.program.upper[-1] = 0 on the compiled model if desired)
+
+        return LinearProgram(
+            c,
+            A_eq=A_eq,
+            b_eq=np.asarray(self.demands, dtype=float),
+            name="Production_Inventory_Optimization",
+            var_names=lambda: ([f"x_{t}" for t in range(1, T + 1)]
+                               + [f"I_{t}" for t in range(1, T + 1)]),
+            eq_names=lambda: [f"Period_{t}_Balance" for t in range(1, T + 1)],
+        )
 
-        return self.model
+    def _bind_variables(self, variables: List[LpVariable]) -> None:
+        """Expose exported PuLP variables as production and inventory lists."""
+        self.production_vars = variables[:self.num_periods]
+        self.inventory_vars = variables[self.num_periods:2 * self.num_periods]
+
+    def _extract_solution(self, x: np.ndarray, objective: float) -> Dict:
+        """Build the solution dictionary from production and inventory levels."""
+        T = self.num_periods
+        production_schedule = x[:T].tolist()
+        inventory_schedule = x[T:2 * T].tolist()
+
+        # Calculate cost breakdown
+        production_cost = float(np.dot(self.production_costs[:T], x[:T]))
+        storage_cost = float(self.storage_cost * x[T:2 * T].sum())
+
+        return {
+            "production_schedule": production_schedule,
+            "inventory_schedule": inventory_schedule,
+            "total_cost": objective,
+            "production_cost": production_cost,
+            "storage_cost": storage_cost,
+        }
+
+    def _forward_scan_applies(self) -> bool:
+        """Check whether the forward-scan solver yields the LP optimum.
+
+        It does for the uncapacitated model with non-negative costs and
+        demands. An exported PuLP model may have been edited, so once
+        build_model() has run the LP is always solved.
+        """
+        if self.method != "auto" or self._has_user_model():
+            return False
+        costs = np.asarray(self.production_costs, dtype=float)
+        demands = np.asarray(self.demands, dtype=float)
+        return (
+            len(costs) >= self.num_periods
+            and self.storage_cost >= 0
+            and bool((costs >= 0).all())
+            and bool((demands >= 0).all())
+        )
 
-    def solve(self) -> Dict:
+    def _solve(self) -> Dict:
         """Solve the optimization problem.
 
+        Without capacity limits every period's demand is produced in the
+        cheapest period at or before it, counting accumulated storage cost,
+        so the optimum is found in linear time without building or solving
+        an LP (see lot_sizing.solve_uncapacitated). Other cases are solved
+        as an LP with the selected backend.
+
         Returns:
             Dictionary containing solution details
         """
-        if self.model is None:
-            self.build_model()
-
-        # Solve the model
-        self.model.solve()
-
-        # Extract solution
-        status = LpStatus[self.model.status]
-
-        if status == "Optimal":
-            production_schedule = [
-                value(self.production_vars[i])
-                for i in range(self.num_periods)
-            ]
-
-            inventory_schedule = [
-                value(self.inventory_vars[i])
-                for i in range(self.num_periods)
-            ]
-
-            total_cost = value(self.model.objective)
-
-            # Calculate cost breakdown
-            production_cost = sum([
-                self.production_costs[i] * production_schedule[i]
-                for i in range(self.num_periods)
-            ])
-
-            storage_cost = sum([
-                self.storage_cost * inventory_schedule[i]
-                for i in range(self.num_periods)
-            ])
-
-            self.solution = {
-                "status": status,
-                "production_schedule": production_schedule,
-                "inventory_schedule": inventory_schedule,
-                "total_cost": total_cost,
-                "production_cost": production_cost,
-                "storage_cost": storage_cost,
-                "model": self.model,
-            }
-        else:
-            self.solution = {
-                "status": status,
-                "error": "Optimization failed to find optimal solution"
-            }
+        if not self._forward_scan_applies():
+            return super()._solve()
+
+        T = self.num_periods
+        result = solve_uncapacitated(
+            np.asarray(self.production_costs[:T], dtype=float),
+            self.storage_cost,
+            np.asarray(self.demands, dtype=float),
+        )
+        x = np.concatenate([result["production_schedule"], result["inventory_schedule"]])
 
+        self.solution = {"status": "Optimal"}
+        self.solution.update(self._extract_solution(x, float(result["total_cost"])))
+        self.solution["model"] = self.model
+        self.solution["program"] = self.program
         return self.solution
 
+    def _start_stream(self, window: Optional[int]) -> None:
+        """Reset the rolling-horizon state to period 0 with empty stock."""
+        self._stream = {
+            "period": 0,
+            "inventory": 0.0,
+            "window": window or self.num_periods,
+            "demands": np.asarray(self.demands, dtype=float).copy(),
+            "costs": np.asarray(self.production_costs[:self.num_periods], dtype=float).copy(),
+            "source": None,
+            "forward_scan": self._forward_scan_applies(),
+        }
+        self._stream["plan"] = self._plan_window(0)
+
+    @staticmethod
+    def _apply_changes(values: np.ndarray, changes: Dict[int, float], start: int,
+                       name: str) -> np.ndarray:
+        """Write {period: value} changes into a forecast, extending it if needed."""
+        if not changes:
+            return values
+        periods = np.fromiter(changes.keys(), dtype=int, count=len(changes))
+        if periods.min() < start:
+            raise ValueError(f"Cannot change {name} of committed periods before {start}")
+        if periods.max() >= len(values):
+            values = np.pad(values, (0, periods.max() + 1 - len(values)), mode="edge")
+        values[periods] = np.fromiter(changes.values(), dtype=float, count=len(changes))
+        return values
+
+    def _stream_step(self, update: Dict) -> Dict:
+        """Apply one update, advance the clock and re-plan the window."""
+        state = self._stream
+        now = state["period"]
+        state["demands"] = self._apply_changes(state["demands"], update.get("demands"),
+                                               now, "demands")
+        state["costs"] = self._apply_changes(state["costs"], update.get("production_costs"),
+                                             now, "production_costs")
+        if update.get("production_costs"):
+            state["source"] = None
+            state["forward_scan"] = (state["forward_scan"]
+                                     and bool((state["costs"][now:] >= 0).all()))
+
+        # Commit the planned decisions of every period the clock moves past
+        target = update.get("period", now)
+        if target < now:
+            raise ValueError(f"Period {target} is before the current period {now}")
+        if target > now:
+            if update.get("demands") or update.get("production_costs"):
+                # Commit the current period from a plan that includes this update
+                state["plan"] = self._plan_window(now)
+            for t in range(now, target):
+                state["inventory"] += state["plan"][0][0] - self._demand_at(t)
+                if state["inventory"] < -1e-9:
+                    raise ValueError(f"Demand of committed period {t} exceeds the plan")
+                state["plan"] = self._plan_window(t + 1)
+            now = state["period"] = target
+
+        state["plan"] = self._plan_window(now)
+        production, inventory, cost = state["plan"]
+        return {
+            "period": now,
+            "production": float(production[0]),
+            "starting_inventory": float(state["inventory"]),
+            "production_schedule": production.tolist(),
+            "inventory_schedule": inventory.tolist(),
+            "total_cost": cost,
+        }
+
+    def _demand_at(self, t: int) -> float:
+        """Current forecast for period t (zero beyond the forecast)."""
+        demands = self._stream["demands"]
+        return float(demands[t]) if t < len(demands) else 0.0
+
+    def _plan_window(self, start: int):
+        """Plan production for periods start..start+window-1.
+
+        Stock on hand serves the earliest demands first; the remaining
+        demand is produced in each period's cheapest source period inside
+        the window. The source map depends only on costs, so it is cached
+        and reused by every update until the window moves.
+        """
+        state = self._stream
+        W = state["window"]
+        demands = np.zeros(W)
+        forecast = state["demands"][start:start + W]
+        demands[:len(forecast)] = forecast
+
+        # Consume stock on hand first
+        covered = np.minimum(np.cumsum(demands), state["inventory"])
+        residual = demands - np.diff(covered, prepend=0.0)
+
+        costs = state["costs"]
+        window_costs = costs[np.minimum(np.arange(start, start + W), len(costs) - 1)]
+        if not state["forward_scan"]:
+            plan = ProductionInventoryOptimizer(window_costs.tolist(), self.storage_cost,
+                                                residual.tolist(), backend=self.backend,
+                                                method="lp").solve()
+            if plan["status"] != "Optimal":
+                raise RuntimeError(f"Window re-plan failed with status {plan['status']}")
+            production = np.asarray(plan["production_schedule"])
+        else:
+            cached = state["source"]
+            if cached is None or cached[0] != start:
+                source = solve_uncapacitated(window_costs, self.storage_cost, residual)
+                state["source"] = cached = (start, source["source_period"])
+            production = np.bincount(cached[1], weights=residual, minlength=W)
+
+        inventory = state["inventory"] + np.cumsum(production) - np.cumsum(demands)
+        cost = float(window_costs @ production + self.storage_cost * inventory.sum())
+        return production, inventory, cost
+
+    def stream(self, updates: Iterable[Dict], window: Optional[int] = None) -> Iterator[Dict]:
+        """Re-plan a rolling horizon as demand forecast updates arrive.
+
+        Each update is a dictionary with optional keys:
+            - ``period``: the current period; periods the clock moves past
+              are committed with their planned production
+            - ``demands``: {period: demand} forecast changes
+            - ``production_costs``: {period: cost} changes
+        Forecasts beyond the known periods extend the horizon (costs repeat
+        the last known value). Every update re-plans only the ``window``
+        periods starting at the current one, so the work per update does
+        not grow with the length of the stream.
+
+        Args:
+            updates: Iterable of update dictionaries
+            window: Number of periods re-planned per update (default: the
+                number of periods of this optimizer)
+
+        Yields:
+            Dictionary with the decision for the current ``period``
+            (``production``), the ``starting_inventory`` and the window's
+            ``production_schedule``, ``inventory_schedule`` and ``total_cost``
+        """
+        self._start_stream(window)
+        for update in updates:
+            yield self._stream_step(update)
+
+    async def astream(
+        self,
+        updates: Union[AsyncIterator[Dict], Iterable[Dict]],
+        window: Optional[int] = None,
+    ) -> AsyncIterator[Dict]:
+        """Asynchronous version of stream() for async update sources.
+
+        Args:
+            updates: Async iterator (or plain iterable) of update dictionaries
+            window: Number of periods re-planned per update
+
+        Yields:
+            The same decision dictionaries as stream()
+        """
+        self._start_stream(window)
+        if hasattr(updates, "__aiter__"):
+            async for update in updates:
+                yield self._stream_step(update)
+        else:
+            for update in updates:
+                yield self._stream_step(update)
+
+    def solve_batch(self, param_arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Solve many variants of the model in one vectorized call.
+
+        All instances share the number of periods. The LP is assembled as
+        stacked dense arrays and solved in-process by the batched simplex
+        kernel.
+
+        Args:
+            param_arrays: Mapping of parameter name to an array whose leading
+                axis indexes the instances. Supported keys are
+                ``production_costs`` (N, T), ``storage_cost`` (N,) and
+                ``demands`` (N, T). Missing keys use the values this
+                optimizer was created with.
+
+        Returns:
+            Dictionary of arrays with one entry per instance:
+                - ``status``: solution status names, shape (N,)
+                - ``production_schedule``: production by period, shape (N, T)
+                - ``inventory_schedule``: ending inventory, shape (N, T)
+                - ``total_cost``: objective values, shape (N,)
+                - ``production_cost``: production cost, shape (N,)
+                - ``storage_cost``: storage cost, shape (N,)
+        """
+        N, params = stack_parameters(param_arrays, {
+            "production_costs": self.production_costs,
+            "storage_cost": self.storage_cost,
+            "demands": self.demands,
+        })
+        T = self.num_periods
+
+        # Variables are [x_1..x_T, I_1..I_T]; rows are shared by all instances
+        c = np.empty((N, 2 * T))
+        c[:, :T] = params["production_costs"]
+        c[:, T:] = params["storage_cost"][:, np.newaxis]
+        A_eq = self.compile_model().A_eq.toarray()
+
+        result = solve_lp_batch(c, A_eq=A_eq, b_eq=params["demands"])
+
+        production = result["x"][:, :T]
+        inventory = result["x"][:, T:]
+        production_cost = np.einsum("kt,kt->k", params["production_costs"], production)
+        storage_cost = params["storage_cost"] * inventory.sum(axis=1)
+
+        return {
+            "status": status_names(result["status"]),
+            "production_schedule": production,
+            "inventory_schedule": inventory,
+            "total_cost": result["objective"],
+            "production_cost": production_cost,
+            "storage_cost": storage_cost,
+        }
+
     def print_summary(self):
         """Print a formatted summary of the solution."""
         if self.solution is None:
@@ -176,7 +405,7 @@ class ProductionInventoryOptimizer:
         print("=" * 80)
         print(f"\nStatus: {self.solution['status']}")
 
-        if self.solution['status'] == "Optimal":
+        if self.solution['status'] in ("Optimal", "Feasible"):
             print(f"\nTotal Cost: ${self.solution['total_cost']:,.2f}")
             print(f"  Production Cost: ${self.solution['production_cost']:,.2f}")
             print(f"  Storage Cost: ${self.solution['storage_cost']:,.2f}")
@@ -206,6 +435,191 @@ class ProductionInventoryOptimizer:
             print(f"\nError: {self.solution.get('error', 'Unknown error')}")
 
 
+class LotSizingOptimizer(ProductionInventoryOptimizer):
+    """Production planning with fixed setup costs and per-period capacities.
+
+    Producing in a period incurs a fixed setup cost and at most
+    ``capacities[t]`` units can be made, which turns the production LP into
+    a MIP with a binary setup variable y_t per period. Instead of handing
+    the MIP to branch-and-bound, the model is solved by dedicated engines
+    in lot_sizing: the exact Wagner-Whitin DP when capacities are unlimited
+    and a repair heuristic with a lower bound otherwise.
+
+    Attributes:
+        setup_costs (np.ndarray): Fixed cost of producing in each period
+        capacities (Optional[np.ndarray]): Production capacity per period,
+            None for unlimited
+        method (str): "auto", "wagner_whitin", "heuristic" or "mip"
+    """
+
+    METHODS = ("auto", "wagner_whitin", "heuristic", "mip")
+    PARAMETERS = dict(ProductionInventoryOptimizer.PARAMETERS,
+                      setup_costs="patch", capacities="patch")
+
+    def __setattr__(self, name, value):
+        """Broadcast per-period parameters given as a single value."""
+        if name in ("setup_costs", "capacities") and value is not None:
+            value = np.broadcast_to(np.asarray(value, dtype=float), (self.num_periods,)).copy()
+        super().__setattr__(name, value)
+
+    def __init__(
+        self,
+        production_costs: Optional[List[float]] = None,
+        storage_cost: float = 8.0,
+        demands: Optional[List[int]] = None,
+        setup_costs=500.0,
+        capacities=None,
+        backend: Optional[str] = None,
+        method: str = "auto",
+    ):
+        """Initialize the Lot-Sizing Optimizer.
+
+        Args:
+            production_costs: List of production costs per unit for each period
+            storage_cost: Storage cost per unit per period
+            demands: List of demand requirements for each period
+            setup_costs: Setup cost per period, or one value for all periods
+            capacities: Production capacity per period, or one value for all
+                periods; None for unlimited capacity
+            backend: Solver backend used by the "mip" method (see
+                solver_utils.SOLVER_BACKENDS); None uses the global default
+            method: "wagner_whitin" (exact, uncapacitated only), "heuristic"
+                (capacitated plan with a lower bound), "mip" (solve the MIP
+                with the backend) or "auto" to pick the dedicated engine
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"method must be one of {self.METHODS}, got '{method}'")
+        super().__init__(production_costs, storage_cost, demands, backend=backend)
+        self.method = method
+
+        self.setup_costs = setup_costs
+        self.capacities = capacities
+        if method == "wagner_whitin" and self.capacities is not None:
+            raise ValueError("The Wagner-Whitin method does not support capacities")
+
+        self.setup_vars = None
+
+    def compile_model(self) -> LinearProgram:
+        """Compile the lot-sizing MIP into sparse matrix form.
+
+        Variables are ordered [x_1..x_n, I_1..I_n, y_1..y_n]. Each binary
+        y_t enables production through x_t - M_t y_t <= 0, where M_t is the
+        smaller of the capacity and the demand still to come.
+
+        Returns:
+            LinearProgram: The compiled MIP
+        """
+        lp = super().compile_model()
+        T = self.num_periods
+        periods = np.arange(T)
+
+        demands = np.asarray(self.demands, dtype=float)
+        big_m = demands[::-1].cumsum()[::-1]
+        if self.capacities is not None:
+            big_m = np.minimum(big_m, self.capacities)
+
+        A_ub = coo_rows(np.concatenate([periods, periods]),
+                        np.concatenate([periods, 2 * T + periods]),
+                        np.concatenate([np.ones(T), -big_m]), (T, 3 * T))
+
+        return LinearProgram(
+            np.concatenate([lp.c, self.setup_costs]),
+            A_ub=A_ub,
+            b_ub=np.zeros(T),
+            A_eq=sparse.hstack([lp.A_eq, sparse.csr_matrix((T, T))]),
+            b_eq=lp.b_eq,
+            upper=np.concatenate([lp.upper, np.ones(T)]),
+            name="Lot_Sizing_Optimization",
+            var_names=lambda: lp.var_names + [f"y_{t}" for t in range(1, T + 1)],
+            ub_names=lambda: [f"Period_{t}_Setup" for t in range(1, T + 1)],
+            eq_names=lambda: lp.eq_names,
+            integrality=np.concatenate([np.zeros(2 * T, dtype=int), np.ones(T, dtype=int)]),
+        )
+
+    def _bind_variables(self, variables: List[LpVariable]) -> None:
+        """Expose exported PuLP variables as production, inventory and setup lists."""
+        super()._bind_variables(variables)
+        self.setup_vars = variables[2 * self.num_periods:]
+
+    def _extract_solution(self, x: np.ndarray, objective: float) -> Dict:
+        """Build the solution dictionary, adding setups to the base breakdown."""
+        T = self.num_periods
+        solution = super()._extract_solution(x, objective)
+        setups = x[2 * T:] > 0.5
+        solution["setup_schedule"] = setups.tolist()
+        solution["setup_cost"] = float(self.setup_costs[setups].sum())
+        return solution
+
+    def _forward_scan_applies(self) -> bool:
+        """Setup costs rule out the forward scan."""
+        return False
+
+    def _solve(self) -> Dict:
+        """Solve the lot-sizing problem.
+
+        Without capacities the Wagner-Whitin DP gives the exact optimum in
+        O(n log n). With capacities the heuristic returns a plan with status
+        "Feasible", or "Optimal" when it meets its lower bound; the solution
+        then also carries ``lower_bound`` and the relative ``gap``. The
+        "mip" method, or an exported PuLP model, is solved with the backend.
+
+        Returns:
+            Dictionary containing solution details
+        """
+        method = self.method
+        if method == "auto":
+            method = "wagner_whitin" if self.capacities is None else "heuristic"
+        if method == "mip" or self._has_user_model():
+            return LPOptimizer._solve(self)
+
+        T = self.num_periods
+        args = (np.asarray(self.production_costs[:T], dtype=float), self.storage_cost,
+                np.asarray(self.demands, dtype=float), self.setup_costs)
+        if method == "wagner_whitin":
+            result = wagner_whitin(*args)
+            result.update(status="Optimal", lower_bound=result["total_cost"], gap=0.0)
+        else:
+            capacities = self.capacities
+            if capacities is None:
+                capacities = np.full(T, np.sum(self.demands), dtype=float)
+            result = capacitated_lot_sizing(*args, capacities)
+            if result["status"] == "Infeasible":
+                self.solution = self._failure_solution("Infeasible")
+                return self.solution
+
+        x = np.concatenate([result["production_schedule"], result["inventory_schedule"],
+                            result["setup_schedule"]])
+        self.solution = {"status": result["status"]}
+        self.solution.update(self._extract_solution(x, float(result["total_cost"])))
+        self.solution["lower_bound"] = float(result["lower_bound"])
+        self.solution["gap"] = float(result["gap"])
+        self.solution["model"] = self.model
+        self.solution["program"] = self.program
+        return self.solution
+
+    def solve_batch(self, param_arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Not available: the batched simplex kernel solves LPs only."""
+        raise NotImplementedError("solve_batch does not support setup costs")
+
+    def stream(self, updates, window=None):
+        """Not available: the rolling-horizon planner has no setup costs."""
+        raise NotImplementedError("stream does not support setup costs")
+
+    def astream(self, updates, window=None):
+        """Not available: the rolling-horizon planner has no setup costs."""
+        raise NotImplementedError("astream does not support setup costs")
+
+    def print_summary(self):
+        """Print a formatted summary of the solution, including setups."""
+        super().print_summary()
+        if self.solution is not None and "setup_cost" in self.solution:
+            setups = [t + 1 for t, on in enumerate(self.solution["setup_schedule"]) if on]
+            print(f"Setup Cost: ${self.solution['setup_cost']:,.2f} (periods {setups})")
+            if "gap" in self.solution:
+                print(f"Lower Bound: ${self.solution['lower_bound']:,.2f} "
+                      f"(gap {self.solution['gap']:.2%})")
+
+
 if __name__ == "__main__":
     # Example usage
     optimizer = ProductionInventoryOptimizer()
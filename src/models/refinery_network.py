@@ -0,0 +1,553 @@
+"""Multi-Refinery Network Model.
+
+This module links several refinery sites, each an ``OilRefiningOptimizer``,
+through shared crude supply. Crude is bought at sources and moved along
+pipeline arcs, possibly through terminals, to the sites; a site can only
+refine the crude delivered to it. Each site keeps its own capacities,
+demands, components and quality specs.
+
+The network can be solved as one LP, with the site blocks assembled into a
+block-diagonal sparse matrix, or by Benders decomposition. The sites only
+interact through the crude delivered to each of them, so the master problem
+is a small transport LP with one profit variable per site, and every site
+subproblem prices its delivered crude. Site subproblems are independent and
+can be solved in parallel worker processes.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from scipy import sparse
+from pulp import LpVariable
+
+from .base import LPOptimizer
+from .compiler import LinearProgram, coo_rows
+from .oil_refining import OilRefiningOptimizer
+from ..utils.batch_lp import solve_lp
+from ..utils.solver_utils import solve_highs
+
+
+METHODS = ("monolithic", "benders")
+
+# Site subproblems held by each worker process, indexed like the sites
+_worker_sites: List[Dict] = []
+
+
+def _solve_sites(sites: Sequence[Dict], indices: Sequence[int],
+                 deliveries: Sequence[float]) -> List[Dict]:
+    """Solve the subproblems of the given sites for their delivered crude.
+
+    Each subproblem is the site's own LP with an extra last row limiting its
+    crude use to the delivery; the dual of that row prices the crude. Only
+    the delivery changes between calls, so on the dense backend each site
+    re-solves from its previous optimal basis.
+    """
+    results = []
+    for i, delivered in zip(indices, deliveries):
+        site = sites[i]
+        b_ub = site["b_ub"].copy()
+        b_ub[-1] = delivered
+        if site["backend"] == "dense":
+            result = solve_lp(site["c"], site["A_ub"], b_ub, bounds=site["bounds"],
+                              maximize=True, basis=site.get("basis"))
+            if result.get("basis") is not None:
+                site["basis"] = result["basis"]
+        else:
+            result = solve_highs(site["c"], site["A_ub"], b_ub, bounds=site["bounds"],
+                                 maximize=True)
+        if result["status"] == "Optimal":
+            results.append({"status": "Optimal", "x": result["x"],
+                            "objective": result["objective"],
+                            "price": max(float(result["duals_ub"][-1]), 0.0)})
+        else:
+            results.append({"status": result["status"]})
+    return results
+
+
+def _init_worker(sites: List[Dict]) -> None:
+    """Load the site subproblems once per worker process."""
+    global _worker_sites
+    _worker_sites = sites
+
+
+def _solve_worker_sites(indices: Sequence[int], deliveries: Sequence[float]) -> List[Dict]:
+    """Solve site subproblems inside a worker process."""
+    return _solve_sites(_worker_sites, indices, deliveries)
+
+
+class RefineryNetworkOptimizer(LPOptimizer):
+    """Optimize crude sourcing, transport and blending across refinery sites.
+
+    Nodes are numbered sources first, then terminals, then sites. Arcs run
+    from a source or terminal to a terminal or site; terminals conserve
+    flow, sources are limited by their supply, and each site refines at
+    most the crude that arrives on its incoming arcs. The objective is the
+    sum of the site blending profits, less the crude purchase cost (paid on
+    arcs leaving a source) and the transport cost of every arc.
+
+    Changes made to a site optimizer after construction are detected on
+    the next solve and rebuild the network model.
+
+    Attributes:
+        sites (List[OilRefiningOptimizer]): Site blending models
+        site_names (List[str]): Site names
+        sources (List[str]): Crude source names
+        terminals (List[str]): Terminal names
+        arcs (np.ndarray): (from_node, to_node) pairs, shape (L, 2)
+        crude_supply (np.ndarray): Barrels/day available at each source
+        crude_costs (np.ndarray): Cost per barrel at each source
+        arc_costs (np.ndarray): Transport cost per barrel on each arc
+        arc_capacities (np.ndarray): Barrels/day each arc can carry
+        method (str): "monolithic" or "benders"
+        workers (Optional[int]): Worker processes for the site subproblems
+        tol (float): Relative optimality gap at which Benders stops
+        max_iterations (int): Benders iteration limit
+        backend (Optional[str]): Solver backend, None for the global default
+    """
+
+    PARAMETERS = {
+        "sites": "rebuild",
+        "site_names": "rebuild",
+        "sources": "rebuild",
+        "terminals": "rebuild",
+        "arcs": "rebuild",
+        "crude_supply": "patch",
+        "crude_costs": "patch",
+        "arc_costs": "patch",
+        "arc_capacities": "patch",
+    }
+
+    def __init__(
+        self,
+        sites: Optional[Sequence[OilRefiningOptimizer]] = None,
+        site_names: Optional[List[str]] = None,
+        sources: Optional[List[str]] = None,
+        crude_supply=None,
+        crude_costs=0.0,
+        terminals: Optional[List[str]] = None,
+        arcs: Optional[np.ndarray] = None,
+        arc_costs=0.0,
+        arc_capacities=np.inf,
+        method: str = "monolithic",
+        workers: Optional[int] = None,
+        tol: float = 1e-6,
+        max_iterations: int = 100,
+        backend: Optional[str] = None,
+    ):
+        """Initialize the Refinery Network Optimizer.
+
+        Args:
+            sites: Site blending models; their ``crude_capacity`` remains a
+                processing limit. Defaults to two sites sharing two sources
+            site_names: Site names (default Site_1, ...)
+            sources: Crude source names (default Crude_1, ...)
+            crude_supply: Barrels/day available at each source (default
+                unlimited)
+            crude_costs: Cost per barrel at each source
+            terminals: Terminal names (default none)
+            arcs: Array of (from_node, to_node) index pairs, shape (L, 2);
+                default ships from every source to every site
+            arc_costs: Transport cost per barrel, broadcast to (L,)
+            arc_capacities: Barrels/day each arc can carry, broadcast to (L,)
+            method: "monolithic" solves one LP; "benders" decomposes the
+                network into a transport master problem and one blending
+                subproblem per site
+            workers: Worker processes for the Benders site subproblems;
+                None or 1 solves them in this process
+            tol: Relative optimality gap at which Benders stops
+            max_iterations: Benders iteration limit
+            backend: Solver backend name (see solver_utils.SOLVER_BACKENDS);
+                None uses the global default. Benders solves its master
+                problem with HiGHS and the site subproblems with HiGHS, or
+                with the dense kernel when ``backend`` is "dense"
+        """
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {METHODS}, got '{method}'")
+        if workers is not None and workers < 1:
+            raise ValueError("workers must be at least 1")
+
+        # Default: a large and a small refinery sharing two crude sources
+        if sites is None:
+            sites = [OilRefiningOptimizer(backend=backend),
+                     OilRefiningOptimizer(crude_capacity=600_000, cracker_capacity=120_000,
+                                          backend=backend)]
+            if crude_supply is None:
+                crude_supply = [1_000_000, 800_000]
+            if np.ndim(crude_costs) == 0 and crude_costs == 0.0:
+                crude_costs = [0.45, 0.60]
+            if arcs is None and np.ndim(arc_costs) == 0 and arc_costs == 0.0:
+                arc_costs = [0.05, 0.20, 0.25, 0.05]
+
+        self.sites = list(sites)
+        self.site_names = site_names or [f"Site_{s}" for s in range(1, len(self.sites) + 1)]
+        K = len(sources) if sources is not None else (
+            np.size(crude_supply) if crude_supply is not None else 1)
+        self.sources = sources or [f"Crude_{k}" for k in range(1, K + 1)]
+        self.terminals = list(terminals or [])
+        K, M, S = len(self.sources), len(self.terminals), len(self.sites)
+        if arcs is None:
+            arcs = [(k, K + M + s) for k in range(K) for s in range(S)]
+        self.arcs = np.asarray(arcs, dtype=np.int64).reshape(-1, 2)
+
+        if len(self.site_names) != S:
+            raise ValueError("site_names must have one name per site")
+        if not all(isinstance(site, OilRefiningOptimizer) for site in self.sites):
+            raise ValueError("sites must be OilRefiningOptimizer instances")
+        if self.arcs.size and (self.arcs[:, 0].min() < 0 or self.arcs[:, 0].max() >= K + M
+                               or self.arcs[:, 1].min() < K or self.arcs[:, 1].max() >= K + M + S):
+            raise ValueError("Arcs must run from a source or terminal to a terminal or site")
+
+        self.crude_supply = crude_supply
+        self.crude_costs = crude_costs
+        self.arc_costs = arc_costs
+        self.arc_capacities = arc_capacities
+        self.method = method
+        self.workers = workers
+        self.tol = tol
+        self.max_iterations = max_iterations
+        self.backend = backend
+
+        self.model = None
+        self.program = None
+        self.variables = None
+        self.flow_vars = None
+        self.solution = None
+        self._site_offsets = None
+
+    @property
+    def num_nodes(self) -> int:
+        """Number of sources, terminals and sites."""
+        return len(self.sources) + len(self.terminals) + len(self.sites)
+
+    def _network_arrays(self) -> Dict[str, np.ndarray]:
+        """Per-source and per-arc parameters broadcast to their shapes."""
+        K, L = len(self.sources), len(self.arcs)
+        supply = (np.full(K, np.inf) if self.crude_supply is None
+                  else np.broadcast_to(np.asarray(self.crude_supply, dtype=float), (K,)))
+        crude_costs = np.broadcast_to(np.asarray(self.crude_costs, dtype=float), (K,))
+        arc_costs = np.broadcast_to(np.asarray(self.arc_costs, dtype=float), (L,))
+        capacities = np.broadcast_to(np.asarray(self.arc_capacities, dtype=float), (L,))
+
+        # Crude is paid for on the arcs that leave a source
+        tails = self.arcs[:, 0]
+        purchase = np.where(tails < K, crude_costs[np.minimum(tails, K - 1)], 0.0)
+        return {"supply": supply, "cost": arc_costs + purchase, "capacity": capacities,
+                "arc_costs": arc_costs, "purchase": purchase}
+
+    def _incidence(self) -> sparse.csr_matrix:
+        """Node-arc matrix of net inflow: +1 at the head, -1 at the tail."""
+        L = len(self.arcs)
+        arcs = np.arange(L)
+        return coo_rows(np.concatenate([self.arcs[:, 1], self.arcs[:, 0]]),
+                        np.concatenate([arcs, arcs]),
+                        np.concatenate([np.ones(L), -np.ones(L)]),
+                        (self.num_nodes, L))
+
+    def _site_programs(self) -> List[LinearProgram]:
+        """Compile every site, checking that its first row is the crude limit."""
+        programs = [site.compile_model() for site in self.sites]
+        for name, program in zip(self.site_names, programs):
+            if program.ub_names[0] != "Crude_Capacity":
+                raise ValueError(f"Site {name} must be a single-day blending model")
+        return programs
+
+    def compile_model(self) -> LinearProgram:
+        """Compile the whole network into one sparse LP.
+
+        Site variables come first, site by site in their own order, followed
+        by one flow variable per arc. Site rows form a block-diagonal matrix;
+        below it are the crude delivery rows (crude used minus crude received
+        at each site) and the supply rows of the limited sources, and the
+        terminal balances are the equality rows.
+
+        Returns:
+            LinearProgram: The compiled LP model
+        """
+        programs = self._site_programs()
+        K, M = len(self.sources), len(self.terminals)
+        net = self._network_arrays()
+        flow = self._incidence()
+        L = len(self.arcs)
+        widths = [program.num_vars for program in programs]
+        offsets = np.concatenate([[0], np.cumsum(widths)])
+        self._site_offsets = offsets
+
+        # Crude used by each site (its crude capacity row) against the crude it receives
+        crude_rows = sparse.block_diag([program.A_ub[0] for program in programs], format="csr")
+        limited = np.flatnonzero(np.isfinite(net["supply"]))
+        A_ub = sparse.vstack([
+            sparse.hstack([sparse.block_diag([program.A_ub for program in programs]),
+                           sparse.csr_matrix((sum(p.A_ub.shape[0] for p in programs), L))]),
+            sparse.hstack([crude_rows, -flow[K + M:]]),
+            sparse.hstack([sparse.csr_matrix((len(limited), offsets[-1])), -flow[limited]]),
+        ], format="csr")
+        b_ub = np.concatenate([program.b_ub for program in programs]
+                              + [np.zeros(len(programs)), net["supply"][limited]])
+        A_eq = sparse.hstack([sparse.csr_matrix((M, offsets[-1])), flow[K:K + M]], format="csr")
+
+        nodes = self.sources + self.terminals + self.site_names
+        return LinearProgram(
+            np.concatenate([program.c for program in programs] + [-net["cost"]]),
+            A_ub=A_ub,
+            b_ub=b_ub,
+            A_eq=A_eq,
+            b_eq=np.zeros(M),
+            upper=np.concatenate([program.upper for program in programs] + [net["capacity"]]),
+            maximize=True,
+            name="Refinery_Network_Optimization",
+            var_names=lambda: (
+                [f"{site}_{name}" for site, program in zip(self.site_names, programs)
+                 for name in program.var_names]
+                + [f"flow_{nodes[a]}_{nodes[b]}" for a, b in self.arcs]),
+            ub_names=lambda: (
+                [f"{site}_{name}" for site, program in zip(self.site_names, programs)
+                 for name in program.ub_names]
+                + [f"Crude_Delivered_{site}" for site in self.site_names]
+                + [f"Supply_{self.sources[k]}" for k in limited]),
+            eq_names=lambda: [f"Balance_{terminal}" for terminal in self.terminals],
+        )
+
+    def _same_layout(self, old: LinearProgram, new: LinearProgram) -> bool:
+        """Sources that become limited or unlimited change the rows."""
+        return super()._same_layout(old, new) and old.ub_names == new.ub_names
+
+    def _bind_variables(self, variables: List[LpVariable]) -> None:
+        """Expose exported PuLP variables per site and as the list of arc flows."""
+        offsets = self._site_offsets
+        self.variables = {
+            name: variables[offsets[s]:offsets[s + 1]] for s, name in enumerate(self.site_names)
+        }
+        self.flow_vars = variables[offsets[-1]:]
+
+    def _network_solution(self, site_x: Sequence[np.ndarray], site_c: Sequence[np.ndarray],
+                          flows: np.ndarray) -> Dict:
+        """Build the solution dictionary from site blends, their objectives and arc flows."""
+        K, M = len(self.sources), len(self.terminals)
+        net = self._network_arrays()
+        inflow = self._incidence() @ flows
+        site_profit = np.array([c @ x for c, x in zip(site_c, site_x)])
+
+        purchased = np.bincount(self.arcs[:, 0], weights=flows, minlength=K + M)[:K]
+        crude_cost = float(net["purchase"] @ flows)
+        transport_cost = float(net["arc_costs"] @ flows)
+        return {
+            "sites": {
+                name: site._extract_solution(x, float(profit))
+                for name, site, x, profit in zip(self.site_names, self.sites, site_x, site_profit)
+            },
+            "flows": flows,
+            "crude_purchased": purchased,
+            "crude_delivered": inflow[K + M:],
+            "site_profit": site_profit,
+            "crude_cost": crude_cost,
+            "transport_cost": transport_cost,
+            "total_profit": float(site_profit.sum()) - crude_cost - transport_cost,
+        }
+
+    def _extract_solution(self, x: np.ndarray, objective: float) -> Dict:
+        """Split the monolithic primal vector into sites and flows."""
+        offsets = self._site_offsets
+        blocks = [slice(offsets[s], offsets[s + 1]) for s in range(len(self.sites))]
+        return self._network_solution([np.maximum(x[block], 0.0) for block in blocks],
+                                      [self.program.c[block] for block in blocks],
+                                      np.maximum(x[offsets[-1]:], 0.0))
+
+    def _cache_parameters(self) -> Dict:
+        """Network parameters and the parameters of every site."""
+        parameters = {name: getattr(self, name) for name in self.PARAMETERS if name != "sites"}
+        parameters["sites"] = [(type(site).__name__, site._cache_parameters())
+                               for site in self.sites]
+        return parameters
+
+    def _cache_options(self) -> Dict:
+        """Benders stops at a gap, so the tolerance is part of the key."""
+        options = super()._cache_options()
+        if self.method == "benders":
+            options["tol"] = self.tol
+        return options
+
+    def _solve(self) -> Dict:
+        """Solve the network as one LP or by Benders decomposition.
+
+        Returns:
+            Dictionary containing solution details
+        """
+        if self.method == "monolithic" or self._has_user_model():
+            return super()._solve()
+        return self._solve_benders()
+
+    def _solve_benders(self) -> Dict:
+        """Solve the network by Benders decomposition.
+
+        The master problem chooses arc flows and a profit estimate
+        ``theta[s]`` for each site, bounded by cuts
+        ``theta[s] <= profit[s](r_k) + price[s](r_k) * (r[s] - r_k)`` from
+        earlier site solutions at deliveries ``r_k``. Each site's profit is
+        concave in its delivered crude, so the cuts are valid and the master
+        objective is an upper bound; the network evaluated at the master's
+        flows gives a lower bound. Cuts are added per site until the bounds
+        meet within ``tol``.
+
+        Returns:
+            Dictionary containing solution details, plus ``iterations``,
+            ``bound`` and ``gap``
+        """
+        self._mark_compiled()
+        programs = self._site_programs()
+        K, M, S = len(self.sources), len(self.terminals), len(self.sites)
+        L = len(self.arcs)
+        net = self._network_arrays()
+        flow = self._incidence()
+        delivered = flow[K + M:]
+        limited = np.flatnonzero(np.isfinite(net["supply"]))
+        backend = "dense" if self.backend == "dense" else "highs"
+
+        # Each subproblem is the site LP plus a row limiting crude use to the delivery
+        subproblems = [{
+            "c": program.c,
+            "A_ub": sparse.vstack([program.A_ub, program.A_ub[0]], format="csr"),
+            "b_ub": np.append(program.b_ub, 0.0),
+            "bounds": program.bounds,
+            "backend": backend,
+        } for program in programs]
+
+        pool = None
+        workers = min(self.workers or 1, S)
+        if workers > 1:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                       initargs=(subproblems,))
+
+        # Sites whose delivery did not change keep their last solution
+        last_r, last = np.full(S, np.nan), [None] * S
+
+        def evaluate(r):
+            changed = np.flatnonzero(~np.isclose(r, last_r, rtol=1e-12, atol=0.0))
+            if pool is None or len(changed) < 2 * workers:
+                results = _solve_sites(subproblems, changed, r[changed])
+            else:
+                futures = [pool.submit(_solve_worker_sites, chunk, r[chunk])
+                           for chunk in np.array_split(changed, workers)]
+                results = [result for future in futures for result in future.result()]
+            for s, result in zip(changed, results):
+                last_r[s], last[s] = r[s], result
+            return list(last)
+
+        def all_optimal(results):
+            failed = [result["status"] for result in results if result["status"] != "Optimal"]
+            if failed:
+                self.solution = self._failure_solution(failed[0])
+            return not failed
+
+        try:
+            # Opening cuts at no crude and at each site's full crude capacity
+            full = np.array([program.b_ub[0] for program in programs])
+            full = np.where(np.isfinite(full), full, net["supply"][limited].sum())
+            cuts = []
+            for r in (np.zeros(S), full):
+                results = evaluate(r)
+                if not all_optimal(results):
+                    return self.solution
+                cuts.extend((s, result["objective"], result["price"], r[s])
+                            for s, result in enumerate(results))
+
+            best, best_solution = -np.inf, None
+            bound = np.inf
+            for iteration in range(1, self.max_iterations + 1):
+                # Master: maximize sum(theta) - arc costs, variables [flows, theta]
+                site, value, price, point = map(np.array, zip(*cuts))
+                A_cut = sparse.hstack([
+                    sparse.diags(-price) @ delivered[site],
+                    coo_rows(np.arange(len(cuts)), site, 1.0, (len(cuts), S)),
+                ])
+                A_ub = sparse.vstack([
+                    sparse.hstack([-flow[limited], sparse.csr_matrix((len(limited), S))]),
+                    A_cut,
+                ], format="csr")
+                b_ub = np.concatenate([net["supply"][limited], value - price * point])
+                A_eq = sparse.hstack([flow[K:K + M], sparse.csr_matrix((M, S))], format="csr")
+                bounds = np.vstack([np.column_stack([np.zeros(L), net["capacity"]]),
+                                    np.column_stack([np.full(S, -np.inf), np.full(S, np.inf)])])
+                master = solve_highs(np.concatenate([-net["cost"], np.ones(S)]), A_ub, b_ub,
+                                     A_eq, np.zeros(M), bounds, maximize=True)
+                if master["status"] != "Optimal":
+                    self.solution = self._failure_solution(master["status"])
+                    return self.solution
+
+                flows = np.maximum(master["x"][:L], 0.0)
+                theta = master["x"][L:]
+                r = delivered @ flows
+                results = evaluate(r)
+                if not all_optimal(results):
+                    return self.solution
+                profits = np.array([result["objective"] for result in results])
+                bound = min(bound, master["objective"])
+                lower = float(profits.sum() - net["cost"] @ flows)
+                if lower > best:
+                    best = lower
+                    best_solution = [np.maximum(result["x"], 0.0) for result in results], flows
+                if bound - best <= self.tol * max(1.0, abs(bound)):
+                    break
+
+                scale = self.tol * np.maximum(1.0, np.abs(profits))
+                cuts.extend((s, results[s]["objective"], results[s]["price"], r[s])
+                            for s in np.flatnonzero(theta > profits + scale))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        gap = max(bound - best, 0.0) / max(1.0, abs(bound))
+        self.solution = {"status": "Optimal" if gap <= self.tol else "Not Solved"}
+        site_x, flows = best_solution
+        self.solution.update(self._network_solution(
+            site_x, [program.c for program in programs], flows))
+        self.solution.update({"iterations": iteration, "bound": bound, "gap": gap})
+        self.solution["model"] = None
+        self.solution["program"] = None
+        return self.solution
+
+    def solve_batch(self, param_arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Not available for the network model."""
+        raise NotImplementedError("solve_batch is not available for the network model")
+
+    def print_summary(self):
+        """Print a formatted summary of the solution."""
+        if self.solution is None:
+            print("No solution available. Run solve() first.")
+            return
+
+        print("=" * 80)
+        print("REFINERY NETWORK OPTIMIZATION RESULTS")
+        print("=" * 80)
+        print(f"\nStatus: {self.solution['status']}")
+
+        if self.solution['status'] in ("Optimal", "Not Solved") and 'sites' in self.solution:
+            print(f"\nTotal Profit: ${self.solution['total_profit']:,.2f}")
+            print(f"  Crude Cost: ${self.solution['crude_cost']:,.2f}")
+            print(f"  Transport Cost: ${self.solution['transport_cost']:,.2f}")
+            if 'iterations' in self.solution:
+                print(f"Benders iterations: {self.solution['iterations']} "
+                      f"(gap {self.solution['gap']:.2e})")
+
+            print("\n" + "-" * 80)
+            print(f"{'Site':<16} {'Crude In':>15} {'Gasoline':>15} {'Blend Profit':>18}")
+            print("-" * 80)
+            for s, name in enumerate(self.site_names):
+                gasoline = self.solution['sites'][name]['blend'].sum()
+                print(f"{name:<16} {self.solution['crude_delivered'][s]:>15,.0f} "
+                      f"{gasoline:>15,.0f} ${self.solution['site_profit'][s]:>17,.2f}")
+
+            print("\n" + "-" * 80)
+            print(f"{'Source':<16} {'Purchased':>15}")
+            print("-" * 80)
+            for source, amount in zip(self.sources, self.solution['crude_purchased']):
+                print(f"{source:<16} {amount:>15,.0f}")
+            print("=" * 80)
+        else:
+            print(f"\nError: {self.solution.get('error', 'Unknown error')}")
+
+
+if __name__ == "__main__":
+    # Example usage
+    optimizer = RefineryNetworkOptimizer(backend="highs")
+    solution = optimizer.solve()
+    optimizer.print_summary()
@@ -0,0 +1,374 @@
+"""Multi-Day Refinery Scheduling Model.
+
+This module extends the single-day blending model to a daily schedule,
+typically a full year. Every day the refinery blends components into
+products subject to that day's crude and cracker capacity (zero during a
+maintenance outage), component supply and quality specs. Blended product
+goes into tanks, and sales are drawn from the tanks up to each day's
+demand, so product can be stored ahead of an outage or a seasonal peak.
+
+The time-expanded LP is assembled from the one-day blocks with Kronecker
+products: the per-day rows are block diagonal and the tank balances couple
+each day to the previous one, so the matrix stays sparse and its
+construction is vectorized over days.
+"""
+
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from scipy import sparse
+from pulp import LpVariable
+
+from .compiler import LinearProgram, coo_rows
+from .oil_refining import OilRefiningOptimizer
+from ..utils.solver_utils import get_default_backend
+
+
+METHODS = ("full", "rolling")
+
+
+class MultiDayRefiningOptimizer(OilRefiningOptimizer):
+    """Schedule blending, tank inventories and sales day by day.
+
+    Variables of day ``t`` are the blend ``x[t, c, p]``, sales ``s[t, p]``
+    and closing tank inventories ``I[t, p]``, linked by the tank balance
+    ``I[t, p] = I[t-1, p] + sum(x[t, :, p]) - s[t, p]``. The objective is
+    the profit over the horizon: margins on sales, less component costs and
+    tank holding costs.
+
+    Capacities may be scalars or one value per day; product-indexed
+    parameters may be given per product or per day and product, and
+    component-indexed parameters per component or per day and component.
+
+    Attributes:
+        num_days (int): Number of days scheduled
+        tank_capacity (np.ndarray): Tank capacity of each product (bbl)
+        initial_inventory (np.ndarray): Opening tank inventory of each product
+        holding_costs (np.ndarray): Cost per barrel and day in tank
+        method (str): "full" (one LP) or "rolling" (rolling horizon)
+        window (int): Days per rolling-horizon window
+        step (int): Days committed per rolling-horizon window
+    """
+
+    PARAMETERS = dict(
+        OilRefiningOptimizer.PARAMETERS,
+        num_days="rebuild",
+        tank_capacity="patch",
+        initial_inventory="patch",
+        holding_costs="patch",
+        window="patch",
+        step="patch",
+    )
+
+    def __init__(
+        self,
+        num_days: int = 365,
+        crude_capacity=1_500_000,
+        cracker_capacity=200_000,
+        octane_numbers: Optional[Dict] = None,
+        demand_limits=None,
+        profit_margins=None,
+        tank_capacity=np.inf,
+        initial_inventory=0.0,
+        holding_costs=0.0,
+        method: str = "full",
+        window: int = 28,
+        step: int = 7,
+        backend: Optional[str] = None,
+        **blending,
+    ):
+        """Initialize the Multi-Day Refining Optimizer.
+
+        Args:
+            num_days: Number of days to schedule
+            crude_capacity: Crude capacity (bbl/day), scalar or per day
+            cracker_capacity: Cracker capacity (bbl/day), scalar or per day
+            octane_numbers: Octane numbers for feedstock, cracker and products
+            demand_limits: Maximum daily sales of each product, per product
+                or per day and product (a dictionary may map products to
+                scalars or daily arrays)
+            profit_margins: Profit per barrel sold, per product or per day
+                and product
+            tank_capacity: Tank capacity of each product (default unlimited)
+            initial_inventory: Opening tank inventory of each product
+            holding_costs: Cost per barrel and day in tank, per product
+            method: "full" solves one LP over the horizon; "rolling" solves
+                windows of ``window`` days and commits the first ``step``
+                days of each
+            window: Days per rolling-horizon window
+            step: Days committed per rolling-horizon window
+            backend: Solver backend name; None uses the global default
+            **blending: Components, products, qualities, properties, specs,
+                usages, supplies and costs as for OilRefiningOptimizer;
+                ``component_supply`` and ``component_costs`` may also be
+                given per day and component
+        """
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {METHODS}, got '{method}'")
+        if not 0 < step <= window:
+            raise ValueError("step must be positive and no larger than window")
+        if num_days < 1:
+            raise ValueError("num_days must be at least 1")
+        self.num_days = num_days
+        super().__init__(
+            crude_capacity=crude_capacity,
+            cracker_capacity=cracker_capacity,
+            octane_numbers=octane_numbers,
+            demand_limits=demand_limits,
+            profit_margins=profit_margins,
+            backend=backend,
+            **blending,
+        )
+        if self.assays is not None:
+            raise ValueError("Crude slate selection is not available in the multi-day model")
+        self.tank_capacity = tank_capacity
+        self.initial_inventory = initial_inventory
+        self.holding_costs = holding_costs
+        self.method = method
+        self.window = window
+        self.step = step
+
+    def _daily(self, values, labels: Sequence[str], default: float, name: str) -> np.ndarray:
+        """A parameter as a (num_days, len(labels)) array.
+
+        Accepts None (``default``), one value per label, one row per day or
+        a dictionary mapping labels to scalars or daily arrays.
+        """
+        D, n = self.num_days, len(labels)
+        if values is None:
+            return np.full((D, n), default)
+        if isinstance(values, dict):
+            missing = [label for label in labels if label not in values]
+            if missing:
+                raise ValueError(f"{name} has no value for {missing}")
+            values = np.column_stack([np.broadcast_to(np.asarray(values[label], dtype=float), (D,))
+                                      for label in labels])
+        array = np.asarray(values, dtype=float)
+        if array.shape not in ((), (n,), (D, n)):
+            raise ValueError(f"{name} must have shape ({n},) or ({D}, {n}), got {array.shape}")
+        return np.broadcast_to(array, (D, n))
+
+    def _capacity(self, values, name: str) -> np.ndarray:
+        """A capacity as one value per day."""
+        array = np.asarray(values, dtype=float)
+        if array.shape not in ((), (self.num_days,)):
+            raise ValueError(f"{name} must be a scalar or have one value per day")
+        return np.broadcast_to(array, (self.num_days,))
+
+    def _compile_window(self, start: int, length: int, opening: np.ndarray) -> LinearProgram:
+        """Compile the LP for days ``start`` to ``start + length - 1``.
+
+        Variables of day ``s`` occupy columns ``s * W`` to ``(s + 1) * W - 1``
+        with ``W = C * P + 2 * P``: the blend, then sales, then inventories.
+        ``opening`` holds the tank inventories before the first day.
+        """
+        components, products = self.components, self.products
+        C, P, T = len(components), len(products), length
+        CP = C * P
+        days = slice(start, start + T)
+
+        crude = self._per_component(self.crude_usage, 0.0, "crude_usage")
+        cracker = self._per_component(self.cracker_usage, 0.0, "cracker_usage")
+        supply = self._daily(self.component_supply, components, np.inf, "component_supply")
+        limited = np.flatnonzero(np.isfinite(supply).any(axis=0))
+        matrices = self._quality_matrices()
+        quality_rows, quality_names = self._cached_block(
+            "quality", matrices, lambda: self._quality_block(*matrices))
+
+        # One day's rows over the blend columns; sales and tanks are unused
+        day_rows = sparse.vstack([
+            sparse.csr_matrix(np.repeat(np.vstack([crude, cracker]), P, axis=1)),
+            coo_rows(np.repeat(np.arange(len(limited)), P),
+                     limited[:, np.newaxis] * P + np.arange(P), 1.0, (len(limited), CP)),
+            quality_rows,
+        ])
+        day_rows = sparse.hstack([day_rows, sparse.csr_matrix((day_rows.shape[0], 2 * P))])
+        A_ub = sparse.kron(sparse.identity(T), day_rows, format="csr")
+        b_ub = np.column_stack([
+            self._capacity(self.crude_capacity, "crude_capacity")[days],
+            self._capacity(self.cracker_capacity, "cracker_capacity")[days],
+            supply[days][:, limited],
+            np.zeros((T, quality_rows.shape[0])),
+        ]).ravel()
+
+        # Tank balance: I[t] - I[t-1] - sum_c x[t, c] + s[t] = 0
+        blended = sparse.hstack([sparse.identity(P)] * C)
+        today = sparse.hstack([-blended, sparse.identity(P), sparse.identity(P)])
+        yesterday = sparse.hstack([sparse.csr_matrix((P, CP + P)), -sparse.identity(P)])
+        A_eq = (sparse.kron(sparse.identity(T), today)
+                + sparse.kron(sparse.eye(T, k=-1), yesterday)).tocsr()
+        b_eq = np.zeros(T * P)
+        b_eq[:P] = opening
+
+        margins = self._daily(self.profit_margins, products, 0.0, "profit_margins")[days]
+        costs = self._daily(self.component_costs, components, 0.0, "component_costs")[days]
+        holding = self._daily(self.holding_costs, products, 0.0, "holding_costs")[days]
+        c = np.hstack([np.repeat(-costs, P, axis=1), margins, -holding]).ravel()
+
+        demand = self._daily(self.demand_limits, products, np.inf, "demand_limits")[days]
+        tanks = self._daily(self.tank_capacity, products, np.inf, "tank_capacity")[days]
+        upper = np.hstack([np.full((T, CP), np.inf), demand, tanks]).ravel()
+
+        names = (["Crude_Capacity", "Cracker_Capacity"]
+                 + [f"Supply_{components[k]}" for k in limited] + quality_names)
+        return LinearProgram(
+            c,
+            A_ub=A_ub,
+            b_ub=b_ub,
+            A_eq=A_eq,
+            b_eq=b_eq,
+            upper=upper,
+            maximize=True,
+            name="Refinery_Schedule",
+            var_names=lambda: [
+                name
+                for t in range(start, start + T)
+                for name in ([f"x_{comp}_{prod}_{t}" for comp in components for prod in products]
+                             + [f"sales_{prod}_{t}" for prod in products]
+                             + [f"tank_{prod}_{t}" for prod in products])
+            ],
+            ub_names=lambda: [f"{name}_{t}" for t in range(start, start + T) for name in names],
+            eq_names=lambda: [f"Tank_Balance_{prod}_{t}"
+                              for t in range(start, start + T) for prod in products],
+        )
+
+    def _opening_inventory(self) -> np.ndarray:
+        """Tank inventories before the first day."""
+        opening = np.broadcast_to(np.asarray(self.initial_inventory, dtype=float),
+                                  (len(self.products),))
+        if (opening < 0).any():
+            raise ValueError("initial_inventory must be non-negative")
+        return opening
+
+    def compile_model(self) -> LinearProgram:
+        """Compile the full-horizon model into sparse matrix form.
+
+        Returns:
+            LinearProgram: The compiled LP model
+        """
+        return self._compile_window(0, self.num_days, self._opening_inventory())
+
+    def _bind_variables(self, variables: List[LpVariable]) -> None:
+        """Expose exported PuLP variables as ``variables[day]``, one list per day."""
+        W = len(self.components) * len(self.products) + 2 * len(self.products)
+        self.variables = [variables[t * W:(t + 1) * W] for t in range(self.num_days)]
+
+    def _schedule_solution(self, x: np.ndarray) -> Dict:
+        """Build the solution dictionary from the day-major primal vector."""
+        C, P, D = len(self.components), len(self.products), self.num_days
+        days = x.reshape(D, C * P + 2 * P)
+        blend = np.maximum(days[:, :C * P], 0.0).reshape(D, C, P)
+        sales = np.maximum(days[:, C * P:C * P + P], 0.0)
+        inventory = np.maximum(days[:, C * P + P:], 0.0)
+
+        margins = self._daily(self.profit_margins, self.products, 0.0, "profit_margins")
+        costs = self._daily(self.component_costs, self.components, 0.0, "component_costs")
+        holding = self._daily(self.holding_costs, self.products, 0.0, "holding_costs")
+        daily_profit = ((margins * sales).sum(axis=1)
+                        - (costs * blend.sum(axis=2)).sum(axis=1)
+                        - (holding * inventory).sum(axis=1))
+
+        totals = blend.sum(axis=0)
+        production = {
+            product: dict(
+                {component: float(totals[k, i]) for k, component in enumerate(self.components)},
+                total=float(totals[:, i].sum()),
+            )
+            for i, product in enumerate(self.products)
+        }
+        return {
+            "production": production,
+            "blend": blend,
+            "sales": sales,
+            "inventory": inventory,
+            "daily_profit": daily_profit,
+            "total_profit": float(daily_profit.sum()),
+        }
+
+    def _extract_solution(self, x: np.ndarray, objective: float) -> Dict:
+        """Build the solution dictionary from the full-horizon LP."""
+        return self._schedule_solution(x)
+
+    def _solve(self) -> Dict:
+        """Solve the full LP, or a rolling sequence of window LPs.
+
+        The rolling horizon solves ``window`` days at a time, commits the
+        first ``step`` days and carries their closing tank inventories into
+        the next window.
+
+        Returns:
+            Dictionary containing solution details
+        """
+        if self.method == "full" or self._has_user_model():
+            return super()._solve()
+
+        P, D = len(self.products), self.num_days
+        W = len(self.components) * P + 2 * P
+        backend = self.backend or get_default_backend()
+        x = np.zeros(D * W)
+        opening = self._opening_inventory()
+        self._mark_compiled()
+
+        start = 0
+        while start < D:
+            length = min(self.window, D - start)
+            commit = length if start + length == D else min(self.step, length)
+            self.program = self._compile_window(start, length, opening)
+            result = self.program.solve(backend)
+            if result["status"] != "Optimal":
+                self.solution = self._failure_solution(result["status"])
+                return self.solution
+
+            x[start * W:(start + commit) * W] = result["x"][:commit * W]
+            opening = np.maximum(result["x"][commit * W - P:commit * W], 0.0)
+            start += commit
+
+        self.solution = {"status": "Optimal"}
+        self.solution.update(self._schedule_solution(x))
+        self.solution["model"] = None
+        self.solution["program"] = self.program
+        return self.solution
+
+    def solve_batch(self, param_arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Not available for the multi-day model."""
+        raise NotImplementedError("solve_batch is not available for the multi-day model")
+
+    def print_summary(self):
+        """Print a formatted summary of the solution."""
+        if self.solution is None:
+            print("No solution available. Run solve() first.")
+            return
+
+        print("=" * 80)
+        print("REFINERY SCHEDULE OPTIMIZATION RESULTS")
+        print("=" * 80)
+        print(f"\nStatus: {self.solution['status']}")
+
+        if self.solution['status'] == "Optimal":
+            daily = self.solution['daily_profit']
+            print(f"\nDays: {self.num_days} ({self.method})")
+            print(f"Total Profit: ${self.solution['total_profit']:,.2f}")
+            print(f"Daily Profit: ${daily.min():,.2f} to ${daily.max():,.2f} "
+                  f"(mean ${daily.mean():,.2f})")
+
+            print("\n" + "-" * 80)
+            print(f"{'Product':<12} {'Blended':>15} {'Sold':>15} "
+                  f"{'Peak Tank':>15} {'Closing Tank':>15}")
+            print("-" * 80)
+            for i, product in enumerate(self.products):
+                inventory = self.solution['inventory'][:, i]
+                print(f"{product.capitalize():<12} "
+                      f"{self.solution['production'][product]['total']:>15,.0f} "
+                      f"{self.solution['sales'][:, i].sum():>15,.0f} "
+                      f"{inventory.max():>15,.0f} {inventory[-1]:>15,.0f}")
+            print("=" * 80)
+        else:
+            print(f"\nError: {self.solution.get('error', 'Unknown error')}")
+
+
+if __name__ == "__main__":
+    # Example usage: a two-week cracker turnaround in spring
+    cracker = np.full(365, 200_000.0)
+    cracker[90:104] = 0.0
+    optimizer = MultiDayRefiningOptimizer(cracker_capacity=cracker, tank_capacity=300_000)
+    solution = optimizer.solve()
+    optimizer.print_summary()
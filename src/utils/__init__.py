@@ -1,11 +1,59 @@
 """Utility functions for optimization models."""
 
-from .solver_utils import validate_solution, get_solver_status
+from .solver_utils import (
+    validate_solution,
+    get_solver_status,
+    solve_model,
+    set_default_backend,
+    set_default_options,
+    SolverOptions,
+    register_backend,
+    available_backends,
+)
+from .calibration import calibrate, select_backend
+from .metrics import (
+    InMemoryMetrics,
+    JsonLinesMetrics,
+    PrometheusMetrics,
+    set_default_metrics_sink,
+)
+from .solution_export import SolutionArrays, export_solution_arrays
+from .sensitivity import get_sensitivity_report
 from .validation import validate_inputs, check_constraints
+from .batch_lp import solve_lp_batch
+from .min_cost_flow import min_cost_flow
+from .cache import SolveCache, set_default_cache
+from .parametric import parametric_rhs
+from .branch_bound import branch_and_bound
+from .assays import AssayLibrary
+from .slp import successive_lp
 
 __all__ = [
     "validate_solution",
     "get_solver_status",
+    "solve_model",
+    "set_default_backend",
+    "set_default_options",
+    "SolverOptions",
+    "register_backend",
+    "available_backends",
+    "calibrate",
+    "select_backend",
+    "SolutionArrays",
+    "export_solution_arrays",
+    "get_sensitivity_report",
     "validate_inputs",
     "check_constraints",
+    "solve_lp_batch",
+    "min_cost_flow",
+    "SolveCache",
+    "set_default_cache",
+    "InMemoryMetrics",
+    "JsonLinesMetrics",
+    "PrometheusMetrics",
+    "set_default_metrics_sink",
+    "parametric_rhs",
+    "branch_and_bound",
+    "AssayLibrary",
+    "successive_lp",
 ]
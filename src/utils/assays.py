@@ -0,0 +1,195 @@
+"""Crude assay library for crude-slate selection.
+
+An assay describes what one barrel of a crude yields: the fraction that
+ends up in each blending component (straight-run naphtha, reformate,
+cracker feed, ...) and crude-level qualities such as API gravity or
+sulfur. The library holds all assays as dense NumPy arrays, one row per
+crude, with a dictionary from crude ID to row, so selecting the yields of a
+slate is a single fancy-indexing step.
+
+Assays are read from a CSV or Parquet table with one row per crude: a
+``crude_id`` column, one ``yield_<component>`` column per component and
+any number of numeric quality columns.
+"""
+
+import csv
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+
+# Column holding the crude identifier, and the prefix marking yield columns
+ID_COLUMN = "crude_id"
+YIELD_PREFIX = "yield_"
+
+
+class AssayLibrary:
+    """Yields and qualities of many crudes, indexed by crude ID.
+
+    Attributes:
+        crude_ids (List[str]): Crude identifiers in row order
+        components (List[str]): Blending components in yield column order
+        qualities (List[str]): Crude qualities in column order
+        yields (np.ndarray): Component yield per barrel of crude, shape (N, C)
+        properties (np.ndarray): Crude qualities, shape (N, Q)
+    """
+
+    def __init__(
+        self,
+        crude_ids: Sequence[str],
+        components: Sequence[str],
+        yields: np.ndarray,
+        qualities: Optional[Sequence[str]] = None,
+        properties: Optional[np.ndarray] = None,
+    ):
+        """Initialize the assay library.
+
+        Args:
+            crude_ids: Unique crude identifiers
+            components: Blending component names
+            yields: Component yield per barrel of crude, shape (N, C);
+                each row sums to at most 1
+            qualities: Crude quality names (default none)
+            properties: Crude qualities, shape (N, Q)
+        """
+        self.crude_ids = [str(crude) for crude in crude_ids]
+        self.components = list(components)
+        self.qualities = list(qualities or [])
+        N, C, Q = len(self.crude_ids), len(self.components), len(self.qualities)
+        self.yields = np.ascontiguousarray(yields, dtype=float)
+        self.properties = (np.zeros((N, 0)) if properties is None
+                           else np.ascontiguousarray(properties, dtype=float))
+
+        if self.yields.shape != (N, C):
+            raise ValueError(f"yields must have shape ({N}, {C}), got {self.yields.shape}")
+        if self.properties.shape != (N, Q):
+            raise ValueError(f"properties must have shape ({N}, {Q}), got {self.properties.shape}")
+        if not np.isfinite(self.yields).all() or (self.yields < 0).any():
+            raise ValueError("yields must be finite and non-negative")
+        if (self.yields.sum(axis=1) > 1 + 1e-9).any():
+            raise ValueError("The yields of a crude cannot sum to more than 1")
+        self._index = {crude: row for row, crude in enumerate(self.crude_ids)}
+        if len(self._index) != N:
+            raise ValueError("crude_ids must be unique")
+
+    def __len__(self) -> int:
+        """Number of crudes in the library."""
+        return len(self.crude_ids)
+
+    def __contains__(self, crude_id: str) -> bool:
+        """Whether the library has an assay for ``crude_id``."""
+        return crude_id in self._index
+
+    def index(self, crude_ids: Sequence[str]) -> np.ndarray:
+        """Rows of the given crudes.
+
+        Args:
+            crude_ids: Crude identifiers
+
+        Returns:
+            Row indices into ``yields`` and ``properties``
+        """
+        missing = [crude for crude in crude_ids if crude not in self._index]
+        if missing:
+            raise ValueError(f"No assay for crudes {missing}")
+        return np.array([self._index[crude] for crude in crude_ids], dtype=np.int64)
+
+    def select(self, crude_ids: Optional[Sequence[str]] = None,
+               components: Optional[Sequence[str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Yields and qualities of a crude slate.
+
+        Args:
+            crude_ids: Crudes to select (default all)
+            components: Components to return yields for, in this order;
+                components the library does not know yield zero
+
+        Returns:
+            Tuple of yields (K, len(components)) and properties (K, Q)
+        """
+        rows = np.arange(len(self)) if crude_ids is None else self.index(crude_ids)
+        yields = self.yields[rows]
+        if components is not None:
+            columns = {component: j for j, component in enumerate(self.components)}
+            selected = np.zeros((len(rows), len(components)))
+            for k, component in enumerate(components):
+                if component in columns:
+                    selected[:, k] = yields[:, columns[component]]
+            yields = selected
+        return yields, self.properties[rows]
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Sequence]) -> "AssayLibrary":
+        """Build a library from a table given as columns.
+
+        Args:
+            columns: Mapping of column name to values, with a ``crude_id``
+                column, ``yield_<component>`` columns and quality columns
+
+        Returns:
+            AssayLibrary
+        """
+        if ID_COLUMN not in columns:
+            raise ValueError(f"Assay table needs a '{ID_COLUMN}' column")
+        yield_columns = [name for name in columns if name.startswith(YIELD_PREFIX)]
+        quality_columns = [name for name in columns
+                           if name != ID_COLUMN and not name.startswith(YIELD_PREFIX)]
+        N = len(columns[ID_COLUMN])
+
+        def matrix(names: List[str]) -> np.ndarray:
+            if not names:
+                return np.zeros((N, 0))
+            return np.column_stack([np.asarray(columns[name], dtype=float) for name in names])
+
+        return cls(
+            crude_ids=list(columns[ID_COLUMN]),
+            components=[name[len(YIELD_PREFIX):] for name in yield_columns],
+            yields=matrix(yield_columns),
+            qualities=quality_columns,
+            properties=matrix(quality_columns),
+        )
+
+    @classmethod
+    def from_csv(cls, path: str) -> "AssayLibrary":
+        """Load a library from a CSV file with a header row.
+
+        Args:
+            path: CSV file path
+
+        Returns:
+            AssayLibrary
+        """
+        with open(path, newline="") as handle:
+            reader = csv.reader(handle)
+            header = [name.strip() for name in next(reader)]
+            rows = [row for row in reader if row]
+        values = list(zip(*rows)) if rows else [()] * len(header)
+        return cls.from_columns(dict(zip(header, values)))
+
+    @classmethod
+    def from_parquet(cls, path: str) -> "AssayLibrary":
+        """Load a library from a Parquet file (requires pyarrow).
+
+        Args:
+            path: Parquet file path
+
+        Returns:
+            AssayLibrary
+        """
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Reading Parquet assay files requires pyarrow") from e
+        return cls.from_columns(pq.read_table(path).to_pydict())
+
+    def to_csv(self, path: str) -> None:
+        """Write the library as a CSV file that ``from_csv`` reads back.
+
+        Args:
+            path: CSV file path
+        """
+        with open(path, "w", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow([ID_COLUMN] + [YIELD_PREFIX + c for c in self.components]
+                            + self.qualities)
+            for crude, yields, properties in zip(self.crude_ids, self.yields, self.properties):
+                writer.writerow([crude] + [repr(v) for v in yields.tolist()]
+                                + [repr(v) for v in properties.tolist()])
@@ -0,0 +1,648 @@
+"""Batched dense simplex kernel for small linear programs.
+
+This module solves many small LPs of identical shape in a single vectorized
+call. Every instance is written in standard form with slack and artificial
+columns and the tableaus are stacked into one NumPy array, so each simplex
+pivot is applied to all unfinished instances at once. No solver process is
+spawned and no files are written, which makes the kernel well suited to
+large what-if sweeps over the models in this package.
+"""
+
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+from .metrics import matrix_dimensions, timed_solver
+
+
+# Status codes follow scipy.optimize.linprog
+STATUS_OPTIMAL = 0
+STATUS_ITERATION_LIMIT = 1
+STATUS_INFEASIBLE = 2
+STATUS_UNBOUNDED = 3
+
+# Status names follow pulp.LpStatus so results read like the PuLP models
+STATUS_NAMES = {
+    STATUS_OPTIMAL: "Optimal",
+    STATUS_ITERATION_LIMIT: "Not Solved",
+    STATUS_INFEASIBLE: "Infeasible",
+    STATUS_UNBOUNDED: "Unbounded",
+}
+
+
+def status_names(status: np.ndarray) -> np.ndarray:
+    """Map an array of integer status codes to PuLP-style status names.
+
+    Args:
+        status: Integer status codes returned by solve_lp_batch
+
+    Returns:
+        Array of status name strings with the same shape
+    """
+    lookup = np.array([STATUS_NAMES[i] for i in range(len(STATUS_NAMES))], dtype=object)
+    return lookup[np.asarray(status, dtype=int)]
+
+
+def _as_batch(array: Optional[np.ndarray], ndim: int, shape: tuple) -> Optional[np.ndarray]:
+    """Convert an input to float and add a leading batch axis if missing."""
+    if array is None:
+        return None
+    array = np.asarray(array, dtype=float)
+    if array.ndim == ndim:
+        array = array[np.newaxis]
+    if array.ndim != ndim + 1 or array.shape[1:] != shape:
+        raise ValueError(
+            f"Expected shape {shape} or (N, {', '.join(map(str, shape))}), got {array.shape}"
+        )
+    return array
+
+
+def _equilibrate(A: np.ndarray, passes: int = 4) -> Tuple[np.ndarray, np.ndarray]:
+    """Row and column scales that bring the nonzeros of each matrix near 1.
+
+    Alternating geometric-mean passes over rows and columns; the scales are
+    rounded to powers of two so scaling introduces no rounding error.
+
+    Args:
+        A: Stacked constraint matrices, shape (N, m, n)
+        passes: Number of row and column passes
+
+    Returns:
+        Tuple of row scales, shape (N, m), and column scales, shape (N, n)
+    """
+    N, m, n = A.shape
+    row, col = np.ones((N, m)), np.ones((N, n))
+    magnitude = np.abs(A)
+    nonzero = magnitude > 0
+    for _ in range(passes):
+        for axis, scale in ((2, row), (1, col)):
+            scaled = magnitude * row[:, :, np.newaxis] * col[:, np.newaxis, :]
+            largest = scaled.max(axis=axis, initial=0.0)
+            smallest = np.where(nonzero, scaled, np.inf).min(axis=axis, initial=np.inf)
+            with np.errstate(divide="ignore"):
+                factor = np.where(largest > 0, 1.0 / np.sqrt(largest * smallest), 1.0)
+            scale *= np.exp2(np.round(np.log2(factor)))
+    return row, col
+
+
+def _pivot(tableau: np.ndarray, basis: np.ndarray, idx: np.ndarray,
+           rows: np.ndarray, cols: np.ndarray) -> None:
+    """Apply one pivot per selected instance, in place."""
+    sub = tableau[idx]
+    k = np.arange(len(idx))
+    pivot_row = sub[k, rows, :] / sub[k, rows, cols][:, np.newaxis]
+    pivot_col = sub[k, :, cols].copy()
+    sub -= pivot_col[:, :, np.newaxis] * pivot_row[:, np.newaxis, :]
+    sub[k, rows, :] = pivot_row
+    tableau[idx] = sub
+    basis[idx, rows] = cols
+
+
+def _primal_simplex(tableau, basis, status, iterations, allowed, artificial_start,
+                    max_iter, tol, guard_artificials):
+    """Run primal simplex iterations on every instance with status -1.
+
+    Dantzig pricing is used until an instance stalls on degenerate pivots,
+    after which that instance switches to Bland's rule to avoid cycling.
+    """
+    m = basis.shape[1]
+    n_cols = tableau.shape[2] - 1
+    stall = np.zeros(len(basis), dtype=int)
+
+    while True:
+        active = np.flatnonzero(status == -1)
+        if len(active) == 0:
+            break
+
+        over = iterations[active] >= max_iter
+        if over.any():
+            status[active[over]] = STATUS_ITERATION_LIMIT
+            active = active[~over]
+            if len(active) == 0:
+                break
+
+        reduced = tableau[active, m, :n_cols]
+        candidates = (reduced < -tol) & allowed
+        done = ~candidates.any(axis=1)
+        if done.any():
+            status[active[done]] = STATUS_OPTIMAL
+            active = active[~done]
+            reduced = reduced[~done]
+            candidates = candidates[~done]
+            if len(active) == 0:
+                break
+
+        dantzig = np.argmin(np.where(candidates, reduced, np.inf), axis=1)
+        bland = np.argmax(candidates, axis=1)
+        use_bland = stall[active] > n_cols
+        entering = np.where(use_bland, bland, dantzig)
+
+        column = tableau[active, :m, entering]
+        rhs = tableau[active, :m, n_cols]
+        positive = column > tol
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(positive, rhs / np.where(positive, column, 1.0), np.inf)
+        if guard_artificials:
+            # Artificials left in the basis at zero level must leave before
+            # they can be driven away from zero by a pivot on a negative entry
+            stuck = (basis[active] >= artificial_start) & (np.abs(column) > tol)
+            ratio = np.where(stuck, 0.0, ratio)
+
+        best = ratio.min(axis=1)
+        unbounded = ~np.isfinite(best)
+        if unbounded.any():
+            status[active[unbounded]] = STATUS_UNBOUNDED
+            keep = ~unbounded
+            active, entering, ratio, best = active[keep], entering[keep], ratio[keep], best[keep]
+            if len(active) == 0:
+                break
+
+        # Break ratio ties by smallest basic index (Bland's leaving rule)
+        ties = ratio <= best[:, np.newaxis] + tol
+        leaving = np.argmin(np.where(ties, basis[active], n_cols + m), axis=1)
+
+        degenerate = best <= tol
+        stall[active] = np.where(degenerate, stall[active] + 1, 0)
+        _pivot(tableau, basis, active, leaving, entering)
+        iterations[active] += 1
+
+
+def _dual_simplex(tableau, basis, status, iterations, allowed, max_iter, tol):
+    """Run dual simplex iterations on every instance with status -1.
+
+    Each instance must start dual feasible. Instances whose right-hand side
+    becomes non-negative are marked optimal.
+    """
+    m = basis.shape[1]
+    n_cols = tableau.shape[2] - 1
+
+    while True:
+        active = np.flatnonzero(status == -1)
+        if len(active) == 0:
+            break
+
+        over = iterations[active] >= max_iter
+        if over.any():
+            status[active[over]] = STATUS_ITERATION_LIMIT
+            active = active[~over]
+            if len(active) == 0:
+                break
+
+        rhs = tableau[active, :m, n_cols]
+        leaving = np.argmin(rhs, axis=1)
+        k = np.arange(len(active))
+        # Roundoff grows with the right-hand side, so feasibility is relative to it
+        done = rhs[k, leaving] >= -tol * np.maximum(1.0, np.abs(rhs).max(axis=1))
+        if done.any():
+            status[active[done]] = STATUS_OPTIMAL
+            active, leaving = active[~done], leaving[~done]
+            k = np.arange(len(active))
+            if len(active) == 0:
+                break
+
+        row = tableau[active, leaving, :n_cols]
+        reduced = tableau[active, m, :n_cols]
+        negative = (row < -tol) & allowed
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(negative, reduced / -np.where(negative, row, -1.0), np.inf)
+        entering = np.argmin(ratio, axis=1)
+        infeasible = ~np.isfinite(ratio[k, entering])
+        if infeasible.any():
+            status[active[infeasible]] = STATUS_INFEASIBLE
+            keep = ~infeasible
+            active, leaving, entering = active[keep], leaving[keep], entering[keep]
+            if len(active) == 0:
+                break
+
+        _pivot(tableau, basis, active, leaving, entering)
+        iterations[active] += 1
+
+
+def _set_objective_row(tableau: np.ndarray, basis: np.ndarray, cost: np.ndarray) -> None:
+    """Write reduced costs and the negated objective into the last tableau row."""
+    m = basis.shape[1]
+    basic_cost = np.take_along_axis(cost, basis, axis=1)
+    tableau[:, m, :-1] = cost
+    tableau[:, m, -1] = 0.0
+    tableau[:, m, :] -= np.einsum("ki,kij->kj", basic_cost, tableau[:, :m, :])
+
+
+def solve_lp_batch(
+    c: np.ndarray,
+    A_ub: Optional[np.ndarray] = None,
+    b_ub: Optional[np.ndarray] = None,
+    A_eq: Optional[np.ndarray] = None,
+    b_eq: Optional[np.ndarray] = None,
+    maximize: bool = False,
+    basis: Optional[np.ndarray] = None,
+    max_iter: Optional[int] = None,
+    tol: float = 1e-9,
+) -> Dict[str, np.ndarray]:
+    """Solve a batch of same-shaped LPs with a vectorized two-phase simplex.
+
+    Each instance is ``min (or max) c @ x`` subject to ``A_ub @ x <= b_ub``,
+    ``A_eq @ x == b_eq`` and ``x >= 0``. Every array may carry a leading
+    batch axis of length N; arrays without one are shared by all instances.
+
+    Rows and columns are equilibrated before the tableau is built, so the
+    absolute tolerances hold for badly scaled programs (block sizes and
+    ticket rows in the millions next to rates of a few percent). Results
+    are returned for the unscaled program.
+
+    Args:
+        c: Objective coefficients, shape (n,) or (N, n)
+        A_ub: Inequality matrix, shape (m_ub, n) or (N, m_ub, n)
+        b_ub: Inequality right-hand sides, shape (m_ub,) or (N, m_ub)
+        A_eq: Equality matrix, shape (m_eq, n) or (N, m_eq, n)
+        b_eq: Equality right-hand sides, shape (m_eq,) or (N, m_eq)
+        maximize: Maximize the objective instead of minimizing it
+        basis: Optional starting basis from a previous call, shape (m,) or
+            (N, m). Instances that are primal or dual feasible for it are
+            re-solved with primal or dual simplex; the rest start cold.
+        max_iter: Iteration limit per phase (default scales with size)
+        tol: Feasibility and optimality tolerance
+
+    Returns:
+        Dictionary of arrays with leading batch axis:
+            - ``x``: primal solutions, shape (N, n)
+            - ``objective``: objective values, shape (N,)
+            - ``status``: status codes, shape (N,) (see STATUS_NAMES)
+            - ``duals``: d(objective)/d(rhs) for [ub rows, eq rows], shape (N, m)
+            - ``reduced_costs``: d(objective)/d(x) for each column, shape (N, n)
+            - ``basis``: final basis column indices, shape (N, m)
+            - ``iterations``: simplex pivots used, shape (N,)
+    """
+    c = np.asarray(c, dtype=float)
+    n = c.shape[-1]
+    c = _as_batch(c, 1, (n,))
+    if A_ub is None:
+        A_ub, b_ub = np.zeros((0, n)), np.zeros(0)
+    if A_eq is None:
+        A_eq, b_eq = np.zeros((0, n)), np.zeros(0)
+    m_ub = np.shape(A_ub)[-2]
+    m_eq = np.shape(A_eq)[-2]
+    A_ub = _as_batch(A_ub, 2, (m_ub, n))
+    b_ub = _as_batch(b_ub, 1, (m_ub,))
+    A_eq = _as_batch(A_eq, 2, (m_eq, n))
+    b_eq = _as_batch(b_eq, 1, (m_eq,))
+
+    N = max(len(a) for a in (c, A_ub, b_ub, A_eq, b_eq))
+    for a in (c, A_ub, b_ub, A_eq, b_eq):
+        if len(a) not in (1, N):
+            raise ValueError(f"Inconsistent batch sizes: {len(a)} vs {N}")
+
+    m = m_ub + m_eq
+    art = n + m_ub
+    n_cols = n + m_ub + m
+    if max_iter is None:
+        max_iter = 50 * (m + n_cols)
+
+    N_A = max(len(A_ub), len(A_eq))
+    A = np.concatenate([np.broadcast_to(A_ub, (N_A, m_ub, n)),
+                        np.broadcast_to(A_eq, (N_A, m_eq, n))], axis=1)
+    row_scale, col_scale = _equilibrate(A)
+
+    # Standard form tableau: [x | slacks | artificials | rhs], one row per
+    # constraint plus the objective row
+    tableau = np.zeros((N, m + 1, n_cols + 1))
+    tableau[:, :m, :n] = A * row_scale[:, :, np.newaxis] * col_scale[:, np.newaxis, :]
+    tableau[:, np.arange(m_ub), n + np.arange(m_ub)] = 1.0
+    tableau[:, :m_ub, -1] = b_ub
+    tableau[:, m_ub:m, -1] = b_eq
+    tableau[:, :m, -1] *= row_scale
+    sign = np.where(tableau[:, :m, -1] < 0, -1.0, 1.0)
+    tableau[:, :m, :art] *= sign[:, :, np.newaxis]
+    tableau[:, :m, -1] *= sign
+    # Artificial columns are never flipped so they always hold B^-1
+    tableau[:, np.arange(m), art + np.arange(m)] = 1.0
+    original = tableau[:, :m, :].copy()
+
+    cost = np.zeros((N, n_cols))
+    cost[:, :n] = (-c if maximize else c) * col_scale
+    status = np.full(N, -1, dtype=int)
+    iterations = np.zeros(N, dtype=int)
+    allowed = np.zeros(n_cols, dtype=bool)
+    allowed[:art] = True
+
+    cold = np.ones(N, dtype=bool)
+    current = np.zeros((N, m), dtype=int)
+
+    if basis is not None:
+        start = np.broadcast_to(np.asarray(basis, dtype=int), (N, m)).copy()
+        # Bases holding artificial columns or singular bases start cold
+        valid = ((start >= 0) & (start < art)).all(axis=1)
+        start[~valid] = art + np.arange(m)
+        B = np.take_along_axis(original, start[:, np.newaxis, :].repeat(m, axis=1), axis=2)
+        sign_det, _ = np.linalg.slogdet(B)
+        valid &= sign_det != 0
+        B[~valid] = np.eye(m)
+        B_inv = np.linalg.inv(B)
+        if valid.any():
+            warm = tableau.copy()
+            warm[:, :m, :] = B_inv @ original
+            _set_objective_row(warm, start, cost)
+            rhs_ok = (warm[:, :m, -1] >= -tol).all(axis=1)
+            dual_ok = (warm[:, m, :art] >= -tol).all(axis=1)
+            usable = valid & (rhs_ok | dual_ok)
+            tableau[usable] = warm[usable]
+            current[usable] = start[usable]
+            cold &= ~usable
+
+            primal_status = np.where(usable & rhs_ok, -1, -2)
+            _primal_simplex(tableau, current, primal_status, iterations, allowed,
+                            art, max_iter, tol, guard_artificials=False)
+            dual_status = np.where(usable & ~rhs_ok, -1, -2)
+            _dual_simplex(tableau, current, dual_status, iterations, allowed, max_iter, tol)
+            status = np.where(primal_status >= 0, primal_status, status)
+            status = np.where(dual_status >= 0, dual_status, status)
+
+    if cold.any():
+        idx = np.flatnonzero(cold)
+        sub = tableau[idx]
+        sub[:, :m, :] = original[idx]
+        sub_basis = art + np.tile(np.arange(m), (len(idx), 1))
+        has_slack = sign[idx, :m_ub] > 0
+        sub_basis[:, :m_ub] = np.where(has_slack, n + np.arange(m_ub), sub_basis[:, :m_ub])
+
+        # Phase 1: minimize the sum of artificials that start in the basis
+        phase1_cost = np.zeros((len(idx), n_cols))
+        np.put_along_axis(phase1_cost, sub_basis, (sub_basis >= art).astype(float), axis=1)
+        _set_objective_row(sub, sub_basis, phase1_cost)
+        sub_status = np.full(len(idx), -1, dtype=int)
+        sub_iter = np.zeros(len(idx), dtype=int)
+        _primal_simplex(sub, sub_basis, sub_status, sub_iter, allowed, art,
+                        max_iter, tol, guard_artificials=False)
+
+        scale = 1.0 + np.abs(original[idx, :, -1]).max(axis=1, initial=0.0)
+        infeasible = (sub_status == STATUS_OPTIMAL) & (-sub[:, m, -1] > tol * 1e3 * scale)
+        sub_status = np.where(infeasible, STATUS_INFEASIBLE,
+                              np.where(sub_status == STATUS_OPTIMAL, -1, sub_status))
+
+        # Phase 2: original objective, artificials barred from entering
+        _set_objective_row(sub, sub_basis, cost[idx])
+        _primal_simplex(sub, sub_basis, sub_status, sub_iter, allowed, art,
+                        max_iter, tol, guard_artificials=True)
+
+        tableau[idx] = sub
+        current[idx] = sub_basis
+        status[idx] = sub_status
+        iterations[idx] += sub_iter
+
+    # Recover primal values, duals and reduced costs from the final tableaus
+    values = np.zeros((N, n_cols))
+    np.put_along_axis(values, current, tableau[:, :m, -1], axis=1)
+    x = values[:, :n]
+    x[np.abs(x) < tol] = 0.0
+    x *= col_scale
+    direction = -1.0 if maximize else 1.0
+    duals = -tableau[:, m, art:art + m] * sign * direction * row_scale
+    reduced_costs = tableau[:, m, :n] * direction / col_scale
+    objective = np.einsum("kj,kj->k", np.broadcast_to(c, (N, n)), x)
+
+    failed = status != STATUS_OPTIMAL
+    x[failed] = np.nan
+    objective[failed] = np.nan
+    duals[failed] = np.nan
+    reduced_costs[failed] = np.nan
+
+    return {
+        "x": x,
+        "objective": objective,
+        "status": status,
+        "duals": duals,
+        "reduced_costs": reduced_costs,
+        "basis": current,
+        "iterations": iterations,
+    }
+
+
+def stack_parameters(
+    param_arrays: Dict[str, np.ndarray],
+    defaults: Dict[str, np.ndarray],
+) -> Tuple[int, Dict[str, np.ndarray]]:
+    """Broadcast per-instance parameter arrays against model defaults.
+
+    Args:
+        param_arrays: Mapping of parameter name to an array whose leading
+            axis indexes the instances of a batch
+        defaults: Mapping of every supported parameter name to the value
+            used when the parameter is not given in ``param_arrays``
+
+    Returns:
+        Tuple of (batch size N, mapping of parameter name to an array of
+        shape (N,) + shape of the default value)
+    """
+    unknown = set(param_arrays) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unsupported batch parameters: {sorted(unknown)}")
+
+    sizes = {len(np.asarray(v)) for v in param_arrays.values()}
+    if len(sizes) > 1:
+        raise ValueError(f"Batch parameters have different lengths: {sorted(sizes)}")
+    N = sizes.pop() if sizes else 1
+
+    stacked = {}
+    for name, default in defaults.items():
+        default = np.asarray(default, dtype=float)
+        if name in param_arrays:
+            array = np.asarray(param_arrays[name], dtype=float)
+            if array.shape[1:] != default.shape:
+                raise ValueError(
+                    f"{name} must have shape (N, {', '.join(map(str, default.shape))}), "
+                    f"got {array.shape}"
+                )
+        else:
+            array = np.broadcast_to(default, (N,) + default.shape)
+        stacked[name] = array
+    return N, stacked
+
+
+def _dense(matrix, rhs, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """A constraint block as a dense (m, n) array and its right-hand sides."""
+    if matrix is None:
+        return np.zeros((0, n)), np.zeros(0)
+    matrix = matrix.toarray() if hasattr(matrix, "toarray") else np.asarray(matrix, dtype=float)
+    return matrix.reshape(-1, n), np.asarray(rhs, dtype=float)
+
+
+def _bounds(bounds: Optional[np.ndarray], n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Lower and upper bounds; the dense kernel needs finite lower bounds."""
+    if bounds is None:
+        lower, upper = np.zeros(n), np.full(n, np.inf)
+    else:
+        bounds = np.array(bounds, dtype=float).reshape(n, 2)
+        lower = np.where(np.isnan(bounds[:, 0]), -np.inf, bounds[:, 0])
+        upper = np.where(np.isnan(bounds[:, 1]), np.inf, bounds[:, 1])
+    if not np.isfinite(lower).all():
+        raise ValueError("The dense simplex kernel requires finite lower bounds")
+    return lower, upper
+
+
+def _kernel_rows(A_ub: np.ndarray, lower: np.ndarray,
+                 upper: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Columns the kernel keeps, the upper-bounded ones and its inequality rows.
+
+    Fixed variables are dropped and every finite upper bound of the others
+    becomes a row below ``A_ub``.
+    """
+    free = np.flatnonzero(upper > lower)
+    capped = free[np.isfinite(upper[free])]
+    bound_rows = np.zeros((len(capped), len(free)))
+    bound_rows[np.arange(len(capped)), np.searchsorted(free, capped)] = 1.0
+    return free, capped, np.vstack([A_ub[:, free], bound_rows])
+
+
+@timed_solver(dimensions=matrix_dimensions, backend="dense")
+def solve_lp(
+    c: np.ndarray,
+    A_ub=None,
+    b_ub: Optional[np.ndarray] = None,
+    A_eq=None,
+    b_eq: Optional[np.ndarray] = None,
+    bounds: Optional[np.ndarray] = None,
+    maximize: bool = False,
+    basis: Optional[np.ndarray] = None,
+) -> Dict:
+    """Solve a single LP with the dense simplex kernel.
+
+    Finite lower bounds are handled by shifting variables and finite upper
+    bounds become extra inequality rows, so any program with bounded-below
+    variables can be solved. Fixed variables are substituted out first, as
+    their bound rows only add degenerate pivots. Meant for small programs;
+    matrices are densified.
+
+    Args:
+        c: Objective coefficients, shape (n,)
+        A_ub: Inequality matrix (dense or scipy.sparse), rows are ``<=``
+        b_ub: Inequality right-hand sides
+        A_eq: Equality matrix (dense or scipy.sparse)
+        b_eq: Equality right-hand sides
+        bounds: Variable bounds as an (n, 2) array (default 0 to +inf)
+        maximize: Maximize the objective instead of minimizing it
+        basis: Optional starting basis from a previous solve; ignored when
+            the number of fixed or upper-bounded variables has changed
+
+    Returns:
+        Dictionary with ``status`` (PuLP status name), ``basis``,
+        ``iterations`` and, when optimal, ``x``, ``objective``,
+        ``duals_ub``, ``duals_eq`` and ``reduced_costs``
+    """
+    c = np.asarray(c, dtype=float)
+    n = len(c)
+    A_ub, b_ub = _dense(A_ub, b_ub, n)
+    A_eq, b_eq = _dense(A_eq, b_eq, n)
+    m_ub = len(b_ub)
+    lower, upper = _bounds(bounds, n)
+    if (upper < lower).any():
+        return {"status": "Infeasible", "basis": None, "iterations": 0}
+
+    b_ub = b_ub - A_ub @ lower
+    b_eq = b_eq - A_eq @ lower
+    free, capped, kernel_ub = _kernel_rows(A_ub, lower, upper)
+    b_ub = np.concatenate([b_ub, upper[capped] - lower[capped]])
+    if basis is not None and np.shape(basis) != (len(b_ub) + len(b_eq),):
+        basis = None
+
+    result = solve_lp_batch(c[free], kernel_ub, b_ub, A_eq[:, free], b_eq,
+                            maximize=maximize, basis=basis)
+    status = STATUS_NAMES[int(result["status"][0])]
+    solution = {
+        "status": status,
+        "basis": result["basis"][0],
+        "iterations": int(result["iterations"][0]),
+    }
+    if status == "Optimal":
+        duals = result["duals"][0]
+        x = lower.copy()
+        x[free] += result["x"][0]
+        # Fixed variables price through the rows they appear in, and a
+        # variable held at its upper bound through its bound row
+        reduced_costs = c - A_ub.T @ duals[:m_ub] - A_eq.T @ duals[len(b_ub):]
+        reduced_costs[free] = result["reduced_costs"][0]
+        reduced_costs[capped] += duals[m_ub:len(b_ub)]
+        solution.update({
+            "x": x,
+            "objective": float(c @ x),
+            "duals_ub": duals[:m_ub],
+            "duals_eq": duals[len(b_ub):],
+            "reduced_costs": reduced_costs,
+        })
+    return solution
+
+
+class BasisPricer:
+    """Price new objective vectors against a fixed optimal basis.
+
+    Changing only the objective leaves the primal solution of a basis
+    untouched, and the basis stays optimal as long as no reduced cost
+    changes sign. The basis matrix is factored once, so every check costs
+    two triangular solves and one matrix-vector product instead of a
+    simplex run.
+
+    Attributes:
+        basis (np.ndarray): Kernel basis from solve_lp
+    """
+
+    def __init__(self, A_ub, A_eq, bounds: Optional[np.ndarray], basis: np.ndarray,
+                 n: Optional[int] = None):
+        """Factor the basis of the standard form solve_lp builds.
+
+        Args:
+            A_ub: Inequality matrix (dense or scipy.sparse) the basis was
+                found for
+            A_eq: Equality matrix (dense or scipy.sparse), or None
+            bounds: Variable bounds as an (n, 2) array (default 0 to +inf)
+            basis: Basis returned by solve_lp for this program
+            n: Number of variables, when both matrices are None
+        """
+        from scipy.linalg import lu_factor
+
+        n = n if n is not None else (A_ub if A_ub is not None else A_eq).shape[1]
+        A_ub, _ = _dense(A_ub, np.zeros(0), n)
+        A_eq, _ = _dense(A_eq, np.zeros(0), n)
+        lower, upper = _bounds(bounds, n)
+        self.free, _, kernel_ub = _kernel_rows(A_ub, lower, upper)
+        m_ub, m = len(kernel_ub), len(kernel_ub) + len(A_eq)
+
+        # Kernel columns: kept variables, slacks, then artificials
+        self._columns = np.zeros((m, len(self.free) + m_ub + m))
+        self._columns[:m_ub, :len(self.free)] = kernel_ub
+        self._columns[m_ub:, :len(self.free)] = A_eq[:, self.free]
+        self._columns[np.arange(m_ub), len(self.free) + np.arange(m_ub)] = 1.0
+        self._columns[np.arange(m), len(self.free) + m_ub + np.arange(m)] = 1.0
+        self._priced = len(self.free) + m_ub
+        self.basis = np.asarray(basis, dtype=int)
+        if self.basis.shape != (m,):
+            raise ValueError(f"basis must have {m} entries, got {self.basis.shape}")
+        self._factor = lu_factor(self._columns[:, self.basis])
+
+    def reduced_costs(self, c: np.ndarray, maximize: bool = False) -> np.ndarray:
+        """Reduced costs of the kept variables and slacks, in minimization form.
+
+        Args:
+            c: Objective coefficients, shape (n,)
+            maximize: Whether ``c`` is maximized
+
+        Returns:
+            Reduced costs; the basis is optimal when none is negative
+        """
+        from scipy.linalg import lu_solve
+
+        cost = np.zeros(self._columns.shape[1])
+        cost[:len(self.free)] = -np.asarray(c, dtype=float)[self.free] if maximize \
+            else np.asarray(c, dtype=float)[self.free]
+        prices = lu_solve(self._factor, cost[self.basis], trans=1)
+        return cost[:self._priced] - prices @ self._columns[:, :self._priced]
+
+    def is_optimal(self, c: np.ndarray, maximize: bool = False, tol: float = 1e-9) -> bool:
+        """Whether the basis is still optimal for the objective ``c``.
+
+        Args:
+            c: Objective coefficients, shape (n,)
+            maximize: Whether ``c`` is maximized
+            tol: Optimality tolerance, relative to the largest cost
+
+        Returns:
+            True when every reduced cost is at least ``-tol``
+        """
+        scale = max(1.0, float(np.abs(c).max(initial=0.0)))
+        return bool((self.reduced_costs(c, maximize) >= -tol * scale).all())
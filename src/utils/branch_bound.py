@@ -0,0 +1,190 @@
+"""Anytime branch and bound for small mixed-integer programs.
+
+The search solves LP relaxations with one of the in-process backends and
+branches on the most fractional integer variable. Nodes are taken in best
+bound order, but after each relaxation the search plunges into the child on
+the side the variable rounds to, so a first incumbent is usually found
+after a handful of nodes. Every improving incumbent is passed to an
+optional callback, and the search stops at a time limit, a node limit or
+once the relative gap between the incumbent and the best bound is closed,
+returning the best solution found so far.
+"""
+
+import heapq
+import itertools
+import time
+from typing import Callable, Dict, Optional
+import numpy as np
+
+from .batch_lp import solve_lp
+from .metrics import matrix_dimensions, timed_solver
+from .solver_utils import solve_highs
+
+
+@timed_solver(dimensions=matrix_dimensions)
+def branch_and_bound(
+    c: np.ndarray,
+    A_ub=None,
+    b_ub: Optional[np.ndarray] = None,
+    A_eq=None,
+    b_eq: Optional[np.ndarray] = None,
+    bounds: Optional[np.ndarray] = None,
+    integrality: Optional[np.ndarray] = None,
+    maximize: bool = False,
+    time_limit: Optional[float] = None,
+    gap: float = 1e-4,
+    node_limit: Optional[int] = None,
+    callback: Optional[Callable[[Dict], Optional[bool]]] = None,
+    backend: str = "highs",
+    tol: float = 1e-6,
+) -> Dict:
+    """Solve a mixed-integer program, returning the best solution in budget.
+
+    Arguments follow solver_utils.solve_highs.
+
+    Args:
+        c: Objective coefficients, shape (n,)
+        A_ub: Inequality matrix (dense or scipy.sparse), rows are ``<=``
+        b_ub: Inequality right-hand sides
+        A_eq: Equality matrix (dense or scipy.sparse)
+        b_eq: Equality right-hand sides
+        bounds: Variable bounds as an (n, 2) array (default 0 to +inf)
+        integrality: Per-variable flags, 1 for integer variables
+        maximize: Maximize the objective instead of minimizing it
+        time_limit: Wall-clock budget in seconds (default unlimited)
+        gap: Relative gap ``|incumbent - bound| / |incumbent|`` at which
+            the incumbent is accepted as optimal
+        node_limit: Largest number of relaxations to solve
+        callback: Called with a dictionary of ``x``, ``objective``,
+            ``bound``, ``mip_gap``, ``nodes`` and ``elapsed`` for every
+            improving incumbent; returning True stops the search
+        backend: LP backend for the relaxations, "highs" or "dense"
+        tol: Integrality and feasibility tolerance
+
+    Returns:
+        Dictionary with:
+            - ``status``: "Optimal" when the gap target was met,
+              "Not Solved" when a limit or the callback stopped the search
+              first, "Infeasible" or "Unbounded"
+            - ``x`` and ``objective``: the best incumbent, when one exists
+            - ``bound``: best bound on the optimal objective
+            - ``mip_gap``: relative gap of the incumbent to ``bound``
+            - ``nodes``: relaxations solved
+            - ``incumbents``: improving solutions found
+            - ``elapsed``: seconds spent
+    """
+    if backend not in ("highs", "dense"):
+        raise ValueError(f"Unknown relaxation backend '{backend}', expected 'highs' or 'dense'")
+    if gap < 0:
+        raise ValueError("gap must be non-negative")
+    c = np.asarray(c, dtype=float)
+    n = len(c)
+    if bounds is None:
+        bounds = np.column_stack([np.zeros(n), np.full(n, np.inf)])
+    bounds = np.array(bounds, dtype=float).reshape(n, 2)
+    integer = np.zeros(n, dtype=bool) if integrality is None else np.asarray(integrality) != 0
+    # Integer variables have integer bounds
+    bounds[integer, 0] = np.ceil(bounds[integer, 0] - tol)
+    bounds[integer, 1] = np.floor(bounds[integer, 1] + tol)
+
+    sense = -1.0 if maximize else 1.0
+    start = time.perf_counter()
+    order = itertools.count()
+
+    def relax(lower, upper):
+        node_bounds = np.column_stack([lower, upper])
+        if backend == "dense":
+            return solve_lp(c, A_ub, b_ub, A_eq, b_eq, node_bounds, maximize=maximize)
+        return solve_highs(c, A_ub, b_ub, A_eq, b_eq, node_bounds, maximize=maximize)
+
+    # Objectives are kept in minimization form internally
+    best_x, best = None, np.inf
+    nodes = incumbents = 0
+    status = None
+    heap = [(-np.inf, next(order), bounds[:, 0], bounds[:, 1])]
+
+    def relative_gap(bound):
+        if best_x is None:
+            return np.inf
+        return max(best - bound, 0.0) / max(abs(best), 1e-10)
+
+    def out_of_budget():
+        return ((time_limit is not None and time.perf_counter() - start >= time_limit)
+                or (node_limit is not None and nodes >= node_limit))
+
+    while heap and status is None:
+        node_bound, _, lower, upper = heapq.heappop(heap)
+        if relative_gap(min(node_bound, best)) <= gap and best_x is not None:
+            # Every open node is at least this good, so the gap is closed
+            heap.clear()
+            break
+
+        # Plunge: follow one child of each relaxation until the branch dies
+        while True:
+            if out_of_budget():
+                status = "Not Solved"
+                heapq.heappush(heap, (node_bound, next(order), lower, upper))
+                break
+            result = relax(lower, upper)
+            nodes += 1
+            if result["status"] == "Unbounded":
+                if nodes == 1:
+                    status = "Unbounded"
+                break
+            if result["status"] != "Optimal":
+                break
+            value = sense * result["objective"]
+            if best_x is not None and relative_gap(value) <= gap:
+                break
+
+            x = result["x"]
+            fraction = np.where(integer, np.abs(x - np.round(x)), 0.0)
+            if fraction.max(initial=0.0) <= tol:
+                best_x, best = np.where(integer, np.round(x), x), value
+                incumbents += 1
+                if callback is not None:
+                    open_bound = heap[0][0] if heap else best
+                    stop = callback({
+                        "x": best_x.copy(),
+                        "objective": sense * best,
+                        "bound": sense * min(open_bound, best),
+                        "mip_gap": relative_gap(min(open_bound, best)),
+                        "nodes": nodes,
+                        "elapsed": time.perf_counter() - start,
+                    })
+                    if stop:
+                        status = "Not Solved"
+                break
+
+            # Branch on the most fractional variable; plunge toward its rounding
+            j = int(np.argmax(fraction))
+            down_upper, up_lower = upper.copy(), lower.copy()
+            down_upper[j] = np.floor(x[j])
+            up_lower[j] = np.ceil(x[j])
+            if x[j] - np.floor(x[j]) >= 0.5:
+                heapq.heappush(heap, (value, next(order), lower, down_upper))
+                lower = up_lower
+            else:
+                heapq.heappush(heap, (value, next(order), up_lower, upper))
+                upper = down_upper
+            node_bound = value
+
+    elapsed = time.perf_counter() - start
+    bound = min(heap[0][0], best) if heap else best
+    if status is None:
+        status = "Optimal" if best_x is not None else "Infeasible"
+    elif status == "Not Solved" and best_x is not None and relative_gap(bound) <= gap:
+        status = "Optimal"
+
+    result = {
+        "status": status,
+        "bound": sense * bound,
+        "mip_gap": relative_gap(bound),
+        "nodes": nodes,
+        "incumbents": incumbents,
+        "elapsed": elapsed,
+    }
+    if best_x is not None:
+        result["x"] = best_x
+        result["objective"] = sense * best
+    return result
@@ -0,0 +1,208 @@
+"""Content-addressed cache for optimizer solutions.
+
+Solutions are stored under a SHA-256 hash of the optimizer class, its
+parameters and the solver options. Parameters are canonicalized first, so
+``[100, 250]``, ``(100.0, 250.0)`` and ``np.array([100, 250])`` hash alike
+and dictionary order does not matter. Entries live in a bounded in-memory
+LRU tier and, optionally, in a SQLite file that persists across processes.
+"""
+
+import copy
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import numpy as np
+
+
+# Solution entries that refer to live solver objects and are never cached
+UNCACHED_KEYS = ("model", "program")
+
+
+def _canonical(value: Any) -> Any:
+    """Convert a parameter value to a JSON-serializable canonical form."""
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        try:
+            array = np.asarray(value)
+        except ValueError:  # ragged nested lists
+            array = np.empty(0, dtype=object)
+        if array.dtype.kind in "biuf":
+            # Numeric arrays hash by content, independent of container and dtype
+            data = np.ascontiguousarray(array, dtype=float)
+            return {"__array__": hashlib.sha256(data.tobytes()).hexdigest(),
+                    "shape": list(data.shape)}
+        return [_canonical(v) for v in value]
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, float, np.number)):
+        return float(value)
+    if value is None or isinstance(value, str):
+        return value
+    return repr(value)
+
+
+def canonical_key(model: str, parameters: Dict[str, Any],
+                  options: Optional[Dict[str, Any]] = None) -> str:
+    """Hash a model, its parameters and solver options into a cache key.
+
+    Args:
+        model: Model identifier, typically the optimizer class name
+        parameters: Parameter names and values
+        options: Solver options such as the backend and solve method
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = {"model": model, "parameters": _canonical(parameters),
+               "options": _canonical(options or {})}
+    text = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class SolveCache:
+    """Two-tier cache of solution dictionaries.
+
+    Attributes:
+        maxsize (int): Maximum number of entries in the memory tier
+        path (Optional[str]): SQLite file of the persistent tier, or None
+        hits (int): Lookups answered from either tier
+        misses (int): Lookups answered by neither tier
+        evictions (int): Entries dropped from the memory tier
+        disk_hits (int): Hits answered by the persistent tier
+    """
+
+    def __init__(self, maxsize: int = 128, path: Optional[str] = None):
+        """Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of solutions kept in memory
+            path: Optional SQLite file for a persistent tier
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+        self._memory: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS solutions "
+                "(key TEXT PRIMARY KEY, solution BLOB, created REAL)"
+            )
+            self._db.commit()
+
+    def _remember(self, key: str, solution: Dict) -> None:
+        """Insert into the memory tier, evicting the least recently used."""
+        self._memory[key] = solution
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Look up a solution.
+
+        Args:
+            key: Cache key from canonical_key()
+
+        Returns:
+            A copy of the cached solution dictionary, or None on a miss
+        """
+        with self._lock:
+            solution = self._memory.get(key)
+            if solution is not None:
+                self._memory.move_to_end(key)
+            elif self._db is not None:
+                row = self._db.execute(
+                    "SELECT solution FROM solutions WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    solution = pickle.loads(row[0])
+                    self._remember(key, solution)
+                    self.disk_hits += 1
+
+            if solution is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return copy.deepcopy(solution)
+
+    def put(self, key: str, solution: Dict) -> None:
+        """Store a solution; live solver objects are replaced by None.
+
+        Args:
+            key: Cache key from canonical_key()
+            solution: Solution dictionary returned by an optimizer
+        """
+        stored = {k: (None if k in UNCACHED_KEYS else copy.deepcopy(v))
+                  for k, v in solution.items()}
+        with self._lock:
+            self._remember(key, stored)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO solutions VALUES (?, ?, ?)",
+                    (key, pickle.dumps(stored, protocol=pickle.HIGHEST_PROTOCOL), time.time()),
+                )
+                self._db.commit()
+
+    def clear(self) -> None:
+        """Drop all entries from both tiers and reset the counters."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM solutions")
+                self._db.commit()
+            self.hits = self.misses = self.evictions = self.disk_hits = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit, miss and eviction counters and the tier sizes."""
+        with self._lock:
+            disk_size = (self._db.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+                         if self._db is not None else 0)
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_hits": self.disk_hits,
+                "memory_size": len(self._memory),
+                "disk_size": disk_size,
+            }
+
+    def close(self) -> None:
+        """Close the persistent tier."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+
+_default_cache: Optional[SolveCache] = None
+
+
+def set_default_cache(cache: Optional[SolveCache]) -> None:
+    """Set the cache used by optimizers that do not have their own.
+
+    Args:
+        cache: A SolveCache, or None to disable caching by default
+    """
+    global _default_cache
+    _default_cache = cache
+
+
+def get_default_cache() -> Optional[SolveCache]:
+    """Return the cache used by optimizers that do not have their own."""
+    return _default_cache
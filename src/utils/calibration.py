@@ -0,0 +1,344 @@
+"""Per-machine backend timings for automatic solver selection.
+
+Which backend solves an LP fastest depends on its size and on the machine:
+the dense NumPy kernel has no start-up cost but grows cubically, HiGHS
+pays a small set-up cost and scales well, and PuLP-driven solvers such as
+CBC pay for writing the model and starting a process on every solve. The
+"auto" backend predicts the solve time of each available backend from the
+instance dimensions and picks the fastest.
+
+Predictions come from timing every backend once on random LPs of a few
+sizes and fitting ``log t = a + b log w`` per backend, where ``w`` is
+rows + columns + nonzeros. The fit is cached as JSON on disk together with
+a fingerprint of the hardware and library versions, so calibration runs
+once per kind of machine (and again for backends registered later). The
+host name is left out, so new containers and CI hosts on the same hardware
+reuse a shipped calibration.
+"""
+
+import json
+import os
+import platform
+import time
+import warnings
+from importlib import metadata
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from scipy import sparse
+from pulp import (
+    LpAffineExpression,
+    LpConstraint,
+    LpConstraintLE,
+    LpMaximize,
+    LpProblem,
+    LpStatus,
+    LpVariable,
+)
+
+from .solver_utils import SolverOptions, available_backends, get_backend
+
+
+# (rows, columns) of the random LPs timed for every backend
+CALIBRATION_SIZES = ((8, 12), (30, 45), (100, 150), (250, 375))
+
+# A backend is not timed on sizes it solves, or is predicted to solve,
+# slower than this
+SLOW_SOLVE_SECONDS = 0.1
+
+# The dense kernel is skipped for tableaus larger than this many entries
+DENSE_TABLEAU_LIMIT = 4_000_000
+
+_CALIBRATION_VERSION = 1
+
+_calibration_path: Optional[str] = None
+_calibration: Optional[Dict] = None
+
+
+def default_calibration_path() -> str:
+    """Return the calibration file under the user's cache directory."""
+    root = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(root, "investment_planning", "backend_calibration.json")
+
+
+def set_calibration_path(path: Optional[str]) -> None:
+    """Set the calibration file and forget the calibration loaded so far.
+
+    Args:
+        path: JSON file to read and write, or None for the default location
+    """
+    global _calibration_path, _calibration
+    _calibration_path = path
+    _calibration = None
+
+
+def get_calibration_path() -> str:
+    """Return the calibration file in use."""
+    return _calibration_path or default_calibration_path()
+
+
+def _cpu_model() -> str:
+    """CPU model name, from /proc/cpuinfo where platform.processor() is empty."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def _version(package: str) -> Optional[str]:
+    """Installed version of a distribution, or None when it is missing."""
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def machine_fingerprint() -> Dict[str, object]:
+    """Describe the hardware and library versions the timings depend on."""
+    return {
+        "machine": platform.machine(),
+        "cpu": _cpu_model(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": _version("scipy"),
+        "pulp": _version("pulp"),
+        "highspy": _version("highspy"),
+    }
+
+
+def _random_program(rows: int, cols: int, rng: np.random.Generator):
+    """A feasible, bounded random LP: maximize c x s.t. A x <= b, x >= 0."""
+    per_row = min(cols, 6)
+    row_index = np.repeat(np.arange(rows), per_row)
+    col_index = np.concatenate([rng.choice(cols, per_row, replace=False) for _ in range(rows)])
+    # Every column appears in some row, so the nonnegative A bounds every x
+    row_index = np.concatenate([row_index, rng.integers(0, rows, cols)])
+    col_index = np.concatenate([col_index, np.arange(cols)])
+    values = rng.uniform(0.5, 2.0, len(row_index))
+    A = sparse.coo_matrix((values, (row_index, col_index)), shape=(rows, cols)).tocsr()
+    A.sum_duplicates()
+    b = rng.uniform(10.0, 20.0, rows)
+    c = rng.uniform(1.0, 5.0, cols)
+    return c, A, b
+
+
+def _pulp_model(c: np.ndarray, A: sparse.csr_matrix, b: np.ndarray) -> LpProblem:
+    """Build the random LP as a PuLP model."""
+    model = LpProblem("calibration", LpMaximize)
+    x = [LpVariable(f"x{j}", lowBound=0) for j in range(len(c))]
+    model.setObjective(LpAffineExpression(zip(x, c)))
+    for i in range(A.shape[0]):
+        row = slice(A.indptr[i], A.indptr[i + 1])
+        expr = LpAffineExpression([(x[j], a) for j, a in zip(A.indices[row], A.data[row])])
+        model.addConstraint(LpConstraint(expr, LpConstraintLE, f"r{i}", b[i]))
+    return model
+
+
+def _time_backend(name: str, c: np.ndarray, A: sparse.csr_matrix, b: np.ndarray,
+                  repeats: int) -> float:
+    """Best of ``repeats`` wall-clock solve times, inf if the solve fails."""
+    backend = get_backend(name)
+    options = SolverOptions()
+    bounds = np.column_stack([np.zeros(len(c)), np.full(len(c), np.inf)])
+    best = np.inf
+    for _ in range(repeats):
+        if SLOW_SOLVE_SECONDS < best < np.inf:
+            break
+        start = time.perf_counter()
+        try:
+            if backend.solve is not None:
+                status = backend.solve(c, A, b, None, None, bounds, maximize=True,
+                                       integrality=None, basis=None, options=options)["status"]
+            else:
+                model = _pulp_model(c, A, b)
+                model.solve(backend.pulp_solver(options))
+                status = LpStatus[model.status]
+        except Exception:
+            return np.inf
+        if status != "Optimal":
+            return np.inf
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _fit(work: Sequence[float], seconds: Sequence[float]) -> Optional[Tuple[float, float]]:
+    """Least-squares fit of log seconds against log work."""
+    points = [(np.log(w), np.log(t)) for w, t in zip(work, seconds) if np.isfinite(t)]
+    if len(points) < 2:
+        return None
+    x, y = np.array(points).T
+    slope, intercept = np.polyfit(x, y, 1)
+    return float(intercept), float(slope)
+
+
+def calibrate(
+    backends: Optional[Iterable[str]] = None,
+    sizes: Sequence[Tuple[int, int]] = CALIBRATION_SIZES,
+    repeats: int = 3,
+    seed: int = 0,
+    path: Optional[str] = None,
+) -> Dict:
+    """Time backends on random LPs and store the fitted cost models.
+
+    Backends already in the calibration file for this machine keep their
+    fit; pass them explicitly to time them again.
+
+    Args:
+        backends: Backend names to time (default the available backends
+            without a stored fit)
+        sizes: (rows, columns) of the random LPs, smallest first; a
+            backend stops at the first size it solves, or is predicted to
+            solve, slower than SLOW_SOLVE_SECONDS
+        repeats: Solves per size; the fastest counts
+        seed: Seed of the random LPs
+        path: Calibration file (default get_calibration_path())
+
+    Returns:
+        The calibration dictionary: ``version``, ``fingerprint`` and, under
+        ``backends``, per backend ``work``, ``seconds`` and ``model`` ([a, b] of the fit, or
+        None when fewer than two sizes solved)
+    """
+    global _calibration
+    if repeats < 1:
+        raise ValueError("repeats must be at least 1")
+    if len(sizes) < 2:
+        raise ValueError("Calibration needs at least two sizes")
+    path = path or get_calibration_path()
+    calibration = load_calibration(path) or {
+        "version": _CALIBRATION_VERSION,
+        "fingerprint": machine_fingerprint(),
+        "backends": {},
+    }
+    if backends is None:
+        backends = [name for name in available_backends()
+                    if name not in calibration["backends"]]
+
+    rng = np.random.default_rng(seed)
+    programs = [_random_program(rows, cols, rng) for rows, cols in sizes]
+    for name in backends:
+        work, seconds = [], []
+        for (rows, cols), (c, A, b) in zip(sizes, programs):
+            if name == "dense" and _dense_tableau(rows, cols) > DENSE_TABLEAU_LIMIT:
+                break
+            size = rows + cols + A.nnz
+            fit = _fit(work, seconds)
+            if fit is not None and np.exp(fit[0] + fit[1] * np.log(size)) > SLOW_SOLVE_SECONDS:
+                break
+            work.append(size)
+            seconds.append(_time_backend(name, c, A, b, repeats))
+            if not seconds[-1] <= SLOW_SOLVE_SECONDS:
+                break
+        calibration["backends"][name] = {
+            "work": work,
+            "seconds": [t if np.isfinite(t) else None for t in seconds],
+            "model": _fit(work, seconds),
+        }
+
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(calibration, f, indent=2)
+    except OSError as e:
+        warnings.warn(f"Could not write backend calibration to {path} ({e})", RuntimeWarning)
+    if path == get_calibration_path():
+        _calibration = calibration
+    return calibration
+
+
+def load_calibration(path: Optional[str] = None) -> Optional[Dict]:
+    """Read a calibration file made on this hardware.
+
+    Args:
+        path: Calibration file (default get_calibration_path())
+
+    Returns:
+        The calibration dictionary, or None if the file is missing,
+        unreadable or was made on other hardware or library versions
+    """
+    path = path or get_calibration_path()
+    try:
+        with open(path) as f:
+            calibration = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (not isinstance(calibration, dict)
+            or calibration.get("version") != _CALIBRATION_VERSION
+            or calibration.get("fingerprint") != machine_fingerprint()):
+        return None
+    return calibration
+
+
+def get_calibration(backends: Optional[Iterable[str]] = None) -> Dict:
+    """Return the calibration in use, timing any backend it lacks.
+
+    Args:
+        backends: Backends that must be calibrated (default all available)
+
+    Returns:
+        The calibration dictionary (see calibrate())
+    """
+    global _calibration
+    if _calibration is None:
+        _calibration = load_calibration()
+    needed = list(backends) if backends is not None else available_backends()
+    missing = [name for name in needed
+               if _calibration is None or name not in _calibration["backends"]]
+    if missing:
+        _calibration = calibrate(missing)
+    return _calibration
+
+
+def _dense_tableau(rows: int, cols: int) -> int:
+    """Entries of the dense kernel's tableau (columns, slacks, artificials)."""
+    return (rows + 1) * (cols + 2 * rows + 1)
+
+
+def predict_seconds(backend: str, num_rows: int, num_vars: int, nnz: int) -> float:
+    """Predicted solve time of a backend for an LP of the given size.
+
+    Args:
+        backend: Calibrated backend name
+        num_rows: Constraint rows
+        num_vars: Variables
+        nnz: Nonzero constraint coefficients
+
+    Returns:
+        Seconds, or inf if the backend has no usable fit
+    """
+    model = get_calibration([backend])["backends"][backend]["model"]
+    if model is None:
+        return np.inf
+    intercept, slope = model
+    return float(np.exp(intercept + slope * np.log(max(num_rows + num_vars + nnz, 1))))
+
+
+def select_backend(num_rows: int, num_vars: int, nnz: int, is_mip: bool = False) -> str:
+    """Pick the backend predicted fastest for an instance.
+
+    Integer programs choose among MIP-capable backends by their LP timings,
+    which track the cost of the relaxations they solve at every node. The
+    dense kernel is never chosen for tableaus above DENSE_TABLEAU_LIMIT.
+
+    Args:
+        num_rows: Constraint rows
+        num_vars: Variables
+        nnz: Nonzero constraint coefficients
+        is_mip: Whether the instance has integer variables
+
+    Returns:
+        A registered backend name
+    """
+    candidates: List[str] = [
+        name for name in available_backends(mip=is_mip)
+        if not (name == "dense" and _dense_tableau(num_rows, num_vars) > DENSE_TABLEAU_LIMIT)
+    ]
+    if not candidates:
+        return "cbc"
+    if len(candidates) == 1:
+        return candidates[0]
+    get_calibration(candidates)
+    return min(candidates, key=lambda name: predict_seconds(name, num_rows, num_vars, nnz))
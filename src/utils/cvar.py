@@ -0,0 +1,113 @@
+"""Conditional value-at-risk over equally likely loss scenarios.
+
+Scenario matrices hold one row per scenario and one column per position
+(for example default rates per loan type). They may be NumPy arrays or
+read-only memory maps of ``.npy`` files; every pass over them goes through
+``iter_chunks()``, so at most ``chunk_size`` rows are in memory at a time.
+
+CVaR at level ``alpha`` is the mean of the worst ``(1 - alpha)`` share of
+losses (Rockafellar and Uryasev). For linear losses ``L = R @ x`` it is a
+convex, piecewise-linear function of ``x``; ``cvar_cut()`` returns the
+supporting hyperplane at a given ``x``, which is what a cutting-plane
+method needs.
+"""
+
+from typing import Iterator, Tuple, Union
+import numpy as np
+
+
+def load_scenarios(source: Union[str, np.ndarray]) -> np.ndarray:
+    """Return a scenario matrix, memory-mapping ``.npy`` files.
+
+    Args:
+        source: A 2-D array, or the path of a ``.npy`` file
+
+    Returns:
+        Array or read-only memory map of shape (S, K)
+    """
+    scenarios = np.load(source, mmap_mode="r") if isinstance(source, str) else source
+    if np.ndim(scenarios) != 2 or len(scenarios) == 0:
+        raise ValueError("Scenarios must be a non-empty (S, K) matrix")
+    return scenarios
+
+
+def iter_chunks(scenarios: np.ndarray, chunk_size: int) -> Iterator[Tuple[int, np.ndarray]]:
+    """Yield ``(start, block)`` pairs of consecutive scenario rows as floats."""
+    for start in range(0, len(scenarios), chunk_size):
+        yield start, np.asarray(scenarios[start:start + chunk_size], dtype=float)
+
+
+def scenario_losses(scenarios: np.ndarray, x: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+    """Compute the loss ``R @ x`` of every scenario, one chunk at a time."""
+    losses = np.empty(len(scenarios))
+    for start, block in iter_chunks(scenarios, chunk_size):
+        losses[start:start + len(block)] = block @ x
+    return losses
+
+
+def _tail_weights(losses: np.ndarray, alpha: float) -> Tuple[np.ndarray, np.ndarray, float]:
+    """Scenario indices and weights of the worst ``(1 - alpha)`` tail.
+
+    Returns:
+        Tuple of (indices, weights summing to one, value-at-risk)
+    """
+    if not 0 <= alpha < 1:
+        raise ValueError("alpha must be in [0, 1)")
+    S = len(losses)
+    k = (1 - alpha) * S
+    whole = min(int(np.floor(k + 1e-9)), S)
+    count = min(whole + 1, S)
+
+    # Only the `count` largest losses matter; sort just those
+    top = np.argpartition(-losses, count - 1)[:count] if count < S else np.arange(S)
+    top = top[np.argsort(-losses[top], kind="stable")]
+
+    weights = np.full(count, 1.0 / k)
+    if count > whole:
+        weights[whole] = (k - whole) / k
+    var = float(losses[top[min(whole, S - 1)]])
+    keep = weights > 0
+    return top[keep], weights[keep], var
+
+
+def cvar(losses: np.ndarray, alpha: float) -> Tuple[float, float]:
+    """Value-at-risk and CVaR of equally likely losses.
+
+    Args:
+        losses: Loss of each scenario, shape (S,)
+        alpha: Confidence level, e.g. 0.95 for the worst 5% of scenarios
+
+    Returns:
+        Tuple of (VaR, CVaR)
+    """
+    losses = np.asarray(losses, dtype=float)
+    index, weights, var = _tail_weights(losses, alpha)
+    return var, float(weights @ losses[index])
+
+
+def cvar_cut(scenarios: np.ndarray, x: np.ndarray, alpha: float,
+             chunk_size: int = 65536) -> Tuple[float, float, np.ndarray]:
+    """CVaR of the losses ``R @ x`` and its supporting hyperplane at ``x``.
+
+    The returned ``gradient`` satisfies ``CVaR(y) >= gradient @ y`` for all
+    ``y``, with equality at ``y = x``.
+
+    Args:
+        scenarios: Scenario matrix R, shape (S, K); may be a memory map
+        x: Position vector, shape (K,)
+        alpha: Confidence level
+        chunk_size: Scenario rows held in memory at a time
+
+    Returns:
+        Tuple of (VaR, CVaR, gradient of shape (K,))
+    """
+    losses = scenario_losses(scenarios, x, chunk_size)
+    index, weights, var = _tail_weights(losses, alpha)
+    # Gather the tail rows in file order, chunk by chunk
+    order = np.argsort(index)
+    index, weights = index[order], weights[order]
+    gradient = np.zeros(scenarios.shape[1])
+    for start in range(0, len(index), chunk_size):
+        rows = np.asarray(scenarios[index[start:start + chunk_size]], dtype=float)
+        gradient += weights[start:start + chunk_size] @ rows
+    return var, float(gradient @ x), gradient
@@ -0,0 +1,549 @@
+"""Phase timings and solver counters for optimizer solves.
+
+Every ``LPOptimizer.solve()`` runs under a PhaseTimer that splits its wall
+and CPU time into phases:
+
+- ``compile``: building the matrix form from the parameters
+- ``build``: exporting the program to PuLP objects
+- ``write``: handing a PuLP model to the solver (MPS/LP files for CBC and
+  GLPK, matrix extraction for the in-process backends)
+- ``solve``: the solver itself
+- ``extract``: reading values back and assembling the solution
+- ``cache``: solve cache lookups and stores
+- ``other``: Python time outside the named phases
+
+Phases nest; each reports its own (self) time, so the phases of a solve
+add up to its total. Solver entry points decorated with timed_solver()
+also record the dimensions of the program and the simplex iterations and
+branch-and-bound nodes they report.
+
+The resulting record is stored on the solution under ``metrics`` and
+passed to a MetricsSink: an in-memory aggregator, a JSON-lines file or a
+Prometheus text exposition.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import warnings
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional, Tuple
+import numpy as np
+
+
+# Upper bounds (seconds) of the solve duration histogram buckets
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float("inf"))
+
+_active: ContextVar[Optional["PhaseTimer"]] = ContextVar("phase_timer", default=None)
+
+
+class PhaseTimer:
+    """Wall and CPU time per phase of one solve, with solver counters.
+
+    Use as a context manager; while it is active, phase() and the
+    timed_solver() entry points record into it. A timer started while
+    another is active is folded into the outer one when it exits.
+
+    Attributes:
+        backend (Optional[str]): Backend that solved, when known
+        solves (int): Outermost solver calls
+        iterations (Optional[int]): Simplex iterations reported by the solvers
+        nodes (Optional[int]): Branch-and-bound nodes reported by the solvers
+        rows (Optional[int]): Constraint rows of the largest program solved
+        cols (Optional[int]): Variables of the largest program solved
+        nnz (Optional[int]): Nonzeros of the largest program solved
+    """
+
+    def __init__(self):
+        """Initialize an idle timer."""
+        self.backend = None
+        self.solves = 0
+        self.iterations = None
+        self.nodes = None
+        self.rows = self.cols = self.nnz = None
+        self.wall = self.cpu = 0.0
+        self._phases: Dict[str, list] = {}
+        self._frames = [[0.0, 0.0]]
+        self._solver_frames = []
+        self._token = None
+
+    def __enter__(self) -> "PhaseTimer":
+        self._token = _active.set(self)
+        self._start = (time.perf_counter(), time.process_time())
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.wall = time.perf_counter() - self._start[0]
+        self.cpu = time.process_time() - self._start[1]
+        _active.reset(self._token)
+        parent = _active.get()
+        if parent is not None:
+            parent._absorb(self)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Attribute the time spent in the block to a phase.
+
+        Args:
+            name: Phase name
+        """
+        wall, cpu = time.perf_counter(), time.process_time()
+        self._frames.append([0.0, 0.0])
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            child_wall, child_cpu = self._frames.pop()
+            self._add(name, wall - child_wall, cpu - child_cpu, 1)
+            self._frames[-1][0] += wall
+            self._frames[-1][1] += cpu
+
+    def _add(self, name: str, wall: float, cpu: float, calls: int) -> None:
+        entry = self._phases.setdefault(name, [0.0, 0.0, 0])
+        entry[0] += wall
+        entry[1] += cpu
+        entry[2] += calls
+
+    def _absorb(self, child: "PhaseTimer") -> None:
+        """Fold a nested timer's phases and counters into this one."""
+        for name, stats in child.phases().items():
+            self._add(name, stats["wall"], stats["cpu"], stats["calls"])
+        self._frames[-1][0] += child.wall
+        self._frames[-1][1] += child.cpu
+        self.solves += child.solves
+        for name in ("iterations", "nodes"):
+            if getattr(child, name) is not None:
+                setattr(self, name, (getattr(self, name) or 0) + getattr(child, name))
+        if child.rows is not None:
+            self._record_dimensions(child.rows, child.cols, child.nnz)
+
+    def _record_dimensions(self, rows: int, cols: int, nnz: int) -> None:
+        if self.rows is None or (rows, cols) > (self.rows, self.cols):
+            self.rows, self.cols, self.nnz = int(rows), int(cols), int(nnz)
+
+    def phases(self) -> Dict[str, Dict[str, float]]:
+        """Self time per phase, with the unattributed time under ``other``.
+
+        Returns:
+            {phase: {"wall": seconds, "cpu": seconds, "calls": count}}
+        """
+        phases = {name: {"wall": wall, "cpu": cpu, "calls": calls}
+                  for name, (wall, cpu, calls) in self._phases.items()}
+        other = phases.setdefault("other", {"wall": 0.0, "cpu": 0.0, "calls": 0})
+        other["wall"] += max(self.wall - self._frames[0][0], 0.0)
+        other["cpu"] += max(self.cpu - self._frames[0][1], 0.0)
+        return phases
+
+    def record(self, **fields) -> Dict:
+        """Return the metrics record of the finished solve.
+
+        Args:
+            **fields: Extra fields, such as ``model`` and ``status``
+
+        Returns:
+            Dictionary with ``timestamp``, ``wall``, ``cpu``, ``phases``,
+            ``backend``, ``rows``, ``cols``, ``nnz``, ``solves``,
+            ``iterations``, ``nodes`` and the extra fields
+        """
+        record = {
+            "timestamp": time.time(),
+            "wall": self.wall,
+            "cpu": self.cpu,
+            "phases": self.phases(),
+            "backend": self.backend,
+            "rows": self.rows,
+            "cols": self.cols,
+            "nnz": self.nnz,
+            "solves": self.solves,
+            "iterations": self.iterations,
+            "nodes": self.nodes,
+        }
+        record.update(fields)
+        return record
+
+
+def current_timer() -> Optional[PhaseTimer]:
+    """Return the active PhaseTimer, or None outside a timed solve."""
+    return _active.get()
+
+
+def set_backend(name: str) -> None:
+    """Record the backend chosen for the active solve, if one is timed."""
+    timer = _active.get()
+    if timer is not None:
+        timer.backend = name
+
+
+def phase(name: str):
+    """Context manager attributing a block to a phase of the active timer.
+
+    Args:
+        name: Phase name
+
+    Returns:
+        The timer's phase context, or a no-op context without a timer
+    """
+    timer = _active.get()
+    return timer.phase(name) if timer is not None else nullcontext()
+
+
+def timed(name: str) -> Callable:
+    """Decorator attributing every call of a function to a phase.
+
+    Args:
+        name: Phase name
+    """
+    def decorate(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            timer = _active.get()
+            if timer is None:
+                return function(*args, **kwargs)
+            with timer.phase(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def matrix_dimensions(args: Tuple, kwargs: Dict) -> Tuple[int, int, int]:
+    """Rows, columns and nonzeros of a call taking ``(c, A_ub, b_ub, A_eq, b_eq, ...)``."""
+    def argument(position, name):
+        return args[position] if len(args) > position else kwargs.get(name)
+
+    rows = nnz = 0
+    for matrix in (argument(1, "A_ub"), argument(3, "A_eq")):
+        if matrix is None:
+            continue
+        rows += matrix.shape[0]
+        nnz += matrix.nnz if hasattr(matrix, "nnz") else int(np.count_nonzero(matrix))
+    return rows, len(argument(0, "c")), nnz
+
+
+def timed_solver(function: Optional[Callable] = None, *,
+                 dimensions: Optional[Callable] = None,
+                 backend: Optional[str] = None) -> Callable:
+    """Decorator for solver entry points.
+
+    Calls are timed as the ``solve`` phase. The outermost solver call of a
+    solve records the program dimensions (from ``dimensions(args, kwargs)``)
+    and counts as one solve; iterations are taken from the ``iterations``
+    of innermost calls, so a branch and bound counts the iterations of its
+    relaxations, and nodes from the ``nodes`` of any call.
+
+    Args:
+        function: The solver function (when used without arguments)
+        dimensions: Optional function returning (rows, cols, nnz)
+        backend: Name recorded as the solve's backend when no backend
+            was chosen before the call
+    """
+    def decorate(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            timer = _active.get()
+            if timer is None:
+                return function(*args, **kwargs)
+            if timer.backend is None:
+                timer.backend = backend
+            frames = timer._solver_frames
+            if frames:
+                frames[-1] = True
+            frames.append(False)
+            try:
+                with timer.phase("solve"):
+                    result = function(*args, **kwargs)
+            finally:
+                nested = frames.pop()
+            if not frames:
+                timer.solves += 1
+                if dimensions is not None:
+                    timer._record_dimensions(*dimensions(args, kwargs))
+            if isinstance(result, dict):
+                counts = {"nodes": result.get("nodes")}
+                if not nested:
+                    counts["iterations"] = result.get("iterations")
+                for name, count in counts.items():
+                    if isinstance(count, (int, np.integer)):
+                        setattr(timer, name, (getattr(timer, name) or 0) + int(count))
+            return result
+        return wrapper
+    return decorate(function) if function is not None else decorate
+
+
+class MetricsSink:
+    """Receiver of solve metrics records. Subclasses implement emit()."""
+
+    def emit(self, record: Dict) -> None:
+        """Receive the metrics record of one solve.
+
+        Args:
+            record: Record built by PhaseTimer.record()
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any resources held by the sink."""
+
+
+class InMemoryMetrics(MetricsSink):
+    """Aggregate records per optimizer class and backend.
+
+    Only running totals and a duration histogram are kept, so memory stays
+    constant over any number of solves.
+    """
+
+    def __init__(self):
+        """Initialize an empty aggregator."""
+        self._groups: Dict[Tuple[str, str], Dict] = {}
+        self._lock = threading.Lock()
+
+    def emit(self, record: Dict) -> None:
+        """Add one record to the totals of its model and backend."""
+        key = (str(record.get("model")), str(record.get("backend")))
+        with self._lock:
+            group = self._groups.get(key)
+            if group is None:
+                group = self._groups[key] = {
+                    "solves": 0, "cache_hits": 0, "statuses": {},
+                    "wall": 0.0, "cpu": 0.0, "max_wall": 0.0, "phases": {},
+                    "iterations": 0, "nodes": 0,
+                    "rows": None, "cols": None, "nnz": None,
+                    "buckets": [0] * len(DURATION_BUCKETS),
+                }
+            group["solves"] += 1
+            group["cache_hits"] += bool(record.get("cache_hit"))
+            status = str(record.get("status"))
+            group["statuses"][status] = group["statuses"].get(status, 0) + 1
+            group["wall"] += record["wall"]
+            group["cpu"] += record["cpu"]
+            group["max_wall"] = max(group["max_wall"], record["wall"])
+            for name, stats in record["phases"].items():
+                totals = group["phases"].setdefault(name, {"wall": 0.0, "cpu": 0.0, "calls": 0})
+                for field in totals:
+                    totals[field] += stats[field]
+            group["iterations"] += record.get("iterations") or 0
+            group["nodes"] += record.get("nodes") or 0
+            if record.get("rows") is not None:
+                group["rows"], group["cols"], group["nnz"] = \
+                    record["rows"], record["cols"], record["nnz"]
+            group["buckets"][int(np.searchsorted(DURATION_BUCKETS, record["wall"]))] += 1
+
+    def _quantile(self, buckets, q: float) -> float:
+        """Upper bound of the histogram bucket holding quantile q."""
+        rank = q * sum(buckets)
+        return DURATION_BUCKETS[int(np.searchsorted(np.cumsum(buckets), rank))]
+
+    def summary(self) -> Dict[str, Dict[str, Dict]]:
+        """Totals per model and backend.
+
+        Returns:
+            {model: {backend: stats}}, where stats has ``solves``,
+            ``cache_hits``, ``statuses``, ``wall``, ``cpu``, ``mean_wall``,
+            ``max_wall``, ``p50_wall`` and ``p99_wall`` (histogram bucket
+            bounds), ``phases`` ({phase: wall, cpu, calls and ``share`` of
+            the total wall time}), ``iterations``, ``nodes`` and the latest
+            ``rows``, ``cols`` and ``nnz``
+        """
+        with self._lock:
+            summary = {}
+            for (model, backend), group in self._groups.items():
+                stats = {k: v for k, v in group.items() if k not in ("buckets", "phases")}
+                stats["statuses"] = dict(group["statuses"])
+                stats["mean_wall"] = group["wall"] / group["solves"]
+                stats["p50_wall"] = self._quantile(group["buckets"], 0.50)
+                stats["p99_wall"] = self._quantile(group["buckets"], 0.99)
+                wall = group["wall"]
+                stats["phases"] = {
+                    name: dict(totals, share=totals["wall"] / wall if wall else 0.0)
+                    for name, totals in group["phases"].items()
+                }
+                summary.setdefault(model, {})[backend] = stats
+            return summary
+
+    def hot_phases(self, top: int = 5) -> list:
+        """The phases with the most wall time across all models and backends.
+
+        Args:
+            top: Number of entries to return
+
+        Returns:
+            List of (model, backend, phase, wall seconds), largest first
+        """
+        entries = [(model, backend, name, totals["wall"])
+                   for model, backends in self.summary().items()
+                   for backend, stats in backends.items()
+                   for name, totals in stats["phases"].items()]
+        return sorted(entries, key=lambda entry: -entry[3])[:top]
+
+    def reset(self) -> None:
+        """Discard all totals."""
+        with self._lock:
+            self._groups.clear()
+
+
+class JsonLinesMetrics(MetricsSink):
+    """Append every record as one JSON line to a file."""
+
+    def __init__(self, path: str, flush_every: int = 1):
+        """Open the file for appending.
+
+        Args:
+            path: JSON-lines file
+            flush_every: Records buffered between flushes
+        """
+        if flush_every < 1:
+            raise ValueError("flush_every must be at least 1")
+        self.path = path
+        self.flush_every = flush_every
+        self._file = open(path, "a")
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def emit(self, record: Dict) -> None:
+        """Write the record as a JSON line."""
+        line = json.dumps(record, default=float)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self._file.flush()
+                self._pending = 0
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class PrometheusMetrics(InMemoryMetrics):
+    """Aggregate records and render them in the Prometheus text format.
+
+    Serve exposition() from an HTTP endpoint, or write() it to a file
+    picked up by node_exporter's textfile collector.
+    """
+
+    def __init__(self, namespace: str = "investment_planning", path: Optional[str] = None):
+        """Initialize the aggregator.
+
+        Args:
+            namespace: Prefix of every metric name
+            path: Optional file rewritten by write() (and on close())
+        """
+        super().__init__()
+        self.namespace = namespace
+        self.path = path
+
+    @staticmethod
+    def _labels(**labels) -> str:
+        """Format a label set, escaping backslashes, quotes and newlines."""
+        escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+                   for v in labels.values())
+        return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+    def exposition(self) -> str:
+        """Render all totals as Prometheus text exposition (version 0.0.4).
+
+        Returns:
+            The metrics text
+        """
+        ns = self.namespace
+        families = {
+            "solves_total": ("counter", "Optimizer solves", []),
+            "cache_hits_total": ("counter", "Solves answered by the solve cache", []),
+            "phase_wall_seconds_total": ("counter", "Wall time per solve phase", []),
+            "phase_cpu_seconds_total": ("counter", "CPU time per solve phase", []),
+            "solve_duration_seconds": ("histogram", "Wall time of a solve", []),
+            "solver_iterations_total": ("counter", "Simplex iterations", []),
+            "solver_nodes_total": ("counter", "Branch-and-bound nodes", []),
+            "model_rows": ("gauge", "Constraint rows of the latest solve", []),
+            "model_cols": ("gauge", "Variables of the latest solve", []),
+            "model_nnz": ("gauge", "Constraint nonzeros of the latest solve", []),
+        }
+        with self._lock:
+            groups = {key: dict(group, statuses=dict(group["statuses"]),
+                                phases={k: dict(v) for k, v in group["phases"].items()},
+                                buckets=list(group["buckets"]))
+                      for key, group in self._groups.items()}
+
+        for (model, backend), group in sorted(groups.items()):
+            base = {"model": model, "backend": backend}
+            for status, count in sorted(group["statuses"].items()):
+                families["solves_total"][2].append(("", self._labels(**base, status=status), count))
+            families["cache_hits_total"][2].append(("", self._labels(**base), group["cache_hits"]))
+            for name, totals in sorted(group["phases"].items()):
+                labels = self._labels(**base, phase=name)
+                families["phase_wall_seconds_total"][2].append(("", labels, totals["wall"]))
+                families["phase_cpu_seconds_total"][2].append(("", labels, totals["cpu"]))
+            cumulative = np.cumsum(group["buckets"])
+            for bound, count in zip(DURATION_BUCKETS, cumulative):
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                families["solve_duration_seconds"][2].append(
+                    ("_bucket", self._labels(**base, le=le), count))
+            duration = families["solve_duration_seconds"][2]
+            duration.append(("_sum", self._labels(**base), group["wall"]))
+            duration.append(("_count", self._labels(**base), group["solves"]))
+            families["solver_iterations_total"][2].append(
+                ("", self._labels(**base), group["iterations"]))
+            families["solver_nodes_total"][2].append(("", self._labels(**base), group["nodes"]))
+            for name in ("rows", "cols", "nnz"):
+                if group[name] is not None:
+                    families[f"model_{name}"][2].append(("", self._labels(**base), group[name]))
+
+        lines = []
+        for name, (kind, help_text, samples) in families.items():
+            lines.append(f"# HELP {ns}_{name} {help_text}")
+            lines.append(f"# TYPE {ns}_{name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{ns}_{name}{suffix}{labels} {float(value)!r}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Optional[str] = None) -> None:
+        """Atomically replace a file with the current exposition.
+
+        Args:
+            path: Target file (default the path given at construction)
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path to write the Prometheus metrics to")
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            f.write(self.exposition())
+        os.replace(temporary, path)
+
+    def close(self) -> None:
+        """Write the final exposition when a path was given."""
+        if self.path is not None:
+            self.write()
+
+
+_default_sink: Optional[MetricsSink] = None
+
+
+def set_default_metrics_sink(sink: Optional[MetricsSink]) -> None:
+    """Set the sink receiving the metrics of optimizers without their own.
+
+    Args:
+        sink: A MetricsSink, or None to stop emitting
+    """
+    global _default_sink
+    _default_sink = sink
+
+
+def get_default_metrics_sink() -> Optional[MetricsSink]:
+    """Return the process-wide metrics sink, if any."""
+    return _default_sink
+
+
+def emit(sink: Optional[MetricsSink], record: Dict) -> None:
+    """Send a record to a sink, warning instead of failing the solve."""
+    if sink is None:
+        return
+    try:
+        sink.emit(record)
+    except Exception as e:
+        warnings.warn(f"Metrics sink {type(sink).__name__} failed ({e})", RuntimeWarning)
@@ -0,0 +1,224 @@
+"""Parametric right-hand-side analysis for small linear programs.
+
+The optimal value of an LP whose right-hand side moves along a line,
+``b(theta) = b + theta * d``, is piecewise linear and concave (convex when
+minimizing) in ``theta``. Within one piece the optimal basis stays the same
+and the basic variables move linearly. Starting from an optimal basis at
+the low end, the walk raises ``theta`` until a basic variable would turn
+negative, then replaces it with a dual simplex pivot; the reduced costs are
+untouched by RHS changes, so the basis stays dual feasible throughout. Each
+pivot marks one breakpoint, so the whole curve costs as many pivots as it
+has pieces instead of one full solve per sample point.
+"""
+
+from typing import Dict, Optional
+import numpy as np
+
+from .batch_lp import _bounds, _kernel_rows, solve_lp
+
+
+def parametric_rhs(
+    c: np.ndarray,
+    A_ub=None,
+    b_ub: Optional[np.ndarray] = None,
+    A_eq=None,
+    b_eq: Optional[np.ndarray] = None,
+    bounds: Optional[np.ndarray] = None,
+    maximize: bool = False,
+    d_ub: Optional[np.ndarray] = None,
+    d_eq: Optional[np.ndarray] = None,
+    lo: float = 0.0,
+    hi: float = 1.0,
+    max_pivots: Optional[int] = None,
+    basis: Optional[np.ndarray] = None,
+    tol: float = 1e-9,
+) -> Dict:
+    """Trace the optimal solution of an LP as its right-hand side moves.
+
+    Solves ``min (or max) c @ x`` subject to ``A_ub @ x <= b_ub + theta * d_ub``,
+    ``A_eq @ x == b_eq + theta * d_eq`` and the variable bounds for every
+    ``theta`` in ``[lo, hi]``. Arguments follow batch_lp.solve_lp.
+
+    Args:
+        c: Objective coefficients, shape (n,)
+        A_ub: Inequality matrix (dense or scipy.sparse), rows are ``<=``
+        b_ub: Inequality right-hand sides at ``theta = 0``
+        A_eq: Equality matrix (dense or scipy.sparse)
+        b_eq: Equality right-hand sides at ``theta = 0``
+        bounds: Variable bounds as an (n, 2) array (default 0 to +inf)
+        maximize: Maximize the objective instead of minimizing it
+        d_ub: Direction of the inequality right-hand sides (default zero)
+        d_eq: Direction of the equality right-hand sides (default zero)
+        lo: Start of the parameter range
+        hi: End of the parameter range
+        max_pivots: Limit on dual simplex pivots (default scales with size)
+        basis: Optional starting basis, e.g. one of the ``bases`` returned
+            by an earlier call on the same program; the solve at ``lo``
+            then starts from it
+        tol: Feasibility and optimality tolerance
+
+    Returns:
+        Dictionary with:
+            - ``status``: "Optimal" when the whole range was traced,
+              "Infeasible" when the LP becomes infeasible past
+              ``breakpoints[-1]`` (or at ``lo``), "Unbounded", or
+              "Not Solved" when the pivot limit was reached
+            - ``breakpoints``: parameter values bounding the pieces, shape (k+1,)
+            - ``objective``: optimal values at the breakpoints, shape (k+1,)
+            - ``slopes``: d(objective)/d(theta) on each piece, shape (k,)
+            - ``x``: optimal solutions at the breakpoints, shape (k+1, n);
+              between two breakpoints the solution is their interpolation
+            - ``bases``: an optimal basis on each piece, shape (k, m)
+            - ``pivots``: dual simplex pivots used
+    """
+    if not hi >= lo:
+        raise ValueError(f"hi ({hi}) must not be below lo ({lo})")
+    c = np.asarray(c, dtype=float)
+    n = len(c)
+
+    def _dense(matrix, rhs, direction):
+        if matrix is None:
+            return np.zeros((0, n)), np.zeros(0), np.zeros(0)
+        matrix = matrix.toarray() if hasattr(matrix, "toarray") else np.asarray(matrix, dtype=float)
+        matrix = matrix.reshape(-1, n)
+        direction = (np.zeros(len(matrix)) if direction is None
+                     else np.asarray(direction, dtype=float))
+        if direction.shape != (len(matrix),):
+            raise ValueError(f"Direction must have one entry per row ({len(matrix)})")
+        return matrix, np.asarray(rhs, dtype=float), direction
+
+    A_ub, b_ub, d_ub = _dense(A_ub, b_ub, d_ub)
+    A_eq, b_eq, d_eq = _dense(A_eq, b_eq, d_eq)
+
+    empty = {"breakpoints": np.zeros(0), "objective": np.zeros(0), "slopes": np.zeros(0),
+             "x": np.zeros((0, n)), "bases": np.zeros((0, 0), dtype=int), "pivots": 0}
+    start = solve_lp(c, A_ub, b_ub + lo * d_ub, A_eq, b_eq + lo * d_eq,
+                     bounds=bounds, maximize=maximize, basis=basis)
+    if start["status"] != "Optimal":
+        return dict(empty, status=start["status"])
+
+    # Rebuild the standard form used by solve_lp, so its basis indexes the
+    # same columns: fixed variables dropped, shifted lower bounds, finite
+    # upper bounds as extra rows, one slack per inequality row
+    lower, upper = _bounds(bounds, n)
+    free, capped, kernel_ub = _kernel_rows(A_ub, lower, upper)
+    b_ub = np.concatenate([b_ub - A_ub @ lower, upper[capped] - lower[capped]])
+    d_ub = np.concatenate([d_ub, np.zeros(len(capped))])
+    b_eq = b_eq - A_eq @ lower
+    n_free, m_ub, m_eq = len(free), len(b_ub), len(b_eq)
+    m = m_ub + m_eq
+
+    A = np.zeros((m, n_free + m_ub))
+    A[:m_ub, :n_free] = kernel_ub
+    A[:m_ub, n_free:] = np.eye(m_ub)
+    A[m_ub:, :n_free] = A_eq[:, free]
+    b = np.concatenate([b_ub, b_eq])
+    d = np.concatenate([d_ub, d_eq])
+    cost = np.zeros(n_free + m_ub)
+    cost[:n_free] = -c[free] if maximize else c[free]
+
+    basis = np.array(start["basis"], dtype=int)
+    # Artificial columns left basic at zero after a degenerate phase 1 are
+    # pivoted out; choosing the column with the smallest ratio of reduced
+    # cost to |pivot entry| keeps every reduced cost non-negative
+    for position in np.flatnonzero(basis >= A.shape[1]):
+        B = np.column_stack([A[:, j] if j < A.shape[1] else np.eye(m)[:, j - A.shape[1]]
+                             for j in basis])
+        B_inv = np.linalg.inv(B)
+        costs = np.array([cost[j] if j < A.shape[1] else 0.0 for j in basis])
+        row = B_inv[position] @ A
+        reduced = cost - (costs @ B_inv) @ A
+        candidates = np.abs(row) > tol
+        candidates[basis[basis < A.shape[1]]] = False
+        if not candidates.any():
+            raise ValueError("Parametric analysis requires equality rows of full rank")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(candidates, np.maximum(reduced, 0.0) / np.abs(row), np.inf)
+        basis[position] = int(np.argmin(ratio))
+    if max_pivots is None:
+        max_pivots = 50 * (m + A.shape[1])
+
+    scale = tol * (1.0 + np.abs(b).max(initial=0.0) + abs(lo) * np.abs(d).max(initial=0.0))
+    theta = float(lo)
+    breakpoints, objective, points, slopes, bases = [], [], [], [], []
+    status = "Optimal"
+    pivots = 0
+
+    def _record(theta, B_inv):
+        values = np.zeros(A.shape[1])
+        values[basis] = B_inv @ (b + theta * d)
+        x = lower.copy()
+        x[free] += values[:n_free]
+        breakpoints.append(theta)
+        points.append(x)
+        objective.append(float(c @ x))
+
+    while True:
+        B_inv = np.linalg.inv(A[:, basis])
+        x_B = B_inv @ (b + theta * d)
+        dx_B = B_inv @ d
+        if not breakpoints:
+            _record(theta, B_inv)
+
+        # Largest step before a basic variable turns negative
+        falling = dx_B < -tol
+        with np.errstate(divide="ignore"):
+            limits = np.where(falling, np.maximum(x_B, 0.0) / -np.where(falling, dx_B, -1.0),
+                              np.inf)
+        step = limits.min(initial=np.inf)
+        end = min(theta + step, hi)
+        if end > theta:
+            # The slope is the dual price of the direction, in the user's sense
+            kept = basis < n_free
+            slopes.append(float(c[free][basis[kept]] @ dx_B[kept]))
+            bases.append(basis.copy())
+            theta = end
+            _record(theta, B_inv)
+        if theta >= hi:
+            break
+
+        if pivots >= max_pivots:
+            status = "Not Solved"
+            break
+
+        # Dual simplex pivot: the first variable to hit zero leaves
+        ties = falling & (limits <= step + scale)
+        leaving = int(np.argmin(np.where(ties, basis, A.shape[1])))
+        row = B_inv[leaving] @ A
+        reduced = cost - (cost[basis] @ B_inv) @ A
+        candidates = row < -tol
+        candidates[basis] = False
+        if not candidates.any():
+            # Nothing can replace it: the LP is infeasible past this point
+            status = "Infeasible"
+            break
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(candidates, np.maximum(reduced, 0.0) / -row, np.inf)
+        best = ratio.min()
+        entering = int(np.argmax(candidates & (ratio <= best + tol)))
+        basis[leaving] = entering
+        pivots += 1
+
+    # Pivots that change the basis but neither the slope nor the direction
+    # of the solution are not breakpoints of the curve
+    breakpoints, objective, points = map(np.array, (breakpoints, objective, points))
+    slopes = np.array(slopes)
+    bases = np.array(bases, dtype=int).reshape(len(slopes), m)
+    if len(slopes) > 1:
+        width = np.diff(breakpoints)
+        rates = np.diff(points, axis=0) / width[:, np.newaxis]
+        same = (np.isclose(slopes[1:], slopes[:-1], rtol=1e-9, atol=tol)
+                & np.isclose(rates[1:], rates[:-1], rtol=1e-9, atol=tol).all(axis=1))
+        keep = np.r_[True, ~same, True]
+        breakpoints, objective, points = breakpoints[keep], objective[keep], points[keep]
+        slopes, bases = slopes[np.r_[True, ~same]], bases[np.r_[True, ~same]]
+
+    return {
+        "status": status,
+        "breakpoints": breakpoints,
+        "objective": objective,
+        "slopes": slopes,
+        "x": points,
+        "bases": bases,
+        "pivots": pivots,
+    }
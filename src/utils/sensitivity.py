@@ -0,0 +1,421 @@
+"""LP sensitivity report: objective ranging, RHS ranging and reduced costs.
+
+An optimal basis stays optimal while the reduced costs of the nonbasic
+columns keep their signs, and stays feasible while the basic variables stay
+within their bounds. A cost coefficient moves the reduced costs along one
+row of ``B^-1 N`` and a right-hand side moves the basic variables along one
+column of ``B^-1``, so factoring the basis ``B`` once gives the allowable
+increase and decrease of every cost coefficient and right-hand side in a
+single pass, without re-solving.
+
+Not every backend reports its basis, so the basis is recovered from the
+optimal primal and dual solution: variables and slacks strictly between
+their bounds are basic, and columns at a bound with zero reduced cost fill
+the remaining positions. With a degenerate optimum other optimal bases give
+other (equally valid) ranges, as in any solver's sensitivity report.
+
+Within a range the solution ``x`` stays the same for cost changes, and the
+dual value stays the same for right-hand side changes; the objective then
+moves by ``x_j * delta`` and ``dual_i * delta`` respectively. The matrices
+stay sparse: the basis is recovered by sparse elimination, factored with
+SuperLU, and ``B^-1`` is applied to blocks of unit vectors only for the
+cost coefficients and right-hand sides whose ranges need it.
+"""
+
+import heapq
+from typing import Dict, List, Optional
+import numpy as np
+from pulp import LpConstraintEQ, LpConstraintGE, LpMaximize, LpProblem, LpStatus
+
+from .solver_utils import _to_matrices, get_backend
+
+
+# Unit vectors per block when applying B^-1 or B^-T
+_BLOCK = 256
+
+
+def _sparse(matrix, n: int):
+    """CSR (m, n) matrix from a dense or sparse matrix, or an empty one."""
+    from scipy import sparse
+
+    if matrix is None:
+        return sparse.csr_matrix((0, n))
+    if sparse.issparse(matrix):
+        return sparse.csr_matrix(matrix, dtype=float)
+    return sparse.csr_matrix(np.asarray(matrix, dtype=float).reshape(-1, n))
+
+
+def _independent_columns(M, order: List[int], tol: float) -> List[int]:
+    """Greedily pick linearly independent columns of a CSC matrix in the given order.
+
+    Each accepted column is reduced against the earlier ones and pivots on
+    its largest entry. A candidate is reduced the same way, eliminating
+    pivot rows in acceptance order, and is accepted if a significant entry
+    remains. Columns stay sparse, so the work follows the fill, not m^2.
+    """
+    m = M.shape[0]
+    pivot_of: Dict[int, int] = {}
+    reduced: List[Dict[int, float]] = []
+    pivots: List[int] = []
+    chosen: List[int] = []
+    for j in order:
+        entries = slice(M.indptr[j], M.indptr[j + 1])
+        v = dict(zip(M.indices[entries].tolist(), M.data[entries].tolist()))
+        scale = max(map(abs, v.values()), default=0.0)
+        pending = [pivot_of[row] for row in v if row in pivot_of]
+        heapq.heapify(pending)
+        queued = set(pending)
+        while pending:
+            k = heapq.heappop(pending)
+            a = v.pop(pivots[k], 0.0)
+            if a == 0.0:
+                continue
+            u = reduced[k]
+            factor = a / u[pivots[k]]
+            for row, b in u.items():
+                if row == pivots[k]:
+                    continue
+                v[row] = v.get(row, 0.0) - factor * b
+                k_row = pivot_of.get(row)
+                if k_row is not None and k_row not in queued:
+                    heapq.heappush(pending, k_row)
+                    queued.add(k_row)
+        v = {row: a for row, a in v.items() if abs(a) > 1e-14 * scale}
+        if not v:
+            continue
+        row = max(v, key=lambda r: abs(v[r]))
+        if abs(v[row]) > tol * max(1.0, scale):
+            pivot_of[row] = len(reduced)
+            reduced.append(v)
+            pivots.append(row)
+            chosen.append(j)
+            if len(chosen) == m:
+                break
+    return chosen
+
+
+def _unit_solves(factor, positions: np.ndarray, trans: str = "N"):
+    """Yield blocks of positions with B^-1 (or B^-T) applied to their unit vectors."""
+    m = factor.shape[0]
+    for start in range(0, len(positions), _BLOCK):
+        block = positions[start:start + _BLOCK]
+        units = np.zeros((m, len(block)))
+        units[block, np.arange(len(block))] = 1.0
+        yield block, factor.solve(units, trans=trans)
+
+
+def sensitivity_ranges(
+    c: np.ndarray,
+    A_ub=None,
+    b_ub: Optional[np.ndarray] = None,
+    A_eq=None,
+    b_eq: Optional[np.ndarray] = None,
+    bounds: Optional[np.ndarray] = None,
+    x: Optional[np.ndarray] = None,
+    duals_ub: Optional[np.ndarray] = None,
+    duals_eq: Optional[np.ndarray] = None,
+    maximize: bool = False,
+    tol: float = 1e-7,
+) -> Dict[str, np.ndarray]:
+    """Objective and right-hand side ranging of an optimal LP solution.
+
+    Arguments follow solver_utils.solve_highs, plus the optimal solution.
+
+    Args:
+        c: Objective coefficients, shape (n,)
+        A_ub: Inequality matrix (dense or scipy.sparse), rows are ``<=``
+        b_ub: Inequality right-hand sides
+        A_eq: Equality matrix (dense or scipy.sparse)
+        b_eq: Equality right-hand sides
+        bounds: Variable bounds as an (n, 2) array (default 0 to +inf)
+        x: Optimal primal solution, shape (n,)
+        duals_ub: Optimal duals of the inequality rows (d objective / d rhs);
+            with the equality duals, they select the basis at a degenerate
+            optimum. Without them any basis of ``x`` that is dual feasible
+            is used.
+        duals_eq: Optimal duals of the equality rows
+        maximize: Whether the objective is maximized
+        tol: Primal and dual feasibility tolerance
+
+    Returns:
+        Dictionary of arrays:
+            - ``basic``: whether each variable is basic, shape (n,)
+            - ``reduced_costs``: d objective / d x, shape (n,)
+            - ``cost_increase``, ``cost_decrease``: how far each objective
+              coefficient can move before the basis stops being optimal
+            - ``duals_ub``, ``duals_eq``: the duals of the basis
+            - ``rhs_increase_ub``, ``rhs_decrease_ub``, ``rhs_increase_eq``,
+              ``rhs_decrease_eq``: how far each right-hand side can move
+              before the basis stops being feasible
+    """
+    from scipy import sparse
+    from scipy.sparse.linalg import splu
+
+    c = np.asarray(c, dtype=float)
+    n = len(c)
+    if x is None:
+        raise ValueError("Sensitivity ranging needs the optimal solution x")
+    x = np.asarray(x, dtype=float)
+    A_ub, A_eq = _sparse(A_ub, n), _sparse(A_eq, n)
+    b_ub = np.asarray(b_ub if b_ub is not None else np.zeros(0), dtype=float)
+    b_eq = np.asarray(b_eq if b_eq is not None else np.zeros(0), dtype=float)
+    m_ub, m_eq = A_ub.shape[0], A_eq.shape[0]
+    m = m_ub + m_eq
+    if x.shape != (n,) or len(b_ub) != m_ub or len(b_eq) != m_eq:
+        raise ValueError("x and the right-hand sides must match the constraint matrices")
+    if bounds is None:
+        lower, upper = np.zeros(n), np.full(n, np.inf)
+    else:
+        bounds = np.array(bounds, dtype=float).reshape(n, 2)
+        lower = np.where(np.isnan(bounds[:, 0]), -np.inf, bounds[:, 0])
+        upper = np.where(np.isnan(bounds[:, 1]), np.inf, bounds[:, 1])
+
+    # Columns: variables, one slack per inequality row, then one artificial
+    # per equality row, fixed at zero, for redundant equalities
+    M = sparse.hstack([sparse.vstack([A_ub, A_eq]), sparse.identity(m)], format="csc")
+    z = np.concatenate([x, b_ub - A_ub @ x, np.zeros(m_eq)])
+    lo = np.concatenate([lower, np.zeros(m)])
+    up = np.concatenate([upper, np.full(m_ub, np.inf), np.zeros(m_eq)])
+    sign = -1.0 if maximize else 1.0
+    cost = np.concatenate([sign * c, np.zeros(m)])
+
+    # Basis: columns strictly inside their bounds first, then columns at a
+    # bound whose reduced cost under the given duals is zero
+    scale = tol * (1.0 + np.abs(z))
+    inside = (z > lo + scale) & (z < up - scale)
+    at_bound = ~inside
+    at_bound[n + m_ub:] = False
+    artificial = np.arange(n + m_ub, n + m)
+    if duals_ub is not None and duals_eq is not None:
+        y = sign * np.concatenate([np.asarray(duals_ub, dtype=float),
+                                   np.asarray(duals_eq, dtype=float)])
+        d = cost - M.T @ y
+        flat = np.abs(d) <= tol * (1.0 + np.abs(cost))
+        order = np.concatenate([np.flatnonzero(inside), np.flatnonzero(at_bound & flat),
+                                np.flatnonzero(at_bound & ~flat), artificial])
+    else:
+        order = np.concatenate([np.flatnonzero(inside), np.flatnonzero(at_bound), artificial])
+    basis = np.array(_independent_columns(M, order.tolist(), 1e-9), dtype=int)
+    if len(basis) < m:
+        raise ValueError("Could not recover a nonsingular basis from the solution")
+
+    factor = splu(M[:, basis].tocsc())
+    y = factor.solve(cost[basis], trans="T")
+    d = cost - M.T @ y
+    d[basis] = 0.0
+    nonbasic = np.setdiff1d(np.arange(n + m), basis)
+
+    # Nonbasic columns: +1 at the lower bound, -1 at the upper bound, 0 fixed;
+    # a free nonbasic column keeps a zero reduced cost
+    free = np.isinf(lo) & np.isinf(up)
+    at_lower = np.abs(z - np.where(np.isfinite(lo), lo, 0.0)) <= \
+        np.abs(z - np.where(np.isfinite(up), up, np.inf))
+    status = np.where(lo == up, 0.0, np.where(at_lower, 1.0, -1.0))
+    status[free] = 0.0
+    violated = status[nonbasic] * d[nonbasic] < -tol * (1.0 + np.abs(cost[nonbasic]))
+    if violated.any():
+        raise ValueError("The solution is not optimal for any basis; pass its duals")
+
+    # Objective ranging of basic variables: row k of B^-1 N (from B^-T e_k)
+    # moves the reduced costs as c_B[k] changes
+    structural = np.flatnonzero(basis < n)
+    columns = basis[structural]
+    N_T = M[:, nonbasic].T.tocsr()
+    d_n, s_n, free_n = d[nonbasic], status[nonbasic], free[nonbasic]
+    increase_min = np.full(n, np.inf)
+    decrease_min = np.full(n, np.inf)
+    for block, rho in _unit_solves(factor, structural, trans="T"):
+        alpha = (N_T @ rho).T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = d_n / alpha
+        toward = s_n * alpha
+        cap_up = np.where(toward > tol, ratio, np.inf)
+        cap_down = np.where(toward < -tol, ratio, -np.inf)
+        pinned = free_n & (np.abs(alpha) > tol)
+        cap_up[pinned], cap_down[pinned] = 0.0, 0.0
+        increase_min[basis[block]] = np.maximum(cap_up.min(axis=1, initial=np.inf), 0.0)
+        decrease_min[basis[block]] = np.maximum(-cap_down.max(axis=1, initial=-np.inf), 0.0)
+
+    # Nonbasic variables: the cost can move until the reduced cost reaches zero
+    variables = nonbasic[nonbasic < n]
+    lowest, highest = variables[status[variables] > 0], variables[status[variables] < 0]
+    unbounded = variables[free[variables]]
+    decrease_min[lowest] = np.maximum(d[lowest], 0.0)
+    increase_min[highest] = np.maximum(-d[highest], 0.0)
+    increase_min[unbounded] = decrease_min[unbounded] = 0.0
+
+    # RHS ranging: column i of B^-1 moves the basic variables as b[i] changes.
+    # When the row's own slack (or artificial) is basic at position k that
+    # column is e_k, so only the other rows need a solve
+    room_up, room_down = up[basis] - z[basis], lo[basis] - z[basis]
+    position = np.full(n + m, -1)
+    position[basis] = np.arange(m)
+    own = position[n:]
+    rhs_increase = np.maximum(np.where(own >= 0, room_up[own], np.inf), 0.0)
+    rhs_decrease = np.maximum(np.where(own >= 0, -room_down[own], np.inf), 0.0)
+    for block, g in _unit_solves(factor, np.flatnonzero(own < 0)):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            limit_up = np.where(g > tol, room_up[:, None] / g,
+                                np.where(g < -tol, room_down[:, None] / g, np.inf))
+            limit_down = np.where(g > tol, room_down[:, None] / g,
+                                  np.where(g < -tol, room_up[:, None] / g, -np.inf))
+        rhs_increase[block] = np.maximum(limit_up.min(axis=0, initial=np.inf), 0.0)
+        rhs_decrease[block] = np.maximum(-limit_down.max(axis=0, initial=-np.inf), 0.0)
+
+    cost_increase, cost_decrease = ((decrease_min, increase_min) if maximize
+                                    else (increase_min, decrease_min))
+    is_basic = np.zeros(n, dtype=bool)
+    is_basic[columns] = True
+    return {
+        "basic": is_basic,
+        "reduced_costs": sign * d[:n] + 0.0,
+        "cost_increase": cost_increase,
+        "cost_decrease": cost_decrease,
+        "duals_ub": sign * y[:m_ub] + 0.0,
+        "duals_eq": sign * y[m_ub:] + 0.0,
+        "rhs_increase_ub": rhs_increase[:m_ub],
+        "rhs_decrease_ub": rhs_decrease[:m_ub],
+        "rhs_increase_eq": rhs_increase[m_ub:],
+        "rhs_decrease_eq": rhs_decrease[m_ub:],
+    }
+
+
+def _ranges_of_program(program, result: Dict, tol: float) -> Dict[str, np.ndarray]:
+    """Ranging of a LinearProgram from a solve() result with an optimal x."""
+    return sensitivity_ranges(program.c, program.A_ub, program.b_ub, program.A_eq,
+                              program.b_eq, program.bounds, result["x"],
+                              result.get("duals_ub"), result.get("duals_eq"),
+                              maximize=program.maximize, tol=tol)
+
+
+def _report(status: str, objective: float, var_names: List[str], x: np.ndarray,
+            costs: np.ndarray, row_names: List[str], senses: List[str], rhs: np.ndarray,
+            slack: np.ndarray, ranges: Dict[str, np.ndarray],
+            flips: Optional[np.ndarray] = None) -> Dict:
+    """Assemble the per-variable and per-constraint report dictionaries."""
+    duals = np.concatenate([ranges["duals_ub"], ranges["duals_eq"]])
+    increase = np.concatenate([ranges["rhs_increase_ub"], ranges["rhs_increase_eq"]])
+    decrease = np.concatenate([ranges["rhs_decrease_ub"], ranges["rhs_decrease_eq"]])
+    if flips is not None:
+        # >= rows were negated into <= rows: undo the sign of duals and ranges
+        duals = duals * flips
+        increase, decrease = (np.where(flips < 0, decrease, increase),
+                              np.where(flips < 0, increase, decrease))
+
+    variables = {
+        name: {
+            "value": float(x[j]),
+            "cost": float(costs[j]),
+            "reduced_cost": float(ranges["reduced_costs"][j]),
+            "basic": bool(ranges["basic"][j]),
+            "allowable_increase": float(ranges["cost_increase"][j]),
+            "allowable_decrease": float(ranges["cost_decrease"][j]),
+        }
+        for j, name in enumerate(var_names)
+    }
+    constraints = {
+        name: {
+            "sense": senses[i],
+            "rhs": float(rhs[i]),
+            "slack": float(slack[i]),
+            "pi": float(duals[i]),
+            "allowable_increase": float(increase[i]),
+            "allowable_decrease": float(decrease[i]),
+        }
+        for i, name in enumerate(row_names)
+    }
+    return {"status": status, "objective_value": float(objective),
+            "variables": variables, "constraints": constraints}
+
+
+def _pulp_report(model: LpProblem, tol: float) -> Dict:
+    """Report for a solved PuLP model."""
+    if LpStatus[model.status] != "Optimal":
+        raise ValueError(f"Sensitivity needs an optimal solution (status {LpStatus[model.status]})")
+    problem = _to_matrices(model, get_backend("highs"))
+    variables, row_refs, c, A_ub, b_ub, A_eq, b_eq, bounds, integrality = problem
+    if integrality.any():
+        raise ValueError("Sensitivity ranging is only defined for continuous LPs")
+    rows = row_refs["ub"] + row_refs["eq"]
+    flips = np.array([flip for _, flip in rows], dtype=float)
+    x = np.array([np.nan if v.varValue is None else v.varValue for v in variables], dtype=float)
+    pis = np.array([np.nan if con.pi is None else con.pi for con, _ in rows], dtype=float)
+    if np.isnan(x).any():
+        raise ValueError("The model has no primal values to analyse")
+    duals = pis * flips
+    m_ub = len(row_refs["ub"])
+    duals_ub, duals_eq = (duals[:m_ub], duals[m_ub:]) if not np.isnan(duals).any() else (None, None)
+    ranges = sensitivity_ranges(c, A_ub, b_ub, A_eq, b_eq, bounds, x, duals_ub, duals_eq,
+                                maximize=model.sense == LpMaximize, tol=tol)
+    rhs = np.array([-con.constant for con, _ in rows], dtype=float) + 0.0
+    activity = np.array([con.value() - con.constant for con, _ in rows], dtype=float)
+    senses = [{LpConstraintEQ: "=", LpConstraintGE: ">="}.get(con.sense, "<=")
+              for con, _ in rows]
+    objective = model.objective.value() if model.objective is not None else 0.0
+    return _report(LpStatus[model.status], objective or 0.0, [v.name for v in variables], x, c,
+                   [con.name for con, _ in rows], senses, rhs, rhs - activity, ranges, flips)
+
+
+def get_sensitivity_report(model, result: Optional[Dict] = None, tol: float = 1e-7) -> Dict:
+    """Sensitivity report of an optimal LP solution.
+
+    For every variable: its value, cost, reduced cost and the allowable
+    increase and decrease of its cost coefficient. For every constraint:
+    its right-hand side, slack, dual (``pi``) and the allowable increase
+    and decrease of its right-hand side. All ranges come from one
+    factorization of the final basis (see sensitivity_ranges).
+
+    Args:
+        model: A solved LPOptimizer, a solved PuLP model, or a
+            LinearProgram together with its ``result``. Optimizers whose
+            last solve kept no LP result (a cache hit, or a specialized
+            method such as the lot-sizing forward scan) have their program
+            solved once with HiGHS
+        result: The result of ``LinearProgram.solve()`` when ``model`` is
+            a program
+        tol: Primal and dual feasibility tolerance
+
+    Returns:
+        Dictionary with ``status``, ``objective_value``, ``variables``
+        ({name: {value, cost, reduced_cost, basic, allowable_increase,
+        allowable_decrease}}) and ``constraints`` ({name: {sense, rhs,
+        slack, pi, allowable_increase, allowable_decrease}})
+
+    Raises:
+        ValueError: If the solution is not optimal or the model has
+            integer variables
+    """
+    if isinstance(model, LpProblem):
+        return _pulp_report(model, tol)
+
+    if hasattr(model, "solution_arrays"):
+        optimizer = model
+        if getattr(optimizer, "model", None) is not None:
+            return _pulp_report(optimizer.model, tol)
+        result = getattr(optimizer, "_result", None)
+        program = optimizer.program
+        if result is None or program is None:
+            program = optimizer.compile_model()
+            result = program.solve("highs") if not program.is_mip else None
+        model = program
+    elif result is None:
+        raise ValueError("A LinearProgram needs the result of its solve()")
+
+    program = model
+    if program.is_mip:
+        raise ValueError("Sensitivity ranging is only defined for continuous LPs")
+    if result is None or result.get("status") != "Optimal" or result.get("x") is None:
+        status = None if result is None else result.get("status")
+        raise ValueError(f"Sensitivity needs an optimal solution (status {status})")
+    if result.get("duals_ub") is None:
+        # PuLP solvers without duals: HiGHS supplies them
+        result = program.solve("highs")
+    ranges = _ranges_of_program(program, result, tol)
+
+    x = np.asarray(result["x"], dtype=float)
+    rhs = np.concatenate([program.b_ub, program.b_eq])
+    slack = rhs - np.concatenate([program.A_ub @ x, program.A_eq @ x])
+    senses = ["<="] * len(program.b_ub) + ["="] * len(program.b_eq)
+    objective = result.get("objective", float(program.c @ x))
+    return _report(result["status"], objective, program.var_names, x, program.c,
+                   program.ub_names + program.eq_names, senses, rhs, slack, ranges)
@@ -0,0 +1,307 @@
+"""Successive linear programming for LPs with bilinear terms.
+
+Pooling and similar blending models are linear except for products of two
+variables, such as a pool quality times a pool outflow. Such a program is
+solved as a sequence of LPs: each bilinear term ``w * x_i * x_j`` is
+replaced by its first-order expansion at the current point,
+
+    w * (x_i0 * x_j + x_j0 * x_i - x_i0 * x_j0),
+
+and the variables that appear in bilinear terms are kept within a trust
+region around the current point. Rows with bilinear terms get elastic
+slacks priced at a penalty, so every LP is feasible and steps are judged
+by the penalty merit ``objective + penalty * violation``: a step is
+accepted when the merit improves by a reasonable share of what the LP
+predicted, and the trust region grows or shrinks accordingly.
+
+The sparsity pattern of the linearized rows does not change, so it is
+built once and each iteration only rewrites the coefficients in place. On
+the dense backend every LP starts from the previous optimal basis.
+"""
+
+import time
+from typing import Callable, Dict, Optional, Tuple
+import numpy as np
+from scipy import sparse
+
+from .batch_lp import solve_lp
+from .metrics import matrix_dimensions, timed_solver
+from .solver_utils import solve_highs
+
+
+# A bilinear term list: row index, first and second variable index and
+# coefficient of each term ``coefficient * x[first] * x[second]``
+BilinearTerms = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+def _terms(terms: Optional[BilinearTerms]) -> BilinearTerms:
+    """Normalize a bilinear term list to index and coefficient arrays."""
+    if terms is None:
+        return (np.zeros(0, dtype=np.int64),) * 3 + (np.zeros(0),)
+    rows, first, second, coefficients = terms
+    rows = np.asarray(rows, dtype=np.int64).ravel()
+    return (rows,
+            np.broadcast_to(np.asarray(first, dtype=np.int64), rows.shape),
+            np.broadcast_to(np.asarray(second, dtype=np.int64), rows.shape),
+            np.broadcast_to(np.asarray(coefficients, dtype=float), rows.shape))
+
+
+def _bilinear_value(x: np.ndarray, terms: BilinearTerms, num_rows: int) -> np.ndarray:
+    """Sum of the bilinear terms of each row at ``x``."""
+    rows, first, second, coefficients = terms
+    return np.bincount(rows, weights=coefficients * x[first] * x[second], minlength=num_rows)
+
+
+class _Linearization:
+    """Constraint rows with bilinear terms, linearized in place.
+
+    The pattern holds the linear coefficients, one entry for each variable
+    of every bilinear term and the elastic slack columns; ``update`` writes
+    the coefficients of an expansion point into the same CSR arrays.
+    """
+
+    def __init__(self, A: sparse.csr_matrix, b: np.ndarray, terms: BilinearTerms,
+                 slack_cols: sparse.csr_matrix):
+        rows, first, second, _ = terms
+        m, n = A.shape
+        A = A.tocoo()
+        pattern = sparse.coo_matrix(
+            (np.concatenate([A.data, np.zeros(2 * len(rows))]),
+             (np.concatenate([A.row, rows, rows]), np.concatenate([A.col, first, second]))),
+            shape=(m, n)).tocsr()
+        pattern.sum_duplicates()
+        pattern.sort_indices()
+        self.matrix = sparse.hstack([pattern, slack_cols], format="csr")
+        self.matrix.sort_indices()
+
+        # Position of every (row, column) of the pattern in the data array
+        keys = np.repeat(np.arange(m), np.diff(self.matrix.indptr)) * (n + slack_cols.shape[1])
+        keys += self.matrix.indices
+        self.base = self.matrix.data.copy()
+        self.first_pos = np.searchsorted(keys, rows * (n + slack_cols.shape[1]) + first)
+        self.second_pos = np.searchsorted(keys, rows * (n + slack_cols.shape[1]) + second)
+        self.b = np.asarray(b, dtype=float)
+        self.terms = terms
+
+    def update(self, x0: np.ndarray) -> np.ndarray:
+        """Linearize at ``x0``; returns the matching right-hand sides."""
+        rows, first, second, coefficients = self.terms
+        data = self.base.copy()
+        np.add.at(data, self.first_pos, coefficients * x0[second])
+        np.add.at(data, self.second_pos, coefficients * x0[first])
+        self.matrix.data = data
+        return self.b + _bilinear_value(x0, self.terms, len(self.b))
+
+
+@timed_solver(dimensions=matrix_dimensions)
+def successive_lp(
+    c: np.ndarray,
+    A_ub=None,
+    b_ub: Optional[np.ndarray] = None,
+    A_eq=None,
+    b_eq: Optional[np.ndarray] = None,
+    bounds: Optional[np.ndarray] = None,
+    bilinear_ub: Optional[BilinearTerms] = None,
+    bilinear_eq: Optional[BilinearTerms] = None,
+    x0: Optional[np.ndarray] = None,
+    maximize: bool = False,
+    penalty: Optional[float] = None,
+    radius: float = 0.5,
+    max_iterations: int = 100,
+    tol: float = 1e-6,
+    backend: str = "dense",
+    correct: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+    callback: Optional[Callable[[Dict], Optional[bool]]] = None,
+) -> Dict:
+    """Solve a program whose rows may contain bilinear terms by successive LP.
+
+    Solves ``min (or max) c @ x`` subject to
+    ``A_ub @ x + bilinear_ub(x) <= b_ub``, ``A_eq @ x + bilinear_eq(x) == b_eq``
+    and the variable bounds, where ``bilinear(x)[r]`` sums
+    ``w * x[i] * x[j]`` over the terms of row r. The result is a local
+    optimum. Arguments follow batch_lp.solve_lp.
+
+    Args:
+        c: Objective coefficients, shape (n,)
+        A_ub: Linear part of the inequality rows (dense or scipy.sparse)
+        b_ub: Inequality right-hand sides
+        A_eq: Linear part of the equality rows (dense or scipy.sparse)
+        b_eq: Equality right-hand sides
+        bounds: Variable bounds as an (n, 2) array (default 0 to +inf);
+            variables in bilinear terms need finite bounds, which set the
+            scale of the trust region
+        bilinear_ub: Bilinear terms of the inequality rows as a tuple of
+            arrays ``(rows, i, j, w)``
+        bilinear_eq: Bilinear terms of the equality rows, the same way
+        x0: Starting point (default the lower bounds); the first LP is not
+            restricted to a trust region
+        maximize: Maximize the objective instead of minimizing it
+        penalty: Price of a unit of violation of a bilinear row; raised
+            tenfold whenever the iterates stall while still infeasible
+            (default 10 times the largest objective coefficient)
+        radius: Trust region restored after raising the penalty, as a
+            fraction of each bilinear variable's bound range
+        max_iterations: Largest number of LPs to solve
+        tol: Convergence tolerance on the relative merit improvement and on
+            the row violation
+        backend: "dense" (warm-started NumPy simplex, for small programs)
+            or "highs"
+        correct: Optional map applied to every LP solution before it is
+            judged, e.g. recomputing variables that the linear rows
+            determine exactly; must keep the variables within bounds
+        callback: Called with the record of every iteration; returning
+            True stops the iterations
+
+    Returns:
+        Dictionary with:
+            - ``status``: "Optimal" when converged to a feasible point,
+              "Infeasible" when converged with violated rows or the linear
+              rows are infeasible, "Not Solved" at the iteration limit
+            - ``x`` and ``objective``: the final point and its objective
+            - ``residual``: total violation of the bilinear rows at ``x``
+            - ``iterations``: LPs solved
+            - ``lp_iterations``: simplex iterations over all LPs
+            - ``elapsed``: seconds spent
+            - ``history``: one record per iteration with ``objective``,
+              ``residual``, ``merit``, ``radius``, ``accepted``,
+              ``lp_iterations`` and ``elapsed``
+    """
+    if backend not in ("dense", "highs"):
+        raise ValueError(f"Unknown LP backend '{backend}', expected 'dense' or 'highs'")
+    start = time.perf_counter()
+    c = np.asarray(c, dtype=float)
+    n = len(c)
+    sense = -1.0 if maximize else 1.0
+    A_ub = sparse.csr_matrix((0, n)) if A_ub is None else sparse.csr_matrix(A_ub)
+    A_eq = sparse.csr_matrix((0, n)) if A_eq is None else sparse.csr_matrix(A_eq)
+    b_ub = np.zeros(0) if b_ub is None else np.asarray(b_ub, dtype=float)
+    b_eq = np.zeros(0) if b_eq is None else np.asarray(b_eq, dtype=float)
+    m_ub, m_eq = len(b_ub), len(b_eq)
+    if bounds is None:
+        bounds = np.column_stack([np.zeros(n), np.full(n, np.inf)])
+    bounds = np.array(bounds, dtype=float).reshape(n, 2)
+    terms_ub, terms_eq = _terms(bilinear_ub), _terms(bilinear_eq)
+
+    nonlinear = np.unique(np.concatenate([terms_ub[1], terms_ub[2], terms_eq[1], terms_eq[2]]))
+    scale = bounds[nonlinear, 1] - bounds[nonlinear, 0]
+    if not np.isfinite(scale).all():
+        raise ValueError("Variables in bilinear terms need finite bounds")
+
+    # Elastic slacks on the rows with bilinear terms: one per inequality
+    # row, a pair per equality row
+    soft_ub = np.unique(terms_ub[0])
+    soft_eq = np.unique(terms_eq[0])
+    k_ub, k_eq = len(soft_ub), len(soft_eq)
+    slack_ub = sparse.hstack([
+        sparse.csr_matrix((m_ub, 0)),
+        sparse.coo_matrix((-np.ones(k_ub), (soft_ub, np.arange(k_ub))), shape=(m_ub, k_ub)),
+        sparse.csr_matrix((m_ub, 2 * k_eq)),
+    ])
+    slack_eq = sparse.hstack([
+        sparse.csr_matrix((m_eq, k_ub)),
+        sparse.coo_matrix((np.concatenate([-np.ones(k_eq), np.ones(k_eq)]),
+                           (np.tile(soft_eq, 2), np.arange(2 * k_eq))), shape=(m_eq, 2 * k_eq)),
+    ])
+    rows_ub = _Linearization(A_ub, b_ub, terms_ub, slack_ub)
+    rows_eq = _Linearization(A_eq, b_eq, terms_eq, slack_eq)
+    num_slacks = k_ub + 2 * k_eq
+
+    if penalty is None:
+        penalty = 10.0 * max(1.0, np.abs(c).max(initial=0.0))
+    lp_bounds = np.vstack([bounds, np.column_stack([np.zeros(num_slacks),
+                                                    np.full(num_slacks, np.inf)])])
+
+    def violation(x):
+        over = A_ub @ x + _bilinear_value(x, terms_ub, m_ub) - b_ub
+        gap = A_eq @ x + _bilinear_value(x, terms_eq, m_eq) - b_eq
+        return float(np.maximum(over[soft_ub], 0.0).sum() + np.abs(gap[soft_eq]).sum())
+
+    def merit(x, residual):
+        return sense * float(c @ x) + penalty * residual
+
+    x = (np.where(np.isfinite(bounds[:, 0]), bounds[:, 0], 0.0) if x0 is None
+         else np.clip(np.asarray(x0, dtype=float), bounds[:, 0], bounds[:, 1]))
+    residual = violation(x)
+    current = merit(x, residual)
+    rho = 1.0
+    basis = None
+    history = []
+    lp_iterations = 0
+    status = "Not Solved"
+
+    for iteration in range(1, max_iterations + 1):
+        b_lin_ub = rows_ub.update(x)
+        b_lin_eq = rows_eq.update(x)
+        step = rho * scale
+        lp_bounds[nonlinear, 0] = np.maximum(bounds[nonlinear, 0], x[nonlinear] - step)
+        lp_bounds[nonlinear, 1] = np.minimum(bounds[nonlinear, 1], x[nonlinear] + step)
+        cost = np.concatenate([sense * c, np.full(num_slacks, penalty)])
+
+        if backend == "dense":
+            result = solve_lp(cost, rows_ub.matrix, b_lin_ub, rows_eq.matrix, b_lin_eq,
+                              lp_bounds, basis=basis)
+            if result["status"] == "Optimal":
+                basis = result["basis"]
+        else:
+            result = solve_highs(cost, rows_ub.matrix, b_lin_ub, rows_eq.matrix, b_lin_eq,
+                                 lp_bounds)
+        lp_iterations += int(result.get("iterations", 0))
+        if result["status"] != "Optimal":
+            status = "Infeasible" if result["status"] == "Infeasible" else result["status"]
+            break
+
+        candidate = result["x"][:n]
+        if correct is not None:
+            candidate = correct(candidate.copy())
+        candidate_residual = violation(candidate)
+        candidate_merit = merit(candidate, candidate_residual)
+        predicted = current - result["objective"]
+        actual = current - candidate_merit
+        converged = predicted <= tol * max(1.0, abs(current))
+
+        accepted = not converged and actual > 0.1 * predicted
+        if accepted:
+            moved = np.abs(candidate[nonlinear] - x[nonlinear])
+            x, residual, current = candidate, candidate_residual, candidate_merit
+            if actual > 0.75 * predicted and np.any(moved >= 0.99 * step):
+                rho = min(1.0, 2.0 * rho)
+        elif not converged:
+            rho *= 0.25 if actual <= 0 else 0.5
+
+        record = {
+            "iteration": iteration,
+            "objective": float(c @ x),
+            "residual": residual,
+            "merit": current,
+            "radius": rho,
+            "accepted": accepted,
+            "lp_iterations": int(result.get("iterations", 0)),
+            "elapsed": time.perf_counter() - start,
+        }
+        history.append(record)
+        if callback is not None and callback(record):
+            break
+
+        if converged or rho < tol:
+            if residual <= tol * max(1.0, np.abs(b_ub).max(initial=0.0),
+                                     np.abs(b_eq).max(initial=0.0)):
+                status = "Optimal"
+                break
+            if penalty >= 1e12 * max(1.0, np.abs(c).max(initial=0.0)):
+                status = "Infeasible"
+                break
+            # Stalled while infeasible: price the violation higher
+            penalty *= 10.0
+            current = merit(x, residual)
+            rho = max(rho, radius)
+
+    return {
+        "status": status,
+        "x": x,
+        "objective": float(c @ x),
+        "residual": residual,
+        "iterations": len(history),
+        "lp_iterations": lp_iterations,
+        "elapsed": time.perf_counter() - start,
+        "history": history,
+    }
@@ -0,0 +1,270 @@
+"""Bulk export of LP solutions as aligned NumPy arrays.
+
+``export_solution_to_dict`` builds one nested dictionary entry per variable
+and constraint, which for large models takes longer than the solve. The
+arrays here come straight from the solver's result vectors: primal values
+and reduced costs per column, activity, slack and duals per row, each
+aligned with a name array. ``to_arrow()`` and ``to_parquet()`` hand the
+arrays to pyarrow without creating per-variable Python objects, and
+``to_pandas()`` builds data frames the same way. pandas and pyarrow are
+only imported when those methods are called.
+
+Duals and reduced costs follow the solver_utils convention, d objective /
+d rhs and d objective / d x, and are NaN when the solver did not report
+them (integer programs, or PuLP solvers that return none).
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+from pulp import LpConstraintEQ, LpConstraintGE, LpProblem, LpStatus, value
+
+
+_SENSES = {LpConstraintEQ: "=", LpConstraintGE: ">="}
+
+
+def _floats(values) -> np.ndarray:
+    """Float array from an iterable that may contain None."""
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+
+class SolutionArrays:
+    """Primal and dual values of a solved LP as column arrays.
+
+    Attributes:
+        status (str): Solver status
+        objective (float): Objective value
+        var_names (np.ndarray): Variable names in column order
+        values (np.ndarray): Primal values
+        reduced_costs (np.ndarray): d objective / d x per variable
+        costs (np.ndarray): Objective coefficients
+        lower (np.ndarray): Variable lower bounds
+        upper (np.ndarray): Variable upper bounds
+        row_names (np.ndarray): Constraint names, inequalities first
+        senses (np.ndarray): "<=", ">=" or "=" per row
+        activity (np.ndarray): Left-hand side value per row
+        rhs (np.ndarray): Right-hand side per row
+        slack (np.ndarray): rhs - activity per row
+        duals (np.ndarray): d objective / d rhs per row
+    """
+
+    def __init__(self, status: str, objective: float, var_names: Sequence[str],
+                 values: np.ndarray, reduced_costs: np.ndarray, costs: np.ndarray,
+                 lower: np.ndarray, upper: np.ndarray, row_names: Sequence[str],
+                 senses: np.ndarray, activity: np.ndarray, rhs: np.ndarray,
+                 slack: np.ndarray, duals: np.ndarray):
+        self.status = status
+        self.objective = objective
+        self.var_names = np.asarray(var_names, dtype=object)
+        self.values = np.asarray(values, dtype=float)
+        self.reduced_costs = np.asarray(reduced_costs, dtype=float)
+        self.costs = np.asarray(costs, dtype=float)
+        self.lower = np.asarray(lower, dtype=float)
+        self.upper = np.asarray(upper, dtype=float)
+        self.row_names = np.asarray(row_names, dtype=object)
+        self.senses = np.asarray(senses, dtype=object)
+        self.activity = np.asarray(activity, dtype=float)
+        self.rhs = np.asarray(rhs, dtype=float)
+        self.slack = np.asarray(slack, dtype=float)
+        self.duals = np.asarray(duals, dtype=float)
+        self._var_index: Optional[Dict[str, int]] = None
+        self._row_index: Optional[Dict[str, int]] = None
+
+        n, m = len(self.var_names), len(self.row_names)
+        if any(len(a) != n for a in (self.values, self.reduced_costs, self.costs,
+                                     self.lower, self.upper)):
+            raise ValueError("Variable arrays must all have one entry per variable name")
+        if any(len(a) != m for a in (self.senses, self.activity, self.rhs, self.slack,
+                                     self.duals)):
+            raise ValueError("Constraint arrays must all have one entry per row name")
+
+    @classmethod
+    def from_program(cls, program, result: Dict) -> "SolutionArrays":
+        """Arrays from a compiled program and a backend result.
+
+        Args:
+            program: The solved LinearProgram
+            result: Its ``solve()`` result; ``x`` is required, ``duals_ub``,
+                ``duals_eq`` and ``reduced_costs`` are used when present
+
+        Returns:
+            SolutionArrays in the program's column and row order
+        """
+        if result.get("x") is None:
+            raise ValueError(f"No primal solution to export (status {result.get('status')})")
+        x = np.asarray(result["x"], dtype=float)
+        m_ub, m_eq = len(program.b_ub), len(program.b_eq)
+
+        def vector(key, size):
+            return (np.asarray(result[key], dtype=float) if result.get(key) is not None
+                    else np.full(size, np.nan))
+
+        activity = np.concatenate([program.A_ub @ x, program.A_eq @ x])
+        rhs = np.concatenate([program.b_ub, program.b_eq])
+        senses = np.empty(m_ub + m_eq, dtype=object)
+        senses[:m_ub], senses[m_ub:] = "<=", "="
+        return cls(
+            status=result.get("status", "Optimal"),
+            objective=float(result.get("objective", program.c @ x)),
+            var_names=program.var_names,
+            values=x,
+            reduced_costs=vector("reduced_costs", len(x)),
+            costs=program.c,
+            lower=program.lower,
+            upper=program.upper,
+            row_names=program.ub_names + program.eq_names,
+            senses=senses,
+            activity=activity,
+            rhs=rhs,
+            slack=rhs - activity,
+            duals=np.concatenate([vector("duals_ub", m_ub), vector("duals_eq", m_eq)]),
+        )
+
+    @classmethod
+    def from_pulp(cls, model: LpProblem) -> "SolutionArrays":
+        """Arrays from a solved PuLP model.
+
+        PuLP keeps values on its variable and constraint objects, so this
+        reads each one once into flat arrays; prefer ``from_program`` when
+        the compiled program and its result are at hand.
+
+        Args:
+            model: A solved LpProblem
+
+        Returns:
+            SolutionArrays in the model's variable and constraint order
+        """
+        variables = model.variables()
+        constraints = list(model.constraints.values())
+        costs = (np.array([model.objective.get(v, 0.0) for v in variables], dtype=float)
+                 if model.objective is not None else np.zeros(len(variables)))
+        rhs = np.array([-c.constant for c in constraints], dtype=float)
+        # Solvers store each row's slack; evaluate the row only when they did not
+        slack = _floats(-c.value() if c.slack is None else c.slack for c in constraints)
+        return cls(
+            status=LpStatus[model.status],
+            objective=float(value(model.objective) or 0.0) if model.objective is not None else 0.0,
+            var_names=[v.name for v in variables],
+            values=_floats(v.varValue for v in variables),
+            reduced_costs=_floats(v.dj for v in variables),
+            costs=costs,
+            lower=_floats(-np.inf if v.lowBound is None else v.lowBound for v in variables),
+            upper=_floats(np.inf if v.upBound is None else v.upBound for v in variables),
+            row_names=[c.name for c in constraints],
+            senses=[_SENSES.get(c.sense, "<=") for c in constraints],
+            activity=rhs - slack,
+            rhs=rhs,
+            slack=slack,
+            duals=_floats(c.pi for c in constraints),
+        )
+
+    @property
+    def num_vars(self) -> int:
+        """Number of variables."""
+        return len(self.var_names)
+
+    @property
+    def num_rows(self) -> int:
+        """Number of constraint rows."""
+        return len(self.row_names)
+
+    def variable_index(self, name: str) -> int:
+        """Column position of a variable name (the index is built on first use)."""
+        if self._var_index is None:
+            self._var_index = {name: j for j, name in enumerate(self.var_names)}
+        return self._var_index[name]
+
+    def row_index(self, name: str) -> int:
+        """Row position of a constraint name (the index is built on first use)."""
+        if self._row_index is None:
+            self._row_index = {name: i for i, name in enumerate(self.row_names)}
+        return self._row_index[name]
+
+    def variable_columns(self) -> Dict[str, np.ndarray]:
+        """Variable arrays keyed by column name, ``name`` first."""
+        return {"name": self.var_names, "value": self.values,
+                "reduced_cost": self.reduced_costs, "cost": self.costs,
+                "lower": self.lower, "upper": self.upper}
+
+    def constraint_columns(self) -> Dict[str, np.ndarray]:
+        """Constraint arrays keyed by column name, ``name`` first."""
+        return {"name": self.row_names, "sense": self.senses, "activity": self.activity,
+                "rhs": self.rhs, "slack": self.slack, "dual": self.duals}
+
+    def to_pandas(self) -> Tuple:
+        """Variable and constraint data frames indexed by name (requires pandas).
+
+        Returns:
+            Tuple of (variables DataFrame, constraints DataFrame)
+        """
+        try:
+            import pandas as pd
+        except ImportError as e:
+            raise ImportError("Exporting solutions to pandas requires pandas") from e
+
+        def frame(columns):
+            columns = dict(columns)
+            index = pd.Index(columns.pop("name"), name="name")
+            return pd.DataFrame(columns, index=index, copy=False)
+
+        return frame(self.variable_columns()), frame(self.constraint_columns())
+
+    def to_arrow(self) -> Tuple:
+        """Variable and constraint Arrow tables (requires pyarrow).
+
+        Returns:
+            Tuple of (variables Table, constraints Table)
+        """
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("Exporting solutions to Arrow requires pyarrow") from e
+
+        def table(columns):
+            return pa.table({
+                key: pa.array(array, type=pa.string()) if array.dtype == object else array
+                for key, array in columns.items()
+            })
+
+        return table(self.variable_columns()), table(self.constraint_columns())
+
+    def to_parquet(self, variables_path: str, constraints_path: Optional[str] = None) -> None:
+        """Write the variable and constraint tables as Parquet files (requires pyarrow).
+
+        Args:
+            variables_path: Parquet file for the variable table
+            constraints_path: Parquet file for the constraint table, or None
+                to skip it
+        """
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Writing Parquet solution files requires pyarrow") from e
+        variables, constraints = self.to_arrow()
+        pq.write_table(variables, variables_path)
+        if constraints_path is not None:
+            pq.write_table(constraints, constraints_path)
+
+    def __repr__(self) -> str:
+        return (f"SolutionArrays(status={self.status!r}, objective={self.objective!r}, "
+                f"num_vars={self.num_vars}, num_rows={self.num_rows})")
+
+
+def export_solution_arrays(source, result: Optional[Dict] = None) -> SolutionArrays:
+    """Export a solution as aligned NumPy arrays.
+
+    Args:
+        source: A solved LPOptimizer, a solved PuLP model, or a
+            LinearProgram together with its ``result``
+        result: The result of ``LinearProgram.solve()`` when ``source`` is
+            a program
+
+    Returns:
+        SolutionArrays
+    """
+    if isinstance(source, LpProblem):
+        return SolutionArrays.from_pulp(source)
+    if hasattr(source, "solution_arrays"):
+        return source.solution_arrays()
+    if result is None:
+        raise ValueError("Exporting a LinearProgram needs the result of its solve()")
+    return SolutionArrays.from_program(source, result)
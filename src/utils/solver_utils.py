@@ -1,7 +1,571 @@
 """Utility functions for LP solver operations."""
 
-from typing import Dict, Any, Optional
-from pulp import LpProblem, LpStatus
+import warnings
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from pulp import (
+    GLPK_CMD,
+    PULP_CBC_CMD,
+    LpConstraintEQ,
+    LpConstraintGE,
+    LpContinuous,
+    LpMaximize,
+    LpProblem,
+    LpSolutionOptimal,
+    LpStatus,
+    LpStatusInfeasible,
+    LpStatusNotSolved,
+    LpStatusOptimal,
+    LpStatusUnbounded,
+)
+
+from .batch_lp import solve_lp
+from .metrics import matrix_dimensions, phase, set_backend, timed, timed_solver
+
+
+# Built-in backends: "cbc" is PuLP's bundled CBC binary, "highs" is HiGHS
+# through SciPy, "dense" is the NumPy simplex kernel and "glpk" is glpsol
+# through PuLP when it is installed. register_backend() adds more, and
+# "auto" picks one per instance (see utils.calibration)
+SOLVER_BACKENDS = ("cbc", "highs", "dense", "glpk")
+AUTO_BACKEND = "auto"
+
+_default_backend = "cbc"
+
+
+class SolverOptions:
+    """Solver settings shared by every backend.
+
+    Each backend applies the settings it supports and ignores the others:
+    CBC honours all four, HiGHS the time limit, gap and presolve, GLPK the
+    time limit, gap and presolve, and the dense kernel none of them. A
+    setting left at None keeps the solver's own default.
+
+    Attributes:
+        time_limit (Optional[float]): Wall-clock limit in seconds
+        threads (Optional[int]): Number of solver threads
+        gap (Optional[float]): Relative MIP gap at which to stop
+        presolve (Optional[bool]): Whether to run the presolver
+    """
+
+    def __init__(
+        self,
+        time_limit: Optional[float] = None,
+        threads: Optional[int] = None,
+        gap: Optional[float] = None,
+        presolve: Optional[bool] = None,
+    ):
+        """Initialize the options.
+
+        Args:
+            time_limit: Wall-clock limit in seconds
+            threads: Number of solver threads
+            gap: Relative MIP gap at which to stop, e.g. 0.01 for 1%
+            presolve: Whether to run the presolver
+        """
+        if time_limit is not None and time_limit <= 0:
+            raise ValueError("time_limit must be positive")
+        if threads is not None and (int(threads) != threads or threads < 1):
+            raise ValueError("threads must be a positive integer")
+        if gap is not None and gap < 0:
+            raise ValueError("gap must be non-negative")
+        self.time_limit = None if time_limit is None else float(time_limit)
+        self.threads = None if threads is None else int(threads)
+        self.gap = None if gap is None else float(gap)
+        self.presolve = None if presolve is None else bool(presolve)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the settings as a dictionary (None for solver defaults)."""
+        return {"time_limit": self.time_limit, "threads": self.threads,
+                "gap": self.gap, "presolve": self.presolve}
+
+    def is_default(self) -> bool:
+        """Whether every setting is left at the solver default."""
+        return all(value is None for value in self.to_dict().values())
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, SolverOptions) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        settings = ", ".join(f"{k}={v!r}" for k, v in self.to_dict().items() if v is not None)
+        return f"SolverOptions({settings})"
+
+
+_default_options = SolverOptions()
+
+
+class SolverBackend:
+    """A registered solver backend.
+
+    A backend either solves matrix-form programs in-process (``solve``) or
+    hands PuLP a solver object (``pulp_solver``); PuLP-driven backends solve
+    matrix-form programs by exporting them to PuLP first.
+
+    Attributes:
+        name (str): Registry name
+        solve (Optional[Callable]): In-process solver called as
+            ``solve(c, A_ub, b_ub, A_eq, b_eq, bounds, maximize=...,
+            integrality=..., basis=..., options=...)`` and returning the
+            dictionary solve_highs() returns
+        pulp_solver (Optional[Callable]): Called with a SolverOptions, returns
+            the PuLP solver for ``LpProblem.solve()`` (None for PuLP's default)
+        supports_mip (bool): Whether the backend solves integer programs
+        warm_start (bool): Whether the backend re-solves from a given basis
+    """
+
+    def __init__(
+        self,
+        name: str,
+        solve: Optional[Callable] = None,
+        pulp_solver: Optional[Callable] = None,
+        available: Optional[Callable[[], bool]] = None,
+        supports_mip: bool = True,
+        warm_start: bool = False,
+    ):
+        """Initialize the backend record (see register_backend())."""
+        if (solve is None) == (pulp_solver is None):
+            raise ValueError("A backend needs exactly one of solve and pulp_solver")
+        self.name = name
+        self.solve = solve
+        self.pulp_solver = pulp_solver
+        self.supports_mip = supports_mip
+        self.warm_start = warm_start
+        self._available = available
+        self._is_available = None
+
+    def is_available(self) -> bool:
+        """Whether the backend can run on this machine (checked once)."""
+        if self._is_available is None:
+            try:
+                self._is_available = bool(self._available is None or self._available())
+            except Exception:
+                self._is_available = False
+        return self._is_available
+
+    def __repr__(self) -> str:
+        return f"SolverBackend({self.name!r})"
+
+
+_BACKENDS: Dict[str, SolverBackend] = {}
+
+
+def register_backend(
+    name: str,
+    solve: Optional[Callable] = None,
+    pulp_solver: Optional[Callable] = None,
+    available: Optional[Callable[[], bool]] = None,
+    supports_mip: bool = True,
+    warm_start: bool = False,
+) -> SolverBackend:
+    """Register a solver backend, replacing any backend of the same name.
+
+    Args:
+        name: Backend name used by optimizers and solve_model()
+        solve: In-process matrix-form solver (see SolverBackend)
+        pulp_solver: Factory of a PuLP solver object from SolverOptions
+        available: Optional check whether the backend can run here
+        supports_mip: Whether the backend solves integer programs
+        warm_start: Whether ``solve`` uses the ``basis`` argument
+
+    Returns:
+        The registered SolverBackend
+    """
+    if name == AUTO_BACKEND:
+        raise ValueError(f"'{AUTO_BACKEND}' is reserved for automatic selection")
+    if solve is not None:
+        solve = timed_solver(solve, dimensions=matrix_dimensions)
+    backend = SolverBackend(name, solve, pulp_solver, available, supports_mip, warm_start)
+    _BACKENDS[name] = backend
+    return backend
+
+
+def get_backend(name: str) -> SolverBackend:
+    """Return the registered backend of the given name.
+
+    Args:
+        name: Backend name
+
+    Returns:
+        The SolverBackend record
+    """
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown solver backend '{name}', expected one of "
+                         f"{tuple(_BACKENDS) + (AUTO_BACKEND,)}")
+    return _BACKENDS[name]
+
+
+def available_backends(mip: bool = False) -> List[str]:
+    """Names of the registered backends that can run on this machine.
+
+    Args:
+        mip: Only list backends that solve integer programs
+
+    Returns:
+        Backend names in registration order
+    """
+    return [name for name, backend in _BACKENDS.items()
+            if backend.is_available() and (backend.supports_mip or not mip)]
+
+
+def is_pulp_backend(name: str) -> bool:
+    """Whether the named backend solves through a PuLP model."""
+    return name in _BACKENDS and _BACKENDS[name].pulp_solver is not None
+
+
+def set_default_backend(backend: str) -> None:
+    """Set the solver backend used when an optimizer does not choose one.
+
+    Args:
+        backend: A registered backend name, or "auto"
+    """
+    global _default_backend
+    if backend != AUTO_BACKEND:
+        get_backend(backend)
+    _default_backend = backend
+
+
+def get_default_backend() -> str:
+    """Return the solver backend used when an optimizer does not choose one."""
+    return _default_backend
+
+
+def set_default_options(options: Optional[SolverOptions]) -> None:
+    """Set the solver options used when a caller does not pass any.
+
+    Args:
+        options: Options for every solve, or None to restore solver defaults
+    """
+    global _default_options
+    _default_options = options if options is not None else SolverOptions()
+
+
+def get_default_options() -> SolverOptions:
+    """Return the solver options used when a caller does not pass any."""
+    return _default_options
+
+
+def solve_model(model: LpProblem, backend: Optional[str] = None,
+                options: Optional[SolverOptions] = None) -> int:
+    """Solve a PuLP model with the selected backend.
+
+    The "highs" backend solves the model in-process with HiGHS through
+    scipy.optimize.linprog, and "dense" uses the NumPy simplex kernel from
+    batch_lp (best for very small models). Both write variable values,
+    duals and slacks back onto the PuLP objects, so callers read the result
+    exactly as they would after ``model.solve()``. No temporary files are
+    written and no solver process is started. Integer models are solved by
+    HiGHS' MIP solver on the "highs" backend; integer models on "dense", a
+    missing SciPy or GLPK, or a solver failure fall back to CBC. "auto"
+    picks the backend predicted fastest for the model's dimensions.
+
+    Args:
+        model: The LP model to solve
+        backend: Backend name, or None for the global default
+        options: Solver options, or None for the global default
+
+    Returns:
+        The PuLP status code stored in ``model.status``
+    """
+    backend = backend or _default_backend
+    options = options if options is not None else _default_options
+    if backend == AUTO_BACKEND:
+        from .calibration import select_backend
+        backend = select_backend(*_model_dimensions(model))
+    entry = get_backend(backend)
+
+    if not entry.is_available():
+        warnings.warn(f"{backend} backend unavailable; falling back to CBC", RuntimeWarning)
+        entry = _BACKENDS["cbc"]
+    elif entry.solve is not None:
+        try:
+            set_backend(entry.name)
+            return _solve_in_process(model, entry, options)
+        except (ImportError, RuntimeError) as e:
+            warnings.warn(f"{backend} backend unavailable ({e}); falling back to CBC",
+                          RuntimeWarning)
+        entry = _BACKENDS["cbc"]
+
+    set_backend(entry.name)
+    _solve_pulp_model(model, entry.pulp_solver(options))
+    return model.status
+
+
+def _pulp_dimensions(args, kwargs) -> Tuple[int, int, int]:
+    """Rows, columns and nonzeros of the model passed to _solve_pulp_model()."""
+    return _model_dimensions(args[0])[:3]
+
+
+@timed_solver(dimensions=_pulp_dimensions)
+def _solve_pulp_model(model: LpProblem, solver) -> None:
+    """Run a PuLP solver, timing the model file it writes as the write phase."""
+    # PuLP solvers call these methods on the model to write its MPS or LP
+    # file; shadow them on the instance while the solver runs
+    for name in ("writeMPS", "writeLP"):
+        setattr(model, name, timed("write")(getattr(model, name)))
+    try:
+        model.solve(solver)
+    finally:
+        del model.writeMPS, model.writeLP
+
+
+def _model_dimensions(model: LpProblem) -> Tuple[int, int, int, bool]:
+    """Rows, columns, nonzeros and integrality of a PuLP model."""
+    variables = model.variables()
+    nnz = sum(len(constraint) for constraint in model.constraints.values())
+    is_mip = any(v.cat != LpContinuous for v in variables)
+    return len(model.constraints), len(variables), nnz, is_mip
+
+
+@timed_solver(dimensions=matrix_dimensions, backend="highs")
+def solve_highs(
+    c: np.ndarray,
+    A_ub=None,
+    b_ub: Optional[np.ndarray] = None,
+    A_eq=None,
+    b_eq: Optional[np.ndarray] = None,
+    bounds: Optional[np.ndarray] = None,
+    maximize: bool = False,
+    integrality: Optional[np.ndarray] = None,
+    options: Optional[SolverOptions] = None,
+) -> Dict[str, Any]:
+    """Solve an LP in matrix form in-process with HiGHS.
+
+    Args:
+        c: Objective coefficients
+        A_ub: Inequality matrix (dense or scipy.sparse), rows are ``<=``
+        b_ub: Inequality right-hand sides
+        A_eq: Equality matrix (dense or scipy.sparse)
+        b_eq: Equality right-hand sides
+        bounds: Variable bounds as an (n, 2) array or list of pairs
+        maximize: Maximize the objective instead of minimizing it
+        integrality: Optional per-variable flags, 1 for integer variables.
+            Models with integer variables are solved with scipy's milp.
+        options: Time limit, gap and presolve settings (threads are not
+            exposed by SciPy and are ignored)
+
+    Returns:
+        Dictionary with ``status`` (PuLP status name), ``x``, ``objective``,
+        ``duals_ub`` and ``duals_eq`` (d objective / d rhs),
+        ``reduced_costs`` (d objective / d x) and ``iterations``.
+        Integer models return ``mip_gap`` and ``nodes`` instead of duals.
+        Raises RuntimeError when HiGHS reports numerical difficulties.
+    """
+    options = options if options is not None else SolverOptions()
+    if integrality is not None and np.any(integrality):
+        return _solve_highs_mip(c, A_ub, b_ub, A_eq, b_eq, bounds, maximize, integrality,
+                                time_limit=options.time_limit, gap=options.gap,
+                                presolve=options.presolve)
+
+    from scipy.optimize import linprog
+
+    settings = {}
+    if options.time_limit is not None:
+        settings["time_limit"] = options.time_limit
+    if options.presolve is not None:
+        settings["presolve"] = options.presolve
+    direction = -1.0 if maximize else 1.0
+    result = linprog(direction * np.asarray(c, dtype=float), A_ub=A_ub, b_ub=b_ub,
+                     A_eq=A_eq, b_eq=b_eq, bounds=bounds, method="highs", options=settings)
+    if result.status == 4:
+        raise RuntimeError(result.message)
+
+    status = LpStatus[{
+        0: LpStatusOptimal,
+        1: LpStatusNotSolved,
+        2: LpStatusInfeasible,
+        3: LpStatusUnbounded,
+    }[result.status]]
+
+    solution = {"status": status, "iterations": result.nit}
+    if result.status == 0:
+        solution.update({
+            "x": result.x,
+            "objective": direction * result.fun,
+            "duals_ub": direction * result.ineqlin.marginals,
+            "duals_eq": direction * result.eqlin.marginals,
+            "reduced_costs": direction * (result.lower.marginals + result.upper.marginals),
+        })
+    return solution
+
+
+def _solve_highs_mip(c, A_ub, b_ub, A_eq, b_eq, bounds, maximize, integrality,
+                     time_limit: Optional[float] = None,
+                     gap: Optional[float] = None,
+                     presolve: Optional[bool] = None) -> Dict[str, Any]:
+    """Solve a mixed-integer program in-process with scipy's HiGHS milp."""
+    from scipy.optimize import Bounds, LinearConstraint, milp
+
+    c = np.asarray(c, dtype=float)
+    direction = -1.0 if maximize else 1.0
+    constraints = []
+    if A_ub is not None and np.shape(A_ub)[0]:
+        constraints.append(LinearConstraint(A_ub, -np.inf, b_ub))
+    if A_eq is not None and np.shape(A_eq)[0]:
+        constraints.append(LinearConstraint(A_eq, b_eq, b_eq))
+    if bounds is None:
+        bounds = np.column_stack([np.zeros(len(c)), np.full(len(c), np.inf)])
+    bounds = np.asarray(bounds, dtype=float)
+
+    options = {}
+    if time_limit is not None:
+        options["time_limit"] = time_limit
+    if gap is not None:
+        options["mip_rel_gap"] = gap
+    if presolve is not None:
+        options["presolve"] = presolve
+
+    result = milp(direction * c, constraints=constraints, integrality=integrality,
+                  bounds=Bounds(bounds[:, 0], bounds[:, 1]), options=options)
+    if result.status == 4:
+        raise RuntimeError(result.message)
+
+    # A time or node limit with an incumbent still returns that incumbent
+    has_incumbent = result.x is not None
+    status = "Optimal" if result.status == 0 else {
+        1: "Not Solved",
+        2: "Infeasible",
+        3: "Unbounded",
+    }[result.status]
+    solution = {
+        "status": status,
+        "nodes": getattr(result, "mip_node_count", None),
+        "mip_gap": getattr(result, "mip_gap", None),
+    }
+    if has_incumbent:
+        solution["x"] = result.x
+        solution["objective"] = direction * result.fun
+    return solution
+
+
+def _solve_in_process(model: LpProblem, backend: SolverBackend,
+                      options: SolverOptions) -> int:
+    """Solve a PuLP model with an in-process backend and write results back."""
+    with phase("write"):
+        problem = _to_matrices(model, backend)
+    variables, row_refs, c, A_ub, b_ub, A_eq, b_eq, bounds, integrality = problem
+
+    maximize = model.sense == LpMaximize
+    result = backend.solve(c, A_ub, b_ub, A_eq, b_eq, bounds, maximize=maximize,
+                           integrality=integrality, basis=None, options=options)
+
+    with phase("extract"):
+        return _write_back(model, variables, row_refs, result)
+
+
+def _to_matrices(model: LpProblem, backend: SolverBackend) -> Tuple:
+    """Extract the matrix form of a PuLP model for an in-process backend."""
+    from scipy.sparse import coo_matrix
+
+    variables = model.variables()
+    integrality = np.array([v.cat != LpContinuous for v in variables], dtype=int)
+    if not backend.supports_mip and integrality.any():
+        raise RuntimeError("model has integer variables")
+
+    index = {v.name: i for i, v in enumerate(variables)}
+    n = len(variables)
+
+    c = np.zeros(n)
+    if model.objective is not None:
+        for var, coef in model.objective.items():
+            c[index[var.name]] = coef
+
+    # Collect coefficients as COO triplets; >= rows are negated into A_ub
+    rows = {"ub": ([], [], [], []), "eq": ([], [], [], [])}
+    row_refs = {"ub": [], "eq": []}
+    for constraint in model.constraints.values():
+        kind = "eq" if constraint.sense == LpConstraintEQ else "ub"
+        flip = -1.0 if constraint.sense == LpConstraintGE else 1.0
+        r, cols, vals, rhs = rows[kind]
+        row = len(rhs)
+        for var, coef in constraint.items():
+            r.append(row)
+            cols.append(index[var.name])
+            vals.append(flip * coef)
+        rhs.append(-flip * constraint.constant)
+        row_refs[kind].append((constraint, flip))
+
+    def _matrix(kind):
+        r, cols, vals, rhs = rows[kind]
+        if not rhs:
+            return None, None
+        return coo_matrix((vals, (r, cols)), shape=(len(rhs), n)).tocsr(), np.array(rhs)
+
+    A_ub, b_ub = _matrix("ub")
+    A_eq, b_eq = _matrix("eq")
+    bounds = np.array([
+        (-np.inf if v.lowBound is None else v.lowBound,
+         np.inf if v.upBound is None else v.upBound)
+        for v in variables
+    ], dtype=float).reshape(n, 2)
+
+    return variables, row_refs, c, A_ub, b_ub, A_eq, b_eq, bounds, integrality
+
+
+def _write_back(model: LpProblem, variables: List, row_refs: Dict, result: Dict) -> int:
+    """Store an in-process result on the PuLP model's variables and rows."""
+    model.status = {v: k for k, v in LpStatus.items()}[result["status"]]
+
+    if result["status"] == "Optimal":
+        model.sol_status = LpSolutionOptimal
+        for i, var in enumerate(variables):
+            var.varValue = result["x"][i]
+        if "duals_ub" not in result:
+            return model.status
+        for i, var in enumerate(variables):
+            var.dj = result["reduced_costs"][i]
+        for kind in ("ub", "eq"):
+            for (constraint, flip), pi in zip(row_refs[kind], result[f"duals_{kind}"]):
+                constraint.pi = pi * flip
+                constraint.slack = -constraint.value()
+
+    return model.status
+
+
+def _solve_dense(c, A_ub, b_ub, A_eq, b_eq, bounds, maximize=False, integrality=None,
+                 basis=None, options=None) -> Dict[str, Any]:
+    """Dense backend: the NumPy simplex kernel, warm-started from ``basis``."""
+    if integrality is not None and np.any(integrality):
+        raise RuntimeError("The dense backend does not support integer variables")
+    return solve_lp(c, A_ub, b_ub, A_eq, b_eq, bounds, maximize=maximize, basis=basis)
+
+
+def _solve_highs_backend(c, A_ub, b_ub, A_eq, b_eq, bounds, maximize=False, integrality=None,
+                         basis=None, options=None) -> Dict[str, Any]:
+    """HiGHS backend: solve_highs() with the backend calling convention."""
+    return solve_highs(c, A_ub, b_ub, A_eq, b_eq, bounds, maximize=maximize,
+                       integrality=integrality, options=options)
+
+
+def _has_scipy_highs() -> bool:
+    """Whether SciPy ships the HiGHS linprog and milp interfaces."""
+    from scipy.optimize import linprog, milp  # noqa: F401
+    return True
+
+
+def _cbc_solver(options: SolverOptions):
+    """PuLP's bundled CBC binary, with its log silenced."""
+    with warnings.catch_warnings():
+        # PuLP 3 flags the bundled binary as deprecated in favour of a system CBC
+        warnings.simplefilter("ignore", DeprecationWarning)
+        return PULP_CBC_CMD(msg=False, timeLimit=options.time_limit, threads=options.threads,
+                            gapRel=options.gap, presolve=options.presolve)
+
+
+def _glpk_solver(options: SolverOptions):
+    """glpsol through PuLP; GLPK is single-threaded, so threads are ignored."""
+    flags = []
+    if options.gap is not None:
+        flags += ["--mipgap", str(options.gap)]
+    if options.presolve:
+        flags.append("--presol")
+    return GLPK_CMD(msg=False, timeLimit=options.time_limit, options=flags)
+
+
+register_backend("cbc", pulp_solver=_cbc_solver)
+register_backend("highs", solve=_solve_highs_backend, available=_has_scipy_highs)
+register_backend("dense", solve=_solve_dense, supports_mip=False, warm_start=True)
+register_backend("glpk", pulp_solver=_glpk_solver,
+                 available=lambda: GLPK_CMD(msg=False).available())
 
 
 def validate_solution(model: LpProblem) -> bool:
@@ -87,6 +651,9 @@ def export_solution_to_dict(
 ) -> Dict[str, Any]:
     """Export LP solution to a dictionary format.
 
+    For large models use solution_export.export_solution_arrays, which
+    returns aligned arrays instead of one dictionary entry per variable.
+
     Args:
         model: The solved LP model
         variable_names: Optional mapping of variable names to display names
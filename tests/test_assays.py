@@ -0,0 +1,67 @@
+"""Unit tests for the crude assay library."""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.assays import AssayLibrary
+
+
+def make_library():
+    """Three crudes yielding two blending components."""
+    return AssayLibrary(
+        crude_ids=['Brent', 'WTI', 'Maya'],
+        components=['naphtha', 'reformate'],
+        yields=[[0.20, 0.10], [0.25, 0.12], [0.12, 0.05]],
+        qualities=['api', 'sulfur'],
+        properties=[[38.1, 0.4], [39.6, 0.2], [21.8, 3.4]],
+    )
+
+
+class TestAssayLibrary:
+    """Test suite for AssayLibrary class."""
+
+    def test_index_and_select(self):
+        """Test crudes are looked up by ID and yields follow the requested components."""
+        library = make_library()
+        assert len(library) == 3
+        assert 'Maya' in library and 'Ural' not in library
+        assert library.index(['Maya', 'Brent']).tolist() == [2, 0]
+
+        yields, properties = library.select(['WTI', 'Maya'], ['reformate', 'butane'])
+        assert yields.tolist() == [[0.12, 0.0], [0.05, 0.0]]
+        assert properties[:, 1].tolist() == [0.2, 3.4]
+        with pytest.raises(ValueError):
+            library.index(['Ural'])
+
+    def test_csv_round_trip(self, tmp_path):
+        """Test a library written to CSV reads back unchanged."""
+        library = make_library()
+        path = str(tmp_path / 'assays.csv')
+        library.to_csv(path)
+        loaded = AssayLibrary.from_csv(path)
+
+        assert loaded.crude_ids == library.crude_ids
+        assert loaded.components == library.components
+        assert loaded.qualities == library.qualities
+        assert np.array_equal(loaded.yields, library.yields)
+        assert np.array_equal(loaded.properties, library.properties)
+
+    def test_invalid_assays(self):
+        """Test duplicate IDs, bad shapes and yields above 100% are rejected."""
+        with pytest.raises(ValueError):
+            AssayLibrary(['A', 'A'], ['naphtha'], [[0.2], [0.3]])
+        with pytest.raises(ValueError):
+            AssayLibrary(['A'], ['naphtha', 'reformate'], [[0.2]])
+        with pytest.raises(ValueError):
+            AssayLibrary(['A'], ['naphtha', 'reformate'], [[0.7, 0.4]])
+        with pytest.raises(ValueError):
+            AssayLibrary.from_columns({'yield_naphtha': [0.2]})
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -1,13 +1,19 @@
 """Unit tests for Bank Loan Portfolio Optimization model."""
 
 import pytest
+import numpy as np
 import sys
 import os
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.models.bank_loan import BankLoanOptimizer
+from src.models.bank_loan import DEFAULT_RATIO_CONSTRAINTS, BankLoanOptimizer
+from src.utils.parametric import parametric_rhs
+from src.utils.cvar import cvar
+from src.utils.batch_lp import solve_lp
+from src.utils.branch_bound import branch_and_bound
+from src.utils.solver_utils import solve_highs
 
 
 class TestBankLoanOptimizer:
@@ -112,6 +118,418 @@ class TestBankLoanOptimizer:
         assert solution['roi_percentage'] > 0
         assert solution['roi_percentage'] < 100  # ROI should be realistic
 
+    def test_solve_batch_matches_solve(self):
+        """Test that batched solving reproduces individual solves."""
+        funds = [6_000_000, 12_000_000, 20_000_000]
+        batch = BankLoanOptimizer().solve_batch({'total_funds': funds})
+
+        assert list(batch['status']) == ['Optimal'] * 3
+        for k, total_funds in enumerate(funds):
+            solution = BankLoanOptimizer(total_funds=total_funds).solve()
+            assert abs(batch['net_return'][k] - solution['net_return']) < 1e-3
+            assert abs(batch['total_allocated'][k] - solution['total_allocated']) < 1e-3
+
+    def test_solve_batch_parameter_shapes(self):
+        """Test that batch parameters broadcast against the defaults."""
+        optimizer = BankLoanOptimizer()
+        rates = np.tile(optimizer.interest_rates, (4, 1)) + np.linspace(0, 0.02, 4)[:, None]
+        batch = optimizer.solve_batch({'interest_rates': rates})
+
+        assert batch['allocations'].shape == (4, 5)
+        assert np.all(np.diff(batch['net_return']) > 0)
+
+        with pytest.raises(ValueError):
+            optimizer.solve_batch({'unknown': [1.0]})
+
+    def test_highs_backend(self):
+        """Test that the in-process HiGHS backend matches CBC."""
+        cbc = BankLoanOptimizer(backend='cbc').solve()
+        highs = BankLoanOptimizer(backend='highs').solve()
+
+        assert highs['status'] == 'Optimal'
+        assert abs(highs['net_return'] - cbc['net_return']) < 1e-3
+
+        # An exported PuLP model is solved in place, with duals written back
+        optimizer = BankLoanOptimizer(backend='highs')
+        optimizer.build_model()
+        solution = optimizer.solve()
+        assert abs(solution['net_return'] - cbc['net_return']) < 1e-3
+        assert solution['model'].constraints['Total_Funds_Constraint'].pi > 0
+
+    def test_parameter_changes_patch_model(self):
+        """Test changed parameters patch the existing model in place."""
+        rates = [0.10, 0.13, 0.15, 0.125, 0.10]
+        expected = BankLoanOptimizer(interest_rates=rates, backend='highs').solve()
+
+        optimizer = BankLoanOptimizer(backend='highs')
+        model = optimizer.build_model()
+        optimizer.solve()
+        optimizer.interest_rates = rates
+        assert optimizer.dirty_parameters == {'interest_rates'}
+
+        solution = optimizer.solve()
+        assert optimizer.model is model
+        assert abs(solution['net_return'] - expected['net_return']) < 1e-3
+        assert not optimizer.dirty_parameters
+
+        # Renaming loan types rebuilds the model
+        optimizer.set_parameters(loan_types=['A', 'B', 'C', 'D', 'E'])
+        optimizer.solve()
+        assert optimizer.model is not model
+        assert 'A' in optimizer.solution['allocations']
+
+    def test_in_place_edits_are_tracked(self):
+        """Test editing a parameter list in place marks it dirty like an assignment."""
+        optimizer = BankLoanOptimizer(backend='highs')
+        model = optimizer.build_model()
+        optimizer.solve()
+        optimizer.interest_rates[0] = 0.10
+        assert optimizer.dirty_parameters == {'interest_rates'}
+
+        solution = optimizer.solve()
+        expected = BankLoanOptimizer(interest_rates=[0.10, 0.13, 0.12, 0.125, 0.10],
+                                     backend='highs').solve()
+        assert optimizer.model is model
+        assert solution['net_return'] == pytest.approx(expected['net_return'])
+        assert not optimizer.dirty_parameters
+
+        # In-place edits of a rebuild parameter rebuild the model
+        optimizer.loan_types[0] = 'Renamed'
+        assert 'Renamed' in optimizer.solve()['allocations']
+        assert optimizer.model is not model
+
+    def test_dense_backend_warm_start(self):
+        """Test the dense backend re-solves from the previous basis."""
+        optimizer = BankLoanOptimizer(backend='dense')
+        optimizer.solve()
+        basis = optimizer._basis.copy()
+
+        optimizer.total_funds = 15_000_000
+        solution = optimizer.solve()
+        expected = BankLoanOptimizer(total_funds=15_000_000, backend='highs').solve()
+        assert abs(solution['net_return'] - expected['net_return']) < 1e-3
+        assert optimizer.program.solve('dense', basis=basis)['iterations'] == 0
+
+    @pytest.mark.parametrize('kwargs', [
+        dict(interest_rates=[0.0944, 0.1165, 0.0712, 0.1109, 0.1353],
+             bad_debt_ratios=[0.0318, 0.0061, 0.0516, 0.0428, 0.0089],
+             block_sizes=[250_000, 500_000, 500_000, 250_000, 250_000],
+             min_tickets=[0, 2e6, 2e6, 0, 0]),
+        dict(interest_rates=[0.1349, 0.1308, 0.0815, 0.1389, 0.0653],
+             bad_debt_ratios=[0.0235, 0.0133, 0.0298, 0.0488, 0.0177],
+             block_sizes=[500_000, 250_000, 500_000, 250_000, 500_000],
+             min_tickets=[0, 2e6, 0, 2e6, 2e6]),
+    ])
+    def test_dense_backend_badly_scaled(self, kwargs):
+        """Test the dense kernel on ticket rows in the millions next to percent rates."""
+        program = BankLoanOptimizer(**kwargs).compile_model()
+        args = (program.c, program.A_ub, program.b_ub, program.A_eq, program.b_eq, program.bounds)
+        relaxation = solve_lp(*args, maximize=True)
+        expected = solve_highs(*args, maximize=True)
+        assert relaxation['status'] == 'Optimal'
+        assert relaxation['objective'] == pytest.approx(expected['objective'], rel=1e-9)
+
+        dense = BankLoanOptimizer(backend='dense', **kwargs).solve()
+        highs = BankLoanOptimizer(backend='highs', **kwargs).solve()
+        assert dense['status'] == highs['status'] == 'Optimal'
+        assert dense['net_return'] == pytest.approx(highs['net_return'], rel=1e-6)
+
+    def test_declared_ratio_constraints(self):
+        """Test loan groups and ratio constraints declared as data."""
+        K = 300
+        rng = np.random.default_rng(0)
+        loan_types = [f"Segment{i // 30}_Product{i % 30}" for i in range(K)]
+        groups = {f"segment{s}": list(range(30 * s, 30 * (s + 1))) for s in range(10)}
+        rules = [{"name": f"Segment{s}_Cap", "group": f"segment{s}", "max": 0.15}
+                 for s in range(10)]
+        rules.append({"name": "Bad_Debt_Limit", "group": "all",
+                      "weights": "bad_debt_ratios", "max": 0.04})
+        optimizer = BankLoanOptimizer(
+            total_funds=1_000_000,
+            interest_rates=rng.uniform(0.05, 0.15, K).tolist(),
+            bad_debt_ratios=rng.uniform(0.0, 0.08, K).tolist(),
+            loan_types=loan_types, loan_groups=groups, ratio_constraints=rules,
+            backend='highs',
+        )
+        solution = optimizer.solve()
+
+        assert solution['status'] == 'Optimal'
+        x = np.array([solution['allocations'][t] for t in loan_types])
+        total = x.sum()
+        assert total == pytest.approx(1_000_000)
+        assert (x.reshape(10, 30).sum(axis=1) <= 0.15 * total + 1e-6).all()
+        assert np.dot(optimizer.bad_debt_ratios, x) <= 0.04 * total + 1e-6
+
+    def test_default_rules_follow_loan_names(self):
+        """Test default rules apply by loan type name, not position."""
+        program = BankLoanOptimizer(
+            interest_rates=[0.12, 0.10], bad_debt_ratios=[0.03, 0.02],
+            loan_types=["Home", "Commercial"],
+        ).compile_model()
+        assert program.ub_names[2:] == ["Farm_Commercial_Minimum", "Home_Loan_Minimum",
+                                        "Bad_Debt_Limit"]
+        assert program.A_ub.toarray()[2].tolist() == pytest.approx([0.4, -0.6])
+
+        with pytest.raises(ValueError):
+            BankLoanOptimizer(ratio_constraints=[{"name": "Bad", "group": "nope", "min": 0.1}]
+                              ).compile_model()
+
+    def _scenarios(self, S):
+        """Sample lognormal default-rate scenarios around the default ratios."""
+        rng = np.random.default_rng(0)
+        base = np.array([0.10, 0.07, 0.03, 0.05, 0.02])
+        return np.clip(base * rng.lognormal(0.0, 0.6, (S, 5)), 0.0, 1.0)
+
+    def test_cvar_methods_agree(self):
+        """Test the Rockafellar-Uryasev LP and the cutting-plane method agree."""
+        scenarios = self._scenarios(2000)
+        lp = BankLoanOptimizer(default_scenarios=scenarios, cvar_limit=0.07,
+                               cvar_method='lp', backend='highs').solve()
+        cuts = BankLoanOptimizer(default_scenarios=scenarios, cvar_limit=0.07,
+                                 cvar_method='cutting_plane', backend='highs').solve()
+
+        assert lp['status'] == cuts['status'] == 'Optimal'
+        assert cuts['net_return'] == pytest.approx(lp['net_return'], rel=1e-6)
+        assert cuts['cvar_cuts'] > 0
+        # The limit binds and holds for both
+        for solution in (lp, cuts):
+            assert solution['cvar'] == pytest.approx(solution['cvar_limit'], rel=1e-6)
+
+    def test_cvar_memory_mapped_scenarios(self, tmp_path):
+        """Test scenarios streamed in chunks from a .npy file."""
+        scenarios = self._scenarios(5000)
+        path = str(tmp_path / "scenarios.npy")
+        np.save(path, scenarios)
+        optimizer = BankLoanOptimizer(default_scenarios=path, cvar_limit=0.07,
+                                      scenario_chunk_size=512, backend='highs')
+        solution = optimizer.solve()
+
+        assert isinstance(optimizer.default_scenarios, np.memmap)
+        assert solution['status'] == 'Optimal'
+        x = np.array(list(solution['allocations'].values()))
+        _, expected = cvar(scenarios @ x, 0.95)
+        assert solution['cvar'] == pytest.approx(expected)
+        assert expected <= 0.07 * x.sum() * (1 + 1e-6)
+
+    def test_cvar_value(self):
+        """Test CVaR against the Rockafellar-Uryasev minimum over the VaR level."""
+        losses = np.random.default_rng(1).exponential(size=1003)
+        var, value = cvar(losses, 0.9)
+        levels = np.sort(losses)
+        objective = levels + np.maximum(losses[:, None] - levels, 0).sum(axis=0) / (0.1 * 1003)
+        assert value == pytest.approx(objective.min())
+        assert var + np.maximum(losses - var, 0).sum() / (0.1 * 1003) == pytest.approx(value)
+
+    def test_parametric_total_funds(self):
+        """Test the parametric curve matches solves at sample fund levels."""
+        curve = BankLoanOptimizer().parametric_total_funds(0, 20_000_000)
+
+        assert curve['status'] == 'Optimal'
+        assert curve['total_funds'][0] == 0 and curve['total_funds'][-1] == 20_000_000
+        for funds in (5_000_000, 12_000_000, 20_000_000):
+            expected = BankLoanOptimizer(total_funds=funds, backend='highs').solve()
+            value = np.interp(funds, curve['total_funds'], curve['net_return'])
+            assert abs(value - expected['net_return']) < 1e-3
+        segment = curve['segments'][-1]
+        assert sum(a[1] for a in segment['allocations'].values()) == pytest.approx(20_000_000)
+
+    def test_bad_debt_frontier(self):
+        """Test frontier vertices against solves with the cap fixed."""
+        rng = np.random.default_rng(3)
+        K = 30
+        kwargs = dict(
+            interest_rates=rng.uniform(0.05, 0.2, K).tolist(),
+            bad_debt_ratios=rng.uniform(0.0, 0.1, K).tolist(),
+            loan_types=[f"Loan_{i}" for i in range(K)],
+            loan_groups={"a": list(range(10)), "b": list(range(10, 20))},
+        )
+
+        def rules(cap):
+            return [{"name": "A_Minimum", "group": "a", "min": 0.3},
+                    {"name": "B_Maximum", "group": "b", "max": 0.3},
+                    {"name": "Bad_Debt_Limit", "group": "all",
+                     "weights": "bad_debt_ratios", "max": cap}]
+
+        frontier = BankLoanOptimizer(ratio_constraints=rules(0.04), **kwargs).bad_debt_frontier()
+        caps = frontier['bad_debt_cap']
+        assert frontier['status'] == 'Optimal'
+        assert len(caps) > 2 and np.all(np.diff(caps) > 0)
+        assert frontier['allocations'].shape == (len(caps), K)
+        assert np.all(np.diff(frontier['net_return']) >= -1e-6)
+
+        for cap in (caps[0], 0.5 * (caps[1] + caps[2]), caps[-1]):
+            expected = BankLoanOptimizer(ratio_constraints=rules(cap), backend='highs',
+                                         **kwargs).solve()
+            value = np.interp(cap, caps, frontier['net_return'])
+            assert value == pytest.approx(expected['net_return'], rel=1e-7)
+        vertex = BankLoanOptimizer(ratio_constraints=rules(caps[1]), **kwargs)
+        x = frontier['allocations'][1]
+        assert np.dot(vertex.bad_debt_ratios, x) <= caps[1] * x.sum() * (1 + 1e-9)
+
+    def test_frontier_interpolates_through_zero_return(self):
+        """Test interpolation between vertices where the return crosses zero."""
+        rng = np.random.default_rng(10)
+        kwargs = dict(interest_rates=rng.uniform(0.05, 0.15, 5).tolist(),
+                      bad_debt_ratios=rng.uniform(0.0, 0.15, 5).tolist())
+        frontier = BankLoanOptimizer(**kwargs).bad_debt_frontier()
+        caps = frontier['bad_debt_cap']
+        assert frontier['net_return'][0] == 0 and frontier['net_return'][-1] > 0
+        assert len(frontier['marginal_return']) == len(frontier['bases']) == len(caps) - 1
+
+        margins = np.array(BankLoanOptimizer(**kwargs)._calculate_net_returns())
+        for cap in np.linspace(caps[0], caps[-1], 9)[1:-1]:
+            expected = BankLoanOptimizer(
+                ratio_constraints=[dict(r, max=cap) if r['name'] == 'Bad_Debt_Limit' else r
+                                   for r in DEFAULT_RATIO_CONSTRAINTS],
+                backend='highs', **kwargs).solve()
+            value = np.interp(cap, caps, frontier['net_return'])
+            allocations = np.array([np.interp(cap, caps, frontier['allocations'][:, j])
+                                    for j in range(5)])
+            assert value == pytest.approx(expected['net_return'], rel=1e-7, abs=1e-3)
+            assert margins @ allocations == pytest.approx(expected['net_return'],
+                                                          rel=1e-7, abs=1e-3)
+            assert np.dot(kwargs['bad_debt_ratios'], allocations) <= cap * allocations.sum() + 1e-3
+
+    def test_refine_frontier(self):
+        """Test warm-started refinement matches the frontier between vertices."""
+        optimizer = BankLoanOptimizer()
+        frontier = optimizer.bad_debt_frontier()
+        lo, hi = frontier['bad_debt_cap'][0], frontier['bad_debt_cap'][-1]
+        refined = optimizer.refine_frontier(frontier, lo, hi, num=11)
+
+        assert refined['pivots'] == 0
+        assert len(refined['bad_debt_cap']) == 11
+        assert refined['net_return'] == pytest.approx(
+            np.interp(refined['bad_debt_cap'], frontier['bad_debt_cap'], frontier['net_return']))
+        # At the default 4% cap the rule is slack
+        assert frontier['net_return'][-1] == pytest.approx(
+            BankLoanOptimizer(backend='highs').solve()['net_return'])
+
+    def test_parametric_rhs_breakpoints(self):
+        """Test breakpoints of max x1 + 2 x2 s.t. x1 + x2 <= t, x2 <= 3."""
+        result = parametric_rhs([1.0, 2.0], [[1.0, 1.0], [0.0, 1.0]], [0.0, 3.0],
+                                maximize=True, d_ub=[1.0, 0.0], lo=0.0, hi=10.0)
+
+        assert result['breakpoints'].tolist() == pytest.approx([0.0, 3.0, 10.0])
+        assert result['slopes'].tolist() == pytest.approx([2.0, 1.0])
+        assert result['objective'].tolist() == pytest.approx([0.0, 6.0, 13.0])
+        assert result['x'][-1].tolist() == pytest.approx([7.0, 3.0])
+
+        # Raising a lower limit until it crosses an upper limit turns infeasible
+        result = parametric_rhs([1.0], [[1.0], [-1.0]], [4.0, 0.0],
+                                d_ub=[0.0, -1.0], lo=0.0, hi=10.0)
+        assert result['status'] == 'Infeasible'
+        assert result['breakpoints'][-1] == pytest.approx(4.0)
+
+    def test_parametric_rhs_fixed_variable(self):
+        """Test a variable fixed by its bounds is kept out of the basis."""
+        c = [3.0, 1.0, 2.0]
+        A_ub = [[-1.0, -1.0, -1.0], [0.0, 1.0, 0.0]]
+        b_ub, d_ub = [-1.0, 1.0], [-1.0, 0.0]
+        bounds = [[1.0, 1.0], [0.0, np.inf], [0.0, np.inf]]
+        result = parametric_rhs(c, A_ub, b_ub, bounds=bounds, d_ub=d_ub, lo=0.0, hi=5.0)
+
+        assert result['status'] == 'Optimal'
+        for theta, objective, x in zip(result['breakpoints'], result['objective'], result['x']):
+            expected = solve_highs(np.array(c), A_ub=np.array(A_ub),
+                                   b_ub=np.array(b_ub) + theta * np.array(d_ub), bounds=bounds)
+            assert objective == pytest.approx(expected['objective'])
+            assert x[0] == pytest.approx(1.0)
+
+    def test_block_sizes(self):
+        """Test amounts come in whole blocks and match HiGHS' MIP solver."""
+        optimizer = BankLoanOptimizer(block_sizes=250_000, backend='highs')
+        solution = optimizer.solve()
+
+        assert solution['status'] == 'Optimal'
+        amounts = np.array(list(solution['allocations'].values()))
+        assert np.allclose(amounts / 250_000, np.round(amounts / 250_000))
+        expected = optimizer.compile_model().solve('highs')
+        assert solution['net_return'] == pytest.approx(expected['objective'])
+        assert solution['net_return'] <= BankLoanOptimizer(backend='highs').solve()['net_return']
+
+    def test_min_tickets(self):
+        """Test minimum tickets are either unfunded or at least the ticket."""
+        rng = np.random.default_rng(5)
+        K = 12
+        tickets = rng.uniform(1e6, 3e6, K)
+        optimizer = BankLoanOptimizer(
+            interest_rates=rng.uniform(0.05, 0.15, K).tolist(),
+            bad_debt_ratios=rng.uniform(0.0, 0.08, K).tolist(),
+            loan_types=[f"Loan_{i}" for i in range(K)],
+            ratio_constraints=[{"name": "Bad_Debt_Limit", "group": "all",
+                                "weights": "bad_debt_ratios", "max": 0.03}],
+            min_tickets=tickets,
+            max_tickets=np.where(np.arange(K) < 4, tickets, np.inf),
+            mip_gap=0.0,
+            backend='highs',
+        )
+        solution = optimizer.solve()
+        amounts = np.array(list(solution['allocations'].values()))
+
+        assert solution['status'] == 'Optimal'
+        funded = amounts > 1e-6
+        assert np.all(amounts[funded] >= tickets[funded] * (1 - 1e-9))
+        # The first four loan types are all-or-nothing
+        assert np.allclose(amounts[:4][funded[:4]], tickets[:4][funded[:4]])
+        expected = optimizer.compile_model().solve('highs')
+        assert solution['net_return'] == pytest.approx(expected['objective'], rel=1e-6)
+
+        with pytest.raises(ValueError):
+            BankLoanOptimizer(min_tickets=[2e6] * 5, max_tickets=[1e6] * 5)
+        with pytest.raises(NotImplementedError):
+            BankLoanOptimizer(min_tickets=1e6).parametric_total_funds(0, 1e6)
+
+    def test_incumbent_callback_and_limits(self):
+        """Test improving incumbents are streamed and limits stop the search."""
+        rng = np.random.default_rng(3)
+        K = 40
+        kwargs = dict(
+            interest_rates=rng.uniform(0.05, 0.15, K).tolist(),
+            bad_debt_ratios=rng.uniform(0.0, 0.08, K).tolist(),
+            loan_types=[f"Loan_{i}" for i in range(K)],
+            ratio_constraints=[{"name": "Bad_Debt_Limit", "group": "all",
+                                "weights": "bad_debt_ratios", "max": 0.03}],
+            block_sizes=rng.choice([25_000, 100_000, 250_000], K),
+            min_tickets=rng.uniform(0.5e6, 3e6, K),
+            backend='highs',
+        )
+        seen = []
+        solution = BankLoanOptimizer(incumbent_callback=seen.append, mip_gap=0.0,
+                                     **kwargs).solve()
+
+        assert solution['status'] == 'Optimal' and solution['mip_gap'] == 0.0
+        returns = [incumbent['net_return'] for incumbent in seen]
+        assert len(returns) >= 1 and np.all(np.diff(returns) > 0)
+        assert returns[-1] == pytest.approx(solution['net_return'])
+
+        # Stopping at the first incumbent returns it with its gap
+        first = BankLoanOptimizer(incumbent_callback=lambda incumbent: True, **kwargs).solve()
+        assert first['net_return'] == pytest.approx(returns[0])
+        assert first['status'] == ('Optimal' if seen[0]['mip_gap'] <= 1e-4 else 'Not Solved')
+        assert first['mip_gap'] == pytest.approx(seen[0]['mip_gap'])
+
+    def test_branch_and_bound(self):
+        """Test branch and bound against HiGHS on random knapsack-type MIPs."""
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            n, m = rng.integers(3, 10), rng.integers(1, 4)
+            A, b = rng.uniform(0, 10, (m, n)), rng.uniform(10, 40, m)
+            c = rng.uniform(-5, 10, n)
+            bounds = np.column_stack([np.zeros(n), rng.integers(1, 5, n)])
+            integrality = (rng.random(n) < 0.7).astype(int)
+            expected = solve_highs(c, A, b, bounds=bounds, maximize=True,
+                                   integrality=integrality)
+            for backend in ('highs', 'dense'):
+                result = branch_and_bound(c, A, b, bounds=bounds, integrality=integrality,
+                                          maximize=True, gap=0.0, backend=backend)
+                assert result['status'] == 'Optimal'
+                assert result['objective'] == pytest.approx(expected['objective'], abs=1e-6)
+
+        result = branch_and_bound(c, A, b, bounds=bounds, integrality=integrality,
+                                  maximize=True, node_limit=0)
+        assert result['status'] == 'Not Solved' and 'x' not in result
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,137 @@
+"""Unit tests for the content-addressed solve cache."""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.bank_loan import BankLoanOptimizer
+from src.models.production_inventory import ProductionInventoryOptimizer
+from src.utils.cache import SolveCache, canonical_key
+
+
+class TestSolveCache:
+    """Test suite for SolveCache and its use by the optimizers."""
+
+    def test_canonical_key(self):
+        """Test equivalent parameter containers hash alike."""
+        a = canonical_key("M", {"x": [100, 250], "y": 3, "z": {"b": 1, "a": 2}})
+        b = canonical_key("M", {"z": {"a": 2.0, "b": 1}, "y": 3.0,
+                                "x": np.array([100.0, 250.0])})
+        assert a == b
+        assert a != canonical_key("M", {"x": [100, 251], "y": 3, "z": {"b": 1, "a": 2}})
+        assert a != canonical_key("N", {"x": [100, 250], "y": 3, "z": {"b": 1, "a": 2}})
+        assert a != canonical_key("M", {"x": [100, 250], "y": 3, "z": {"b": 1, "a": 2}},
+                                  {"backend": "highs"})
+
+    def test_lru_eviction(self):
+        """Test the memory tier evicts the least recently used entry."""
+        cache = SolveCache(maxsize=2)
+        cache.put("a", {"status": "Optimal"})
+        cache.put("b", {"status": "Optimal"})
+        cache.get("a")
+        cache.put("c", {"status": "Optimal"})
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["hits"] == 2 and stats["misses"] == 1
+
+    def test_optimizer_hit(self):
+        """Test a repeated solve is served from the cache without a model."""
+        cache = SolveCache()
+        first = BankLoanOptimizer(backend="highs")
+        first.cache = cache
+        solution = first.solve()
+
+        second = BankLoanOptimizer(backend="highs", interest_rates=(0.14, 0.13, 0.12, 0.125, 0.10))
+        second.cache = cache
+        cached = second.solve()
+
+        assert cache.hits == 1 and cache.misses == 1
+        assert cached['net_return'] == pytest.approx(solution['net_return'])
+        assert cached['program'] is None and second.program is None
+
+        # A parameter change misses
+        second.total_funds = 10_000_000
+        assert second.solve()['net_return'] != pytest.approx(solution['net_return'])
+        assert cache.misses == 2
+
+    def test_in_place_edit_recompiles(self):
+        """Test an in-place parameter edit is solved and stored under its own key."""
+        cache = SolveCache()
+        optimizer = BankLoanOptimizer(backend="highs")
+        optimizer.cache = cache
+        optimizer.solve()
+        optimizer.interest_rates[0] = 0.5
+        solution = optimizer.solve()
+
+        fresh = BankLoanOptimizer(backend="highs", interest_rates=[0.5, 0.13, 0.12, 0.125, 0.10])
+        expected = fresh.solve()
+        assert solution['net_return'] == pytest.approx(expected['net_return'])
+        fresh.cache = cache
+        assert fresh.solve()['net_return'] == pytest.approx(expected['net_return'])
+        assert cache.hits == 1
+
+    def test_key_covers_cvar_limits(self):
+        """Test a different cut limit misses instead of reusing the solution."""
+        rng = np.random.default_rng(0)
+        base = np.array([0.10, 0.07, 0.03, 0.05, 0.02])
+        scenarios = np.clip(base * rng.lognormal(0.0, 0.6, (500, 5)), 0.0, 1.0)
+        cache = SolveCache()
+        for max_cuts in (200, 1):
+            optimizer = BankLoanOptimizer(default_scenarios=scenarios, cvar_limit=0.07,
+                                          cvar_method='cutting_plane', max_cuts=max_cuts,
+                                          backend='highs')
+            optimizer.cache = cache
+            optimizer.solve()
+        assert cache.hits == 0 and cache.misses == 2
+
+    def test_incumbent_callback_bypasses_cache(self):
+        """Test a registered incumbent callback is called on every solve."""
+        cache = SolveCache()
+        incumbents = []
+        for _ in range(2):
+            optimizer = BankLoanOptimizer(block_sizes=250_000, backend='highs',
+                                          incumbent_callback=incumbents.append)
+            optimizer.cache = cache
+            optimizer.solve()
+        assert cache.hits == cache.misses == 0
+        assert len(incumbents) >= 2
+
+    def test_user_model_bypasses_cache(self):
+        """Test a hand-built PuLP model is always solved."""
+        cache = SolveCache()
+        optimizer = ProductionInventoryOptimizer()
+        optimizer.cache = cache
+        optimizer.build_model()
+        optimizer.solve()
+        optimizer.solve()
+        assert cache.hits == cache.misses == 0
+
+    def test_disk_tier(self, tmp_path):
+        """Test solutions persist in the SQLite tier across cache instances."""
+        path = str(tmp_path / "solutions.db")
+        cache = SolveCache(path=path)
+        optimizer = ProductionInventoryOptimizer()
+        optimizer.cache = cache
+        solution = optimizer.solve()
+        cache.close()
+
+        reopened = SolveCache(path=path)
+        optimizer = ProductionInventoryOptimizer()
+        optimizer.cache = reopened
+        cached = optimizer.solve()
+
+        assert reopened.disk_hits == 1
+        assert cached['production_schedule'] == solution['production_schedule']
+        assert reopened.stats()["disk_size"] == 1
+        reopened.close()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,156 @@
+"""Unit tests for solve phase timings and metrics sinks."""
+
+import json
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.bank_loan import BankLoanOptimizer
+from src.models.oil_refining import OilRefiningOptimizer
+from src.utils.cache import SolveCache
+from src.utils.metrics import (
+    InMemoryMetrics,
+    JsonLinesMetrics,
+    MetricsSink,
+    PhaseTimer,
+    PrometheusMetrics,
+    phase,
+    timed_solver,
+)
+
+
+class TestPhaseTimings:
+    """Test suite for the per-solve metrics record."""
+
+    def test_in_process_record(self):
+        """Test phases add up to the solve and dimensions match the program."""
+        solution = OilRefiningOptimizer(backend='highs').solve()
+        metrics, program = solution['metrics'], solution['program']
+
+        assert metrics['model'] == 'OilRefiningOptimizer'
+        assert metrics['backend'] == 'highs'
+        assert metrics['status'] == 'Optimal'
+        assert {'compile', 'solve', 'extract', 'other'} <= set(metrics['phases'])
+        assert sum(p['wall'] for p in metrics['phases'].values()) == pytest.approx(metrics['wall'])
+        assert (metrics['rows'], metrics['cols'], metrics['nnz']) == \
+            (program.num_rows, program.num_vars, program.nnz)
+        assert metrics['solves'] == 1
+        assert metrics['iterations'] > 0
+
+    def test_pulp_phases(self):
+        """Test the CBC path separates PuLP export, file writing and the solver."""
+        metrics = OilRefiningOptimizer(backend='cbc').solve()['metrics']
+
+        assert {'compile', 'build', 'write', 'solve', 'extract'} <= set(metrics['phases'])
+        assert metrics['phases']['write']['calls'] == 1
+        assert metrics['iterations'] is None
+
+    def test_nested_solvers(self):
+        """Test branch and bound counts nodes and its relaxations' iterations once."""
+        metrics = BankLoanOptimizer(block_sizes=50_000, backend='highs').solve()['metrics']
+
+        assert metrics['solves'] == 1
+        assert metrics['nodes'] >= 1
+        assert metrics['iterations'] >= 1
+
+        @timed_solver(backend='outer')
+        def outer():
+            with phase('compile'):
+                inner()
+            return {'iterations': 100, 'nodes': 3}
+
+        @timed_solver(backend='inner')
+        def inner():
+            return {'iterations': 7}
+
+        with PhaseTimer() as timer:
+            outer()
+        assert (timer.backend, timer.solves, timer.iterations, timer.nodes) == ('outer', 1, 7, 3)
+        assert set(timer.phases()) == {'solve', 'compile', 'other'}
+
+    def test_cache_hit(self):
+        """Test a cache hit is recorded with its lookup time."""
+        cache = SolveCache()
+        first = OilRefiningOptimizer(backend='highs')
+        first.cache = cache
+        first.solve()
+        second = OilRefiningOptimizer(backend='highs')
+        second.cache = cache
+        metrics = second.solve()['metrics']
+
+        assert metrics['cache_hit'] is True
+        assert set(metrics['phases']) == {'cache', 'other'}
+        assert metrics['solves'] == 0
+
+
+class TestMetricsSinks:
+    """Test suite for the in-memory, JSON-lines and Prometheus sinks."""
+
+    def test_in_memory_aggregates(self):
+        """Test totals per model and backend with phase shares."""
+        sink = InMemoryMetrics()
+        for backend in ('highs', 'highs', 'dense'):
+            optimizer = OilRefiningOptimizer(backend=backend)
+            optimizer.metrics_sink = sink
+            optimizer.solve()
+        summary = sink.summary()['OilRefiningOptimizer']
+
+        assert summary['highs']['solves'] == 2
+        assert summary['highs']['statuses'] == {'Optimal': 2}
+        assert summary['dense']['solves'] == 1
+        assert sum(p['share'] for p in summary['highs']['phases'].values()) == pytest.approx(1.0)
+        assert summary['highs']['p50_wall'] <= summary['highs']['p99_wall']
+        assert len(sink.hot_phases(3)) == 3
+
+    def test_json_lines(self, tmp_path):
+        """Test every solve is appended as one JSON line."""
+        path = str(tmp_path / 'metrics.jsonl')
+        sink = JsonLinesMetrics(path)
+        optimizer = OilRefiningOptimizer(backend='dense')
+        optimizer.metrics_sink = sink
+        optimizer.solve()
+        optimizer.solve()
+        sink.close()
+
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+        assert len(records) == 2
+        assert records[0]['backend'] == 'dense'
+        assert 'solve' in records[1]['phases']
+
+    def test_prometheus(self, tmp_path):
+        """Test the text exposition has counters and a consistent histogram."""
+        path = str(tmp_path / 'metrics.prom')
+        sink = PrometheusMetrics(path=path)
+        optimizer = OilRefiningOptimizer(backend='highs')
+        optimizer.metrics_sink = sink
+        for _ in range(3):
+            optimizer.solve()
+        sink.close()
+        text = open(path).read()
+
+        labels = '{model="OilRefiningOptimizer",backend="highs"'
+        assert '# TYPE investment_planning_solve_duration_seconds histogram' in text
+        assert f'investment_planning_solves_total{labels},status="Optimal"}} 3.0' in text
+        assert f'investment_planning_solve_duration_seconds_bucket{labels},le="+Inf"}} 3.0' in text
+        assert f'investment_planning_solve_duration_seconds_count{labels}}} 3.0' in text
+        assert f'investment_planning_phase_wall_seconds_total{labels},phase="solve"}}' in text
+
+    def test_failing_sink_warns(self):
+        """Test a failing sink does not fail the solve."""
+        class Broken(MetricsSink):
+            def emit(self, record):
+                raise OSError('disk full')
+
+        optimizer = OilRefiningOptimizer(backend='highs')
+        optimizer.metrics_sink = Broken()
+        with pytest.warns(RuntimeWarning):
+            solution = optimizer.solve()
+        assert solution['status'] == 'Optimal'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
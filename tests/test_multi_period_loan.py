@@ -0,0 +1,103 @@
+"""Unit tests for the Multi-Period Loan Planning model."""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.multi_period_loan import (
+    MultiPeriodLoanOptimizer,
+    convolve_profiles,
+    loan_profiles,
+)
+
+
+def cash_residual(optimizer, solution):
+    """Recompute the cash balance rows from the origination schedule."""
+    T = optimizer.num_periods
+    _, cash_profile, _, _ = optimizer._profiles(T)
+    returned = convolve_profiles(solution['originations'], cash_profile).sum(axis=0)
+    rc = (1 + optimizer.cash_rate) ** (1 / 12) - 1
+    previous = np.r_[0.0, solution['cash'][:-1]] * (1 + rc)
+    previous[0] = optimizer.total_funds
+    expected = (previous + optimizer.deposits - optimizer.liabilities + returned
+                - solution['originations'].sum(axis=0))
+    return np.abs(solution['cash'] - expected).max()
+
+
+class TestMultiPeriodLoanOptimizer:
+    """Test suite for MultiPeriodLoanOptimizer class."""
+
+    def test_loan_profiles(self):
+        """Test an amortizing loan without defaults pays back principal plus interest."""
+        balance, cash, interest, losses = loan_profiles(
+            [12], [0.01], [0.0], [0.0], [True], horizon=14)
+
+        assert balance[0, 0] == 1.0 and balance[0, 12] == 0.0
+        assert cash[0].sum() == pytest.approx(1.0 + interest[0].sum())
+        assert interest[0, 1] == pytest.approx(0.01)
+        assert losses.sum() == 0.0
+
+    def test_solve(self):
+        """Test the full-horizon plan keeps the cash rows and ratio rules."""
+        optimizer = MultiPeriodLoanOptimizer(num_periods=36, liabilities=20_000,
+                                             backend='highs')
+        solution = optimizer.solve()
+
+        assert solution['status'] == 'Optimal'
+        assert solution['originations'].shape == (5, 36)
+        assert cash_residual(optimizer, solution) < 1e-3
+        assert solution['cash'].min() >= -1e-6
+
+        # Farm and commercial at least 40% of the book every month
+        book = solution['outstanding']
+        assert (book[3:].sum(axis=0) >= 0.4 * book.sum(axis=0) - 1e-3).all()
+        assert solution['terminal_value'] > optimizer.total_funds
+
+    def test_rolling_horizon(self):
+        """Test the rolling horizon gives a feasible plan close to the full LP."""
+        rng = np.random.default_rng(0)
+        K = 12
+        kwargs = dict(
+            interest_rates=rng.uniform(0.05, 0.15, K).tolist(),
+            bad_debt_ratios=rng.uniform(0.0, 0.06, K).tolist(),
+            loan_types=[f"Product_{i}" for i in range(K)],
+            loan_terms=rng.integers(6, 48, K),
+            ratio_constraints=[{"name": "Bad_Debt_Limit", "group": "all",
+                                "weights": "bad_debt_ratios", "max": 0.03}],
+            num_periods=48, liabilities=100_000, backend='highs',
+        )
+        full = MultiPeriodLoanOptimizer(**kwargs).solve()
+        optimizer = MultiPeriodLoanOptimizer(method='rolling', window=12, step=6, **kwargs)
+        rolling = optimizer.solve()
+
+        assert rolling['status'] == full['status'] == 'Optimal'
+        assert cash_residual(optimizer, rolling) < 1e-3
+        assert rolling['terminal_value'] <= full['terminal_value'] * (1 + 1e-9)
+        assert rolling['terminal_value'] >= 0.95 * full['terminal_value']
+
+    def test_switch_to_rolling_after_cbc_solve(self):
+        """Test the model exported for CBC does not pin the full-horizon method."""
+        optimizer = MultiPeriodLoanOptimizer(num_periods=24, backend='cbc')
+        full = optimizer.solve()
+        assert full['model'] is not None
+
+        optimizer.method = 'rolling'
+        optimizer.window, optimizer.step = 12, 6
+        rolling = optimizer.solve()
+        assert rolling['status'] == 'Optimal' and rolling['model'] is None
+        assert optimizer.program.num_vars < full['program'].num_vars
+
+    def test_invalid_arguments(self):
+        """Test invalid methods and window settings are rejected."""
+        with pytest.raises(ValueError):
+            MultiPeriodLoanOptimizer(method='benders')
+        with pytest.raises(ValueError):
+            MultiPeriodLoanOptimizer(window=6, step=12)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -1,6 +1,7 @@
 """Unit tests for Oil Refining Optimization model."""
 
 import pytest
+import numpy as np
 import sys
 import os
 
@@ -8,6 +9,7 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.models.oil_refining import OilRefiningOptimizer
+from src.utils.assays import AssayLibrary
 
 
 class TestOilRefiningOptimizer:
@@ -166,6 +168,182 @@ class TestOilRefiningOptimizer:
 
             assert abs(feedstock + cracker - total) < 1e-6
 
+    def test_solve_batch_matches_solve(self):
+        """Test that batched solving reproduces individual solves."""
+        margins = np.array([[6.70, 7.20, 8.10], [8.00, 7.00, 6.00]])
+        batch = OilRefiningOptimizer().solve_batch({'profit_margins': margins})
+
+        assert list(batch['status']) == ['Optimal', 'Optimal']
+        for k, row in enumerate(margins):
+            solution = OilRefiningOptimizer(
+                profit_margins=dict(zip(['regular', 'premium', 'super'], row))
+            ).solve()
+            assert abs(batch['total_profit'][k] - solution['total_profit']) < 1e-3
+
+    def test_highs_backend(self):
+        """Test that the in-process HiGHS backend matches CBC."""
+        cbc = OilRefiningOptimizer(backend='cbc').solve()
+        highs = OilRefiningOptimizer(backend='highs').solve()
+
+        assert highs['status'] == 'Optimal'
+        assert abs(highs['total_profit'] - cbc['total_profit']) < 1e-3
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend name is rejected."""
+        optimizer = OilRefiningOptimizer(backend='gurobi')
+        with pytest.raises(ValueError):
+            optimizer.solve()
+
+    def test_compile_model_uses_octane_numbers(self):
+        """Test that octane rows follow the octane_numbers parameter."""
+        octane = {'feedstock': 82, 'cracker': 98, 'regular': 87, 'premium': 89, 'super': 92}
+        program = OilRefiningOptimizer(octane_numbers=octane).compile_model()
+        row = program.ub_names.index('Octane_Regular')
+        coefficients = program.A_ub.toarray()[row]
+        assert coefficients[0] == 5 and coefficients[3] == -11
+
+        octane['super'] = 95
+        solution = OilRefiningOptimizer(octane_numbers=octane).solve()
+        production = solution['production']['super']
+        if production['total'] > 1e-6:
+            blended = ((82 * production['feedstock'] + 98 * production['cracker'])
+                       / production['total'])
+            assert blended >= 95 - 1e-3
+
+    def test_parameter_changes_patch_model(self):
+        """Test octane changes rewrite the affected rows of the PuLP model."""
+        octane = {'feedstock': 80, 'cracker': 99, 'regular': 87, 'premium': 90, 'super': 93}
+        expected = OilRefiningOptimizer(octane_numbers=octane, backend='highs').solve()
+
+        optimizer = OilRefiningOptimizer(backend='highs')
+        model = optimizer.build_model()
+        optimizer.solve()
+        optimizer.octane_numbers = octane
+        solution = optimizer.solve()
+
+        assert optimizer.model is model
+        assert abs(solution['total_profit'] - expected['total_profit']) < 1e-3
+
+    def test_general_blend(self):
+        """Test component-property and spec matrices drive the quality rows."""
+        properties = np.array([
+            # octane, rvp, sulfur
+            [82.0, 9.0, 40.0],
+            [98.0, 7.0, 10.0],
+            [113.0, 4.0, 0.0],    # alkylate-like, scarce
+            [94.0, 14.0, 5.0],    # butane-like, high vapour pressure
+        ])
+        spec_min = np.array([[87.0, np.nan, np.nan], [92.0, np.nan, np.nan]])
+        spec_max = np.array([[np.nan, 10.0, 30.0], [np.nan, 9.0, 15.0]])
+        optimizer = OilRefiningOptimizer(
+            components=['straight_run', 'reformate', 'alkylate', 'butane'],
+            products=['regular', 'premium'],
+            qualities=['octane', 'rvp', 'sulfur'],
+            properties=properties,
+            spec_min=spec_min,
+            spec_max=spec_max,
+            demand_limits=[60_000, 40_000],
+            profit_margins=[6.0, 8.0],
+            component_supply=[np.inf, 30_000, 5_000, 10_000],
+            component_costs=[0.0, 1.0, 3.0, 0.5],
+            crude_usage=[5.0, 10.0, 0.0, 0.0],
+            backend='highs',
+        )
+        solution = optimizer.solve()
+
+        assert solution['status'] == 'Optimal'
+        assert solution['blend'].shape == (4, 2)
+        assert np.all(solution['blend'].sum(axis=1)[1:] <= [30_000 + 1e-6, 5_000 + 1e-6,
+                                                            10_000 + 1e-6])
+        for i, product in enumerate(['regular', 'premium']):
+            quality = solution['qualities'][product]
+            assert quality['octane'] >= spec_min[i, 0] - 1e-6
+            assert quality['rvp'] <= spec_max[i, 1] + 1e-6
+            assert quality['sulfur'] <= spec_max[i, 2] + 1e-6
+        blend = solution['blend']
+        margins = blend.sum(axis=0) @ [6.0, 8.0] - blend.sum(axis=1) @ [0.0, 1.0, 3.0, 0.5]
+        assert solution['total_profit'] == pytest.approx(margins)
+
+        # The default refinery written out as matrices gives the same model
+        octane = OilRefiningOptimizer().octane_numbers
+        explicit = OilRefiningOptimizer(
+            components=['feedstock', 'cracker'],
+            qualities=['octane'],
+            properties=[[octane['feedstock']], [octane['cracker']]],
+            spec_min=[[octane[p]] for p in ['regular', 'premium', 'super']],
+            crude_usage=[5, 10],
+            cracker_usage=[0, 2],
+            backend='highs',
+        ).solve()
+        expected = OilRefiningOptimizer(backend='highs').solve()
+        assert explicit['total_profit'] == pytest.approx(expected['total_profit'])
+
+    def test_quality_block_reuse(self):
+        """Test only property and spec changes rebuild the quality rows."""
+        optimizer = OilRefiningOptimizer(backend='highs')
+        optimizer.solve()
+        block = optimizer._blocks['quality'][1]
+
+        optimizer.demand_limits = {'regular': 40_000, 'premium': 30_000, 'super': 40_000}
+        optimizer.solve()
+        assert optimizer._blocks['quality'][1] is block
+
+        optimizer.octane_numbers = dict(optimizer.octane_numbers, cracker=99)
+        optimizer.solve()
+        assert optimizer._blocks['quality'][1] is not block
+
+        # A spec that appears adds a row, so the exported model is rebuilt
+        model = optimizer.build_model()
+        optimizer.spec_max = [[np.nan], [np.nan], [95.0]]
+        solution = optimizer.solve()
+        assert optimizer.model is not model
+        assert 'Octane_Max_Super' in optimizer.program.ub_names
+        assert solution['qualities']['super']['octane'] <= 95 + 1e-6
+
+    def test_crude_slate(self):
+        """Test crude selection from assays respects yields, availability and slate specs."""
+        rng = np.random.default_rng(0)
+        N = 50
+        library = AssayLibrary(
+            [f'Crude_{k}' for k in range(N)], ['feedstock', 'cracker'],
+            rng.uniform(0.05, 0.4, (N, 2)), ['sulfur'], rng.uniform(0.1, 3.0, (N, 1)))
+        prices = rng.uniform(0.5, 2.0, N)
+        optimizer = OilRefiningOptimizer(assays=library, crude_prices=prices,
+                                         crude_availability=100_000, slate_max={'sulfur': 1.0},
+                                         backend='highs')
+        solution = optimizer.solve()
+
+        assert solution['status'] == 'Optimal'
+        volumes = solution['slate_volumes']
+        assert volumes.sum() <= optimizer.crude_capacity + 1e-6
+        assert volumes.max() <= 100_000 + 1e-6
+        assert volumes @ library.properties[:, 0] <= 1.0 * volumes.sum() + 1e-6
+        # Components used cannot exceed what the slate yields
+        assert np.all(solution['blend'].sum(axis=1) <= volumes @ library.yields + 1e-6)
+        assert solution['crude_cost'] == pytest.approx(prices @ volumes)
+        assert set(solution['slate']) <= set(library.crude_ids)
+
+    def test_crude_price_replan(self):
+        """Test a new price deck reuses the yield rows and matches a fresh model."""
+        rng = np.random.default_rng(1)
+        N = 30
+        library = AssayLibrary([f'Crude_{k}' for k in range(N)], ['feedstock', 'cracker'],
+                               rng.uniform(0.05, 0.4, (N, 2)))
+        optimizer = OilRefiningOptimizer(assays=library, crude_prices=rng.uniform(0.5, 2.0, N),
+                                         backend='highs')
+        optimizer.solve()
+        block = optimizer._blocks['slate'][1]
+
+        prices = dict(zip(library.crude_ids, rng.uniform(0.5, 2.0, N)))
+        optimizer.crude_prices = prices
+        solution = optimizer.solve()
+        fresh = OilRefiningOptimizer(assays=library, crude_prices=prices, backend='highs').solve()
+
+        assert optimizer._blocks['slate'][1] is block
+        assert solution['total_profit'] == pytest.approx(fresh['total_profit'])
+        batch = optimizer.solve_batch({'crude_prices': [list(prices.values())]})
+        assert batch['total_profit'][0] == pytest.approx(fresh['total_profit'], rel=1e-6)
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
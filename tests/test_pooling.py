@@ -0,0 +1,113 @@
+"""Unit tests for the pooling model and the successive LP solver."""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.pooling import PoolingOptimizer
+from src.utils.slp import successive_lp
+
+
+def haverly(demand_x=100, cost_b=16, **kwargs):
+    """Haverly's pooling problem: A and B share a pool, C blends directly."""
+    return PoolingOptimizer(
+        pools=['pool'],
+        components=['A', 'B', 'C'],
+        products=['X', 'Y'],
+        qualities=['sulfur'],
+        properties=np.array([[3.0], [1.0], [2.0]]),
+        spec_max=np.array([[2.5], [1.5]]),
+        spec_min=np.full((2, 1), np.nan),
+        demand_limits=[demand_x, 200],
+        profit_margins=[9, 15],
+        component_costs=[6, cost_b, 10],
+        pool_inputs=np.array([[True], [True], [False]]),
+        direct_blending=np.array([[False, False], [False, False], [True, True]]),
+        **kwargs,
+    )
+
+
+class TestPoolingOptimizer:
+    """Test suite for PoolingOptimizer class."""
+
+    @pytest.mark.parametrize('demand_x, cost_b, expected', [
+        (100, 16, 400.0),
+        (600, 16, 600.0),
+        (100, 13, 750.0),
+    ])
+    def test_haverly_instances(self, demand_x, cost_b, expected):
+        """Test the three Haverly instances reach their known optima."""
+        solution = haverly(demand_x, cost_b).solve()
+
+        assert solution['status'] == 'Optimal'
+        assert solution['total_profit'] == pytest.approx(expected, abs=1e-6)
+        assert solution['slp']['residual'] < 1e-6
+        assert solution['slp']['iterations'] <= 20
+
+    def test_pool_qualities_and_specs(self):
+        """Test the pool blends its inflows and products meet their specs."""
+        solution = haverly().solve()
+        pool = solution['pools']['pool']
+        inflow = np.array([pool['inflow'][c] for c in ('A', 'B', 'C')])
+
+        assert pool['inflow']['C'] == pytest.approx(0.0)
+        assert sum(pool['outflow'].values()) == pytest.approx(inflow.sum())
+        assert pool['qualities']['sulfur'] == pytest.approx(inflow @ [3.0, 1.0, 2.0] / inflow.sum())
+        for product, limit in (('X', 2.5), ('Y', 1.5)):
+            if solution['production'][product]['total'] > 0:
+                assert solution['qualities'][product]['sulfur'] <= limit + 1e-6
+        assert solution['direct'][:2].sum() == pytest.approx(0.0)
+
+    def test_backends_agree(self):
+        """Test the dense and HiGHS iterations reach the same profit."""
+        dense = haverly(cost_b=13).solve()
+        highs = haverly(cost_b=13, backend='highs').solve()
+
+        assert highs['total_profit'] == pytest.approx(dense['total_profit'], abs=1e-6)
+        history = dense['slp']['history']
+        assert [record['iteration'] for record in history] == list(range(1, len(history) + 1))
+        assert history[-1]['elapsed'] <= dense['slp']['elapsed']
+
+    def test_invalid_arguments(self):
+        """Test invalid pooling settings raise errors."""
+        with pytest.raises(ValueError):
+            haverly(starts=0)
+        with pytest.raises(ValueError):
+            haverly(pool_capacity=[1.0, 2.0]).compile_model()
+        with pytest.raises(ValueError):
+            haverly(demand_x=np.inf).compile_model()
+        with pytest.raises(NotImplementedError):
+            haverly().build_model()
+
+
+class TestSuccessiveLP:
+    """Test suite for the successive LP solver."""
+
+    def test_bilinear_constraint(self):
+        """Test min x + y subject to x * y >= 4 reaches x = y = 2."""
+        result = successive_lp(
+            np.array([1.0, 1.0]),
+            A_ub=np.zeros((1, 2)), b_ub=np.array([-4.0]),
+            bounds=np.array([[0.5, 8.0], [0.5, 8.0]]),
+            bilinear_ub=(np.array([0]), np.array([0]), np.array([1]), np.array([-1.0])),
+            x0=np.array([8.0, 1.0]),
+        )
+
+        assert result['status'] == 'Optimal'
+        assert result['objective'] == pytest.approx(4.0, abs=1e-3)
+        assert result['x'][0] * result['x'][1] >= 4.0 - 1e-6
+        assert len(result['history']) == result['iterations']
+
+    def test_unbounded_bilinear_variable(self):
+        """Test variables in bilinear terms need finite bounds."""
+        with pytest.raises(ValueError):
+            successive_lp(np.ones(2), bilinear_eq=([0], [0], [1], [1.0]),
+                          A_eq=np.zeros((1, 2)), b_eq=np.ones(1))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
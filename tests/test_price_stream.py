@@ -0,0 +1,86 @@
+"""Unit tests for the price-tick re-optimizer."""
+
+import asyncio
+import pytest
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.oil_refining import OilRefiningOptimizer
+from src.models.price_stream import PriceTickReoptimizer
+from src.models.refinery_schedule import MultiDayRefiningOptimizer
+
+# Tight capacities, so the margins decide the blend
+CAPACITIES = dict(crude_capacity=400_000, cracker_capacity=60_000)
+
+
+def reference_profit(margins):
+    """Profit of a fresh solve with the given margins."""
+    optimizer = OilRefiningOptimizer(profit_margins=margins, backend='highs', **CAPACITIES)
+    return optimizer.solve()['total_profit']
+
+
+class TestPriceTickReoptimizer:
+    """Test suite for PriceTickReoptimizer class."""
+
+    def test_small_tick_skips_solve(self):
+        """Test a tick inside the basis's ranging keeps the plan without solving."""
+        reoptimizer = PriceTickReoptimizer(OilRefiningOptimizer(**CAPACITIES))
+        delta = reoptimizer.update({'regular': 6.75})
+
+        assert delta['resolved'] is False
+        assert delta['changes'] == {}
+        assert delta['total_profit'] == pytest.approx(reference_profit(delta['margins']))
+        assert reoptimizer.metrics()['skipped'] == 1
+
+    def test_large_tick_resolves(self):
+        """Test a tick outside the ranging re-solves and publishes the plan delta."""
+        reoptimizer = PriceTickReoptimizer(OilRefiningOptimizer(**CAPACITIES))
+        delta = reoptimizer.update({'premium': 20.0})
+
+        assert delta['resolved'] is True
+        assert delta['changes']
+        assert delta['total_profit'] == pytest.approx(reference_profit(delta['margins']))
+        assert reoptimizer.metrics()['solves'] == 1
+
+    def test_stream_tracks_latest_prices(self):
+        """Test a stream publishes correct plans and coalesces queued ticks."""
+        rng = np.random.default_rng(2)
+        walk = np.abs(np.array([6.7, 7.2, 8.1]) + rng.normal(0, 3.0, (40, 3)).cumsum(axis=0))
+
+        async def ticks():
+            for margins in walk:
+                yield dict(zip(['regular', 'premium', 'super'], margins.tolist()))
+                await asyncio.sleep(0.001)
+
+        async def collect(source):
+            reoptimizer = PriceTickReoptimizer(OilRefiningOptimizer(**CAPACITIES))
+            return [delta async for delta in reoptimizer.run(source)], reoptimizer.metrics()
+
+        deltas, metrics = asyncio.run(collect(ticks()))
+        assert sum(delta['ticks'] for delta in deltas) == 40
+        assert deltas[-1]['margins']['super'] == pytest.approx(walk[-1, 2])
+        for delta in deltas[::5]:
+            assert delta['total_profit'] == pytest.approx(reference_profit(delta['margins']))
+        assert metrics['solves'] + metrics['skipped'] == metrics['published']
+        assert metrics['latency_p50'] <= metrics['latency_p99']
+
+        # A burst queued up at once is merged into few batches
+        burst = [{'regular': 7.0}, {'premium': 7.5}, {'super': 9.0}, {'regular': 7.1}]
+        deltas, metrics = asyncio.run(collect(burst))
+        assert metrics['ticks'] == 4 and metrics['coalesced'] > 0
+        assert deltas[-1]['margins'] == {'regular': 7.1, 'premium': 7.5, 'super': 9.0}
+
+    def test_invalid_ticks(self):
+        """Test unknown products and unsupported models raise errors."""
+        with pytest.raises(ValueError):
+            PriceTickReoptimizer().update({'diesel': 5.0})
+        with pytest.raises(ValueError):
+            PriceTickReoptimizer(MultiDayRefiningOptimizer(num_days=2))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -1,13 +1,15 @@
 """Unit tests for Production-Inventory Optimization model."""
 
 import pytest
+import numpy as np
 import sys
 import os
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.models.production_inventory import ProductionInventoryOptimizer
+from src.models.production_inventory import LotSizingOptimizer, ProductionInventoryOptimizer
+from src.models.lot_sizing import capacitated_lot_sizing, solve_uncapacitated, wagner_whitin
 
 
 class TestProductionInventoryOptimizer:
@@ -124,6 +126,205 @@ class TestProductionInventoryOptimizer:
         production = solution['production_schedule']
         assert sum(production) >= sum(optimizer.demands) - 1e-6
 
+    def test_solve_batch_matches_solve(self):
+        """Test that batched solving reproduces individual solves."""
+        demands = np.array([
+            [100, 250, 190, 140, 220, 110],
+            [120, 80, 60, 200, 150, 90],
+        ])
+        batch = ProductionInventoryOptimizer().solve_batch({'demands': demands})
+
+        assert list(batch['status']) == ['Optimal', 'Optimal']
+        for k in range(len(demands)):
+            solution = ProductionInventoryOptimizer(demands=list(demands[k])).solve()
+            assert abs(batch['total_cost'][k] - solution['total_cost']) < 1e-6
+            assert batch['production_schedule'][k].sum() == pytest.approx(demands[k].sum())
+
+    def test_highs_backend(self):
+        """Test that the in-process HiGHS backend matches CBC."""
+        cbc = ProductionInventoryOptimizer(backend='cbc').solve()
+        highs = ProductionInventoryOptimizer(backend='highs').solve()
+
+        assert highs['status'] == 'Optimal'
+        assert abs(highs['total_cost'] - cbc['total_cost']) < 1e-6
+
+    def test_compile_model(self):
+        """Test the sparse matrix form of the model."""
+        optimizer = ProductionInventoryOptimizer()
+        program = optimizer.compile_model()
+
+        assert program.num_vars == 2 * optimizer.num_periods
+        assert program.num_rows == optimizer.num_periods
+        assert program.nnz == 3 * optimizer.num_periods - 1
+        assert program.eq_names[0] == 'Period_1_Balance'
+
+        solution = program.solve('highs')
+        expected = ProductionInventoryOptimizer().solve()
+        assert abs(solution['objective'] - expected['total_cost']) < 1e-6
+
+    def test_forward_scan_matches_lp(self):
+        """Test that the forward-scan fast path matches the LP optimum."""
+        rng = np.random.default_rng(7)
+        for _ in range(5):
+            costs = list(rng.uniform(40, 60, 12))
+            demands = list(rng.integers(0, 300, 12).astype(float))
+            fast = ProductionInventoryOptimizer(costs, 3.0, demands).solve()
+            lp = ProductionInventoryOptimizer(costs, 3.0, demands, method='lp').solve()
+
+            assert fast['model'] is None
+            assert lp['model'] is not None
+            assert abs(fast['total_cost'] - lp['total_cost']) < 1e-6
+            assert abs(fast['total_cost'] - fast['production_cost'] - fast['storage_cost']) < 1e-6
+
+    def test_solve_uncapacitated_vectorized(self):
+        """Test forward scan across several SKUs at once."""
+        rng = np.random.default_rng(3)
+        costs = rng.uniform(10, 20, (4, 30))
+        demands = rng.integers(0, 50, (4, 30)).astype(float)
+        result = solve_uncapacitated(costs, [1.0, 2.0, 0.5, 0.0], demands)
+
+        assert result['production_schedule'].shape == (4, 30)
+        assert np.all(result['inventory_schedule'] >= 0)
+        assert np.allclose(result['production_schedule'].sum(axis=1), demands.sum(axis=1))
+        assert np.allclose(result['inventory_schedule'][:, -1], 0)
+
+        single = ProductionInventoryOptimizer(list(costs[1]), 2.0, list(demands[1])).solve()
+        assert abs(result['total_cost'][1] - single['total_cost']) < 1e-6
+
+    def test_stream_first_update_matches_solve(self):
+        """Test the first streamed plan equals the full solve."""
+        optimizer = ProductionInventoryOptimizer()
+        decision = next(optimizer.stream([{}]))
+
+        assert decision['period'] == 0
+        assert decision['production_schedule'] == pytest.approx(
+            ProductionInventoryOptimizer().solve()['production_schedule'])
+
+    def test_stream_rolls_forward(self):
+        """Test committed periods carry their stock into the next window."""
+        optimizer = ProductionInventoryOptimizer()
+        updates = [{}, {'period': 2, 'demands': {3: 200}}, {'period': 3}]
+        decisions = list(optimizer.stream(updates, window=4))
+
+        # Period 1 built 190 units ahead for period 2 (0-based)
+        assert decisions[1]['starting_inventory'] == pytest.approx(190)
+        assert decisions[1]['production'] == pytest.approx(0)
+        assert decisions[2]['production'] == pytest.approx(200)
+        assert len(decisions[2]['production_schedule']) == 4
+        assert min(decisions[2]['inventory_schedule']) >= -1e-9
+
+        with pytest.raises(ValueError):
+            list(optimizer.stream([{'period': 1}, {'demands': {0: 10}}]))
+
+    def test_stream_revises_current_period_and_advances(self):
+        """Test an update that revises today's demand and moves the clock commits the revision."""
+        decision = next(ProductionInventoryOptimizer().stream([{'period': 1, 'demands': {0: 200}}]))
+        expected = ProductionInventoryOptimizer(demands=[200, 250, 190, 140, 220, 110]).solve()
+
+        assert decision['period'] == 1
+        assert decision['starting_inventory'] == pytest.approx(
+            expected['inventory_schedule'][0])
+        assert decision['production'] == pytest.approx(expected['production_schedule'][1])
+
+    def test_astream(self):
+        """Test the async stream yields the same decisions."""
+        import asyncio
+
+        async def updates():
+            for update in [{}, {'period': 1, 'demands': {8: 50}}]:
+                yield update
+
+        async def collect():
+            return [d async for d in ProductionInventoryOptimizer().astream(updates())]
+
+        decisions = asyncio.run(collect())
+        expected = list(ProductionInventoryOptimizer().stream(
+            [{}, {'period': 1, 'demands': {8: 50}}]))
+        assert decisions == expected
+
+    def test_parameter_changes(self):
+        """Test changed demands are picked up by the next solve."""
+        optimizer = ProductionInventoryOptimizer(method='lp', backend='highs')
+        optimizer.solve()
+
+        optimizer.demands = [100, 200, 300, 100, 200, 100]
+        expected = ProductionInventoryOptimizer(demands=[100, 200, 300, 100, 200, 100]).solve()
+        assert optimizer.solve()['total_cost'] == pytest.approx(expected['total_cost'])
+
+        # A different horizon length recompiles the model
+        optimizer.demands = [100, 200]
+        solution = optimizer.solve()
+        assert optimizer.num_periods == 2
+        assert len(solution['production_schedule']) == 2
+
+
+class TestLotSizingOptimizer:
+    """Test suite for LotSizingOptimizer class."""
+
+    def test_wagner_whitin_matches_mip(self):
+        """Test the Wagner-Whitin DP against the MIP on random instances."""
+        rng = np.random.default_rng(3)
+        for _ in range(5):
+            kwargs = dict(
+                production_costs=rng.uniform(40, 60, 10).tolist(),
+                storage_cost=float(rng.uniform(1, 10)),
+                demands=rng.integers(0, 300, 10).tolist(),
+                setup_costs=rng.uniform(100, 2000, 10),
+            )
+            dp = LotSizingOptimizer(**kwargs).solve()
+            mip = LotSizingOptimizer(method="mip", backend="highs", **kwargs).solve()
+
+            assert dp['status'] == "Optimal"
+            assert dp['total_cost'] == pytest.approx(mip['total_cost'])
+            assert dp['total_cost'] == pytest.approx(
+                dp['production_cost'] + dp['storage_cost'] + dp['setup_cost'])
+
+    def test_capacitated_heuristic_bound(self):
+        """Test the capacitated plan is feasible and bracketed by its bound."""
+        rng = np.random.default_rng(4)
+        for _ in range(5):
+            kwargs = dict(
+                production_costs=rng.uniform(40, 60, 10).tolist(),
+                storage_cost=float(rng.uniform(1, 10)),
+                demands=rng.integers(0, 150, 10).tolist(),
+                setup_costs=rng.uniform(100, 2000, 10),
+                capacities=200,
+            )
+            heuristic = LotSizingOptimizer(**kwargs).solve()
+            mip = LotSizingOptimizer(method="mip", backend="highs", **kwargs).solve()
+
+            assert heuristic['status'] in ("Optimal", "Feasible")
+            assert max(heuristic['production_schedule']) <= 200 + 1e-6
+            assert min(heuristic['inventory_schedule']) >= -1e-6
+            assert heuristic['lower_bound'] <= mip['total_cost'] + 1e-6
+            assert heuristic['total_cost'] >= mip['total_cost'] - 1e-6
+            assert heuristic['gap'] >= 0
+
+    def test_insufficient_capacity(self):
+        """Test an instance whose capacity cannot cover demand."""
+        solution = LotSizingOptimizer(capacities=100).solve()
+        assert solution['status'] == "Infeasible"
+
+    def test_long_horizon(self):
+        """Test 1000-period instances with both engines."""
+        rng = np.random.default_rng(5)
+        costs = rng.uniform(40, 60, 1000)
+        demands = rng.integers(0, 100, 1000).astype(float)
+        setups = rng.uniform(100, 1000, 1000)
+
+        exact = wagner_whitin(costs, 2.0, demands, setups)
+        plan = capacitated_lot_sizing(costs, 2.0, demands, setups, 120.0)
+
+        assert exact['production_schedule'].sum() == pytest.approx(demands.sum())
+        assert plan['status'] in ("Optimal", "Feasible")
+        assert plan['production_schedule'].max() <= 120.0 + 1e-6
+        assert plan['lower_bound'] <= plan['total_cost']
+
+    def test_batch_not_supported(self):
+        """Test solve_batch rejects setup costs."""
+        with pytest.raises(NotImplementedError):
+            LotSizingOptimizer().solve_batch({})
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
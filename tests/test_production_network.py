@@ -0,0 +1,126 @@
+"""Unit tests for Production Network Optimization model."""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.production_network import ProductionNetworkOptimizer
+from src.models.production_inventory import ProductionInventoryOptimizer
+from src.utils.min_cost_flow import min_cost_flow
+
+
+class TestProductionNetworkOptimizer:
+    """Test suite for ProductionNetworkOptimizer class."""
+
+    def test_initialization_default(self):
+        """Test default initialization."""
+        optimizer = ProductionNetworkOptimizer()
+
+        assert optimizer.num_skus == 2
+        assert optimizer.num_plants == 2
+        assert optimizer.num_warehouses == 2
+        assert optimizer.num_periods == 6
+        assert optimizer.production_costs.shape == (2, 2, 6)
+
+    def test_solve(self):
+        """Test solving the default network."""
+        optimizer = ProductionNetworkOptimizer()
+        solution = optimizer.solve()
+
+        assert solution['status'] == 'Optimal'
+        assert set(solution['skus']) == {'SKU_1', 'SKU_2'}
+        assert solution['total_cost'] == pytest.approx(
+            solution['production_cost'] + solution['storage_cost'] + solution['transport_cost'])
+
+        # Everything produced is delivered
+        for k, sku in enumerate(optimizer.skus):
+            produced = sum(solution['skus'][sku]['production_schedule'])
+            assert produced == pytest.approx(optimizer.demands[k].sum())
+
+    def test_matches_lp(self):
+        """Test the flow engine against the LP on a capacitated network."""
+        rng = np.random.default_rng(0)
+        S, P, W, T = 3, 2, 3, 8
+        lanes = [(p, P + w) for p in range(P) for w in range(W)] + [(P, P + 1), (P + 1, P)]
+        kwargs = dict(
+            production_costs=rng.uniform(10, 20, (S, P, T)),
+            demands=rng.integers(0, 30, (S, W, T)),
+            lanes=np.array(lanes),
+            lane_costs=rng.uniform(0, 5, (S, len(lanes))),
+            storage_costs=rng.uniform(0, 3, (S, P + W)),
+            production_capacities=60,
+            lane_capacities=40,
+            lead_times=[0] * (P * W) + [1, 1],
+        )
+        flow = ProductionNetworkOptimizer(**kwargs).solve()
+        lp = ProductionNetworkOptimizer(method="lp", backend="highs", **kwargs).solve()
+
+        assert flow['status'] == lp['status'] == 'Optimal'
+        assert flow['total_cost'] == pytest.approx(lp['total_cost'])
+        assert flow['production'].max() <= 60
+        assert flow['shipments'].max() <= 40
+
+    def test_resolve_after_mutation(self):
+        """Test reassigned arrays reach the compiled program of an LP re-solve."""
+        optimizer = ProductionNetworkOptimizer(method="lp", backend="highs")
+        optimizer.solve()
+        program = optimizer.program
+
+        optimizer.demands = optimizer.demands * 2
+        optimizer.lane_costs = 5.0
+        optimizer.production_capacities = 400
+        assert optimizer.dirty_parameters == {"demands", "lane_costs", "production_capacities"}
+        resolved = optimizer.solve()
+        fresh = ProductionNetworkOptimizer(demands=optimizer.demands, lane_costs=5.0,
+                                           production_capacities=400).solve()
+
+        assert optimizer.program is program
+        assert resolved['status'] == fresh['status'] == 'Optimal'
+        assert resolved['total_cost'] == pytest.approx(fresh['total_cost'])
+
+        # Lead times change the arcs, so the program is rebuilt
+        optimizer.lead_times = 1
+        assert optimizer.solve()['status'] == 'Infeasible'
+        assert optimizer.program is not program
+
+    def test_single_site_matches_production_model(self):
+        """Test one plant feeding one warehouse reproduces the single-item plan."""
+        single = ProductionInventoryOptimizer().solve()
+        network = ProductionNetworkOptimizer(
+            production_costs=np.array([[[50, 45, 55, 48, 52, 50]]]),
+            demands=np.array([[[100, 250, 190, 140, 220, 110]]]),
+            lane_costs=0,
+        ).solve()
+
+        sku = network['skus']['SKU_1']
+        assert sku['total_cost'] == pytest.approx(single['total_cost'])
+        assert sku['production_schedule'] == pytest.approx(single['production_schedule'])
+
+    def test_infeasible(self):
+        """Test demand that production capacity cannot cover."""
+        solution = ProductionNetworkOptimizer(production_capacities=10).solve()
+        assert solution['status'] == 'Infeasible'
+
+    def test_min_cost_flow_parallel_arcs(self):
+        """Test parallel and antiparallel arcs with zero costs."""
+        tail = np.array([0, 0, 1, 1, 2])
+        head = np.array([1, 1, 0, 2, 1])
+        result = min_cost_flow(3, tail, head, cost=[0.0, 2.0, 0.0, 1.0, 0.0],
+                               capacity=[3, np.inf, 5, 4, 1], supply=[4, 0, -4])
+
+        assert result['status'] == 'Optimal'
+        assert result['flow'].tolist() == [3, 1, 0, 4, 0]
+        assert result['objective'] == pytest.approx(6.0)
+
+    def test_invalid_method(self):
+        """Test unknown solve methods are rejected."""
+        with pytest.raises(ValueError):
+            ProductionNetworkOptimizer(method="simplex")
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,105 @@
+"""Unit tests for the Multi-Refinery Network model."""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.oil_refining import OilRefiningOptimizer
+from src.models.refinery_network import RefineryNetworkOptimizer
+
+
+def random_network(num_sites, seed=0):
+    """Sites with random blends fed from sources through two terminals."""
+    rng = np.random.default_rng(seed)
+    sites = [
+        OilRefiningOptimizer(
+            crude_capacity=rng.uniform(4e5, 1.2e6),
+            cracker_capacity=rng.uniform(1e5, 2e5),
+            profit_margins=rng.uniform(6, 9, 3),
+            demand_limits=rng.uniform(2e4, 6e4, 3),
+        )
+        for _ in range(num_sites)
+    ]
+    K, M = 3, 2
+    arcs = ([(k, K + m) for k in range(K) for m in range(M)]
+            + [(K + m, K + M + s) for m in range(M) for s in range(num_sites)]
+            + [(s % K, K + M + s) for s in range(num_sites)])
+    return dict(sites=sites, crude_supply=rng.uniform(5e5, 1.5e6, K),
+                crude_costs=rng.uniform(0.3, 0.7, K), terminals=['North', 'South'],
+                arcs=arcs, arc_costs=rng.uniform(0, 0.2, len(arcs)),
+                arc_capacities=rng.uniform(2e5, 8e5, len(arcs)), backend='highs')
+
+
+class TestRefineryNetworkOptimizer:
+    """Test suite for RefineryNetworkOptimizer class."""
+
+    def test_default_network(self):
+        """Test the default two-site network respects supply and capacities."""
+        optimizer = RefineryNetworkOptimizer(backend='highs')
+        solution = optimizer.solve()
+
+        assert solution['status'] == 'Optimal'
+        assert np.all(solution['crude_purchased'] <= np.array([1_000_000, 800_000]) + 1e-6)
+        for site, name in zip(optimizer.sites, optimizer.site_names):
+            blend = solution['sites'][name]['blend']
+            crude_used = blend.sum(axis=1) @ np.array([5.0, 10.0])
+            delivered = solution['crude_delivered'][optimizer.site_names.index(name)]
+            assert crude_used <= delivered + 1e-6
+            assert crude_used <= site.crude_capacity + 1e-6
+        assert solution['total_profit'] == pytest.approx(
+            solution['site_profit'].sum() - solution['crude_cost'] - solution['transport_cost'])
+
+    def test_benders_matches_monolithic(self):
+        """Test Benders decomposition reaches the monolithic optimum."""
+        network = random_network(8)
+        monolithic = RefineryNetworkOptimizer(**network).solve()
+        benders = RefineryNetworkOptimizer(method='benders', **network).solve()
+        dense = RefineryNetworkOptimizer(method='benders', **dict(network, backend='dense')).solve()
+
+        assert benders['status'] == dense['status'] == 'Optimal'
+        assert benders['total_profit'] == pytest.approx(monolithic['total_profit'], rel=1e-6)
+        assert dense['total_profit'] == pytest.approx(monolithic['total_profit'], rel=1e-6)
+        assert benders['gap'] <= 1e-6
+
+        # Terminals pass on exactly what they receive
+        arcs = np.array(network['arcs'])
+        for terminal in (3, 4):
+            inflow = benders['flows'][arcs[:, 1] == terminal].sum()
+            outflow = benders['flows'][arcs[:, 0] == terminal].sum()
+            assert inflow == pytest.approx(outflow, abs=1e-6)
+
+    def test_benders_workers(self):
+        """Test site subproblems solved in worker processes give the same profit."""
+        network = random_network(6, seed=1)
+        serial = RefineryNetworkOptimizer(method='benders', **network).solve()
+        parallel = RefineryNetworkOptimizer(method='benders', workers=2, **network).solve()
+
+        assert parallel['status'] == 'Optimal'
+        assert parallel['total_profit'] == pytest.approx(serial['total_profit'], rel=1e-6)
+
+    def test_site_changes_rebuild(self):
+        """Test editing a site optimizer in place is picked up by the next solve."""
+        optimizer = RefineryNetworkOptimizer(backend='highs')
+        first = optimizer.solve()
+        optimizer.sites[1].crude_capacity = 300_000
+        second = optimizer.solve()
+
+        assert second['crude_delivered'][1] <= 300_000 + 1e-6
+        assert second['total_profit'] < first['total_profit']
+
+    def test_invalid_arguments(self):
+        """Test invalid methods and arcs are rejected."""
+        with pytest.raises(ValueError):
+            RefineryNetworkOptimizer(method='dantzig')
+        with pytest.raises(ValueError):
+            RefineryNetworkOptimizer(arcs=[(2, 0)])
+        with pytest.raises(ValueError):
+            RefineryNetworkOptimizer(site_names=['Only_One'])
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,96 @@
+"""Unit tests for the Multi-Day Refinery Scheduling model."""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.oil_refining import OilRefiningOptimizer
+from src.models.refinery_schedule import MultiDayRefiningOptimizer
+
+
+class TestMultiDayRefiningOptimizer:
+    """Test suite for MultiDayRefiningOptimizer class."""
+
+    def test_single_day_matches_blending_model(self):
+        """Test one day without tanks reproduces the single-day model."""
+        solution = MultiDayRefiningOptimizer(num_days=1, backend='highs').solve()
+        expected = OilRefiningOptimizer(backend='highs').solve()
+
+        assert solution['status'] == 'Optimal'
+        assert solution['total_profit'] == pytest.approx(expected['total_profit'])
+        assert solution['blend'].shape == (1, 2, 3)
+
+    def test_outage_uses_tanks(self):
+        """Test product is stored ahead of a cracker outage."""
+        cracker = np.full(30, 200_000.0)
+        cracker[20:25] = 0.0
+        kwargs = dict(num_days=30, cracker_capacity=cracker, backend='highs')
+        no_tanks = MultiDayRefiningOptimizer(tank_capacity=0.0, **kwargs).solve()
+        optimizer = MultiDayRefiningOptimizer(tank_capacity=150_000, holding_costs=0.01, **kwargs)
+        solution = optimizer.solve()
+
+        assert solution['status'] == 'Optimal'
+        assert solution['total_profit'] > no_tanks['total_profit']
+        assert no_tanks['daily_profit'][20:25].max() == pytest.approx(0.0)
+        assert solution['inventory'][19].sum() > 0
+        assert solution['inventory'].max() <= 150_000 + 1e-6
+
+        # Tank balances and daily demand limits hold
+        inventory = np.vstack([np.zeros(3), solution['inventory']])
+        produced = solution['blend'].sum(axis=1)
+        assert np.allclose(inventory[1:], inventory[:-1] + produced - solution['sales'], atol=1e-6)
+        assert np.all(solution['sales'] <= np.array([50_000, 30_000, 40_000]) + 1e-6)
+        assert solution['total_profit'] == pytest.approx(solution['daily_profit'].sum())
+
+    def test_rolling_horizon(self):
+        """Test the rolling horizon gives a feasible schedule close to the full LP."""
+        days = 60
+        kwargs = dict(
+            num_days=days,
+            cracker_capacity=np.where(np.arange(days) % 20 < 17, 200_000.0, 50_000.0),
+            demand_limits=np.outer(1 + 0.3 * np.sin(np.arange(days) / 9),
+                                   [50_000, 30_000, 40_000]),
+            profit_margins=[6.70, 7.20, 8.10],
+            tank_capacity=100_000,
+            initial_inventory=[10_000, 0, 0],
+            holding_costs=0.05,
+            backend='highs',
+        )
+        full = MultiDayRefiningOptimizer(**kwargs).solve()
+        rolling = MultiDayRefiningOptimizer(method='rolling', window=14, step=7, **kwargs).solve()
+
+        assert rolling['status'] == full['status'] == 'Optimal'
+        assert rolling['total_profit'] <= full['total_profit'] * (1 + 1e-9)
+        assert rolling['total_profit'] >= 0.99 * full['total_profit']
+        inventory = np.vstack([[10_000, 0, 0], rolling['inventory']])
+        produced = rolling['blend'].sum(axis=1)
+        assert np.allclose(inventory[1:], inventory[:-1] + produced - rolling['sales'], atol=1e-6)
+
+    def test_switch_to_rolling_after_cbc_solve(self):
+        """Test the model exported for CBC does not pin the full-horizon method."""
+        optimizer = MultiDayRefiningOptimizer(num_days=30, backend='cbc')
+        full = optimizer.solve()
+        assert full['model'] is not None
+
+        optimizer.method = 'rolling'
+        optimizer.window, optimizer.step = 10, 5
+        rolling = optimizer.solve()
+        assert rolling['status'] == 'Optimal' and rolling['model'] is None
+        assert optimizer.program.num_vars < full['program'].num_vars
+
+    def test_invalid_arguments(self):
+        """Test invalid methods and parameter shapes are rejected."""
+        with pytest.raises(ValueError):
+            MultiDayRefiningOptimizer(method='benders')
+        with pytest.raises(ValueError):
+            MultiDayRefiningOptimizer(window=7, step=14)
+        with pytest.raises(ValueError):
+            MultiDayRefiningOptimizer(num_days=10, crude_capacity=np.ones(5)).compile_model()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,191 @@
+"""Unit tests for the LP sensitivity report."""
+
+import pytest
+import numpy as np
+import sys
+import os
+from pulp import (
+    LpConstraintEQ,
+    LpConstraintGE,
+    LpConstraintLE,
+    LpMinimize,
+    LpProblem,
+    LpVariable,
+)
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.bank_loan import BankLoanOptimizer
+from src.models.oil_refining import OilRefiningOptimizer
+from src.models.production_inventory import ProductionInventoryOptimizer
+from src.utils.cache import SolveCache
+from src.utils.sensitivity import get_sensitivity_report, sensitivity_ranges
+from src.utils.solver_utils import export_solution_to_dict, solve_highs, solve_model
+
+
+class TestSensitivityRanges:
+    """Test suite for ranging from the final basis."""
+
+    def test_textbook_example(self):
+        """Test the Wyndor Glass ranges: max 3x + 5y, x <= 4, 2y <= 12, 3x + 2y <= 18."""
+        c = np.array([3.0, 5.0])
+        A = np.array([[1.0, 0.0], [0.0, 2.0], [3.0, 2.0]])
+        b = np.array([4.0, 12.0, 18.0])
+        result = solve_highs(c, A, b, maximize=True)
+        ranges = sensitivity_ranges(c, A, b, x=result['x'], duals_ub=result['duals_ub'],
+                                    duals_eq=result['duals_eq'], maximize=True)
+
+        assert ranges['basic'].all()
+        assert ranges['duals_ub'] == pytest.approx([0.0, 1.5, 1.0])
+        # 0 <= c_x <= 7.5 and c_y >= 2
+        assert ranges['cost_increase'] == pytest.approx([4.5, np.inf])
+        assert ranges['cost_decrease'] == pytest.approx([3.0, 3.0])
+        # b1 >= 2, 6 <= b2 <= 18, 12 <= b3 <= 24
+        assert ranges['rhs_increase_ub'] == pytest.approx([np.inf, 6.0, 6.0])
+        assert ranges['rhs_decrease_ub'] == pytest.approx([2.0, 6.0, 6.0])
+
+    def test_ranges_match_resolves(self):
+        """Test moves inside a range keep the plan and moves past it change it."""
+        program = ProductionInventoryOptimizer(method='lp').compile_model()
+        result = program.solve('highs')
+        report = get_sensitivity_report(program, result)
+
+        for j, name in enumerate(program.var_names):
+            entry = report['variables'][name]
+            for direction, key in ((1, 'allowable_increase'), (-1, 'allowable_decrease')):
+                allowed = entry[key]
+                if not 1e-6 < allowed < np.inf:
+                    continue
+                c = program.c.copy()
+                program.c[j] = c[j] + direction * 0.99 * allowed
+                inside = program.solve('highs')
+                program.c[j] = c[j] + direction * 1.01 * allowed
+                outside = program.solve('highs')
+                program.c = c
+                assert inside['x'] == pytest.approx(result['x'], abs=1e-6)
+                # Past the range the plan changes, or the LP becomes unbounded
+                assert (outside['status'] != 'Optimal'
+                        or not np.allclose(outside['x'], result['x'], atol=1e-6))
+
+        for i, name in enumerate(program.eq_names):
+            entry = report['constraints'][name]
+            allowed = entry['allowable_decrease']
+            b = program.b_eq.copy()
+            program.b_eq[i] = b[i] - 0.99 * allowed
+            moved = program.solve('highs')
+            program.b_eq = b
+            assert moved['objective'] == pytest.approx(
+                result['objective'] - 0.99 * allowed * entry['pi'])
+
+    def test_long_horizon_in_blocks(self):
+        """Test ranges of a horizon longer than one solve block match re-solves."""
+        rng = np.random.default_rng(3)
+        T = 600
+        program = ProductionInventoryOptimizer(
+            production_costs=rng.uniform(40, 60, T).tolist(),
+            demands=rng.integers(50, 300, T).tolist(), method='lp').compile_model()
+        result = program.solve('highs')
+        ranges = sensitivity_ranges(program.c, A_eq=program.A_eq, b_eq=program.b_eq,
+                                    x=result['x'], duals_ub=result['duals_ub'],
+                                    duals_eq=result['duals_eq'])
+        dense = sensitivity_ranges(program.c, A_eq=program.A_eq.toarray(), b_eq=program.b_eq,
+                                   x=result['x'], duals_ub=result['duals_ub'],
+                                   duals_eq=result['duals_eq'])
+        for key in ranges:
+            assert ranges[key] == pytest.approx(dense[key])
+
+        for j in rng.choice(np.flatnonzero(ranges['basic']), 5, replace=False):
+            c = program.c.copy()
+            program.c[j] = c[j] + 0.99 * ranges['cost_increase'][j]
+            assert program.solve('highs')['x'] == pytest.approx(result['x'], abs=1e-6)
+            program.c = c
+        for i in rng.choice(T, 5, replace=False):
+            b = program.b_eq.copy()
+            delta = 0.99 * min(ranges['rhs_increase_eq'][i], 100.0)
+            program.b_eq[i] = b[i] + delta
+            moved = program.solve('highs')
+            program.b_eq = b
+            assert moved['objective'] == pytest.approx(
+                result['objective'] + delta * ranges['duals_eq'][i])
+
+
+class TestSensitivityReport:
+    """Test suite for reports on the optimizers and PuLP models."""
+
+    @pytest.mark.parametrize('factory', [
+        lambda backend: BankLoanOptimizer(backend=backend),
+        lambda backend: OilRefiningOptimizer(backend=backend),
+        lambda backend: ProductionInventoryOptimizer(method='lp', backend=backend),
+    ])
+    def test_every_optimizer_and_backend(self, factory):
+        """Test reports cover every variable and row and agree on the duals."""
+        reports = []
+        for backend in ('highs', 'dense', 'cbc'):
+            optimizer = factory(backend)
+            optimizer.solve()
+            reports.append(get_sensitivity_report(optimizer))
+
+        program = factory('highs').compile_model()
+        for report in reports:
+            assert set(report['variables']) == set(program.var_names)
+            assert set(report['constraints']) == set(program.ub_names + program.eq_names)
+            assert report['objective_value'] == pytest.approx(reports[0]['objective_value'])
+            for entry in report['variables'].values():
+                assert entry['allowable_increase'] >= 0 and entry['allowable_decrease'] >= 0
+                if not entry['basic']:
+                    assert abs(entry['reduced_cost']) == pytest.approx(
+                        min(entry['allowable_increase'], entry['allowable_decrease']))
+
+    def test_matches_pulp_duals(self):
+        """Test a PuLP model's report keeps its slacks, duals and >= rows."""
+        model = BankLoanOptimizer().build_model()
+        solve_model(model, 'highs')
+        report = get_sensitivity_report(model)
+        expected = export_solution_to_dict(model)
+
+        for name, row in expected['constraints'].items():
+            assert report['constraints'][name]['pi'] == pytest.approx(row['pi'])
+            assert report['constraints'][name]['slack'] == pytest.approx(row['slack'], abs=1e-6)
+        symbols = {LpConstraintLE: '<=', LpConstraintGE: '>=', LpConstraintEQ: '='}
+        for name, constraint in model.constraints.items():
+            assert report['constraints'][name]['sense'] == symbols[constraint.sense]
+
+        # min 2x + 3y with x + y >= 4 and x <= 3: y covers the rest of the demand
+        small = LpProblem('cover', LpMinimize)
+        x, y = LpVariable('x', lowBound=0), LpVariable('y', lowBound=0)
+        small += 2 * x + 3 * y
+        small += x + y >= 4, 'demand'
+        small += x <= 3, 'supply'
+        solve_model(small, 'cbc')
+        demand = get_sensitivity_report(small)['constraints']['demand']
+        assert (demand['sense'], demand['pi']) == ('>=', pytest.approx(3.0))
+        assert (demand['allowable_increase'], demand['allowable_decrease']) == \
+            (np.inf, pytest.approx(1.0))
+
+    def test_without_lp_result(self):
+        """Test cache hits and the forward scan are analysed; MIPs are refused."""
+        report = get_sensitivity_report(_solved(ProductionInventoryOptimizer()))
+        direct = get_sensitivity_report(_solved(ProductionInventoryOptimizer(method='lp')))
+        assert report['objective_value'] == pytest.approx(direct['objective_value'])
+
+        cache = SolveCache()
+        for _ in range(2):
+            optimizer = OilRefiningOptimizer(backend='highs')
+            optimizer.cache = cache
+            optimizer.solve()
+        assert get_sensitivity_report(optimizer)['objective_value'] == pytest.approx(875000.0)
+
+        with pytest.raises(ValueError):
+            get_sensitivity_report(_solved(BankLoanOptimizer(block_sizes=50_000,
+                                                             backend='highs')))
+
+
+def _solved(optimizer):
+    """Solve an optimizer and return it."""
+    optimizer.solve()
+    return optimizer
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,118 @@
+"""Unit tests for the bulk solution export."""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.oil_refining import OilRefiningOptimizer
+from src.models.production_inventory import ProductionInventoryOptimizer
+from src.utils.cache import SolveCache
+from src.utils.solution_export import SolutionArrays, export_solution_arrays
+from src.utils.solver_utils import export_solution_to_dict, solve_model
+
+
+class TestSolutionArrays:
+    """Test suite for exporting solutions as aligned arrays."""
+
+    def test_matches_dict_export(self):
+        """Test the arrays agree with the per-variable dictionary export."""
+        model = OilRefiningOptimizer().build_model()
+        solve_model(model, 'highs')
+        arrays = export_solution_arrays(model)
+        expected = export_solution_to_dict(model)
+
+        assert arrays.objective == pytest.approx(expected['objective_value'])
+        for name, value in expected['variables'].items():
+            assert arrays.values[arrays.variable_index(name)] == pytest.approx(value)
+        for name, row in expected['constraints'].items():
+            i = arrays.row_index(name)
+            assert arrays.duals[i] == pytest.approx(row['pi'])
+            assert arrays.slack[i] == pytest.approx(row['slack'], abs=1e-6)
+
+    def test_arrays_are_aligned(self):
+        """Test row activity and complementary slackness from the arrays alone."""
+        optimizer = OilRefiningOptimizer(backend='dense')
+        optimizer.solve()
+        arrays = optimizer.solution_arrays()
+        program = optimizer.program
+
+        assert list(arrays.var_names) == program.var_names
+        assert arrays.activity == pytest.approx(arrays.rhs - arrays.slack)
+        assert np.all(arrays.slack[arrays.senses == '<='] >= -1e-7)
+        assert np.abs(arrays.duals * arrays.slack).max() < 1e-6
+        assert arrays.costs @ arrays.values == pytest.approx(arrays.objective)
+
+    def test_every_source(self):
+        """Test optimizers on each path, PuLP models and programs export alike."""
+        program = OilRefiningOptimizer().compile_model()
+        exports = [export_solution_arrays(program, program.solve('highs'))]
+        for backend in ('highs', 'dense', 'cbc'):
+            optimizer = OilRefiningOptimizer(backend=backend)
+            optimizer.solve()
+            exports.append(export_solution_arrays(optimizer))
+
+        for arrays in exports:
+            # Several plans are optimal, but each must satisfy strong duality
+            dual_objective = arrays.duals @ arrays.rhs + arrays.reduced_costs @ arrays.values
+            assert arrays.objective == pytest.approx(exports[0].objective)
+            assert dual_objective == pytest.approx(arrays.objective)
+            assert sorted(arrays.var_names) == sorted(program.var_names)
+        with pytest.raises(ValueError):
+            export_solution_arrays(program)
+
+    def test_no_result_to_export(self):
+        """Test cache hits and solves without an LP refuse to export."""
+        cache = SolveCache()
+        first = OilRefiningOptimizer(backend='highs')
+        first.cache = cache
+        first.solve()
+        second = OilRefiningOptimizer(backend='highs')
+        second.cache = cache
+        second.solve()
+        with pytest.raises(ValueError):
+            second.solution_arrays()
+
+        # Uncapacitated lot sizing is solved by a forward scan, not an LP
+        scan = ProductionInventoryOptimizer(backend='highs')
+        scan.solve()
+        with pytest.raises(ValueError):
+            scan.solution_arrays()
+
+    def test_pandas_and_parquet(self, tmp_path):
+        """Test data frames and a Parquet round trip when the libraries exist."""
+        optimizer = OilRefiningOptimizer(backend='highs')
+        optimizer.solve()
+        arrays = optimizer.solution_arrays()
+
+        pytest.importorskip('pandas')
+        variables, constraints = arrays.to_pandas()
+        assert variables.loc[arrays.var_names[0], 'value'] == arrays.values[0]
+        assert list(constraints.columns) == ['sense', 'activity', 'rhs', 'slack', 'dual']
+
+        pq = pytest.importorskip('pyarrow.parquet')
+        path = str(tmp_path / 'variables.parquet')
+        arrays.to_parquet(path, str(tmp_path / 'constraints.parquet'))
+        table = pq.read_table(path)
+        assert table.column('name').to_pylist() == list(arrays.var_names)
+        assert np.array_equal(table.column('value').to_numpy(), arrays.values)
+
+    def test_missing_optional_dependencies(self, monkeypatch):
+        """Test pandas and pyarrow exports name the library they need."""
+        arrays = SolutionArrays('Optimal', 0.0, ['x'], [0.0], [0.0], [0.0], [0.0], [1.0],
+                                [], [], [], [], [], [])
+        for module in ('pandas', 'pyarrow', 'pyarrow.parquet'):
+            monkeypatch.setitem(sys.modules, module, None)
+        with pytest.raises(ImportError, match='pandas'):
+            arrays.to_pandas()
+        with pytest.raises(ImportError, match='pyarrow'):
+            arrays.to_arrow()
+        with pytest.raises(ImportError, match='pyarrow'):
+            arrays.to_parquet('unused.parquet')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,175 @@
+"""Unit tests for the solver backend registry and automatic selection."""
+
+import json
+import platform
+import pytest
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.bank_loan import BankLoanOptimizer
+from src.models.oil_refining import OilRefiningOptimizer
+from src.utils import calibration
+from src.utils import solver_utils
+from src.utils.cache import SolveCache
+from src.utils.solver_utils import (
+    SolverOptions,
+    available_backends,
+    get_backend,
+    register_backend,
+    solve_model,
+)
+
+
+@pytest.fixture(autouse=True)
+def calibration_file(tmp_path):
+    """Keep calibrations out of the user's cache directory."""
+    path = str(tmp_path / 'calibration.json')
+    calibration.set_calibration_path(path)
+    yield path
+    calibration.set_calibration_path(None)
+
+
+def write_calibration(path, models):
+    """Store hand-made cost models as a calibration for this machine."""
+    with open(path, 'w') as f:
+        json.dump({'version': 1, 'fingerprint': calibration.machine_fingerprint(),
+                   'backends': {name: {'work': [], 'seconds': [], 'model': model}
+                                for name, model in models.items()}}, f)
+
+
+class TestSolverBackends:
+    """Test suite for the backend registry and solver options."""
+
+    def test_solver_options(self):
+        """Test options validate their settings and compare by value."""
+        options = SolverOptions(time_limit=5, threads=2, gap=0.01, presolve=False)
+
+        assert options.to_dict() == {'time_limit': 5.0, 'threads': 2, 'gap': 0.01,
+                                     'presolve': False}
+        assert options == SolverOptions(time_limit=5.0, threads=2, gap=0.01, presolve=False)
+        assert SolverOptions().is_default()
+        for bad in ({'time_limit': 0}, {'threads': 1.5}, {'gap': -0.1}):
+            with pytest.raises(ValueError):
+                SolverOptions(**bad)
+
+    def test_options_reach_pulp_solvers(self):
+        """Test CBC and GLPK receive the uniform options in their own syntax."""
+        options = SolverOptions(time_limit=5, threads=2, gap=0.01, presolve=True)
+        cbc = get_backend('cbc').pulp_solver(options)
+        glpk = get_backend('glpk').pulp_solver(options)
+
+        assert cbc.timeLimit == 5.0
+        assert cbc.optionsDict['threads'] == 2
+        assert cbc.optionsDict['gapRel'] == 0.01
+        assert glpk.options == ['--mipgap', '0.01', '--presol']
+        assert 'dense' not in available_backends(mip=True)
+
+    def test_every_backend_agrees(self):
+        """Test the same plan on every available backend, with options set."""
+        profits = []
+        for backend in available_backends():
+            optimizer = OilRefiningOptimizer(backend=backend)
+            optimizer.solver_options = SolverOptions(time_limit=30, threads=1, gap=1e-6)
+            profits.append(optimizer.solve()['total_profit'])
+
+        assert profits == pytest.approx([profits[0]] * len(profits))
+
+    def test_register_backend(self):
+        """Test a registered backend serves optimizers and PuLP models."""
+        calls = []
+
+        def counting(c, A_ub, b_ub, A_eq, b_eq, bounds, maximize=False, integrality=None,
+                     basis=None, options=None):
+            calls.append(options)
+            return solver_utils.solve_highs(c, A_ub, b_ub, A_eq, b_eq, bounds,
+                                            maximize=maximize, integrality=integrality)
+
+        register_backend('counting', solve=counting)
+        try:
+            options = SolverOptions(gap=0.05)
+            optimizer = OilRefiningOptimizer(backend='counting')
+            optimizer.solver_options = options
+            profit = optimizer.solve()['total_profit']
+
+            model = OilRefiningOptimizer().build_model()
+            solve_model(model, 'counting')
+
+            assert profit == pytest.approx(OilRefiningOptimizer().solve()['total_profit'])
+            assert model.status == 1
+            assert calls == [options, SolverOptions()]
+            with pytest.raises(ValueError):
+                register_backend('auto', solve=counting)
+        finally:
+            solver_utils._BACKENDS.pop('counting')
+
+        with pytest.raises(ValueError):
+            OilRefiningOptimizer(backend='counting').solve()
+
+    def test_options_in_cache_key(self):
+        """Test solves with different options do not share cache entries."""
+        cache = SolveCache()
+        first = OilRefiningOptimizer(backend='highs')
+        first.cache = cache
+        first.solve()
+        second = OilRefiningOptimizer(backend='highs')
+        second.cache = cache
+        second.solver_options = SolverOptions(time_limit=60)
+        second.solve()
+
+        assert cache.stats()['misses'] == 2
+
+
+class TestCalibration:
+    """Test suite for the per-machine calibration and auto selection."""
+
+    def test_calibrate_writes_cache(self, calibration_file, monkeypatch):
+        """Test calibration fits every backend once and persists the fit."""
+        result = calibration.calibrate(sizes=((6, 9), (20, 30)), repeats=1)
+        stored = calibration.load_calibration()
+
+        assert set(result['backends']) == set(available_backends())
+        assert stored == json.loads(json.dumps(result))
+        assert all(entry['model'] is not None for entry in stored['backends'].values())
+
+        # Another host with the same hardware and libraries reuses it
+        monkeypatch.setattr(platform, 'node', lambda: 'another-host')
+        assert calibration.load_calibration() == stored
+
+        # A calibration made on other hardware is ignored
+        stored['fingerprint']['cpu'] = 'another-cpu'
+        with open(calibration_file, 'w') as f:
+            json.dump(stored, f)
+        assert calibration.load_calibration() is None
+
+    def test_select_backend(self, calibration_file):
+        """Test the cheapest predicted backend wins and MIPs avoid dense."""
+        # Dense has no overhead but grows fast; HiGHS scales well; CBC is slowest
+        write_calibration(calibration_file, {'dense': [-12.0, 1.5], 'highs': [-8.0, 0.5],
+                                             'cbc': [-7.0, 0.5], 'glpk': [-7.0, 0.5]})
+
+        assert calibration.select_backend(5, 8, 20) == 'dense'
+        assert calibration.select_backend(300, 500, 2000) == 'highs'
+        assert calibration.select_backend(5, 8, 20, is_mip=True) == 'highs'
+        assert calibration.select_backend(10_000, 10_000, 50_000) == 'highs'
+
+    def test_auto_backend(self, calibration_file):
+        """Test the auto backend solves LPs and MIPs like a fixed backend."""
+        write_calibration(calibration_file, {'dense': [-12.0, 1.5], 'highs': [-8.0, 0.5],
+                                             'cbc': [-7.0, 0.5], 'glpk': [-7.0, 0.5]})
+        lp = OilRefiningOptimizer(backend='auto').solve()
+        mip = BankLoanOptimizer(block_sizes=50_000, backend='auto').solve()
+
+        assert lp['total_profit'] == pytest.approx(
+            OilRefiningOptimizer(backend='highs').solve()['total_profit'])
+        amounts = np.array(list(mip['allocations'].values()))
+        assert np.allclose(amounts / 50_000, np.round(amounts / 50_000), atol=1e-6)
+        assert mip['net_return'] == pytest.approx(
+            BankLoanOptimizer(block_sizes=50_000, backend='highs').solve()['net_return'])
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])